@@ -0,0 +1,375 @@
+"""Synthetic throughput benchmark for the direct-query export path.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+
+from .config import (
+    ArchiveConfig,
+    DatabaseConfig,
+    IotConfig,
+    ObjectStorageConfig,
+    SqlExportConfig,
+)
+from .executor import SQL_PAGING_CURSOR, LiveArchiveExecutor
+from .models import EXPORT_FORMAT_PARQUET, DatasetPlan
+from .pipeline import COMPRESSION_GZIP
+
+_WINDOW_START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+_ROW_INTERVAL = timedelta(milliseconds=250)
+_CONTENT_PATHS = ("temperature", "humidity", "battery/level", "location", "status")
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """One export path and output format to measure."""
+
+    dataset: str
+    paging: str = SQL_PAGING_CURSOR
+    compression: str = COMPRESSION_GZIP
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Throughput and memory measured for one benchmark case."""
+
+    case: BenchmarkCase
+    rows: int
+    seconds: float
+    rows_per_second: float
+    uncompressed_mb_per_second: float
+    compressed_mb: float
+    objects: int
+    peak_rss_mb: float | None
+
+
+class _SyntheticLob:
+    """Stand-in for an ``oracledb.LOB`` whose content is read on demand."""
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def read(self) -> str:
+        return self.value
+
+
+_COLUMNS = {
+    "raw": (
+        "id",
+        "digital_twin_instance_id",
+        "endpoint",
+        "time_received",
+        "content_type",
+        "content_encoding",
+        "content_representation",
+        "content",
+    ),
+    "historized": (
+        "id",
+        "digital_twin_instance_id",
+        "content_path",
+        "time_observed",
+        "value_json",
+        "value_number",
+        "value_text",
+    ),
+    "rejected": (
+        "id",
+        "digital_twin_instance_id",
+        "endpoint",
+        "time_received",
+        "reason_code",
+        "reason_message",
+        "content_type",
+        "content_encoding",
+        "content_representation",
+        "content",
+    ),
+}
+
+
+class SyntheticCursor:
+    """Fake ``oracledb`` cursor that generates realistic dataset rows.
+
+    Rows match the columns of the sql-mode dataset queries. ``content`` is
+    returned as a LOB-like object holding JSON text, or base64 for the binary
+    payloads mixed in. Rows have consecutive ids from 1 and times
+    ``_ROW_INTERVAL`` apart, so both the open-cursor and the keyset paging
+    queries can be answered from the bind values alone. Payloads come from a
+    fixed set of templates so generating rows costs far less than exporting
+    them.
+    """
+
+    def __init__(self, dataset: str, rows: int, seed: int = 7, templates: int = 1024):
+        """Store the dataset shape and how many rows the window holds."""
+        self.dataset = dataset
+        self.total_rows = rows
+        self.arraysize = 100
+        self.description = tuple((name.upper(),) for name in _COLUMNS[dataset])
+        rng = random.Random(seed)
+        self._templates = [_row_values(dataset, rng) for _ in range(templates)]
+        self._next = 0
+        self._stop = 0
+
+    def __enter__(self):
+        """Return the cursor for ``with`` blocks."""
+        return self
+
+    def __exit__(self, *_exc_info):
+        """Nothing to release."""
+        return False
+
+    def execute(self, _statement: str, binds: dict[str, Any]) -> None:
+        """Position the cursor at the rows the statement would return."""
+        start = binds.get("last_id", binds.get("after_id")) or 0
+        stop = self.total_rows
+        if "page_rows" in binds:
+            stop = min(stop, start + binds["page_rows"])
+        self._next, self._stop = start, stop
+
+    def fetchmany(self, size: int | None = None) -> list[tuple]:
+        """Generate the next batch of rows."""
+        count = max(0, min(size or self.arraysize, self._stop - self._next))
+        rows = [self._row(index) for index in range(self._next, self._next + count)]
+        self._next += count
+        return rows
+
+    def _row(self, index: int) -> tuple:
+        template = self._templates[index % len(self._templates)]
+        row_time = _WINDOW_START + _ROW_INTERVAL * index
+        return (index + 1, template[1], template[2], row_time, *template[4:])
+
+
+class _SyntheticConnection:
+    def __init__(self, cursor_factory):
+        self.cursor_factory = cursor_factory
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        return False
+
+    def cursor(self) -> SyntheticCursor:
+        return self.cursor_factory()
+
+
+class _SyntheticPool:
+    def __init__(self, cursor_factory):
+        self.cursor_factory = cursor_factory
+
+    def acquire(self) -> _SyntheticConnection:
+        return _SyntheticConnection(self.cursor_factory)
+
+    def close(self) -> None:
+        pass
+
+
+class MeasuringObjectStorageClient:
+    """Fake Object Storage client that counts uploaded bytes and discards them."""
+
+    def __init__(self):
+        """Start with no uploads recorded."""
+        self.objects = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def put_object(self, namespace_name, bucket_name, object_name, put_object_body):
+        """Record one upload."""
+        with self._lock:
+            self.objects += 1
+            self.bytes += len(put_object_body)
+
+
+def _row_values(dataset: str, rng: random.Random) -> tuple:
+    """Build one row template in the dataset's column order.
+
+    The id and time columns are placeholders replaced per generated row.
+    """
+    twin = f"ocid1.iotdigitaltwininstance.oc1.phx.{rng.randrange(5000):08x}"
+    if dataset == "historized":
+        reading = Decimal(rng.randrange(-4000, 12000)) / 100
+        return (
+            None,
+            twin,
+            rng.choice(_CONTENT_PATHS),
+            None,
+            json.dumps(float(reading)),
+            reading,
+            None,
+        )
+
+    if rng.random() < 0.1:
+        payload = rng.randbytes(rng.randrange(256, 4096))
+        content_type, encoding, representation = (
+            "application/octet-stream",
+            "base64",
+            "base64-string",
+        )
+        content = base64.b64encode(payload).decode("ascii")
+    else:
+        content = json.dumps(
+            {
+                "readings": {
+                    path: round(rng.uniform(-40, 120), 2) for path in _CONTENT_PATHS
+                },
+                "firmware": f"{rng.randrange(1, 9)}.{rng.randrange(10)}",
+                "notes": "x" * rng.randrange(0, 1024),
+            }
+        )
+        content_type, encoding, representation = (
+            "application/json",
+            "json",
+            "parsed-json",
+        )
+    endpoint = f"telemetry/{rng.randrange(64)}"
+    classification = (content_type, encoding, representation, _SyntheticLob(content))
+    if dataset == "rejected":
+        return (
+            None,
+            twin,
+            endpoint,
+            None,
+            "SCHEMA_MISMATCH",
+            "Payload does not match the digital twin model",
+            *classification,
+        )
+    return (None, twin, endpoint, None, *classification)
+
+
+def _benchmark_config(
+    case: BenchmarkCase, fetch_rows: int, part_size_mb: int, page_rows: int
+) -> ArchiveConfig:
+    return ArchiveConfig(
+        iot=IotConfig(
+            domain_id="ocid1.iotdomain.oc1..benchmark",
+            retention_days={"raw": 16, "historized": 30, "rejected": 16},
+            bootstrap_lookback_days=1,
+        ),
+        database=DatabaseConfig(
+            connect_string="benchmark",
+            token_scope="benchmark",
+            iot_domain_short_name="benchmark",
+            auth_type="SecurityToken",
+            profile="DEFAULT",
+            thick_mode=False,
+            lib_dir=None,
+            dbms_cloud_credential_name=None,
+        ),
+        object_storage=ObjectStorageConfig(
+            namespace="benchmark",
+            bucket_name="benchmark",
+            prefix="benchmark",
+            manifest_prefix="_manifests",
+            checkpoint_object="_state/checkpoint.json",
+        ),
+        sql_export=replace(
+            SqlExportConfig(),
+            compression=case.compression,
+            fetch_rows=fetch_rows,
+            part_size_mb=part_size_mb,
+            paging=case.paging,
+            page_rows=page_rows,
+        ),
+    )
+
+
+def peak_rss_mb() -> float | None:
+    """Return the process's peak resident set size, where the OS reports it."""
+    try:
+        import resource
+    except ModuleNotFoundError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def run_case(
+    case: BenchmarkCase,
+    rows: int,
+    fetch_rows: int = 1000,
+    part_size_mb: int = 64,
+    page_rows: int = 50000,
+) -> BenchmarkResult:
+    """Export ``rows`` synthetic rows through one path and measure it."""
+    client = MeasuringObjectStorageClient()
+    executor = LiveArchiveExecutor(
+        config=_benchmark_config(case, fetch_rows, part_size_mb, page_rows),
+        object_storage_client=client,
+        namespace="benchmark",
+        region=None,
+        pool=_SyntheticPool(lambda: SyntheticCursor(case.dataset, rows)),
+    )
+    window_end = _WINDOW_START + _ROW_INTERVAL * rows
+    dataset_plan = DatasetPlan(
+        name=case.dataset,
+        retention_days=16,
+        purge_boundary=window_end,
+        window_start=_WINDOW_START,
+        window_end=window_end,
+    )
+
+    started = time.perf_counter()
+    result = executor.execute_dataset(
+        dataset=case.dataset,
+        dataset_plan=dataset_plan,
+        mode="sql",
+        object_prefix=f"benchmark/{case.dataset}",
+        export_format=EXPORT_FORMAT_PARQUET,
+    )
+    seconds = time.perf_counter() - started
+    return BenchmarkResult(
+        case=case,
+        rows=result.row_count or 0,
+        seconds=round(seconds, 3),
+        rows_per_second=round((result.row_count or 0) / seconds, 1),
+        uncompressed_mb_per_second=round(
+            (result.uncompressed_bytes or 0) / (1024 * 1024) / seconds, 2
+        ),
+        compressed_mb=round(client.bytes / (1024 * 1024), 2),
+        objects=client.objects,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def run_benchmark(
+    cases: list[BenchmarkCase],
+    rows: int,
+    isolate: bool = True,
+    **options: int,
+) -> list[BenchmarkResult]:
+    """Run every case and return its measurements in order.
+
+    With ``isolate`` each case runs in a fresh process, so its peak RSS is not
+    inflated by the cases before it.
+    """
+    if not isolate:
+        return [run_case(case, rows, **options) for case in cases]
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    results = []
+    for case in cases:
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=get_context("spawn")
+        ) as pool:
+            results.append(pool.submit(run_case, case, rows, **options).result())
+    return results
@@ -0,0 +1,75 @@
+"""On-disk cache for slowly changing OCI metadata.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+class MetadataCache:
+    """Keep small JSON values in one local file across CLI invocations.
+
+    Each value is stored with the time it was written, and readers decide
+    how old a value they accept. A missing or unreadable file is treated as
+    empty, and writes replace the file atomically, so concurrent processes
+    never read a partly written cache.
+    """
+
+    def __init__(self, path: str | Path, clock: Callable[[], float] = time.time):
+        """Store the cache file location."""
+        self.path = Path(path).expanduser()
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def get(
+        self, key: str, max_age_seconds: float | None = None
+    ) -> tuple[Any, float] | None:
+        """Return a cached value and its age in seconds.
+
+        Values older than ``max_age_seconds`` are treated as missing; with
+        ``None`` any age is accepted.
+        """
+        entry = self._read().get(key)
+        if not isinstance(entry, dict) or "value" not in entry:
+            return None
+        age = max(0.0, self.clock() - float(entry.get("stored_at", 0)))
+        if max_age_seconds is not None and age >= max_age_seconds:
+            return None
+        return entry["value"], age
+
+    def put(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key``; a cache that cannot be written is skipped."""
+        with self._lock:
+            entries = self._read()
+            entries[key] = {"value": value, "stored_at": self.clock()}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                descriptor, temporary = tempfile.mkstemp(
+                    dir=self.path.parent, prefix=f".{self.path.name}."
+                )
+                with os.fdopen(descriptor, "w", encoding="utf-8") as file_obj:
+                    json.dump(entries, file_obj, indent=2, sort_keys=True)
+                os.replace(temporary, self.path)
+            except OSError:
+                pass
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with self.path.open("r", encoding="utf-8") as file_obj:
+                payload = json.load(file_obj)
+        except (OSError, ValueError):
+            return {}
+        return payload if isinstance(payload, dict) else {}
@@ -0,0 +1,84 @@
+"""Catalog index helpers for archive-domain.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime
+
+from .models import STREAM_EXPORT_MODE, CatalogEntry
+
+
+def add_catalog_entries(
+    entries: tuple[CatalogEntry, ...], new_entries: list[CatalogEntry]
+) -> tuple[CatalogEntry, ...]:
+    """Add exported windows, replacing any earlier copy of the same window."""
+    added = {
+        (entry.dataset, entry.run_id, entry.window_start): entry
+        for entry in new_entries
+    }
+    kept = tuple(
+        entry
+        for entry in entries
+        if (entry.dataset, entry.run_id, entry.window_start) not in added
+    )
+    return tuple(
+        sorted(
+            kept + tuple(added.values()),
+            key=lambda entry: (entry.dataset, entry.window_start, entry.run_id),
+        )
+    )
+
+
+def replace_catalog_objects(
+    entries: tuple[CatalogEntry, ...], replacements: dict[str, str]
+) -> tuple[CatalogEntry, ...]:
+    """Point entries at the objects their original objects were merged into."""
+    updated = []
+    for entry in entries:
+        object_names = tuple(
+            dict.fromkeys(replacements.get(name, name) for name in entry.object_names)
+        )
+        updated.append(
+            entry
+            if object_names == entry.object_names
+            else replace(entry, object_names=object_names)
+        )
+    return tuple(updated)
+
+
+def find_catalog_entries(
+    entries: tuple[CatalogEntry, ...],
+    dataset: str,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+) -> tuple[CatalogEntry, ...]:
+    """Return a dataset's entries whose window overlaps ``[start_time, end_time)``."""
+    return tuple(
+        entry
+        for entry in entries
+        if entry.dataset == dataset
+        and (start_time is None or entry.window_end > start_time)
+        and (end_time is None or entry.window_start < end_time)
+    )
+
+
+def archived_through(entries: tuple[CatalogEntry, ...]) -> dict[str, datetime]:
+    """Return the latest exported window end per dataset.
+
+    Stream entries are left out: a part's window ends at its newest message,
+    which says nothing about the windows batch runs have not exported yet.
+    """
+    latest: dict[str, datetime] = {}
+    for entry in entries:
+        if entry.export_mode == STREAM_EXPORT_MODE:
+            continue
+        if entry.dataset not in latest or entry.window_end > latest[entry.dataset]:
+            latest[entry.dataset] = entry.window_end
+    return latest
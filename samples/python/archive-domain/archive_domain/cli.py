@@ -9,12 +9,36 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 
 from __future__ import annotations
 
+import json
 import os
-from datetime import datetime, timezone
+import signal
+from datetime import datetime, timedelta, timezone
 
 import click
 
-from .service import build_service
+from .benchmark import BenchmarkCase, run_benchmark
+from .daemon import ArchiveDaemon, serve_metrics
+from .executor import VALID_SQL_PAGING
+from .pipeline import VALID_COMPRESSIONS
+from .planner import parse_datasets
+from .service import (
+    build_compactor,
+    build_reader,
+    build_service,
+    build_stream_archiver,
+)
+
+_OFFLINE_HELP = (
+    "Make no OCI calls; use cached or configured retention and skip the checkpoint."
+)
+_OFFLINE_NOTE = (
+    "Offline; the checkpoint was not read, so windows start at the bootstrap "
+    "lookback."
+)
+_INCREMENTAL_HELP = (
+    "Export the ids above each dataset's checkpoint high-water mark instead "
+    "of a time window."
+)
 
 
 def _format_timestamp(value: datetime | None) -> str:
@@ -30,6 +54,84 @@ def _parse_timestamp(_ctx: click.Context, _param: click.Parameter, value: str |
     return datetime.fromisoformat(normalized)
 
 
+def _format_bytes(value: int) -> str:
+    size = float(value)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def _format_estimate(estimate) -> str:
+    parts = [f"~{estimate.rows:,} rows ({estimate.method})"]
+    if estimate.bytes is not None:
+        parts.append(f"~{_format_bytes(estimate.bytes)}")
+    parts.append(f"suggested shards={estimate.suggested_shards}")
+    if estimate.expected_seconds is not None:
+        parts.append(
+            f"expected {_format_duration(estimate.expected_seconds)} at "
+            f"{estimate.rows_per_second:,.0f} rows/s ({estimate.throughput_source})"
+        )
+    else:
+        parts.append("expected duration unknown (no throughput recorded)")
+    return ", ".join(parts)
+
+
+def _format_id_range(dataset_plan) -> str:
+    if dataset_plan.resume_after_id is None:
+        return f"through {dataset_plan.through_id:,} from the window start"
+    return f"{dataset_plan.resume_after_id:,} exclusive -> {dataset_plan.through_id:,}"
+
+
+def _shard_options(shard_minutes: int | None, shard_rows: int | None) -> dict:
+    if shard_minutes is not None and shard_rows is not None:
+        raise click.UsageError("Use either --shard-minutes or --shard-rows, not both.")
+    return {
+        "shard_duration": (
+            timedelta(minutes=shard_minutes) if shard_minutes is not None else None
+        ),
+        "target_rows_per_shard": shard_rows,
+    }
+
+
+def _split_choices(value: str, valid: tuple[str, ...]) -> list[str]:
+    selected = [item.strip().lower() for item in value.split(",") if item.strip()]
+    unknown = sorted(set(selected).difference(valid))
+    if not selected or unknown:
+        raise ValueError(f"Choose from {', '.join(valid)}; got: {value}")
+    return selected
+
+
+def _format_daemon_run(run_result) -> str:
+    statuses = ", ".join(
+        f"{result.name}={result.status}" for result in run_result.dataset_results
+    )
+    advanced = "yes" if run_result.checkpoint_advanced else "no"
+    return f"Run {run_result.run_id}: {statuses}; checkpoint advanced: {advanced}" + (
+        f" ({run_result.wall_seconds:.1f}s)"
+        if run_result.wall_seconds is not None
+        else ""
+    )
+
+
+def _format_stream_part(result) -> str:
+    return (
+        f"Wrote {result.row_count} messages to {result.object_names[0]} "
+        f"({_format_bytes(result.compressed_bytes)})"
+    )
+
+
 @click.group()
 @click.option(
     "--config",
@@ -79,24 +181,67 @@ def cli(ctx: click.Context, config_path: str, profile: str, auth: str):
     callback=_parse_timestamp,
     help="Explicit archive window end in ISO-8601 format.",
 )
+@click.option(
+    "--shard-minutes",
+    type=click.IntRange(min=1),
+    help="Split each dataset window into sub-windows of this many minutes.",
+)
+@click.option(
+    "--shard-rows",
+    type=click.IntRange(min=1),
+    help="Split each dataset window so each sub-window holds about this many rows.",
+)
+@click.option(
+    "--estimate",
+    is_flag=True,
+    help="Estimate rows, bytes, shard count, and export duration per window.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help=_INCREMENTAL_HELP,
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help=_OFFLINE_HELP,
+)
 @click.pass_context
 def plan(
     ctx: click.Context,
     datasets: str,
     start_time: datetime | None,
     end_time: datetime | None,
+    shard_minutes: int | None,
+    shard_rows: int | None,
+    estimate: bool,
+    incremental: bool,
+    offline: bool,
 ):
     """Plan archive work."""
     service = build_service(
-        ctx.obj["config_path"], profile=ctx.obj["profile"], auth=ctx.obj["auth"]
-    )
-    plan_result = service.plan(
-        datasets=datasets, start_time=start_time, end_time=end_time
+        ctx.obj["config_path"],
+        profile=ctx.obj["profile"],
+        auth=ctx.obj["auth"],
+        offline=offline,
     )
+    try:
+        plan_result = service.plan(
+            datasets=datasets,
+            start_time=start_time,
+            end_time=end_time,
+            estimate=estimate,
+            incremental=incremental,
+            **_shard_options(shard_minutes, shard_rows),
+        )
+    finally:
+        service.close()
 
     click.echo(
         f"Checkpoint: {_format_timestamp(plan_result.checkpoint.last_successful_run_at)}"
     )
+    if offline:
+        click.echo(_OFFLINE_NOTE)
     for dataset in plan_result.plan.selected_datasets:
         dataset_plan = plan_result.plan.datasets[dataset]
         click.echo(
@@ -104,6 +249,24 @@ def plan(
             f"{_format_timestamp(dataset_plan.window_end)} "
             f"(retention={dataset_plan.retention_days}d)"
         )
+        if dataset_plan.through_id is not None:
+            click.echo(f"  ids: {_format_id_range(dataset_plan)}")
+        if end_time is None and dataset_plan.window_end < dataset_plan.purge_boundary:
+            click.echo(
+                "  cut to the run budget; later runs continue to "
+                f"{_format_timestamp(dataset_plan.purge_boundary)}"
+            )
+        archived_through = plan_result.archived_through.get(dataset)
+        if archived_through is not None:
+            click.echo(f"  archived through: {_format_timestamp(archived_through)}")
+        dataset_estimate = plan_result.estimates.get(dataset)
+        if dataset_estimate is not None:
+            click.echo(f"  estimate: {_format_estimate(dataset_estimate)}")
+        for shard in dataset_plan.shards:
+            click.echo(
+                f"  shard {shard.index}: {_format_timestamp(shard.window_start)} -> "
+                f"{_format_timestamp(shard.window_end)}"
+            )
 
 
 @cli.command()
@@ -135,6 +298,52 @@ def plan(
     callback=_parse_timestamp,
     help="Explicit archive window end in ISO-8601 format.",
 )
+@click.option(
+    "--parallelism",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Maximum number of datasets or sub-windows exported concurrently.",
+)
+@click.option(
+    "--shard-minutes",
+    type=click.IntRange(min=1),
+    help="Split each dataset window into sub-windows of this many minutes.",
+)
+@click.option(
+    "--shard-rows",
+    type=click.IntRange(min=1),
+    help="Split each dataset window so each sub-window holds about this many rows.",
+)
+@click.option(
+    "--worker-id",
+    help=(
+        "Share the run with other workers, claiming datasets and sub-windows "
+        "through leases under this worker name."
+    ),
+)
+@click.option(
+    "--lease-seconds",
+    type=click.IntRange(min=1),
+    default=300,
+    show_default=True,
+    help="How long a claimed work unit stays leased without renewal.",
+)
+@click.option(
+    "--verify",
+    is_flag=True,
+    help="Count each exported window in the database and fail on a mismatch.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help=_INCREMENTAL_HELP,
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help=_OFFLINE_HELP + " Requires --dry-run.",
+)
 @click.pass_context
 def run(
     ctx: click.Context,
@@ -143,31 +352,86 @@ def run(
     dry_run: bool,
     start_time: datetime | None,
     end_time: datetime | None,
+    parallelism: int,
+    shard_minutes: int | None,
+    shard_rows: int | None,
+    worker_id: str | None,
+    lease_seconds: int,
+    verify: bool,
+    incremental: bool,
+    offline: bool,
 ):
     """Run archive work."""
+    if offline and not dry_run:
+        raise click.UsageError("--offline requires --dry-run.")
     service = build_service(
-        ctx.obj["config_path"], profile=ctx.obj["profile"], auth=ctx.obj["auth"]
-    )
-    run_result = service.run(
-        datasets=datasets,
-        mode=mode,
-        dry_run=dry_run,
-        start_time=start_time,
-        end_time=end_time,
+        ctx.obj["config_path"],
+        profile=ctx.obj["profile"],
+        auth=ctx.obj["auth"],
+        offline=offline,
     )
+    try:
+        run_result = service.run(
+            datasets=datasets,
+            mode=mode,
+            dry_run=dry_run,
+            start_time=start_time,
+            end_time=end_time,
+            parallelism=parallelism,
+            worker_id=worker_id,
+            lease_seconds=lease_seconds,
+            verify=verify,
+            incremental=incremental,
+            **_shard_options(shard_minutes, shard_rows),
+        )
+    finally:
+        service.close()
 
     click.echo(f"Run ID: {run_result.run_id}")
     click.echo(f"Mode: {run_result.mode}")
     if dry_run:
         click.echo("Dry run only; no data exported.")
+    if offline:
+        click.echo(_OFFLINE_NOTE)
     for dataset_result in run_result.dataset_results:
+        duration = (
+            f" in {dataset_result.duration_seconds:.1f}s"
+            if dataset_result.duration_seconds is not None
+            else ""
+        )
+        volume = ", ".join(
+            item
+            for item in (
+                (
+                    f"{dataset_result.row_count:,} rows"
+                    if dataset_result.row_count is not None
+                    else None
+                ),
+                (
+                    f"{_format_bytes(dataset_result.compressed_bytes)} written"
+                    if dataset_result.compressed_bytes is not None
+                    else None
+                ),
+            )
+            if item
+        )
         click.echo(
             f"{dataset_result.name}: {dataset_result.status} "
             f"({dataset_result.export_mode}, {dataset_result.export_format})"
+            f"{duration}{f' [{volume}]' if volume else ''}"
+        )
+        if dataset_result.verification is not None:
+            click.echo(f"  rows {dataset_result.verification}")
+        for shard in dataset_result.shards:
+            click.echo(f"  shard {shard.index}: {shard.status}")
+    if run_result.wall_seconds is not None:
+        click.echo(f"Wall time: {run_result.wall_seconds:.1f}s")
+    if worker_id is not None and not dry_run and not run_result.manifest_object_name:
+        click.echo("Another worker commits this run.")
+    else:
+        click.echo(
+            f"Checkpoint advanced: {'yes' if run_result.checkpoint_advanced else 'no'}"
         )
-    click.echo(
-        f"Checkpoint advanced: {'yes' if run_result.checkpoint_advanced else 'no'}"
-    )
     failed_results = [
         result for result in run_result.dataset_results if result.status == "failed"
     ]
@@ -177,3 +441,377 @@ def run(
             for result in failed_results
         )
         raise click.ClickException(f"One or more dataset exports failed: {details}")
+
+
+@cli.command()
+@click.option(
+    "--datasets",
+    default="raw,historized,rejected",
+    show_default=True,
+    help="Comma-separated dataset list.",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["bulk", "sql"]),
+    default="sql",
+    show_default=True,
+    help="Archive execution mode for each micro-batch.",
+)
+@click.option(
+    "--interval-seconds",
+    type=click.IntRange(min=1),
+    default=300,
+    show_default=True,
+    help="Start a micro-batch run this often.",
+)
+@click.option(
+    "--parallelism",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Maximum number of datasets or sub-windows exported concurrently.",
+)
+@click.option(
+    "--shard-minutes",
+    type=click.IntRange(min=1),
+    help="Split each dataset window into sub-windows of this many minutes.",
+)
+@click.option(
+    "--shard-rows",
+    type=click.IntRange(min=1),
+    help="Split each dataset window so each sub-window holds about this many rows.",
+)
+@click.option(
+    "--worker-id",
+    help="Share each run with other workers through leases under this name.",
+)
+@click.option(
+    "--lease-seconds",
+    type=click.IntRange(min=1),
+    default=300,
+    show_default=True,
+    help="How long a claimed work unit stays leased without renewal.",
+)
+@click.option(
+    "--retention-ttl-minutes",
+    type=click.IntRange(min=1),
+    default=60,
+    show_default=True,
+    help="Refetch the IoT Domain retention at most this often.",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(min=0, max=65535),
+    help="Serve Prometheus metrics at /metrics on this port.",
+)
+@click.option(
+    "--max-runs",
+    type=click.IntRange(min=1),
+    help="Exit after this many runs instead of running until stopped.",
+)
+@click.pass_context
+def serve(
+    ctx: click.Context,
+    datasets: str,
+    mode: str,
+    interval_seconds: int,
+    parallelism: int,
+    shard_minutes: int | None,
+    shard_rows: int | None,
+    worker_id: str | None,
+    lease_seconds: int,
+    retention_ttl_minutes: int,
+    metrics_port: int | None,
+    max_runs: int | None,
+):
+    """Run archive micro-batches on a fixed cadence until stopped."""
+    run_options = {
+        "datasets": datasets,
+        "mode": mode,
+        "parallelism": parallelism,
+        "worker_id": worker_id,
+        "lease_seconds": lease_seconds,
+        **_shard_options(shard_minutes, shard_rows),
+    }
+    service = build_service(
+        ctx.obj["config_path"],
+        profile=ctx.obj["profile"],
+        auth=ctx.obj["auth"],
+        retention_ttl_seconds=retention_ttl_minutes * 60,
+    )
+    daemon = ArchiveDaemon(
+        service,
+        interval_seconds,
+        run_options,
+        on_run=lambda result: click.echo(_format_daemon_run(result)),
+        on_error=lambda exc: click.echo(f"Run failed: {exc}", err=True),
+    )
+    server = None
+    if metrics_port is not None:
+        server = serve_metrics(daemon.render_metrics, metrics_port)
+        click.echo(f"Serving metrics on port {server.server_address[1]}")
+    previous_handler = signal.signal(signal.SIGTERM, lambda *_args: daemon.stop())
+    try:
+        daemon.serve(max_runs=max_runs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        if server is not None:
+            server.shutdown()
+        service.close()
+
+
+@cli.command()
+@click.option(
+    "--max-parts",
+    type=click.IntRange(min=1),
+    help="Exit after writing this many parts instead of running until stopped.",
+)
+@click.pass_context
+def stream(ctx: click.Context, max_parts: int | None):
+    """Archive raw messages from the IoT Domain queue as they arrive."""
+    archiver = build_stream_archiver(
+        ctx.obj["config_path"], profile=ctx.obj["profile"], auth=ctx.obj["auth"]
+    )
+    previous_handler = signal.signal(signal.SIGTERM, lambda *_args: archiver.stop())
+    try:
+        archiver.run(
+            max_parts=max_parts,
+            on_flush=lambda result: click.echo(_format_stream_part(result)),
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        archiver.close()
+
+
+@cli.command()
+@click.option(
+    "--dataset",
+    type=click.Choice(["raw", "historized", "rejected"]),
+    required=True,
+    help="Dataset to read back from the archive.",
+)
+@click.option(
+    "--start-time",
+    callback=_parse_timestamp,
+    required=True,
+    help="Start of the archive time range in ISO-8601 format.",
+)
+@click.option(
+    "--end-time",
+    callback=_parse_timestamp,
+    required=True,
+    help="End of the archive time range in ISO-8601 format (exclusive).",
+)
+@click.option(
+    "--source-dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Read from a local copy of the bucket instead of Object Storage.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of parts downloaded ahead of the output.",
+)
+@click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    help="Stop after printing this many records.",
+)
+@click.option(
+    "--use-catalog",
+    is_flag=True,
+    help="Select parts from the catalog index instead of listing the bucket.",
+)
+@click.pass_context
+def read(
+    ctx: click.Context,
+    dataset: str,
+    start_time: datetime,
+    end_time: datetime,
+    source_dir: str | None,
+    concurrency: int,
+    limit: int | None,
+    use_catalog: bool,
+):
+    """Print archived records as JSON lines."""
+    if end_time <= start_time:
+        raise click.UsageError("--end-time must be after --start-time.")
+    reader = build_reader(
+        ctx.obj["config_path"],
+        profile=ctx.obj["profile"],
+        auth=ctx.obj["auth"],
+        source_dir=source_dir,
+        concurrency=concurrency,
+        use_catalog=use_catalog,
+    )
+    records = reader.iter_records(dataset, start_time, end_time)
+    for count, record in enumerate(records, start=1):
+        click.echo(json.dumps(record, default=str))
+        if limit is not None and count >= limit:
+            records.close()
+            break
+
+
+@cli.command()
+@click.option(
+    "--dataset",
+    type=click.Choice(["raw", "historized", "rejected"]),
+    required=True,
+    help="Dataset whose partition is compacted.",
+)
+@click.option(
+    "--partition",
+    required=True,
+    help="Day (YYYY-MM-DD) or month (YYYY-MM) partition to compact.",
+)
+@click.option(
+    "--target-size-mb",
+    type=click.IntRange(min=1),
+    default=128,
+    show_default=True,
+    help="Approximate size of each compacted file.",
+)
+@click.option(
+    "--source-dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Compact a local copy of the bucket instead of Object Storage.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Print the planned merges without writing or deleting objects.",
+)
+@click.pass_context
+def compact(
+    ctx: click.Context,
+    dataset: str,
+    partition: str,
+    target_size_mb: int,
+    source_dir: str | None,
+    dry_run: bool,
+):
+    """Merge a partition's small parts into size-targeted files."""
+    compactor = build_compactor(
+        ctx.obj["config_path"],
+        profile=ctx.obj["profile"],
+        auth=ctx.obj["auth"],
+        source_dir=source_dir,
+        target_size_mb=target_size_mb,
+    )
+    try:
+        result = compactor.compact(dataset, partition, dry_run=dry_run)
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+
+    click.echo(f"Compaction ID: {result.compaction_id}")
+    click.echo(f"Partition: {result.partition_prefix} ({result.status})")
+    click.echo(
+        f"Merged {len(result.source_objects)} objects into {len(result.outputs)}"
+    )
+    for output in result.outputs:
+        detail = (
+            f" [{output.rows:,} rows, {_format_bytes(output.compressed_bytes)}]"
+            if output.rows is not None
+            else ""
+        )
+        click.echo(f"  {output.object_name}{detail}")
+    if result.uncommitted_objects:
+        click.echo(
+            f"Left {len(result.uncommitted_objects)} objects of unfinished writes "
+            "for a later compaction"
+        )
+    if result.manifest_object_name is not None:
+        click.echo(f"Manifest: {result.manifest_object_name}")
+    if dry_run:
+        click.echo("Dry run only; no objects written or deleted.")
+
+
+@cli.command()
+@click.option(
+    "--rows",
+    type=click.IntRange(min=1),
+    default=1_000_000,
+    show_default=True,
+    help="Synthetic rows exported per case.",
+)
+@click.option(
+    "--datasets",
+    default="raw,historized,rejected",
+    show_default=True,
+    help="Comma-separated dataset list.",
+)
+@click.option(
+    "--paging",
+    default="cursor,keyset",
+    show_default=True,
+    help="Comma-separated sql_export.paging modes to measure.",
+)
+@click.option(
+    "--compression",
+    default="gzip",
+    show_default=True,
+    help="Comma-separated part compressions to measure (gzip, zstd).",
+)
+@click.option(
+    "--fetch-rows",
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help="Rows fetched per cursor round trip.",
+)
+@click.option(
+    "--part-size-mb",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Uncompressed size of each part object.",
+)
+@click.option(
+    "--in-process",
+    is_flag=True,
+    help="Run every case in this process instead of a fresh one per case.",
+)
+def benchmark(
+    rows: int,
+    datasets: str,
+    paging: str,
+    compression: str,
+    fetch_rows: int,
+    part_size_mb: int,
+    in_process: bool,
+):
+    """Measure sql-mode export throughput against synthetic rows."""
+    try:
+        cases = [
+            BenchmarkCase(dataset=dataset, paging=paging_mode, compression=codec)
+            for dataset in parse_datasets(datasets)
+            for paging_mode in _split_choices(paging, VALID_SQL_PAGING)
+            for codec in _split_choices(compression, VALID_COMPRESSIONS)
+        ]
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+
+    click.echo(
+        f"{'dataset':<11} {'paging':<7} {'codec':<5} {'rows/s':>10} "
+        f"{'MB/s':>8} {'written MB':>11} {'objects':>7} {'peak RSS MB':>11}"
+    )
+    for result in run_benchmark(
+        cases,
+        rows,
+        isolate=not in_process,
+        fetch_rows=fetch_rows,
+        part_size_mb=part_size_mb,
+    ):
+        peak = "n/a" if result.peak_rss_mb is None else f"{result.peak_rss_mb:.1f}"
+        click.echo(
+            f"{result.case.dataset:<11} {result.case.paging:<7} "
+            f"{result.case.compression:<5} {result.rows_per_second:>10,.0f} "
+            f"{result.uncompressed_mb_per_second:>8.1f} "
+            f"{result.compressed_mb:>11.1f} {result.objects:>7} {peak:>11}"
+        )
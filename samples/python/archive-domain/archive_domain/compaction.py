@@ -0,0 +1,361 @@
+"""Partition compaction for archived datasets.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from .catalog import replace_catalog_objects
+from .exporters import dataset_zone
+from .manifest import build_compaction_manifest
+from .models import CompactionResult, PartMetrics
+from .object_storage import (
+    build_dataset_root_prefix,
+    build_manifest_object_name,
+    encode_json,
+)
+from .pipeline import COMPRESSION_GZIP, build_compressor, part_filename
+from .reader import (
+    COMPACTION_DIRECTORY,
+    COMPACTION_MANIFEST_FILENAME,
+    decode_part,
+    decompress_jsonl,
+    import_pyarrow,
+)
+
+_JSONL_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+_PARQUET_SUFFIX = ".parquet"
+_RUN_ID_PATTERN = re.compile(r"/run_id=([^/]+)/")
+_COMPACTION_ID_PATTERN = re.compile(rf"/{COMPACTION_DIRECTORY}[^/]+/")
+
+
+def build_partition_prefix(dataset_prefix: str, partition: str) -> str:
+    """Return the month (``YYYY-MM``) or day (``YYYY-MM-DD``) partition prefix."""
+    base = dataset_prefix.strip("/")
+    try:
+        if len(partition) == len("YYYY-MM"):
+            value = datetime.strptime(partition, "%Y-%m")
+            return f"{base}/year={value:%Y}/month={value:%m}/"
+        value = datetime.strptime(partition, "%Y-%m-%d")
+    except ValueError as exc:
+        raise ValueError(
+            f"Partition must be a month (YYYY-MM) or day (YYYY-MM-DD): {partition}"
+        ) from exc
+    return f"{base}/year={value:%Y}/month={value:%m}/day={value:%d}/"
+
+
+def group_by_size(
+    objects: list[tuple[str, int]], target_bytes: int
+) -> list[list[tuple[str, int]]]:
+    """Split ``(name, size)`` pairs, in order, into groups of about ``target_bytes``."""
+    groups: list[list[tuple[str, int]]] = []
+    current: list[tuple[str, int]] = []
+    current_bytes = 0
+    for name, size in objects:
+        if current and current_bytes + size > target_bytes:
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append((name, size))
+        current_bytes += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+class PartitionCompactor:
+    """Merge the small parts of one day or month partition into larger files.
+
+    Only parts of runs whose run manifest exists are merged, so exports that
+    are still writing into the partition are left alone and picked up by a
+    later compaction. Each merged file is read back and checked before the
+    compaction manifest is written, and sources are deleted only after that.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        prefix: str,
+        domain_short_name: str,
+        manifest_prefix: str,
+        target_size_mb: int = 128,
+        compression: str = COMPRESSION_GZIP,
+        compression_level: int = 6,
+        clock: Callable[[], datetime] | None = None,
+        catalog_store: Any = None,
+        catalog_object: str | None = None,
+    ):
+        """Store the object source, archive layout, and output sizing.
+
+        With a ``catalog_store`` the catalog index entries are pointed at the
+        merged files before any source is deleted.
+        """
+        if target_size_mb < 1:
+            raise ValueError("target size must be >= 1 MB")
+        self.source = source
+        self.prefix = prefix
+        self.domain_short_name = domain_short_name
+        self.manifest_prefix = manifest_prefix
+        self.target_bytes = target_size_mb * 1024 * 1024
+        self.compression = compression
+        self.compression_level = compression_level
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.catalog_store = catalog_store
+        self.catalog_object = catalog_object
+
+    def compact(
+        self, dataset: str, partition: str, dry_run: bool = False
+    ) -> CompactionResult:
+        """Compact one dataset partition and return what was merged and deleted."""
+        created_at = self.clock()
+        compaction_id = created_at.strftime("%Y%m%dT%H%M%SZ")
+        partition_prefix = build_partition_prefix(
+            build_dataset_root_prefix(
+                self.prefix, self.domain_short_name, dataset_zone(dataset), dataset
+            ),
+            partition,
+        )
+        listed = dict(self.source.list_object_sizes(partition_prefix))
+        committed = self._committed_compactions(listed)
+        leftover = [
+            name
+            for payload in committed.values()
+            for item in payload.get("outputs", ())
+            for name in item.get("sources", ())
+            if name in listed
+        ]
+        candidates, uncommitted = self._select_candidates(listed, committed, leftover)
+
+        output_directory = f"{partition_prefix}{COMPACTION_DIRECTORY}{compaction_id}/"
+        groups = [
+            (group, _PARQUET_SUFFIX)
+            for group in self._groups(candidates, _PARQUET_SUFFIX)
+        ] + [(group, None) for group in self._groups(candidates, _JSONL_SUFFIXES)]
+        planned = [
+            (
+                f"{output_directory}{_output_filename(index, suffix, self.compression)}",
+                group,
+            )
+            for index, (group, suffix) in enumerate(groups)
+        ]
+        source_objects = tuple(name for _output, group in planned for name, _ in group)
+
+        if dry_run:
+            return CompactionResult(
+                compaction_id=compaction_id,
+                dataset=dataset,
+                partition_prefix=partition_prefix,
+                status="planned" if planned else "skipped",
+                source_objects=source_objects,
+                outputs=tuple(
+                    PartMetrics(object_name=output_name) for output_name, _ in planned
+                ),
+                uncommitted_objects=tuple(uncommitted),
+            )
+
+        outputs = [
+            (self._write_verified(output_name, group), tuple(n for n, _ in group))
+            for output_name, group in planned
+        ]
+        manifest_object_name = None
+        if outputs:
+            manifest_object_name = f"{output_directory}{COMPACTION_MANIFEST_FILENAME}"
+            manifest = build_compaction_manifest(
+                compaction_id=compaction_id,
+                dataset=dataset,
+                partition_prefix=partition_prefix,
+                created_at=created_at,
+                outputs=outputs,
+            )
+            self.source.put_object(
+                manifest_object_name,
+                encode_json(manifest),
+            )
+
+        if outputs or leftover:
+            self._update_catalog(committed, outputs)
+
+        merged = set(source_objects)
+        superseded = [
+            manifest_name
+            for manifest_name, payload in committed.items()
+            if payload.get("outputs")
+            and all(item["object_name"] in merged for item in payload["outputs"])
+        ]
+        deleted = [*leftover, *source_objects, *superseded]
+        for name in deleted:
+            self.source.delete_object(name)
+
+        return CompactionResult(
+            compaction_id=compaction_id,
+            dataset=dataset,
+            partition_prefix=partition_prefix,
+            status="compacted" if outputs else "skipped",
+            source_objects=source_objects,
+            outputs=tuple(output for output, _sources in outputs),
+            uncommitted_objects=tuple(uncommitted),
+            manifest_object_name=manifest_object_name,
+            deleted_objects=tuple(deleted),
+        )
+
+    def _update_catalog(
+        self,
+        committed: dict[str, dict],
+        outputs: list[tuple[PartMetrics, tuple[str, ...]]],
+    ) -> None:
+        """Point catalog entries at merged files, earlier compactions first."""
+        if self.catalog_store is None:
+            return
+        earlier = {
+            source: item["object_name"]
+            for payload in committed.values()
+            for item in payload.get("outputs", ())
+            for source in item.get("sources", ())
+        }
+        current = {
+            source: output.object_name
+            for output, sources in outputs
+            for source in sources
+        }
+        self.catalog_store.update_catalog(
+            self.catalog_object,
+            lambda entries: replace_catalog_objects(
+                replace_catalog_objects(entries, earlier), current
+            ),
+        )
+
+    def _committed_compactions(self, listed: dict[str, int]) -> dict[str, dict]:
+        """Return the outputs of earlier compactions, keyed by manifest name.
+
+        Only the ``outputs`` member is read; the flat ``sources`` list after
+        it repeats what the outputs already record.
+        """
+        return {
+            name: self.source.get_json_members(name, ("outputs",))
+            for name in listed
+            if name.endswith(f"/{COMPACTION_MANIFEST_FILENAME}")
+        }
+
+    def _select_candidates(
+        self,
+        listed: dict[str, int],
+        committed: dict[str, dict],
+        leftover: list[str],
+    ) -> tuple[list[tuple[str, int]], list[str]]:
+        """Split listed parts into mergeable parts and parts of unfinished writes."""
+        committed_directories = {
+            name.removesuffix(COMPACTION_MANIFEST_FILENAME) for name in committed
+        }
+        committed_runs: dict[str, bool] = {}
+        candidates = []
+        uncommitted = []
+        for name, size in listed.items():
+            if not name.endswith((*_JSONL_SUFFIXES, _PARQUET_SUFFIX)) or (
+                name in leftover
+            ):
+                continue
+            compaction = _COMPACTION_ID_PATTERN.search(name)
+            if compaction is not None:
+                if name[: compaction.end()] not in committed_directories:
+                    uncommitted.append(name)
+                elif size < self.target_bytes:
+                    candidates.append((name, size))
+                continue
+            run = _RUN_ID_PATTERN.search(name)
+            if run is None or not self._run_committed(run.group(1), committed_runs):
+                uncommitted.append(name)
+                continue
+            candidates.append((name, size))
+        return candidates, uncommitted
+
+    def _run_committed(self, run_id: str, cache: dict[str, bool]) -> bool:
+        """Return whether the run wrote its manifest, i.e. finished writing."""
+        if run_id not in cache:
+            manifest_name = build_manifest_object_name(self.manifest_prefix, run_id)
+            cache[run_id] = manifest_name in self.source.list_objects(manifest_name)
+        return cache[run_id]
+
+    def _groups(
+        self, candidates: list[tuple[str, int]], suffixes: str | tuple[str, ...]
+    ) -> list[list[tuple[str, int]]]:
+        """Group one format's candidates; a lone part is not worth rewriting."""
+        matching = [item for item in candidates if item[0].endswith(suffixes)]
+        if len(matching) < 2:
+            return []
+        return [
+            group
+            for group in group_by_size(matching, self.target_bytes)
+            if len(group) > 1
+        ]
+
+    def _write_verified(
+        self, output_name: str, group: list[tuple[str, int]]
+    ) -> PartMetrics:
+        """Merge one group, upload it, and check the stored copy."""
+        if output_name.endswith(_PARQUET_SUFFIX):
+            data, rows, uncompressed_bytes = self._merge_parquet(group)
+        else:
+            data, rows, uncompressed_bytes = self._merge_jsonl(group)
+        sha256 = hashlib.sha256(data).hexdigest()
+        self.source.put_object(output_name, data)
+
+        stored = self.source.get_object(output_name)
+        stored_sha256 = hashlib.sha256(stored).hexdigest()
+        stored_rows = sum(1 for _record in decode_part(output_name, stored))
+        if stored_sha256 != sha256 or stored_rows != rows:
+            raise RuntimeError(
+                f"Compacted object {output_name} failed verification: expected "
+                f"{rows} rows with sha256 {sha256}, read back {stored_rows} rows "
+                f"with sha256 {stored_sha256}; sources were kept"
+            )
+        return PartMetrics(
+            object_name=output_name,
+            rows=rows,
+            uncompressed_bytes=uncompressed_bytes,
+            compressed_bytes=len(data),
+            sha256=sha256,
+        )
+
+    def _merge_jsonl(self, group: list[tuple[str, int]]) -> tuple[bytes, int, int]:
+        compressor = build_compressor(self.compression, self.compression_level)
+        chunks = []
+        rows = 0
+        uncompressed_bytes = 0
+        for name, _size in group:
+            payload = decompress_jsonl(name, self.source.get_object(name))
+            if payload and not payload.endswith(b"\n"):
+                payload += b"\n"
+            rows += sum(1 for line in payload.splitlines() if line)
+            uncompressed_bytes += len(payload)
+            chunks.append(compressor.compress(payload))
+        chunks.append(compressor.flush())
+        return b"".join(chunks), rows, uncompressed_bytes
+
+    def _merge_parquet(self, group: list[tuple[str, int]]) -> tuple[bytes, int, None]:
+        pyarrow = import_pyarrow()
+        table = pyarrow.concat_tables(
+            [
+                pyarrow.parquet.read_table(io.BytesIO(self.source.get_object(name)))
+                for name, _size in group
+            ],
+            promote_options="default",
+        )
+        buffer = io.BytesIO()
+        pyarrow.parquet.write_table(table, buffer)
+        return buffer.getvalue(), table.num_rows, None
+
+
+def _output_filename(index: int, suffix: str | None, compression: str) -> str:
+    if suffix == _PARQUET_SUFFIX:
+        return f"part-{index:05d}{_PARQUET_SUFFIX}"
+    return part_filename(index, compression)
@@ -9,7 +9,7 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import yaml
@@ -36,6 +36,7 @@ class DatabaseConfig:
     thick_mode: bool
     lib_dir: str | None
     dbms_cloud_credential_name: str | None
+    pool_max_sessions: int = 8
 
 
 @dataclass(frozen=True)
@@ -47,6 +48,64 @@ class ObjectStorageConfig:
     prefix: str
     manifest_prefix: str
     checkpoint_object: str
+    progress_prefix: str = "_state/progress"
+    throughput_object: str = "_state/throughput.json"
+    catalog_object: str = "_state/catalog.json"
+    work_prefix: str = "_state/work"
+
+
+@dataclass(frozen=True)
+class SqlExportConfig:
+    """Tuning for the direct-query (sql mode) export pipeline."""
+
+    compression: str = "gzip"
+    compression_level: int = 6
+    compression_threads: int = 0
+    fetch_rows: int = 1000
+    part_size_mb: int = 64
+    queue_depth: int = 4
+    paging: str = "cursor"
+    page_rows: int = 50000
+
+
+@dataclass(frozen=True)
+class BulkExportConfig:
+    """How bulk (DBMS_CLOUD) exports are submitted and awaited."""
+
+    submission: str = "inline"
+    poll_initial_seconds: float = 2.0
+    poll_max_seconds: float = 30.0
+    poll_backoff: float = 2.0
+    poll_retries: int = 5
+
+
+@dataclass(frozen=True)
+class StreamingConfig:
+    """How the queue-fed raw archiver buffers messages into parts."""
+
+    subscriber_name: str = "ARCHIVE_DOMAIN"
+    part_size_mb: int = 16
+    max_part_seconds: int = 300
+    dequeue_batch: int = 500
+    wait_seconds: int = 5
+
+
+@dataclass(frozen=True)
+class MetadataCacheConfig:
+    """Where namespace and retention lookups are cached between invocations."""
+
+    path: str | None = "~/.cache/archive-domain/metadata.json"
+    ttl_minutes: float = 60
+
+
+@dataclass(frozen=True)
+class PlanningConfig:
+    """Inputs for plan cost estimates and run budgets."""
+
+    estimate_method: str = "stats"
+    target_rows_per_shard: int = 5_000_000
+    throughput_rows_per_second: float | None = None
+    run_budget_seconds: float | None = None
 
 
 @dataclass(frozen=True)
@@ -57,6 +116,11 @@ class ArchiveConfig:
     database: DatabaseConfig
     object_storage: ObjectStorageConfig
     export_format: str = "parquet"
+    sql_export: SqlExportConfig = field(default_factory=SqlExportConfig)
+    planning: PlanningConfig = field(default_factory=PlanningConfig)
+    bulk_export: BulkExportConfig = field(default_factory=BulkExportConfig)
+    streaming: StreamingConfig = field(default_factory=StreamingConfig)
+    metadata_cache: MetadataCacheConfig = field(default_factory=MetadataCacheConfig)
 
 
 def load_config(path: str | Path) -> ArchiveConfig:
@@ -68,6 +132,13 @@ def load_config(path: str | Path) -> ArchiveConfig:
     iot = data.get("iot", {})
     database = data.get("database", {})
     object_storage = data.get("object_storage", {})
+    sql_export = data.get("sql_export", {})
+    planning = data.get("planning", {})
+    bulk_export = data.get("bulk_export", {})
+    streaming = data.get("streaming", {})
+    metadata_cache = data.get("metadata_cache", {})
+    throughput = planning.get("throughput_rows_per_second")
+    run_budget = planning.get("run_budget_seconds")
 
     return ArchiveConfig(
         iot=IotConfig(
@@ -84,6 +155,7 @@ def load_config(path: str | Path) -> ArchiveConfig:
             thick_mode=bool(database.get("thick_mode", False)),
             lib_dir=database.get("lib_dir"),
             dbms_cloud_credential_name=database.get("dbms_cloud_credential_name"),
+            pool_max_sessions=int(database.get("pool_max_sessions", 8)),
         ),
         object_storage=ObjectStorageConfig(
             namespace=object_storage.get("namespace"),
@@ -93,6 +165,48 @@ def load_config(path: str | Path) -> ArchiveConfig:
             checkpoint_object=object_storage.get(
                 "checkpoint_object", "_state/checkpoint.json"
             ),
+            progress_prefix=object_storage.get("progress_prefix", "_state/progress"),
+            throughput_object=object_storage.get(
+                "throughput_object", "_state/throughput.json"
+            ),
+            catalog_object=object_storage.get("catalog_object", "_state/catalog.json"),
+            work_prefix=object_storage.get("work_prefix", "_state/work"),
         ),
         export_format=str(data.get("export_format", "parquet")).lower(),
+        sql_export=SqlExportConfig(
+            compression=str(sql_export.get("compression", "gzip")).lower(),
+            compression_level=int(sql_export.get("compression_level", 6)),
+            compression_threads=int(sql_export.get("compression_threads", 0)),
+            fetch_rows=int(sql_export.get("fetch_rows", 1000)),
+            part_size_mb=int(sql_export.get("part_size_mb", 64)),
+            queue_depth=int(sql_export.get("queue_depth", 4)),
+            paging=str(sql_export.get("paging", "cursor")).lower(),
+            page_rows=int(sql_export.get("page_rows", 50000)),
+        ),
+        planning=PlanningConfig(
+            estimate_method=str(planning.get("estimate_method", "stats")).lower(),
+            target_rows_per_shard=int(planning.get("target_rows_per_shard", 5_000_000)),
+            throughput_rows_per_second=(
+                float(throughput) if throughput is not None else None
+            ),
+            run_budget_seconds=(float(run_budget) if run_budget is not None else None),
+        ),
+        bulk_export=BulkExportConfig(
+            submission=str(bulk_export.get("submission", "inline")).lower(),
+            poll_initial_seconds=float(bulk_export.get("poll_initial_seconds", 2.0)),
+            poll_max_seconds=float(bulk_export.get("poll_max_seconds", 30.0)),
+            poll_backoff=float(bulk_export.get("poll_backoff", 2.0)),
+            poll_retries=int(bulk_export.get("poll_retries", 5)),
+        ),
+        streaming=StreamingConfig(
+            subscriber_name=str(streaming.get("subscriber_name", "ARCHIVE_DOMAIN")),
+            part_size_mb=int(streaming.get("part_size_mb", 16)),
+            max_part_seconds=int(streaming.get("max_part_seconds", 300)),
+            dequeue_batch=int(streaming.get("dequeue_batch", 500)),
+            wait_seconds=int(streaming.get("wait_seconds", 5)),
+        ),
+        metadata_cache=MetadataCacheConfig(
+            path=metadata_cache.get("path", MetadataCacheConfig.path),
+            ttl_minutes=float(metadata_cache.get("ttl_minutes", 60)),
+        ),
     )
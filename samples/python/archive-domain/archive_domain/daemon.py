@@ -0,0 +1,221 @@
+"""Long-running archive daemon that runs micro-batches on a fixed cadence.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any
+
+from .models import RunResult
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class ArchiveDaemon:
+    """Run archive micro-batches from one long-lived service.
+
+    Runs start every ``interval_seconds`` measured from the first run, so the
+    cadence does not drift with run duration. The service, and with it the
+    Object Storage clients, the connection pool, and the retention lookup, is
+    reused by every run. A run that is still going when the next one is due
+    makes that run skip; skipped runs are counted rather than queued.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        interval_seconds: float,
+        run_options: dict[str, Any] | None = None,
+        clock: Callable[[], datetime] | None = None,
+        wait: Callable[[float], None] | None = None,
+        on_run: Callable[[RunResult], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+    ):
+        """Store the service, the cadence, and the options for each run."""
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be > 0")
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.run_options = run_options or {}
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self._stopped = threading.Event()
+        self.wait = wait or self._stopped.wait
+        self.on_run = on_run
+        self.on_error = on_error
+        self._run_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self.runs = {"succeeded": 0, "failed": 0}
+        self.skipped_runs = 0
+        self.last_run_seconds: float | None = None
+        self._archived_through: dict[str, tuple[datetime, int]] = {}
+
+    def stop(self) -> None:
+        """Stop after the current run; an idle daemon stops immediately."""
+        self._stopped.set()
+
+    def run_once(self) -> RunResult | None:
+        """Run one micro-batch, or skip it if another one is still running."""
+        if not self._run_lock.acquire(blocking=False):
+            with self._metrics_lock:
+                self.skipped_runs += 1
+            return None
+        started = time.monotonic()
+        try:
+            result = self.service.run(**self.run_options)
+        except Exception as exc:
+            self._record_run("failed", started)
+            if self.on_error is None:
+                raise
+            self.on_error(exc)
+            return None
+        finally:
+            self._run_lock.release()
+
+        failed = any(item.status == "failed" for item in result.dataset_results)
+        self._record_run("failed" if failed else "succeeded", started)
+        self._record_archived_through(result)
+        if self.on_run is not None:
+            self.on_run(result)
+        return result
+
+    def serve(self, max_runs: int | None = None) -> None:
+        """Run micro-batches until stopped, or until ``max_runs`` have started.
+
+        Runs that fall due while the previous run is still going are skipped
+        and the next one starts on the following tick of the cadence.
+        """
+        interval = timedelta(seconds=self.interval_seconds)
+        next_run = self.clock()
+        started_runs = 0
+        while not self._stopped.is_set():
+            self.run_once()
+            started_runs += 1
+            if max_runs is not None and started_runs >= max_runs:
+                return
+            now = self.clock()
+            missed = max(0, math.floor((now - next_run) / interval))
+            if missed:
+                with self._metrics_lock:
+                    self.skipped_runs += missed
+            next_run += interval * (missed + 1)
+            self.wait(max(0.0, (next_run - self.clock()).total_seconds()))
+
+    def lag_seconds(self) -> dict[str, float]:
+        """Return how far each dataset's archive trails its purge boundary.
+
+        The purge boundary keeps moving with the clock, so the lag grows
+        between runs and whenever runs fail, and shrinks when a run advances
+        the checkpoint.
+        """
+        now = self.clock()
+        with self._metrics_lock:
+            archived_through = dict(self._archived_through)
+        return {
+            dataset: max(
+                0.0,
+                (now - timedelta(days=retention) - through).total_seconds(),
+            )
+            for dataset, (through, retention) in archived_through.items()
+        }
+
+    def render_metrics(self) -> str:
+        """Render the daemon's metrics in the Prometheus text format."""
+        lag = self.lag_seconds()
+        with self._metrics_lock:
+            runs = dict(self.runs)
+            skipped_runs = self.skipped_runs
+            last_run_seconds = self.last_run_seconds
+        lines = [
+            "# HELP archive_domain_lag_behind_boundary_seconds Time between the "
+            "purge boundary and the end of the archived data.",
+            "# TYPE archive_domain_lag_behind_boundary_seconds gauge",
+            *(
+                f'archive_domain_lag_behind_boundary_seconds{{dataset="{dataset}"}} '
+                f"{seconds:.0f}"
+                for dataset, seconds in sorted(lag.items())
+            ),
+            "# HELP archive_domain_runs_total Micro-batch runs by outcome.",
+            "# TYPE archive_domain_runs_total counter",
+            *(
+                f'archive_domain_runs_total{{status="{status}"}} {count}'
+                for status, count in sorted(runs.items())
+            ),
+            "# HELP archive_domain_skipped_runs_total Runs skipped because the "
+            "previous run was still going.",
+            "# TYPE archive_domain_skipped_runs_total counter",
+            f"archive_domain_skipped_runs_total {skipped_runs}",
+        ]
+        if last_run_seconds is not None:
+            lines += [
+                "# HELP archive_domain_last_run_seconds Duration of the last run.",
+                "# TYPE archive_domain_last_run_seconds gauge",
+                f"archive_domain_last_run_seconds {last_run_seconds:.3f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def _record_run(self, status: str, started: float) -> None:
+        with self._metrics_lock:
+            self.runs[status] += 1
+            self.last_run_seconds = round(time.monotonic() - started, 3)
+
+    def _record_archived_through(self, result: RunResult) -> None:
+        # A leased worker that did not finalize the run has no manifest; the
+        # worker that did records the checkpoint, so this one learns nothing.
+        if result.manifest_object_name is None and not result.checkpoint_advanced:
+            return
+        # A run's window starts where the previous checkpoint left off.
+        plan = result.plan_result.plan
+        with self._metrics_lock:
+            for dataset in plan.selected_datasets:
+                dataset_plan = plan.datasets[dataset]
+                through = (
+                    dataset_plan.window_end
+                    if result.checkpoint_advanced
+                    else dataset_plan.window_start
+                )
+                self._archived_through[dataset] = (
+                    through,
+                    dataset_plan.retention_days,
+                )
+
+
+def serve_metrics(
+    render: Callable[[], str], port: int, host: str = ""
+) -> ThreadingHTTPServer:
+    """Serve ``render()`` at ``/metrics`` from a background thread.
+
+    Call ``shutdown()`` on the returned server to stop it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -10,6 +10,8 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 from __future__ import annotations
 
 import re
+import threading
+from datetime import datetime, timezone
 from typing import Any
 
 
@@ -40,8 +42,12 @@ def build_dsn(connect_string: str) -> str:
         )"""
 
 
-def connect(database_config: Any):
-    """Create a direct database connection using OCI token auth."""
+_ORA_ALREADY_SUBSCRIBED = 24034
+_oracle_client_lock = threading.Lock()
+_oracle_client_initialized = False
+
+
+def _import_oracledb():
     try:
         import oracledb
         import oracledb.plugins.oci_tokens  # noqa: F401
@@ -49,7 +55,19 @@ def connect(database_config: Any):
         raise RuntimeError(
             "python-oracledb with OCI token support is required for direct DB access"
         ) from exc
+    return oracledb
+
+
+def _init_oracle_client(oracledb: Any, database_config: Any) -> None:
+    """Enable thick mode once per process."""
+    global _oracle_client_initialized
+    with _oracle_client_lock:
+        if not _oracle_client_initialized:
+            oracledb.init_oracle_client(lib_dir=database_config.lib_dir, config_dir=".")
+            _oracle_client_initialized = True
+
 
+def _connect_kwargs(oracledb: Any, database_config: Any) -> dict[str, Any]:
     extra_auth_params = {
         "auth_type": database_config.auth_type,
         "scope": database_config.token_scope,
@@ -57,15 +75,45 @@ def connect(database_config: Any):
     if database_config.auth_type in {"ConfigFileAuthentication", "SecurityToken"}:
         extra_auth_params["profile"] = database_config.profile
 
-    connect_kwargs: dict[str, Any] = {}
+    connect_kwargs: dict[str, Any] = {
+        "dsn": build_dsn(database_config.connect_string),
+        "extra_auth_params": extra_auth_params,
+    }
     if database_config.thick_mode:
-        oracledb.init_oracle_client(lib_dir=database_config.lib_dir, config_dir=".")
+        _init_oracle_client(oracledb, database_config)
         connect_kwargs["externalauth"] = True
+    return connect_kwargs
+
+
+def connect(database_config: Any):
+    """Create a direct database connection using OCI token auth."""
+    oracledb = _import_oracledb()
+    return oracledb.connect(**_connect_kwargs(oracledb, database_config))
+
 
-    return oracledb.connect(
-        dsn=build_dsn(database_config.connect_string),
-        extra_auth_params=extra_auth_params,
-        **connect_kwargs,
+def create_pool(database_config: Any):
+    """Create a session pool whose sessions already use the IoT schema.
+
+    The OCI token is obtained once for the pool, and the session callback
+    switches every new session to the domain IoT schema so callers can run
+    dataset queries as soon as they acquire a connection.
+    """
+    oracledb = _import_oracledb()
+    iot_domain_short_name = database_config.iot_domain_short_name
+
+    def session_callback(connection: Any, _requested_tag: str | None) -> None:
+        set_current_schema(connection, iot_domain_short_name)
+
+    pool_kwargs = _connect_kwargs(oracledb, database_config)
+    if database_config.thick_mode:
+        pool_kwargs["homogeneous"] = False
+    return oracledb.create_pool(
+        min=1,
+        max=database_config.pool_max_sessions,
+        increment=1,
+        getmode=oracledb.POOL_GETMODE_WAIT,
+        session_callback=session_callback,
+        **pool_kwargs,
     )
 
 
@@ -77,6 +125,71 @@ def set_current_schema(connection: Any, iot_domain_short_name: str) -> None:
         )
 
 
+def as_utc(value: datetime | None) -> datetime | None:
+    """Treat naive database timestamps as UTC."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
 def execute_statement(cursor: Any, statement: str, binds: dict[str, Any]) -> None:
     """Execute one statement with bind values."""
     cursor.execute(statement, binds)
+
+
+def raw_queue_name(iot_domain_short_name: str) -> str:
+    """Return the AQ queue the IoT Domain publishes raw messages to."""
+    return f"{iot_domain_short_name}__iot.raw_data_in".upper()
+
+
+def add_queue_subscriber(
+    connection: Any, queue_name: str, subscriber_name: str
+) -> None:
+    """Subscribe ``subscriber_name`` to a multi-consumer queue.
+
+    The subscription is durable: messages published while no archiver is
+    running are kept for it. Subscribing an existing subscriber again is not
+    an error.
+    """
+    oracledb = _import_oracledb()
+    agent = connection.gettype("SYS.AQ$_AGENT").newobject()
+    agent.NAME = subscriber_name
+    agent.ADDRESS = None
+    agent.PROTOCOL = 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.callproc(
+                "dbms_aqadm.add_subscriber",
+                keyword_parameters={
+                    "queue_name": queue_name,
+                    "subscriber": agent,
+                    "rule": None,
+                    "transformation": None,
+                    "queue_to_queue": False,
+                    "delivery_mode": oracledb.MSG_PERSISTENT_OR_BUFFERED,
+                },
+            )
+    except oracledb.DatabaseError as exc:
+        error = exc.args[0] if exc.args else None
+        if getattr(error, "code", None) != _ORA_ALREADY_SUBSCRIBED:
+            raise
+
+
+def open_queue(
+    connection: Any, queue_name: str, subscriber_name: str, wait_seconds: int
+) -> Any:
+    """Open a queue for transactional dequeues by one subscriber.
+
+    Dequeued messages are removed only when the connection commits, and each
+    dequeue call waits up to ``wait_seconds`` for a message to arrive.
+    """
+    oracledb = _import_oracledb()
+    queue = connection.queue(
+        queue_name, payload_type=connection.gettype(f"{queue_name}_TYPE")
+    )
+    queue.deqOptions.mode = oracledb.DEQ_REMOVE
+    queue.deqOptions.visibility = oracledb.DEQ_ON_COMMIT
+    queue.deqOptions.navigation = oracledb.DEQ_NEXT_MSG
+    queue.deqOptions.wait = wait_seconds
+    queue.deqOptions.consumername = subscriber_name
+    return queue
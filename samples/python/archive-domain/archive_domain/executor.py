@@ -11,17 +11,73 @@ from __future__ import annotations
 
 import base64
 import decimal
-import gzip
-import io
 import json
+import threading
+import uuid
+from collections.abc import Iterator
+from dataclasses import replace
 from datetime import date, datetime, timezone
 from typing import Any
 
-from .db import choose_execution_mode, connect, execute_statement, set_current_schema
+from .db import as_utc, choose_execution_mode, create_pool, execute_statement
 from .exporters import build_bulk_export_request, export_format_for_dataset
-from .models import EXPORT_FORMAT_PARQUET, DatasetResult
+from .models import (
+    ESTIMATE_METHOD_COUNT,
+    ESTIMATE_METHOD_STATS,
+    EXPORT_FORMAT_PARQUET,
+    VALID_ESTIMATE_METHODS,
+    DatasetResult,
+    PartMetrics,
+    ScheduledExport,
+)
 from .object_storage import build_dbms_cloud_file_uri, build_object_name
-from .sql import build_dataset_query
+from .pipeline import ExportPipeline, PipelineSettings
+from .planner import scale_table_rows
+from .sql import (
+    build_create_export_job_statement,
+    build_dataset_query,
+    build_drop_job_statement,
+    build_id_page_query,
+    build_job_run_details_query,
+    build_keyset_page_query,
+    build_max_id_query,
+    build_row_count_query,
+    build_table_stats_query,
+    build_time_bounds_query,
+    dataset_time_column,
+    render_dbms_cloud_export_block,
+)
+
+BULK_SUBMISSION_INLINE = "inline"
+BULK_SUBMISSION_SCHEDULER = "scheduler"
+VALID_BULK_SUBMISSIONS = (BULK_SUBMISSION_INLINE, BULK_SUBMISSION_SCHEDULER)
+
+SQL_PAGING_CURSOR = "cursor"
+SQL_PAGING_KEYSET = "keyset"
+VALID_SQL_PAGING = (SQL_PAGING_CURSOR, SQL_PAGING_KEYSET)
+
+# A multiple of three bytes, so BLOB chunks base64-encode without padding.
+LOB_CHUNK_SIZE = 768 * 1024
+_STREAMED_LOB_TYPES = ("DB_TYPE_BLOB", "DB_TYPE_CLOB", "DB_TYPE_NCLOB")
+
+
+class PartialExportError(RuntimeError):
+    """A SQL export failed after some parts were already uploaded.
+
+    ``resume_key`` is the ``(time, id)`` key of the last row in the last
+    uploaded part, or ``None`` when it is unknown.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        object_names: tuple[str, ...],
+        resume_key: tuple[datetime, int] | None,
+    ):
+        """Record the uploaded objects and the key to resume after."""
+        super().__init__(message)
+        self.object_names = object_names
+        self.resume_key = resume_key
 
 
 def _normalize_value(value: Any) -> Any:
@@ -46,6 +102,96 @@ def _normalize_value(value: Any) -> Any:
     return value
 
 
+def _encode_record(columns: list[str], row) -> bytes:
+    record = {column: _normalize_value(value) for column, value in zip(columns, row)}
+    return json.dumps(record, sort_keys=True).encode("utf-8") + b"\n"
+
+
+def _streams_lob(value: Any, chunk_size: int) -> bool:
+    """Return whether a value is a LOB too large to read in one piece."""
+    lob_type = getattr(getattr(value, "type", None), "name", None)
+    return lob_type in _STREAMED_LOB_TYPES and value.size() > chunk_size
+
+
+def _read_lob_chunks(lob: Any, chunk_size: int) -> Iterator[bytes | str]:
+    offset = 1
+    while True:
+        chunk = lob.read(offset, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+        if isinstance(chunk, bytes):
+            offset += len(chunk)
+        else:
+            # CLOB offsets count UTF-16 code units.
+            offset += len(chunk.encode("utf-16-le")) // 2
+
+
+def _lob_json_chunks(lob: Any, chunk_size: int) -> Iterator[bytes]:
+    """Yield the JSON of a LOB value, encoding one chunk at a time.
+
+    BLOBs become the same ``{"data": ..., "encoding": "base64"}`` object as
+    :func:`_normalize_value` builds, base64-encoded in multiples of three
+    bytes so the chunks concatenate to one valid encoding. CLOBs become a
+    JSON string escaped chunk by chunk.
+    """
+    if lob.type.name == "DB_TYPE_BLOB":
+        yield b'{"data": "'
+        pending = b""
+        for chunk in _read_lob_chunks(lob, chunk_size):
+            data = pending + chunk
+            cut = len(data) - len(data) % 3
+            yield base64.b64encode(data[:cut])
+            pending = data[cut:]
+        yield base64.b64encode(pending) + b'", "encoding": "base64"}'
+        return
+    yield b'"'
+    for chunk in _read_lob_chunks(lob, chunk_size):
+        yield json.dumps(chunk)[1:-1].encode("ascii")
+    yield b'"'
+
+
+def _encode_record_chunks(
+    columns: list[str], row, chunk_size: int = LOB_CHUNK_SIZE
+) -> bytes | Iterator[bytes]:
+    """Encode a row like :func:`_encode_record`, streaming its large LOBs.
+
+    Rows without a LOB larger than ``chunk_size`` are encoded in one piece.
+    Otherwise the record is yielded in chunks that concatenate to the same
+    JSON line, and each large LOB is read and encoded ``chunk_size`` at a
+    time, so it is never held in memory whole.
+    """
+    streamed = [_streams_lob(value, chunk_size) for value in row]
+    if not any(streamed):
+        return _encode_record(columns, row)
+    return _iter_record_chunks(columns, row, streamed, chunk_size)
+
+
+def _iter_record_chunks(
+    columns: list[str], row, streamed: list[bool], chunk_size: int
+) -> Iterator[bytes]:
+    separator = b"{"
+    for column, value, is_streamed in sorted(
+        zip(columns, row, streamed), key=lambda item: item[0]
+    ):
+        yield separator + json.dumps(column).encode("utf-8") + b": "
+        separator = b", "
+        if is_streamed:
+            yield from _lob_json_chunks(value, chunk_size)
+        else:
+            yield json.dumps(_normalize_value(value), sort_keys=True).encode("utf-8")
+    yield b"}\n"
+
+
+def _row_key(columns: list[str], time_column: str):
+    """Return a ``(time, id)`` key extractor, or ``None`` if either is absent."""
+    if time_column not in columns or "id" not in columns:
+        return None
+    time_index = columns.index(time_column)
+    id_index = columns.index("id")
+    return lambda row: (as_utc(row[time_index]), row[id_index])
+
+
 class LiveArchiveExecutor:
     """Execute dataset archives using direct DB and Object Storage clients."""
 
@@ -55,12 +201,111 @@ class LiveArchiveExecutor:
         object_storage_client: Any,
         namespace: str,
         region: str | None,
+        pool: Any = None,
     ):
-        """Store runtime dependencies for live archive execution."""
+        """Store runtime dependencies for live archive execution.
+
+        ``pool`` replaces the connection pool that is otherwise created from
+        the database configuration on first use.
+        """
         self.config = config
         self.object_storage_client = object_storage_client
         self.namespace = namespace
         self.region = region
+        self._pool = pool
+        self._pool_lock = threading.Lock()
+
+    def _acquire(self):
+        """Acquire a pooled connection, creating the pool on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = create_pool(self.config.database)
+        return self._pool.acquire()
+
+    def close(self) -> None:
+        """Close the connection pool if one was created."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+    def estimate_rows(self, dataset, dataset_plan) -> int:
+        """Count the rows in one dataset window."""
+        count_query = build_row_count_query(
+            dataset, dataset_plan.window_start, dataset_plan.window_end
+        )
+        with self._acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(count_query.sql_text, count_query.binds)
+                (row_count,) = cursor.fetchone()
+        return int(row_count)
+
+    def count_rows(self, dataset, dataset_plan) -> int:
+        """Count the rows an export of one dataset window reads."""
+        count_query = build_row_count_query(
+            dataset,
+            dataset_plan.window_start,
+            dataset_plan.window_end,
+            after_id=dataset_plan.resume_after_id,
+            through_id=dataset_plan.through_id,
+        )
+        with self._acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(count_query.sql_text, count_query.binds)
+                (row_count,) = cursor.fetchone()
+        return int(row_count)
+
+    def max_id(self, dataset) -> int | None:
+        """Return a dataset's highest id, or ``None`` when the table is empty."""
+        max_id_query = build_max_id_query(dataset)
+        with self._acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(max_id_query.sql_text, max_id_query.binds)
+                (max_id,) = cursor.fetchone()
+        return None if max_id is None else int(max_id)
+
+    def estimate_dataset(
+        self, dataset, dataset_plan, method: str = ESTIMATE_METHOD_STATS
+    ) -> tuple[int, int | None, str]:
+        """Estimate the rows and average row size of one dataset window.
+
+        The ``stats`` method scales the optimizer's table row count by the
+        window's share of the table's time range; it falls back to an exact
+        count when the table has no statistics. Returns the row count, the
+        average row length in bytes (if known), and the method used.
+        """
+        if method not in VALID_ESTIMATE_METHODS:
+            raise ValueError(f"Unsupported estimate method: {method}")
+        stats_query = build_table_stats_query(dataset)
+        with self._acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(stats_query.sql_text, stats_query.binds)
+                stats = cursor.fetchone()
+                table_rows, average_row_bytes = stats if stats else (None, None)
+                if method == ESTIMATE_METHOD_STATS and table_rows is not None:
+                    bounds_query = build_time_bounds_query(dataset)
+                    cursor.execute(bounds_query.sql_text, bounds_query.binds)
+                    table_start, table_end = cursor.fetchone()
+                    rows = scale_table_rows(
+                        int(table_rows),
+                        as_utc(table_start),
+                        as_utc(table_end),
+                        dataset_plan.window_start,
+                        dataset_plan.window_end,
+                    )
+                    method_used = ESTIMATE_METHOD_STATS
+                else:
+                    count_query = build_row_count_query(
+                        dataset, dataset_plan.window_start, dataset_plan.window_end
+                    )
+                    cursor.execute(count_query.sql_text, count_query.binds)
+                    (rows,) = cursor.fetchone()
+                    method_used = ESTIMATE_METHOD_COUNT
+        return (
+            int(rows),
+            int(average_row_bytes) if average_row_bytes is not None else None,
+            method_used,
+        )
 
     def execute_dataset(
         self,
@@ -71,15 +316,7 @@ class LiveArchiveExecutor:
         export_format,
     ) -> DatasetResult:
         """Execute archive export for one dataset."""
-        actual_mode = choose_execution_mode(
-            requested_mode=mode,
-            dbms_cloud_available=bool(
-                self.region and self.config.database.dbms_cloud_credential_name
-            ),
-            has_db_export_credentials=bool(
-                self.config.database.dbms_cloud_credential_name
-            ),
-        )
+        actual_mode = self._resolve_mode(mode)
         if actual_mode == "sql":
             if export_format != EXPORT_FORMAT_PARQUET:
                 raise RuntimeError("sql mode supports only parquet exports")
@@ -92,9 +329,20 @@ class LiveArchiveExecutor:
             )
         return self._execute_sql(dataset, dataset_plan, object_prefix, export_format)
 
-    def _execute_bulk(
+    def _resolve_mode(self, mode: str) -> str:
+        return choose_execution_mode(
+            requested_mode=mode,
+            dbms_cloud_available=bool(
+                self.region and self.config.database.dbms_cloud_credential_name
+            ),
+            has_db_export_credentials=bool(
+                self.config.database.dbms_cloud_credential_name
+            ),
+        )
+
+    def _bulk_request(
         self, dataset, dataset_plan, object_prefix, export_format
-    ) -> DatasetResult:
+    ) -> tuple[str, dict]:
         file_uri_list = build_dbms_cloud_file_uri(
             region=self.region,
             namespace=self.namespace,
@@ -102,7 +350,7 @@ class LiveArchiveExecutor:
             object_prefix=object_prefix,
             basename=dataset,
         )
-        dataset_query, statement, binds = build_bulk_export_request(
+        _dataset_query, statement, binds = build_bulk_export_request(
             dataset=dataset,
             window_start=dataset_plan.window_start,
             window_end=dataset_plan.window_end,
@@ -110,57 +358,226 @@ class LiveArchiveExecutor:
             file_uri_list=file_uri_list,
             domain_short_name=self.config.database.iot_domain_short_name,
             export_format=export_format,
+            after_id=dataset_plan.resume_after_id,
+            through_id=dataset_plan.through_id,
+        )
+        return statement, binds
+
+    def _execute_bulk(
+        self, dataset, dataset_plan, object_prefix, export_format
+    ) -> DatasetResult:
+        statement, binds = self._bulk_request(
+            dataset, dataset_plan, object_prefix, export_format
         )
 
-        with connect(self.config.database) as connection:
-            set_current_schema(connection, self.config.database.iot_domain_short_name)
+        with self._acquire() as connection:
             with connection.cursor() as cursor:
                 execute_statement(cursor, statement, binds)
 
-        return DatasetResult(
-            name=dataset,
-            status="succeeded",
-            export_mode="bulk",
-            export_format=export_format_for_dataset(dataset, export_format),
+        return self._with_listed_parts(
+            DatasetResult(
+                name=dataset,
+                status="succeeded",
+                export_mode="bulk",
+                export_format=export_format_for_dataset(dataset, export_format),
+                object_prefix=object_prefix,
+            )
+        )
+
+    def _list_parts(self, object_prefix: str) -> tuple[PartMetrics, ...]:
+        """List the objects a bulk export wrote with their size and MD5."""
+        parts = []
+        start = None
+        while True:
+            response = self.object_storage_client.list_objects(
+                namespace_name=self.namespace,
+                bucket_name=self.config.object_storage.bucket_name,
+                prefix=f"{object_prefix.rstrip('/')}/",
+                fields="name,size,md5",
+                start=start,
+            )
+            parts.extend(
+                PartMetrics(
+                    object_name=item.name,
+                    compressed_bytes=item.size,
+                    md5=item.md5,
+                )
+                for item in response.data.objects
+            )
+            start = response.data.next_start_with
+            if not start:
+                return tuple(parts)
+
+    def _with_listed_parts(self, result: DatasetResult) -> DatasetResult:
+        parts = self._list_parts(result.object_prefix)
+        return replace(
+            result,
+            object_names=tuple(part.object_name for part in parts),
+            compressed_bytes=sum(part.compressed_bytes or 0 for part in parts),
+            parts=parts,
+        )
+
+    def uses_scheduled_bulk(self, mode: str) -> bool:
+        """Return whether ``mode`` resolves to bulk exports run as scheduler jobs."""
+        submission = self.config.bulk_export.submission
+        if submission not in VALID_BULK_SUBMISSIONS:
+            raise ValueError(f"Unsupported bulk_export.submission: {submission}")
+        return (
+            submission == BULK_SUBMISSION_SCHEDULER
+            and self._resolve_mode(mode) == "bulk"
+        )
+
+    def submit_bulk(
+        self, dataset, dataset_plan, object_prefix, export_format
+    ) -> ScheduledExport:
+        """Start one bulk export as a DBMS_SCHEDULER job and return at once."""
+        _statement, binds = self._bulk_request(
+            dataset, dataset_plan, object_prefix, export_format
+        )
+        job_name = f"ARCHIVE_DOMAIN_{uuid.uuid4().hex[:16].upper()}"
+        with self._acquire() as connection:
+            with connection.cursor() as cursor:
+                execute_statement(
+                    cursor,
+                    build_create_export_job_statement(),
+                    {
+                        "job_name": job_name,
+                        "job_action": render_dbms_cloud_export_block(
+                            binds, self.config.database.iot_domain_short_name
+                        ),
+                    },
+                )
+        return ScheduledExport(
+            job_name=job_name,
+            dataset=dataset,
             object_prefix=object_prefix,
+            export_format=export_format_for_dataset(dataset, export_format),
         )
 
+    def stop_bulk(self, jobs: list[ScheduledExport]) -> None:
+        """Stop and drop scheduler jobs whose results are no longer awaited."""
+        with self._acquire() as connection:
+            with connection.cursor() as cursor:
+                for job in jobs:
+                    execute_statement(
+                        cursor, build_drop_job_statement(), {"job_name": job.job_name}
+                    )
+
+    def poll_bulk(self, jobs: list[ScheduledExport]) -> dict[str, DatasetResult]:
+        """Return results for the scheduler jobs that have finished.
+
+        Finished jobs are dropped; jobs still queued or running are absent
+        from the returned mapping.
+        """
+        if not jobs:
+            return {}
+        jobs_by_name = {job.job_name: job for job in jobs}
+        with self._acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    build_job_run_details_query(len(jobs)),
+                    {f"job_{index}": job.job_name for index, job in enumerate(jobs)},
+                )
+                finished = {
+                    job_name: (status, additional_info)
+                    for job_name, status, additional_info in cursor.fetchall()
+                }
+                for job_name in finished:
+                    execute_statement(
+                        cursor, build_drop_job_statement(), {"job_name": job_name}
+                    )
+
+        results = {}
+        for job_name, (status, additional_info) in finished.items():
+            job = jobs_by_name[job_name]
+            if hasattr(additional_info, "read"):
+                additional_info = additional_info.read()
+            succeeded = status == "SUCCEEDED"
+            result = DatasetResult(
+                name=job.dataset,
+                status="succeeded" if succeeded else "failed",
+                export_mode="bulk",
+                export_format=job.export_format,
+                object_prefix=job.object_prefix,
+                error_message=(
+                    None
+                    if succeeded
+                    else additional_info
+                    or f"Scheduler job {job_name} ended with status {status}"
+                ),
+            )
+            results[job_name] = self._with_listed_parts(result) if succeeded else result
+        return results
+
     def _execute_sql(
         self, dataset, dataset_plan, object_prefix, export_format
     ) -> DatasetResult:
-        dataset_query = build_dataset_query(
-            dataset,
-            dataset_plan.window_start,
-            dataset_plan.window_end,
-            domain_short_name=self.config.database.iot_domain_short_name,
-            export_format=export_format,
+        sql_export = self.config.sql_export
+        if sql_export.paging not in VALID_SQL_PAGING:
+            raise ValueError(f"Unsupported sql_export.paging: {sql_export.paging}")
+        settings = PipelineSettings(
+            compression=sql_export.compression,
+            compression_level=sql_export.compression_level,
+            compression_threads=sql_export.compression_threads,
+            fetch_rows=sql_export.fetch_rows,
+            part_size_bytes=sql_export.part_size_mb * 1024 * 1024,
+            queue_depth=sql_export.queue_depth,
         )
 
-        buffer = io.BytesIO()
-        with connect(self.config.database) as connection:
-            set_current_schema(connection, self.config.database.iot_domain_short_name)
+        def upload_part(filename: str, data: bytes) -> None:
+            self.object_storage_client.put_object(
+                namespace_name=self.namespace,
+                bucket_name=self.config.object_storage.bucket_name,
+                object_name=build_object_name(object_prefix, filename),
+                put_object_body=data,
+            )
+
+        with self._acquire() as connection:
             with connection.cursor() as cursor:
-                cursor.execute(dataset_query.sql_text, dataset_query.binds)
+                cursor.arraysize = settings.fetch_rows
+                if (
+                    sql_export.paging == SQL_PAGING_KEYSET
+                    and dataset_plan.through_id is not None
+                ):
+                    fetch_batch = self._id_page_batches(
+                        cursor, dataset, dataset_plan, export_format
+                    )
+                elif sql_export.paging == SQL_PAGING_KEYSET:
+                    fetch_batch = self._keyset_batches(
+                        cursor, dataset, dataset_plan, export_format
+                    )
+                else:
+                    dataset_query = build_dataset_query(
+                        dataset,
+                        dataset_plan.window_start,
+                        dataset_plan.window_end,
+                        domain_short_name=self.config.database.iot_domain_short_name,
+                        export_format=export_format,
+                        after_id=dataset_plan.resume_after_id,
+                        through_id=dataset_plan.through_id,
+                    )
+                    cursor.execute(dataset_query.sql_text, dataset_query.binds)
+                    fetch_batch = cursor.fetchmany
                 columns = [column[0].lower() for column in cursor.description]
-
-                with gzip.GzipFile(fileobj=buffer, mode="wb") as gzip_file:
-                    for row in cursor:
-                        record = {
-                            column: _normalize_value(value)
-                            for column, value in zip(columns, row)
-                        }
-                        gzip_file.write(
-                            json.dumps(record, sort_keys=True).encode("utf-8")
-                        )
-                        gzip_file.write(b"\n")
-
-        object_name = build_object_name(object_prefix, "part-00000.jsonl.gz")
-        self.object_storage_client.put_object(
-            namespace_name=self.namespace,
-            bucket_name=self.config.object_storage.bucket_name,
-            object_name=object_name,
-            put_object_body=buffer.getvalue(),
-        )
+                pipeline = ExportPipeline(
+                    settings,
+                    encode_row=lambda row: _encode_record_chunks(columns, row),
+                    upload_part=upload_part,
+                    row_key=_row_key(columns, dataset_time_column(dataset)),
+                )
+                try:
+                    pipeline_result = pipeline.run(fetch_batch)
+                except Exception as exc:
+                    if not pipeline.uploaded_filenames:
+                        raise
+                    raise PartialExportError(
+                        str(exc),
+                        object_names=tuple(
+                            build_object_name(object_prefix, filename)
+                            for filename in pipeline.uploaded_filenames
+                        ),
+                        resume_key=pipeline.durable_key,
+                    ) from exc
 
         return DatasetResult(
             name=dataset,
@@ -168,5 +585,112 @@ class LiveArchiveExecutor:
             export_mode="sql",
             export_format=export_format,
             object_prefix=object_prefix,
-            object_names=(object_name,),
+            object_names=tuple(
+                build_object_name(object_prefix, filename)
+                for filename in pipeline_result.filenames
+            ),
+            stage_metrics=pipeline_result.stage_metrics,
+            row_count=pipeline_result.row_count,
+            uncompressed_bytes=sum(
+                part.uncompressed_bytes or 0 for part in pipeline_result.parts
+            ),
+            compressed_bytes=sum(
+                part.compressed_bytes or 0 for part in pipeline_result.parts
+            ),
+            parts=tuple(
+                replace(
+                    part, object_name=build_object_name(object_prefix, part.object_name)
+                )
+                for part in pipeline_result.parts
+            ),
+        )
+
+    def _keyset_batches(self, cursor, dataset, dataset_plan, export_format):
+        """Execute the first keyset page and return a batch fetcher for the rest.
+
+        Each page is a bounded ``fetch first`` query that restarts after the
+        ``(time, id)`` key of the previous page's last row, so no cursor stays
+        open across the whole window.
+        """
+        page_rows = self.config.sql_export.page_rows
+        time_column = dataset_time_column(dataset)
+        binds: dict[str, Any] = {
+            "window_start": dataset_plan.window_start,
+            "window_end": dataset_plan.window_end,
+            "page_rows": page_rows,
+        }
+        resume_after_id = dataset_plan.resume_after_id
+        if resume_after_id is not None:
+            binds["last_time"] = dataset_plan.window_start
+            binds["last_id"] = resume_after_id
+        cursor.execute(
+            build_keyset_page_query(
+                dataset, export_format, after_key=resume_after_id is not None
+            ),
+            binds,
         )
+        row_key = _row_key(
+            [column[0].lower() for column in cursor.description], time_column
+        )
+        if row_key is None:
+            raise RuntimeError("Keyset paging requires id and time columns")
+        next_page_sql = build_keyset_page_query(dataset, export_format, after_key=True)
+
+        def batches():
+            while True:
+                page_count = 0
+                last_row = None
+                while rows := cursor.fetchmany():
+                    page_count += len(rows)
+                    last_row = rows[-1]
+                    yield rows
+                if page_count < page_rows:
+                    return
+                last_time, last_id = row_key(last_row)
+                cursor.execute(
+                    next_page_sql,
+                    {**binds, "last_time": last_time, "last_id": last_id},
+                )
+
+        iterator = batches()
+        return lambda: next(iterator, [])
+
+    def _id_page_batches(self, cursor, dataset, dataset_plan, export_format):
+        """Execute the first id page of an incremental export and page the rest.
+
+        Like :meth:`_keyset_batches`, but pages restart after the id of the
+        previous page's last row, walking the primary key index.
+        """
+        page_rows = self.config.sql_export.page_rows
+        after_id = dataset_plan.resume_after_id
+        # Dataset ids are positive, so a first export starts after id 0.
+        binds: dict[str, Any] = {
+            "last_id": after_id if after_id is not None else 0,
+            "through_id": dataset_plan.through_id,
+            "page_rows": page_rows,
+        }
+        if after_id is None:
+            binds["window_start"] = dataset_plan.window_start
+        page_sql = build_id_page_query(
+            dataset, export_format, from_window_start=after_id is None
+        )
+        cursor.execute(page_sql, binds)
+        columns = [column[0].lower() for column in cursor.description]
+        if "id" not in columns:
+            raise RuntimeError("Id paging requires an id column")
+        id_index = columns.index("id")
+
+        def batches():
+            while True:
+                page_count = 0
+                last_row = None
+                while rows := cursor.fetchmany():
+                    page_count += len(rows)
+                    last_row = rows[-1]
+                    yield rows
+                if page_count < page_rows:
+                    return
+                cursor.execute(page_sql, {**binds, "last_id": last_row[id_index]})
+
+        iterator = batches()
+        return lambda: next(iterator, [])
@@ -37,6 +37,8 @@ def build_bulk_export_request(
     file_uri_list: str,
     domain_short_name: str,
     export_format: str = "parquet",
+    after_id: int | None = None,
+    through_id: int | None = None,
 ) -> tuple[DatasetQuery, str, dict]:
     """Build the dataset query and DBMS_CLOUD export statement."""
     dataset_query = build_dataset_query(
@@ -45,6 +47,8 @@ def build_bulk_export_request(
         window_end,
         domain_short_name=domain_short_name,
         export_format=export_format,
+        after_id=after_id,
+        through_id=through_id,
     )
     statement, binds = build_dbms_cloud_export_statement(
         dataset_query=dataset_query,
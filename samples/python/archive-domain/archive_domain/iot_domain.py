@@ -9,7 +9,9 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 
 from __future__ import annotations
 
-from collections.abc import Mapping
+import threading
+import time
+from collections.abc import Callable, Mapping
 from typing import Any
 
 from .models import VALID_DATASETS
@@ -29,6 +31,70 @@ class IotDomainLookup:
         return extract_retention_days(response.data)
 
 
+class CachedRetentionLookup:
+    """Reuse retention values fetched by another lookup for ``ttl_seconds``.
+
+    A failed refresh keeps serving the last values fetched, so a long-running
+    process is not stopped by a transient IoT API error.
+
+    With a ``cache`` the values are also kept on disk under ``cache_key``, so
+    a new process starts from values another process fetched less than
+    ``ttl_seconds`` ago, and falls back to older ones if the refresh fails.
+    """
+
+    def __init__(
+        self,
+        lookup: Any,
+        ttl_seconds: float,
+        monotonic: Callable[[], float] = time.monotonic,
+        cache: Any = None,
+        cache_key: str = "retention",
+    ):
+        """Wrap ``lookup`` and keep its values for ``ttl_seconds``."""
+        self.lookup = lookup
+        self.ttl_seconds = ttl_seconds
+        self.monotonic = monotonic
+        self.cache = cache
+        self.cache_key = cache_key
+        self._values: dict[str, int] | None = None
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                values, age = cached
+                self._values = {key: int(value) for key, value in values.items()}
+                self._fetched_at = self.monotonic() - age
+
+    def get_retention_days(self) -> dict[str, int]:
+        """Return cached retention values, refreshing them once they expire."""
+        with self._lock:
+            now = self.monotonic()
+            if (
+                self._fetched_at is not None
+                and now - self._fetched_at < self.ttl_seconds
+            ):
+                return dict(self._values)
+            try:
+                self._values = dict(self.lookup.get_retention_days())
+            except Exception:
+                if self._values is None:
+                    raise
+            else:
+                if self.cache is not None:
+                    self.cache.put(self.cache_key, self._values)
+            self._fetched_at = now
+            return dict(self._values)
+
+
+class OfflineRetentionLookup:
+    """Stand-in lookup for runs that must not call the IoT API."""
+
+    def get_retention_days(self) -> dict[str, int]:
+        """Fail, so only cached or configured retention values are used."""
+        raise RuntimeError("retention lookup is not available offline")
+
+
 def _read_value(source: Any, *keys: str) -> Any:
     if source is None:
         return None
@@ -0,0 +1,352 @@
+"""Work leases that let several archive workers share one run.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any
+
+from .models import ArchivePlan, DatasetPlan, ShardPlan
+
+PLAN_OPEN = "open"
+PLAN_FINALIZED = "finalized"
+LEASE_HELD = "held"
+LEASE_DONE = "done"
+SHARED_PLAN_ATTEMPTS = 5
+RENEW_RETRY_FRACTION = 8
+
+
+@dataclass(frozen=True)
+class Lease:
+    """A work unit claimed by this worker until ``expires_at``.
+
+    ``etag`` is the ETag of the lease object as this worker last wrote it;
+    every renewal and the final completion are conditional on it, so a
+    worker that lost its lease cannot overwrite the new owner's.
+    """
+
+    object_name: str
+    key: str
+    owner: str
+    expires_at: datetime
+    etag: str
+
+
+class _HeldLease:
+    """The current state of a lease that is being renewed in the background.
+
+    ``lost`` is set, and ``lease`` becomes ``None``, once the lease can no
+    longer be renewed.
+    """
+
+    def __init__(self, lease: Lease):
+        self.lease: Lease | None = lease
+        self.lost = threading.Event()
+
+    def lose(self) -> None:
+        """Record that another worker may now own the unit."""
+        self.lease = None
+        self.lost.set()
+
+
+class LeaseManager:
+    """Claim, renew, and complete work units through lease objects.
+
+    The shared plan and one lease object per work unit live beneath
+    ``work_prefix`` in the state bucket. Every write is a conditional put
+    against the ETag read just before, so when two workers race for the same
+    object exactly one of them wins.
+    """
+
+    def __init__(
+        self,
+        state_store: Any,
+        work_prefix: str,
+        worker_id: str,
+        lease_seconds: float,
+        clock: Callable[[], datetime],
+    ):
+        """Store the state store, lease location, and this worker's identity."""
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be > 0")
+        self.state_store = state_store
+        self.work_prefix = work_prefix.strip("/")
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+
+    @property
+    def plan_object_name(self) -> str:
+        """Object holding the plan all workers of the current run share."""
+        return f"{self.work_prefix}/plan.json"
+
+    @property
+    def poll_seconds(self) -> float:
+        """How often leases are renewed and other workers' leases rechecked."""
+        return self.lease_seconds / 3
+
+    def lease_object_name(self, run_id: str, key: str) -> str:
+        """Build the lease object name for one work unit of a run."""
+        return f"{self.work_prefix}/run_id={run_id}/unit={key}.json"
+
+    def join_plan(
+        self, checkpoint_before: str | None, build: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Return the shared plan for ``checkpoint_before``.
+
+        An open plan for that checkpoint is joined. So is a run that was
+        finalized from it and is still saving the checkpoint it advances to,
+        whose units are then all done; only a finalized run that leaves the
+        checkpoint where it is, or whose finalizer has not saved it within
+        ``lease_seconds``, is followed by a new plan. That plan is the one
+        returned by ``build``; if another worker writes first, its plan is
+        joined instead.
+        """
+        for _attempt in range(SHARED_PLAN_ATTEMPTS):
+            payload, etag = self.state_store.get_json_object_with_etag(
+                self.plan_object_name
+            )
+            if (
+                payload is not None
+                and payload["checkpoint_before"] == checkpoint_before
+            ):
+                if payload["status"] == PLAN_OPEN or self._advancing(payload):
+                    return payload
+            created = {
+                **build(),
+                "checkpoint_before": checkpoint_before,
+                "status": PLAN_OPEN,
+                "created_by": self.worker_id,
+            }
+            written = self.state_store.put_json_object_if(
+                self.plan_object_name, created, etag
+            )
+            if written is not None:
+                return created
+        raise RuntimeError(
+            f"Shared plan {self.plan_object_name} changed during each of "
+            f"{SHARED_PLAN_ATTEMPTS} attempts to join it"
+        )
+
+    def finalize_plan(self, run_id: str, advances_checkpoint: bool) -> bool:
+        """Mark the shared plan of ``run_id`` finalized.
+
+        Returns ``True`` for exactly one worker: the one whose conditional
+        write closed the plan. That worker commits the run, and
+        ``advances_checkpoint`` records whether it is about to save a new
+        checkpoint.
+        """
+        payload, etag = self.state_store.get_json_object_with_etag(
+            self.plan_object_name
+        )
+        if payload is None or payload["run_id"] != run_id:
+            return False
+        if payload["status"] != PLAN_OPEN:
+            return False
+        finalized = {
+            **payload,
+            "status": PLAN_FINALIZED,
+            "finalized_by": self.worker_id,
+            "finalized_at": _format_timestamp(self.clock()),
+            "advances_checkpoint": advances_checkpoint,
+        }
+        return (
+            self.state_store.put_json_object_if(self.plan_object_name, finalized, etag)
+            is not None
+        )
+
+    def _advancing(self, payload: dict[str, Any]) -> bool:
+        """Return whether a finalized plan's checkpoint may still be saving."""
+        if payload["status"] != PLAN_FINALIZED or not payload.get(
+            "advances_checkpoint"
+        ):
+            return False
+        finalized_at = _parse_timestamp(payload["finalized_at"])
+        return self.clock() < finalized_at + timedelta(seconds=self.lease_seconds)
+
+    def read(self, run_id: str, key: str) -> dict[str, Any] | None:
+        """Return the lease record of one work unit, if it was ever claimed."""
+        return self.state_store.get_json_object(self.lease_object_name(run_id, key))
+
+    def claim(self, run_id: str, key: str) -> Lease | None:
+        """Claim one work unit, taking it over if its lease has expired.
+
+        Returns ``None`` when the unit is done, another worker holds a live
+        lease on it, or another worker claimed it first.
+        """
+        object_name = self.lease_object_name(run_id, key)
+        payload, etag = self.state_store.get_json_object_with_etag(object_name)
+        now = self.clock()
+        if payload is not None:
+            if payload["status"] == LEASE_DONE:
+                return None
+            if payload["owner"] != self.worker_id and (
+                _parse_timestamp(payload["expires_at"]) > now
+            ):
+                return None
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        claimed = {
+            "key": key,
+            "owner": self.worker_id,
+            "status": LEASE_HELD,
+            "expires_at": _format_timestamp(expires_at),
+        }
+        new_etag = self.state_store.put_json_object_if(object_name, claimed, etag)
+        if new_etag is None:
+            return None
+        return Lease(
+            object_name=object_name,
+            key=key,
+            owner=self.worker_id,
+            expires_at=expires_at,
+            etag=new_etag,
+        )
+
+    def renew(self, lease: Lease) -> Lease | None:
+        """Extend a held lease; ``None`` if another worker has taken it over."""
+        expires_at = self.clock() + timedelta(seconds=self.lease_seconds)
+        payload = self._lease_payload(lease, LEASE_HELD, expires_at)
+        new_etag = self.state_store.put_json_object_if(
+            lease.object_name, payload, lease.etag
+        )
+        if new_etag is None:
+            return None
+        return replace(lease, expires_at=expires_at, etag=new_etag)
+
+    def complete(self, lease: Lease, result: dict[str, Any]) -> bool:
+        """Record a unit's result and mark it done; ``False`` if the lease was lost."""
+        payload = {
+            **self._lease_payload(lease, LEASE_DONE, lease.expires_at),
+            "result": result,
+        }
+        return (
+            self.state_store.put_json_object_if(lease.object_name, payload, lease.etag)
+            is not None
+        )
+
+    @contextmanager
+    def hold(self, lease: Lease) -> Iterator[_HeldLease]:
+        """Renew ``lease`` every ``poll_seconds`` until the block exits.
+
+        The yielded holder's ``lease`` is the latest renewal. A renewal that
+        fails, for example on a transient Object Storage error, is retried
+        after ``poll_seconds / RENEW_RETRY_FRACTION``, doubling up to
+        ``poll_seconds``. The holder is marked lost when a renewal finds that
+        another worker has taken the unit over, or when the lease expires
+        before a retry succeeds.
+        """
+        held = _HeldLease(lease)
+        stopped = threading.Event()
+
+        def renew_until_stopped() -> None:
+            failures = 0
+            while not stopped.wait(self._renew_delay(failures)):
+                try:
+                    renewed = self.renew(held.lease)
+                except Exception:
+                    if self.clock() >= held.lease.expires_at:
+                        held.lose()
+                        return
+                    failures += 1
+                    continue
+                if renewed is None:
+                    held.lose()
+                    return
+                held.lease = renewed
+                failures = 0
+
+        renewer = threading.Thread(target=renew_until_stopped, daemon=True)
+        renewer.start()
+        try:
+            yield held
+        finally:
+            stopped.set()
+            renewer.join()
+
+    def _renew_delay(self, failures: int) -> float:
+        """Return the wait before the next renewal after ``failures`` errors."""
+        if failures == 0:
+            return self.poll_seconds
+        retry = self.poll_seconds / RENEW_RETRY_FRACTION * 2 ** (failures - 1)
+        return min(retry, self.poll_seconds)
+
+    def _lease_payload(
+        self, lease: Lease, status: str, expires_at: datetime
+    ) -> dict[str, Any]:
+        return {
+            "key": lease.key,
+            "owner": lease.owner,
+            "status": status,
+            "expires_at": _format_timestamp(expires_at),
+        }
+
+
+def archive_plan_payload(plan: ArchivePlan) -> dict[str, Any]:
+    """Return an archive plan as stored in the shared plan object."""
+    return {
+        "now": _format_timestamp(plan.now),
+        "selected_datasets": list(plan.selected_datasets),
+        "datasets": {
+            name: {
+                "retention_days": dataset_plan.retention_days,
+                "purge_boundary": _format_timestamp(dataset_plan.purge_boundary),
+                "window_start": _format_timestamp(dataset_plan.window_start),
+                "window_end": _format_timestamp(dataset_plan.window_end),
+                "resume_after_id": dataset_plan.resume_after_id,
+                "shards": [
+                    {
+                        "index": shard.index,
+                        "window_start": _format_timestamp(shard.window_start),
+                        "window_end": _format_timestamp(shard.window_end),
+                    }
+                    for shard in dataset_plan.shards
+                ],
+            }
+            for name, dataset_plan in plan.datasets.items()
+        },
+    }
+
+
+def parse_archive_plan(payload: dict[str, Any]) -> ArchivePlan:
+    """Rebuild the archive plan stored in a shared plan object."""
+    return ArchivePlan(
+        now=_parse_timestamp(payload["now"]),
+        selected_datasets=tuple(payload["selected_datasets"]),
+        datasets={
+            name: DatasetPlan(
+                name=name,
+                retention_days=item["retention_days"],
+                purge_boundary=_parse_timestamp(item["purge_boundary"]),
+                window_start=_parse_timestamp(item["window_start"]),
+                window_end=_parse_timestamp(item["window_end"]),
+                resume_after_id=item.get("resume_after_id"),
+                shards=tuple(
+                    ShardPlan(
+                        index=shard["index"],
+                        window_start=_parse_timestamp(shard["window_start"]),
+                        window_end=_parse_timestamp(shard["window_end"]),
+                    )
+                    for shard in item["shards"]
+                ),
+            )
+            for name, item in payload["datasets"].items()
+        },
+    )
+
+
+def _format_timestamp(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
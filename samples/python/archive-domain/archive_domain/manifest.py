@@ -13,12 +13,12 @@ from dataclasses import asdict, is_dataclass
 from datetime import datetime
 from typing import Any
 
-from .models import DatasetResult
+from .models import DatasetResult, PartMetrics, ShardResult, StageMetrics
 
 
 def _to_jsonable(value: Any) -> Any:
     if is_dataclass(value):
-        return asdict(value)
+        return _to_jsonable(asdict(value))
     if isinstance(value, datetime):
         return value.isoformat().replace("+00:00", "Z")
     if isinstance(value, dict):
@@ -34,12 +34,102 @@ def build_run_manifest(
     retention_days: dict[str, int],
     checkpoint_before: str | None,
     dataset_results: list[DatasetResult],
+    started_at: datetime | None = None,
+    wall_seconds: float | None = None,
 ) -> dict[str, Any]:
-    """Build a minimal run manifest payload."""
+    """Build a run manifest payload.
+
+    Each dataset result carries its row count, uncompressed and compressed
+    bytes, stage timings, and per-part sizes, timings, and checksums.
+    ``totals`` sums the known figures across datasets.
+    """
     return {
         "run_id": run_id,
         "selected_datasets": list(selected_datasets),
         "retention_days": retention_days,
         "checkpoint_before": checkpoint_before,
+        "started_at": _to_jsonable(started_at),
+        "wall_seconds": wall_seconds,
+        "totals": {
+            field_name: sum_known(
+                getattr(result, field_name) for result in dataset_results
+            )
+            for field_name in ("row_count", "uncompressed_bytes", "compressed_bytes")
+        },
         "dataset_results": [_to_jsonable(result) for result in dataset_results],
     }
+
+
+def dataset_result_payload(result: DatasetResult) -> dict[str, Any]:
+    """Return one dataset result as it appears in a run manifest."""
+    return _to_jsonable(result)
+
+
+def parse_dataset_result(payload: dict[str, Any]) -> DatasetResult:
+    """Rebuild a dataset result from its manifest payload."""
+    resume_key = payload.get("resume_key")
+    return DatasetResult(
+        **{
+            **payload,
+            "object_names": tuple(payload.get("object_names", ())),
+            "started_at": _parse_timestamp(payload.get("started_at")),
+            "shards": tuple(
+                ShardResult(
+                    **{
+                        **item,
+                        "window_start": _parse_timestamp(item["window_start"]),
+                        "window_end": _parse_timestamp(item["window_end"]),
+                        "object_names": tuple(item.get("object_names", ())),
+                        "started_at": _parse_timestamp(item.get("started_at")),
+                    }
+                )
+                for item in payload.get("shards", ())
+            ),
+            "stage_metrics": tuple(
+                StageMetrics(**item) for item in payload.get("stage_metrics", ())
+            ),
+            "resume_key": (
+                None
+                if resume_key is None
+                else (_parse_timestamp(resume_key[0]), resume_key[1])
+            ),
+            "parts": tuple(PartMetrics(**item) for item in payload.get("parts", ())),
+        }
+    )
+
+
+def _parse_timestamp(value: str | None) -> datetime | None:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def sum_known(values) -> int | None:
+    """Sum the values that are not ``None``; ``None`` if none are known."""
+    known = [value for value in values if value is not None]
+    return sum(known) if known else None
+
+
+def build_compaction_manifest(
+    compaction_id: str,
+    dataset: str,
+    partition_prefix: str,
+    created_at: datetime,
+    outputs: list[tuple[PartMetrics, tuple[str, ...]]],
+) -> dict[str, Any]:
+    """Build a compaction manifest payload.
+
+    Each output lists the source objects merged into it, so the sources an
+    interrupted compaction still has to delete can be recovered later.
+    """
+    return {
+        "compaction_id": compaction_id,
+        "dataset": dataset,
+        "partition_prefix": partition_prefix,
+        "created_at": _to_jsonable(created_at),
+        "outputs": [
+            {**_to_jsonable(output), "sources": list(sources)}
+            for output, sources in outputs
+        ],
+        "sources": [source for _output, sources in outputs for source in sources],
+    }
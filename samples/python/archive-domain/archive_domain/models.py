@@ -9,7 +9,7 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
 VALID_DATASETS = ("raw", "historized", "rejected")
@@ -18,16 +18,44 @@ EXPORT_FORMAT_PARQUET = "parquet"
 EXPORT_FORMAT_DATAPUMP = "datapump"
 VALID_EXPORT_FORMATS = (EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_DATAPUMP)
 
+ESTIMATE_METHOD_COUNT = "count"
+ESTIMATE_METHOD_STATS = "stats"
+VALID_ESTIMATE_METHODS = (ESTIMATE_METHOD_COUNT, ESTIMATE_METHOD_STATS)
+
+STREAM_EXPORT_MODE = "stream"
+
+VERIFICATION_VERIFIED = "verified"
+VERIFICATION_FAILED = "failed"
+VERIFICATION_UNAVAILABLE = "unverified"
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    """One sub-window of a dataset archive window."""
+
+    index: int
+    window_start: datetime
+    window_end: datetime
+
 
 @dataclass(frozen=True)
 class DatasetPlan:
-    """Archive plan details for one dataset."""
+    """Archive plan details for one dataset.
+
+    ``through_id`` marks an incremental export: the dataset's rows with an id
+    up to ``through_id`` and above ``resume_after_id`` are exported in id
+    order, whatever their time. Without a ``resume_after_id`` the export
+    starts at the rows from ``window_start`` on.
+    """
 
     name: str
     retention_days: int
     purge_boundary: datetime
     window_start: datetime
     window_end: datetime
+    shards: tuple[ShardPlan, ...] = ()
+    resume_after_id: int | None = None
+    through_id: int | None = None
 
 
 @dataclass(frozen=True)
@@ -41,9 +69,91 @@ class ArchivePlan:
 
 @dataclass(frozen=True)
 class CheckpointState:
-    """Latest successful archive checkpoint."""
+    """Latest successful archive checkpoint.
+
+    ``window_ends`` records where a dataset's archive stopped when its last
+    window was cut short of the purge boundary to fit the run budget. The
+    next window of that dataset starts there instead of at
+    ``last_successful_run_at`` minus its retention.
+
+    ``high_water_marks`` records the highest id an incremental run exported
+    for each dataset; the next incremental run exports the ids above it.
+    """
 
     last_successful_run_at: datetime | None = None
+    window_ends: dict[str, datetime] = field(default_factory=dict)
+    high_water_marks: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class StageMetrics:
+    """Work done and busy time for one SQL export pipeline stage."""
+
+    stage: str
+    items: int
+    bytes: int
+    busy_seconds: float
+    items_per_second: float | None = None
+    mb_per_second: float | None = None
+
+
+@dataclass(frozen=True)
+class PartMetrics:
+    """Size, timing, and checksums of one exported object.
+
+    Direct-query parts report every field. Bulk exports are written by the
+    database, so only the listed size and Object Storage MD5 are known.
+    """
+
+    object_name: str
+    rows: int | None = None
+    uncompressed_bytes: int | None = None
+    compressed_bytes: int | None = None
+    sha256: str | None = None
+    md5: str | None = None
+    serialize_seconds: float | None = None
+    upload_seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class ShardResult:
+    """Outcome for one dataset sub-window in a run."""
+
+    index: int
+    window_start: datetime
+    window_end: datetime
+    status: str
+    object_prefix: str | None = None
+    object_names: tuple[str, ...] = ()
+    error_message: str | None = None
+    started_at: datetime | None = None
+    duration_seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class CompletedWindow:
+    """A dataset window exported since the last checkpoint.
+
+    ``last_id`` marks a partial export that stopped inside the window: rows
+    before ``window_end`` and rows at exactly ``window_end`` with an id up to
+    ``last_id`` were exported.
+    """
+
+    window_start: datetime
+    window_end: datetime
+    run_id: str
+    object_prefix: str | None = None
+    object_names: tuple[str, ...] = ()
+    last_id: int | None = None
+
+
+@dataclass(frozen=True)
+class DatasetProgress:
+    """Windows already exported for one dataset since the last checkpoint."""
+
+    dataset: str
+    checkpoint_before: datetime | None = None
+    completed: tuple[CompletedWindow, ...] = ()
 
 
 @dataclass(frozen=True)
@@ -57,6 +167,57 @@ class DatasetResult:
     object_prefix: str | None = None
     object_names: tuple[str, ...] = ()
     error_message: str | None = None
+    started_at: datetime | None = None
+    duration_seconds: float | None = None
+    shards: tuple[ShardResult, ...] = ()
+    stage_metrics: tuple[StageMetrics, ...] = ()
+    resume_key: tuple[datetime, int] | None = None
+    row_count: int | None = None
+    uncompressed_bytes: int | None = None
+    compressed_bytes: int | None = None
+    parts: tuple[PartMetrics, ...] = ()
+    verification: str | None = None
+
+
+@dataclass(frozen=True)
+class ScheduledExport:
+    """A bulk export submitted as a database scheduler job."""
+
+    job_name: str
+    dataset: str
+    object_prefix: str
+    export_format: str
+
+
+@dataclass(frozen=True)
+class ThroughputRecord:
+    """Export throughput observed for one dataset in a completed run."""
+
+    dataset: str
+    mode: str
+    rows_per_second: float
+    run_id: str
+    bytes_per_second: float | None = None
+
+
+@dataclass(frozen=True)
+class DatasetEstimate:
+    """Estimated size and export cost of one dataset window.
+
+    ``method`` is ``count`` for an exact count query or ``stats`` for a
+    figure scaled from optimizer statistics. ``throughput_source`` is
+    ``configured`` or ``recorded``; without a throughput figure the expected
+    duration is unknown.
+    """
+
+    dataset: str
+    method: str
+    rows: int
+    bytes: int | None
+    suggested_shards: int
+    rows_per_second: float | None = None
+    throughput_source: str | None = None
+    expected_seconds: float | None = None
 
 
 @dataclass(frozen=True)
@@ -67,6 +228,8 @@ class PlanResult:
     export_format: str
     retention_days: dict[str, int]
     checkpoint: CheckpointState
+    estimates: dict[str, DatasetEstimate] = field(default_factory=dict)
+    archived_through: dict[str, datetime] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -80,3 +243,42 @@ class RunResult:
     dataset_results: tuple[DatasetResult, ...]
     checkpoint_advanced: bool
     manifest_object_name: str | None = None
+    started_at: datetime | None = None
+    wall_seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    """Outcome of compacting one dataset day or month partition."""
+
+    compaction_id: str
+    dataset: str
+    partition_prefix: str
+    status: str
+    source_objects: tuple[str, ...] = ()
+    outputs: tuple[PartMetrics, ...] = ()
+    uncommitted_objects: tuple[str, ...] = ()
+    manifest_object_name: str | None = None
+    deleted_objects: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """One exported dataset window as recorded in the catalog index.
+
+    ``last_id`` marks a partial export, as in :class:`CompletedWindow`.
+    ``export_mode`` is ``"stream"`` for parts written by the stream
+    archiver, whose windows span only the messages they hold.
+    """
+
+    dataset: str
+    window_start: datetime
+    window_end: datetime
+    run_id: str
+    export_format: str | None = None
+    object_names: tuple[str, ...] = ()
+    row_count: int | None = None
+    uncompressed_bytes: int | None = None
+    compressed_bytes: int | None = None
+    last_id: int | None = None
+    export_mode: str | None = None
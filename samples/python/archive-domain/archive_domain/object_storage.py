@@ -9,20 +9,42 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 
 from __future__ import annotations
 
+import codecs
 import json
+import re
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import asdict, is_dataclass
 from datetime import datetime
 from typing import Any
 from urllib.parse import quote
 
-from .models import CheckpointState
+from .catalog import archived_through
+from .models import (
+    CatalogEntry,
+    CheckpointState,
+    CompletedWindow,
+    DatasetProgress,
+    ThroughputRecord,
+)
+
+COMPLETED_STATUSES = ("succeeded", "skipped")
+CONDITIONAL_WRITE_ATTEMPTS = 5
+_CONDITIONAL_WRITE_CONFLICT_STATUSES = (409, 412)
+JSON_MEMBERS_RANGE_BYTES = 16 * 1024
+_RANGE_NOT_SATISFIABLE = 416
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CONTINUATION = frozenset("0123456789.eE+-")
 
 
 def should_advance_checkpoint(statuses: dict[str, str]) -> bool:
-    """Advance the checkpoint only if all selected datasets succeeded."""
+    """Advance the checkpoint only if all selected datasets completed.
+
+    A dataset completes when it succeeds in this run or is skipped because an
+    earlier run since the same checkpoint already exported its window.
+    """
     if not statuses:
         return False
-    return all(status == "succeeded" for status in statuses.values())
+    return all(status in COMPLETED_STATUSES for status in statuses.values())
 
 
 def build_dataset_object_prefix(
@@ -34,19 +56,42 @@ def build_dataset_object_prefix(
     run_at: datetime,
 ) -> str:
     """Build the partitioned object prefix for one dataset."""
-    normalized_prefix = prefix.strip("/")
+    dataset_prefix = build_dataset_root_prefix(prefix, domain_short_name, zone, dataset)
     return (
-        f"{normalized_prefix}/domain={domain_short_name}/zone={zone}/dataset={dataset}/"
+        f"{dataset_prefix}/"
         f"year={run_at:%Y}/month={run_at:%m}/day={run_at:%d}/hour={run_at:%H}/"
         f"run_id={run_id}"
     )
 
 
+def build_dataset_root_prefix(
+    prefix: str,
+    domain_short_name: str,
+    zone: str,
+    dataset: str,
+) -> str:
+    """Build the prefix above the time partitions of one dataset."""
+    normalized_prefix = prefix.strip("/")
+    return (
+        f"{normalized_prefix}/domain={domain_short_name}/zone={zone}/dataset={dataset}"
+    )
+
+
+def build_shard_object_prefix(object_prefix: str, shard_index: int) -> str:
+    """Build the part prefix for one sub-window beneath a dataset prefix."""
+    return f"{object_prefix.strip('/')}/shard={shard_index:05d}"
+
+
 def build_manifest_object_name(manifest_prefix: str, run_id: str) -> str:
     """Build the manifest object name for a run."""
     return f"{manifest_prefix.strip('/')}/run_id={run_id}.json"
 
 
+def build_progress_object_name(progress_prefix: str, dataset: str) -> str:
+    """Build the progress record object name for one dataset."""
+    return f"{progress_prefix.strip('/')}/dataset={dataset}.json"
+
+
 def build_object_name(object_prefix: str, filename: str) -> str:
     """Build one object name beneath a dataset object prefix."""
     return f"{object_prefix.strip('/')}/{filename}"
@@ -68,10 +113,128 @@ def build_dbms_cloud_file_uri(
     )
 
 
-def _serialize(payload: Any) -> bytes:
+def encode_json(payload: Any) -> bytes:
+    """Encode a payload compactly, keeping its key order.
+
+    Payloads list their small metadata members before large lists, so
+    :meth:`ObjectStorageStateStore.get_json_members` finds them in the first
+    bytes of the object.
+    """
     if is_dataclass(payload):
         payload = asdict(payload)
-    return json.dumps(payload, indent=2, sort_keys=True).encode("utf-8")
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def read_json_members(chunks: Iterable[bytes], keys: Iterable[str]) -> dict[str, Any]:
+    """Return the named top-level members of a JSON object read from ``chunks``.
+
+    Reading stops once every key was seen; missing keys are absent from the
+    result.
+    """
+    wanted = set(keys)
+    members: dict[str, Any] = {}
+    for key, value in iter_json_members(chunks):
+        if key in wanted:
+            members[key] = value
+            if len(members) == len(wanted):
+                break
+    return members
+
+
+def iter_json_members(chunks: Iterable[bytes]) -> Iterator[tuple[str, Any]]:
+    """Yield the top-level members of a JSON object as its bytes arrive.
+
+    A member is decoded once the text after its value shows the value is
+    complete, and the text before it is dropped. A caller that stops
+    iterating early reads no further chunks.
+    """
+    text = _JsonText(chunks)
+    text.expect("{")
+    if text.peek() == "}":
+        return
+    while True:
+        key = text.value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected a JSON object key, found {key!r}")
+        text.expect(":")
+        yield key, text.value()
+        separator = text.next_char()
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(
+                f"Expected ',' or '}}' in JSON object, found {separator!r}"
+            )
+
+
+class _JsonText:
+    """UTF-8 text decoded from byte chunks on demand for :func:`iter_json_members`."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._scanner = json.JSONDecoder()
+        self._text = ""
+        self._position = 0
+        self._exhausted = False
+
+    def _grow(self) -> bool:
+        """Read until the unconsumed text doubles; ``False`` once nothing is left."""
+        if self._exhausted:
+            return False
+        target = 2 * max(len(self._text) - self._position, 1)
+        text = self._text[self._position :]
+        while len(text) < target and not self._exhausted:
+            chunk = next(self._chunks, None)
+            self._exhausted = chunk is None
+            text += self._decoder.decode(chunk or b"", final=self._exhausted)
+        self._text, self._position = text, 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self._position = _WHITESPACE.match(self._text, self._position).end()
+            if self._position < len(self._text):
+                return self._text[self._position]
+            if not self._grow():
+                raise ValueError("Unexpected end of JSON document")
+
+    def next_char(self) -> str:
+        char = self.peek()
+        self._position += 1
+        return char
+
+    def expect(self, char: str) -> None:
+        found = self.next_char()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON document, found {found!r}")
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._scanner.raw_decode(self._text, self._position)
+            except json.JSONDecodeError:
+                if not self._grow():
+                    raise
+                continue
+            # A number or literal at the end of the text may continue in the
+            # next chunk, so the value only counts once a character that
+            # cannot extend it follows.
+            following = _WHITESPACE.match(self._text, end).end()
+            complete = (
+                following < len(self._text)
+                and self._text[end] not in _NUMBER_CONTINUATION
+            )
+            if complete or not self._grow():
+                self._position = end
+                return value
+
+
+def _format_timestamp(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    return value.isoformat().replace("+00:00", "Z")
 
 
 def _parse_timestamp(value: str | None) -> datetime | None:
@@ -92,6 +255,13 @@ class ObjectStorageStateStore:
 
     def get_json_object(self, object_name: str) -> dict[str, Any] | None:
         """Read one JSON object from Object Storage."""
+        payload, _etag = self.get_json_object_with_etag(object_name)
+        return payload
+
+    def get_json_object_with_etag(
+        self, object_name: str
+    ) -> tuple[dict[str, Any] | None, str | None]:
+        """Read one JSON object and the ETag to make a conditional write against."""
         try:
             response = self.client.get_object(
                 namespace_name=self.namespace,
@@ -99,13 +269,61 @@ class ObjectStorageStateStore:
                 object_name=object_name,
             )
         except Exception as exc:
-            status = getattr(exc, "status", None)
-            code = getattr(exc, "code", None)
-            if status == 404 or code == "ObjectNotFound":
+            if _is_not_found(exc):
+                return None, None
+            raise
+
+        headers = getattr(response, "headers", None) or {}
+        return json.loads(response.data.content), headers.get("etag")
+
+    def get_json_members(
+        self,
+        object_name: str,
+        keys: Iterable[str],
+        first_bytes: int = JSON_MEMBERS_RANGE_BYTES,
+    ) -> dict[str, Any] | None:
+        """Read only the named top-level members of a JSON object.
+
+        The object is fetched with ranged GETs, starting with ``first_bytes``
+        and doubling, and parsed as it arrives. Requests stop once every key
+        was seen, so metadata ahead of a long list costs one small GET.
+        Missing keys are absent from the result; a missing object returns
+        ``None``.
+        """
+        try:
+            return read_json_members(
+                self._ranged_chunks(object_name, first_bytes), keys
+            )
+        except Exception as exc:
+            if _is_not_found(exc):
                 return None
             raise
 
-        return json.loads(response.data.content.decode("utf-8"))
+    def _ranged_chunks(self, object_name: str, first_bytes: int) -> Iterator[bytes]:
+        """Yield an object's bytes through ranged GETs pinned to its first ETag."""
+        offset, size, condition = 0, first_bytes, {}
+        while True:
+            try:
+                response = self.client.get_object(
+                    namespace_name=self.namespace,
+                    bucket_name=self.bucket_name,
+                    object_name=object_name,
+                    range=f"bytes={offset}-{offset + size - 1}",
+                    **condition,
+                )
+            except Exception as exc:
+                if offset and getattr(exc, "status", None) == _RANGE_NOT_SATISFIABLE:
+                    return
+                raise
+            data = response.data.content
+            yield data
+            if len(data) < size:
+                return
+            etag = (getattr(response, "headers", None) or {}).get("etag")
+            if etag and not condition:
+                condition = {"if_match": etag}
+            offset += len(data)
+            size *= 2
 
     def put_json_object(self, object_name: str, payload: Any) -> None:
         """Write one JSON object to Object Storage."""
@@ -113,9 +331,42 @@ class ObjectStorageStateStore:
             namespace_name=self.namespace,
             bucket_name=self.bucket_name,
             object_name=object_name,
-            put_object_body=_serialize(payload),
+            put_object_body=encode_json(payload),
         )
 
+    def put_json_object_if(
+        self, object_name: str, payload: Any, etag: str | None
+    ) -> str | None:
+        """Write one JSON object only if it is unchanged since it was read.
+
+        The write carries ``if-match`` on ``etag``, or ``if-none-match: *``
+        when ``etag`` is ``None`` and the object must not exist yet. Returns
+        the new ETag, or ``None`` when another writer changed the object
+        first. A response without an ETag raises ``RuntimeError``, because
+        the next conditional write would have nothing to match.
+        """
+        condition = {"if_match": etag} if etag else {"if_none_match": "*"}
+        try:
+            response = self.client.put_object(
+                namespace_name=self.namespace,
+                bucket_name=self.bucket_name,
+                object_name=object_name,
+                put_object_body=encode_json(payload),
+                **condition,
+            )
+        except Exception as exc:
+            if getattr(exc, "status", None) in _CONDITIONAL_WRITE_CONFLICT_STATUSES:
+                return None
+            raise
+        headers = getattr(response, "headers", None) or {}
+        etag = headers.get("etag")
+        if not etag:
+            raise RuntimeError(
+                f"Object Storage returned no ETag for {object_name}; "
+                "conditional writes cannot continue."
+            )
+        return etag
+
     def load_checkpoint(self, object_name: str) -> CheckpointState:
         """Load the current checkpoint or return an empty one."""
         payload = self.get_json_object(object_name)
@@ -125,16 +376,244 @@ class ObjectStorageStateStore:
         return CheckpointState(
             last_successful_run_at=_parse_timestamp(
                 payload.get("last_successful_run_at")
-            )
+            ),
+            window_ends={
+                dataset: _parse_timestamp(value)
+                for dataset, value in payload.get("window_ends", {}).items()
+            },
+            high_water_marks={
+                dataset: int(value)
+                for dataset, value in payload.get("high_water_marks", {}).items()
+            },
         )
 
     def save_checkpoint(self, object_name: str, checkpoint: CheckpointState) -> None:
         """Persist checkpoint state."""
-        payload = {
-            "last_successful_run_at": (
-                checkpoint.last_successful_run_at.isoformat().replace("+00:00", "Z")
-                if checkpoint.last_successful_run_at is not None
-                else None
+        payload: dict[str, Any] = {
+            "last_successful_run_at": _format_timestamp(
+                checkpoint.last_successful_run_at
+            )
+        }
+        if checkpoint.window_ends:
+            payload["window_ends"] = {
+                dataset: _format_timestamp(value)
+                for dataset, value in sorted(checkpoint.window_ends.items())
+            }
+        if checkpoint.high_water_marks:
+            payload["high_water_marks"] = dict(
+                sorted(checkpoint.high_water_marks.items())
+            )
+        self.put_json_object(object_name, payload)
+
+    def load_progress(
+        self,
+        object_name: str,
+        dataset: str,
+        checkpoint_before: datetime | None,
+    ) -> DatasetProgress:
+        """Load the windows exported for a dataset since ``checkpoint_before``.
+
+        Records written against a different checkpoint are stale and ignored.
+        """
+        payload = self.get_json_object(object_name)
+        return _parse_progress_payload(payload, dataset, checkpoint_before)
+
+    def save_progress(self, object_name: str, progress: DatasetProgress) -> None:
+        """Persist the windows exported for one dataset."""
+        self.put_json_object(object_name, _progress_payload(progress))
+
+    def update_progress(
+        self,
+        object_name: str,
+        dataset: str,
+        checkpoint_before: datetime | None,
+        update: Callable[[DatasetProgress], DatasetProgress],
+        attempts: int = CONDITIONAL_WRITE_ATTEMPTS,
+    ) -> DatasetProgress:
+        """Apply ``update`` to a dataset's progress record with a conditional write.
+
+        Workers exporting different sub-windows of the same dataset record
+        their progress concurrently, so each update is retried against the
+        latest copy instead of overwriting it.
+        """
+        for _attempt in range(attempts):
+            payload, etag = self.get_json_object_with_etag(object_name)
+            updated = update(
+                _parse_progress_payload(payload, dataset, checkpoint_before)
+            )
+            new_etag = self.put_json_object_if(
+                object_name, _progress_payload(updated), etag
             )
+            if new_etag is not None:
+                return updated
+        raise RuntimeError(
+            f"Progress {object_name} changed during each of {attempts} update attempts"
+        )
+
+    def load_throughput(self, object_name: str) -> dict[str, ThroughputRecord]:
+        """Load the most recent export throughput recorded per dataset."""
+        payload = self.get_json_object(object_name) or {}
+        return {
+            dataset: ThroughputRecord(
+                dataset=dataset,
+                mode=item["mode"],
+                rows_per_second=float(item["rows_per_second"]),
+                run_id=item["run_id"],
+                bytes_per_second=item.get("bytes_per_second"),
+            )
+            for dataset, item in payload.get("datasets", {}).items()
+        }
+
+    def save_throughput(
+        self, object_name: str, records: dict[str, ThroughputRecord]
+    ) -> None:
+        """Persist the most recent export throughput per dataset."""
+        payload = {
+            "datasets": {
+                dataset: {
+                    "mode": record.mode,
+                    "rows_per_second": record.rows_per_second,
+                    "bytes_per_second": record.bytes_per_second,
+                    "run_id": record.run_id,
+                }
+                for dataset, record in records.items()
+            }
         }
         self.put_json_object(object_name, payload)
+
+    def load_catalog(self, object_name: str) -> tuple[CatalogEntry, ...]:
+        """Load every exported window recorded in the catalog index."""
+        entries, _etag = self._load_catalog_with_etag(object_name)
+        return entries
+
+    def load_archived_through(self, object_name: str) -> dict[str, datetime]:
+        """Load the latest exported window end per dataset from the catalog.
+
+        Catalog writes keep this summary ahead of the entries, so it is read
+        with a small ranged GET instead of downloading every entry. A
+        catalog written before the summary existed is read in full.
+        """
+        members = self.get_json_members(object_name, ("archived_through",))
+        if members is None:
+            return {}
+        if "archived_through" not in members:
+            return archived_through(self.load_catalog(object_name))
+        return {
+            dataset: _parse_timestamp(value)
+            for dataset, value in members["archived_through"].items()
+        }
+
+    def update_catalog(
+        self,
+        object_name: str,
+        update: Callable[[tuple[CatalogEntry, ...]], tuple[CatalogEntry, ...]],
+        attempts: int = CONDITIONAL_WRITE_ATTEMPTS,
+    ) -> tuple[CatalogEntry, ...]:
+        """Apply ``update`` to the catalog index with a conditional write.
+
+        The write only succeeds if the catalog is unchanged since it was read
+        (``if-match`` on its ETag, or ``if-none-match`` when it does not exist
+        yet). On a conflict the catalog is read again and ``update`` reapplied.
+        """
+        for _attempt in range(attempts):
+            entries, etag = self._load_catalog_with_etag(object_name)
+            updated = update(entries)
+            payload = {
+                "archived_through": {
+                    dataset: _format_timestamp(value)
+                    for dataset, value in sorted(archived_through(updated).items())
+                },
+                "entries": [_catalog_entry_payload(item) for item in updated],
+            }
+            if self.put_json_object_if(object_name, payload, etag) is not None:
+                return updated
+        raise RuntimeError(
+            f"Catalog {object_name} changed during each of {attempts} update attempts"
+        )
+
+    def _load_catalog_with_etag(
+        self, object_name: str
+    ) -> tuple[tuple[CatalogEntry, ...], str | None]:
+        payload, etag = self.get_json_object_with_etag(object_name)
+        return parse_catalog_payload(payload), etag
+
+
+def _is_not_found(exc: Exception) -> bool:
+    return (
+        getattr(exc, "status", None) == 404
+        or getattr(exc, "code", None) == "ObjectNotFound"
+    )
+
+
+def _parse_progress_payload(
+    payload: dict[str, Any] | None,
+    dataset: str,
+    checkpoint_before: datetime | None,
+) -> DatasetProgress:
+    if payload is None or payload.get("checkpoint_before") != _format_timestamp(
+        checkpoint_before
+    ):
+        return DatasetProgress(dataset=dataset, checkpoint_before=checkpoint_before)
+
+    return DatasetProgress(
+        dataset=dataset,
+        checkpoint_before=checkpoint_before,
+        completed=tuple(
+            CompletedWindow(
+                window_start=_parse_timestamp(item["window_start"]),
+                window_end=_parse_timestamp(item["window_end"]),
+                run_id=item["run_id"],
+                object_prefix=item.get("object_prefix"),
+                object_names=tuple(item.get("object_names", ())),
+                last_id=item.get("last_id"),
+            )
+            for item in payload.get("completed", [])
+        ),
+    )
+
+
+def _progress_payload(progress: DatasetProgress) -> dict[str, Any]:
+    return {
+        "dataset": progress.dataset,
+        "checkpoint_before": _format_timestamp(progress.checkpoint_before),
+        "completed": [
+            {
+                "window_start": _format_timestamp(item.window_start),
+                "window_end": _format_timestamp(item.window_end),
+                "run_id": item.run_id,
+                "object_prefix": item.object_prefix,
+                "object_names": list(item.object_names),
+                "last_id": item.last_id,
+            }
+            for item in progress.completed
+        ],
+    }
+
+
+def parse_catalog_payload(payload: dict[str, Any] | None) -> tuple[CatalogEntry, ...]:
+    """Return the entries of a catalog index payload."""
+    return tuple(
+        CatalogEntry(
+            dataset=item["dataset"],
+            window_start=_parse_timestamp(item["window_start"]),
+            window_end=_parse_timestamp(item["window_end"]),
+            run_id=item["run_id"],
+            export_format=item.get("export_format"),
+            object_names=tuple(item.get("object_names", ())),
+            row_count=item.get("row_count"),
+            uncompressed_bytes=item.get("uncompressed_bytes"),
+            compressed_bytes=item.get("compressed_bytes"),
+            last_id=item.get("last_id"),
+            export_mode=item.get("export_mode"),
+        )
+        for item in (payload or {}).get("entries", [])
+    )
+
+
+def _catalog_entry_payload(entry: CatalogEntry) -> dict[str, Any]:
+    return {
+        **asdict(entry),
+        "window_start": _format_timestamp(entry.window_start),
+        "window_end": _format_timestamp(entry.window_end),
+        "object_names": list(entry.object_names),
+    }
@@ -10,6 +10,8 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 from __future__ import annotations
 
 import os
+import threading
+from collections.abc import Callable
 from typing import Any
 
 
@@ -72,6 +74,30 @@ def get_oci_config(
     return config, signer
 
 
+class LazyClient:
+    """Build an OCI client on first use and forward calls to it.
+
+    Importing the OCI SDK and loading its configuration dominate CLI start-up
+    time, so commands that are answered from cached metadata never pay for
+    them.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        """Store the factory that builds the client."""
+        self._factory = factory
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        """Build the client if needed and return its attribute."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        with self._lock:
+            if self._client is None:
+                self._client = self._factory()
+        return getattr(self._client, name)
+
+
 def resolve_region(config: dict[str, Any]) -> str | None:
     """Resolve the OCI region from config or environment."""
     return (
@@ -0,0 +1,334 @@
+"""Fetch, compress, and upload pipeline for SQL-mode exports.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import queue
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from typing import Any
+
+from .models import PartMetrics, StageMetrics
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+VALID_COMPRESSIONS = (COMPRESSION_GZIP, COMPRESSION_ZSTD)
+
+_COMPRESSION_EXTENSIONS = {COMPRESSION_GZIP: "gz", COMPRESSION_ZSTD: "zst"}
+_QUEUE_POLL_SECONDS = 0.1
+_END = object()
+
+
+class _PipelineCancelledError(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+@dataclass(frozen=True)
+class PipelineSettings:
+    """Tuning knobs for the SQL export pipeline."""
+
+    compression: str = COMPRESSION_GZIP
+    compression_level: int = 6
+    compression_threads: int = 0
+    fetch_rows: int = 1000
+    part_size_bytes: int = 64 * 1024 * 1024
+    queue_depth: int = 4
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    """Outcome of one pipeline execution."""
+
+    filenames: tuple[str, ...]
+    row_count: int
+    stage_metrics: tuple[StageMetrics, ...]
+    parts: tuple[PartMetrics, ...] = ()
+
+
+def part_filename(index: int, compression: str = COMPRESSION_GZIP) -> str:
+    """Return the object filename for one JSON Lines part."""
+    if compression not in VALID_COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return f"part-{index:05d}.jsonl.{_COMPRESSION_EXTENSIONS[compression]}"
+
+
+def build_compressor(compression: str, level: int, threads: int = 0) -> Any:
+    """Return a streaming compressor with ``compress`` and ``flush`` methods.
+
+    gzip output uses zlib with a gzip container. zstd requires the optional
+    ``zstandard`` package; ``threads`` enables its multi-threaded mode.
+    """
+    if compression == COMPRESSION_GZIP:
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+    if compression == COMPRESSION_ZSTD:
+        try:
+            import zstandard
+        except ModuleNotFoundError as exc:
+            raise RuntimeError(
+                "The zstandard package is required for zstd compression"
+            ) from exc
+        return zstandard.ZstdCompressor(level=level, threads=threads).compressobj()
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def merge_stage_metrics(
+    stage_metrics: list[tuple[StageMetrics, ...]],
+) -> tuple[StageMetrics, ...]:
+    """Sum the per-stage counters of several pipeline runs, e.g. shards."""
+    stages: dict[str, _Stage] = {}
+    for run_metrics in stage_metrics:
+        for metrics in run_metrics:
+            stage = stages.setdefault(metrics.stage, _Stage(metrics.stage))
+            stage.items += metrics.items
+            stage.bytes += metrics.bytes
+            stage.busy_seconds += metrics.busy_seconds
+    return tuple(stage.freeze() for stage in stages.values())
+
+
+class _Stage:
+    """Mutable counters for one running stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        self.busy_seconds = 0.0
+
+    def freeze(self) -> StageMetrics:
+        return StageMetrics(
+            stage=self.name,
+            items=self.items,
+            bytes=self.bytes,
+            busy_seconds=round(self.busy_seconds, 6),
+            items_per_second=(
+                round(self.items / self.busy_seconds, 3) if self.busy_seconds else None
+            ),
+            mb_per_second=(
+                round(self.bytes / self.busy_seconds / 1_000_000, 3)
+                if self.busy_seconds and self.bytes
+                else None
+            ),
+        )
+
+
+class _Part:
+    """One compressed output part being assembled."""
+
+    def __init__(self, compressor: Any):
+        self.compressor = compressor
+        self.chunks: list[bytes] = []
+        self.raw_bytes = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+        self.last_key: Any = None
+
+    def write(self, data: bytes) -> None:
+        self.chunks.append(self.compressor.compress(data))
+        self.raw_bytes += len(data)
+
+    def close(self) -> bytes:
+        self.chunks.append(self.compressor.flush())
+        return b"".join(self.chunks)
+
+
+class ExportPipeline:
+    """Run fetch, serialize+compress, and upload on separate threads.
+
+    The calling thread fetches row batches. A serializer thread encodes and
+    compresses rows into size-bounded parts, and an uploader thread writes
+    each finished part. Bounded queues between the stages cap memory use at
+    roughly ``queue_depth`` batches plus ``queue_depth`` compressed parts.
+
+    When ``row_key`` is given, ``durable_key`` tracks the key of the last row
+    in the most recently uploaded part so a failed run can resume after it.
+
+    ``encode_row`` returns either the encoded row or an iterable of chunks
+    that make it up. Chunks are compressed as they are produced, so a large
+    row never has to be held in memory whole.
+    """
+
+    def __init__(
+        self,
+        settings: PipelineSettings,
+        encode_row: Callable[[Sequence[Any]], bytes | Iterable[bytes]],
+        upload_part: Callable[[str, bytes], None],
+        row_key: Callable[[Sequence[Any]], Any] | None = None,
+    ):
+        """Store the row encoder, part uploader, and pipeline settings."""
+        self.settings = settings
+        self.encode_row = encode_row
+        self.upload_part = upload_part
+        self.row_key = row_key
+        self.uploaded_filenames: list[str] = []
+        self.durable_key: Any = None
+        self._batches: queue.Queue = queue.Queue(maxsize=settings.queue_depth)
+        self._parts: queue.Queue = queue.Queue(maxsize=settings.queue_depth)
+        self._failed = threading.Event()
+        self._errors: list[BaseException] = []
+        self._fetch = _Stage("fetch")
+        self._serialize = _Stage("serialize")
+        self._upload = _Stage("upload")
+        self._filenames: list[str] = []
+        self._part_metrics: list[PartMetrics] = []
+
+    def run(self, fetch_batch: Callable[[], Sequence[Sequence[Any]]]) -> PipelineResult:
+        """Drain ``fetch_batch`` until it returns no rows and upload all parts."""
+        workers = [
+            threading.Thread(target=self._guard, args=(self._serialize_loop,)),
+            threading.Thread(target=self._guard, args=(self._upload_loop,)),
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            while True:
+                started = time.perf_counter()
+                rows = fetch_batch()
+                self._fetch.busy_seconds += time.perf_counter() - started
+                if not rows:
+                    break
+                self._fetch.items += len(rows)
+                self._put(self._batches, rows)
+            self._put(self._batches, _END)
+        except _PipelineCancelledError:
+            pass
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            for worker in workers:
+                worker.join()
+
+        if self._errors:
+            raise self._errors[0]
+        return PipelineResult(
+            filenames=tuple(self._filenames),
+            row_count=self._fetch.items,
+            stage_metrics=(
+                self._fetch.freeze(),
+                self._serialize.freeze(),
+                self._upload.freeze(),
+            ),
+            parts=tuple(self._part_metrics),
+        )
+
+    def _fail(self, exc: BaseException) -> None:
+        self._errors.append(exc)
+        self._failed.set()
+
+    def _guard(self, target: Callable[[], None]) -> None:
+        try:
+            target()
+        except _PipelineCancelledError:
+            pass
+        except BaseException as exc:
+            self._fail(exc)
+
+    def _put(self, target: queue.Queue, item: Any) -> None:
+        while True:
+            if self._failed.is_set():
+                raise _PipelineCancelledError()
+            try:
+                target.put(item, timeout=_QUEUE_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, source: queue.Queue) -> Any:
+        while True:
+            if self._failed.is_set():
+                raise _PipelineCancelledError()
+            try:
+                return source.get(timeout=_QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _new_part(self) -> _Part:
+        return _Part(
+            build_compressor(
+                self.settings.compression,
+                self.settings.compression_level,
+                self.settings.compression_threads,
+            )
+        )
+
+    def _emit_part(self, part: _Part) -> None:
+        started = time.perf_counter()
+        data = part.close()
+        sha256 = hashlib.sha256(data).hexdigest()
+        elapsed = time.perf_counter() - started
+        self._serialize.busy_seconds += elapsed
+        filename = part_filename(len(self._filenames), self.settings.compression)
+        self._filenames.append(filename)
+        metrics = PartMetrics(
+            object_name=filename,
+            rows=part.rows,
+            uncompressed_bytes=part.raw_bytes,
+            compressed_bytes=len(data),
+            sha256=sha256,
+            serialize_seconds=round(part.busy_seconds + elapsed, 6),
+        )
+        self._put(self._parts, (metrics, data, part.last_key))
+
+    def _serialize_loop(self) -> None:
+        part = None
+        while True:
+            batch = self._get(self._batches)
+            if batch is _END:
+                break
+            for row in batch:
+                started = time.perf_counter()
+                if part is None:
+                    part = self._new_part()
+                encoded = self.encode_row(row)
+                if isinstance(encoded, bytes):
+                    part.write(encoded)
+                    written = len(encoded)
+                else:
+                    written = 0
+                    for chunk in encoded:
+                        part.write(chunk)
+                        written += len(chunk)
+                if self.row_key is not None:
+                    part.last_key = self.row_key(row)
+                part.rows += 1
+                self._serialize.items += 1
+                self._serialize.bytes += written
+                elapsed = time.perf_counter() - started
+                self._serialize.busy_seconds += elapsed
+                part.busy_seconds += elapsed
+                if part.raw_bytes >= self.settings.part_size_bytes:
+                    self._emit_part(part)
+                    part = None
+
+        if part is not None or not self._filenames:
+            self._emit_part(part or self._new_part())
+        self._put(self._parts, _END)
+
+    def _upload_loop(self) -> None:
+        while True:
+            item = self._get(self._parts)
+            if item is _END:
+                return
+            metrics, data, last_key = item
+            started = time.perf_counter()
+            self.upload_part(metrics.object_name, data)
+            self.uploaded_filenames.append(metrics.object_name)
+            if last_key is not None:
+                self.durable_key = last_key
+            elapsed = time.perf_counter() - started
+            self._part_metrics.append(
+                replace(metrics, upload_seconds=round(elapsed, 6))
+            )
+            self._upload.busy_seconds += elapsed
+            self._upload.items += 1
+            self._upload.bytes += len(data)
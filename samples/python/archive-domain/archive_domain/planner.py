@@ -9,9 +9,18 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 
 from __future__ import annotations
 
+import math
+from dataclasses import replace
 from datetime import datetime, timedelta
 
-from .models import VALID_DATASETS, ArchivePlan, DatasetPlan
+from .models import (
+    VALID_DATASETS,
+    ArchivePlan,
+    CompletedWindow,
+    DatasetEstimate,
+    DatasetPlan,
+    ShardPlan,
+)
 
 
 def parse_datasets(value: str | None) -> tuple[str, ...]:
@@ -37,9 +46,15 @@ def build_archive_plan(
     bootstrap_lookback_days: int | None = None,
     explicit_start_time: datetime | None = None,
     explicit_end_time: datetime | None = None,
+    window_ends: dict[str, datetime] | None = None,
 ) -> ArchivePlan:
-    """Build a retention-aware archive plan for the selected datasets."""
+    """Build a retention-aware archive plan for the selected datasets.
+
+    A dataset listed in ``window_ends`` resumes where its last window
+    stopped short of the purge boundary.
+    """
     datasets: dict[str, DatasetPlan] = {}
+    window_ends = window_ends or {}
 
     for dataset in selected_datasets:
         retention = retention_days[dataset]
@@ -48,6 +63,8 @@ def build_archive_plan(
 
         if explicit_start_time is not None:
             window_start = explicit_start_time
+        elif dataset in window_ends:
+            window_start = window_ends[dataset]
         elif last_successful_run_at is not None:
             window_start = last_successful_run_at - timedelta(days=retention)
         elif bootstrap_lookback_days is not None:
@@ -70,3 +87,197 @@ def build_archive_plan(
         selected_datasets=tuple(selected_datasets),
         datasets=datasets,
     )
+
+
+def split_window(
+    window_start: datetime,
+    window_end: datetime,
+    shard_duration: timedelta | None = None,
+    shard_count: int | None = None,
+) -> tuple[ShardPlan, ...]:
+    """Split one archive window into contiguous sub-windows.
+
+    Returns an empty tuple when the window does not need splitting.
+    """
+    if shard_duration is not None and shard_duration <= timedelta(0):
+        raise ValueError("shard duration must be positive")
+    if shard_count is not None and shard_count < 1:
+        raise ValueError("shard count must be >= 1")
+    if window_end <= window_start:
+        return ()
+
+    bounds: list[tuple[datetime, datetime]] = []
+    if shard_duration is not None:
+        shard_start = window_start
+        while shard_start < window_end:
+            bounds.append((shard_start, min(shard_start + shard_duration, window_end)))
+            shard_start += shard_duration
+    elif shard_count is not None:
+        span = (window_end - window_start) / shard_count
+        for index in range(shard_count):
+            shard_end = (
+                window_end
+                if index == shard_count - 1
+                else window_start + span * (index + 1)
+            )
+            bounds.append((window_start + span * index, shard_end))
+
+    if len(bounds) < 2:
+        return ()
+    return tuple(
+        ShardPlan(index=index, window_start=start, window_end=end)
+        for index, (start, end) in enumerate(bounds)
+    )
+
+
+def suggest_shard_count(rows: int, target_rows_per_shard: int) -> int:
+    """Return the sub-window count that keeps each near ``target_rows_per_shard``."""
+    if target_rows_per_shard < 1:
+        raise ValueError("target rows per shard must be >= 1")
+    return max(1, math.ceil(rows / target_rows_per_shard))
+
+
+def scale_table_rows(
+    table_rows: int,
+    table_start: datetime | None,
+    table_end: datetime | None,
+    window_start: datetime,
+    window_end: datetime,
+) -> int:
+    """Scale a whole-table row count to the share of time a window covers.
+
+    Rows are assumed to be spread evenly between the oldest and newest time
+    in the table, which is what optimizer statistics alone can tell us.
+    """
+    if table_rows <= 0 or table_start is None or table_end is None:
+        return 0
+    if table_end <= table_start:
+        return table_rows if window_start <= table_start < window_end else 0
+    overlap_start = max(window_start, table_start)
+    overlap_end = min(window_end, table_end)
+    if overlap_end <= overlap_start:
+        return 0
+    return round(
+        table_rows * ((overlap_end - overlap_start) / (table_end - table_start))
+    )
+
+
+def build_dataset_estimate(
+    dataset: str,
+    method: str,
+    rows: int,
+    average_row_bytes: int | None,
+    target_rows_per_shard: int,
+    rows_per_second: float | None = None,
+    throughput_source: str | None = None,
+) -> DatasetEstimate:
+    """Combine a row estimate with sizing and throughput into a plan estimate."""
+    return DatasetEstimate(
+        dataset=dataset,
+        method=method,
+        rows=rows,
+        bytes=rows * average_row_bytes if average_row_bytes is not None else None,
+        suggested_shards=suggest_shard_count(rows, target_rows_per_shard),
+        rows_per_second=rows_per_second,
+        throughput_source=throughput_source if rows_per_second else None,
+        expected_seconds=round(rows / rows_per_second, 1) if rows_per_second else None,
+    )
+
+
+def budget_window_end(
+    dataset_plan: DatasetPlan,
+    rows: int,
+    average_row_bytes: int | None,
+    budget_seconds: float,
+    rows_per_second: float | None = None,
+    bytes_per_second: float | None = None,
+) -> datetime:
+    """Return where a window has to end for its export to fit the budget.
+
+    ``rows`` is the estimate for the whole window, assumed to be spread
+    evenly across it. Both throughputs limit the window when both are known.
+    Returns the planned end when the whole window fits, and never less than
+    one second past the start so every run makes progress.
+    """
+    if budget_seconds <= 0:
+        raise ValueError("run budget must be > 0 seconds")
+    fractions = []
+    if rows and rows_per_second:
+        fractions.append(budget_seconds * rows_per_second / rows)
+    if rows and average_row_bytes and bytes_per_second:
+        fractions.append(budget_seconds * bytes_per_second / (rows * average_row_bytes))
+    fraction = min(fractions, default=1.0)
+    if fraction >= 1:
+        return dataset_plan.window_end
+    span = dataset_plan.window_end - dataset_plan.window_start
+    window_end = (dataset_plan.window_start + span * fraction).replace(microsecond=0)
+    return min(
+        dataset_plan.window_end,
+        max(window_end, dataset_plan.window_start + timedelta(seconds=1)),
+    )
+
+
+def shard_archive_plan(
+    plan: ArchivePlan,
+    shard_duration: timedelta | None = None,
+    estimated_rows: dict[str, int] | None = None,
+    target_rows_per_shard: int | None = None,
+) -> ArchivePlan:
+    """Split each dataset window by fixed duration or estimated row count."""
+    if shard_duration is not None and target_rows_per_shard is not None:
+        raise ValueError(
+            "Specify either a shard duration or a target rows per shard, not both"
+        )
+    if target_rows_per_shard is not None and target_rows_per_shard < 1:
+        raise ValueError("target rows per shard must be >= 1")
+
+    datasets: dict[str, DatasetPlan] = {}
+    for dataset, dataset_plan in plan.datasets.items():
+        shard_count = None
+        if target_rows_per_shard is not None:
+            shard_count = suggest_shard_count(
+                (estimated_rows or {}).get(dataset, 0), target_rows_per_shard
+            )
+        datasets[dataset] = replace(
+            dataset_plan,
+            shards=split_window(
+                dataset_plan.window_start,
+                dataset_plan.window_end,
+                shard_duration=shard_duration,
+                shard_count=shard_count,
+            ),
+        )
+    return replace(plan, datasets=datasets)
+
+
+def remaining_window(
+    window_start: datetime,
+    window_end: datetime,
+    completed: tuple[CompletedWindow, ...],
+) -> tuple[datetime, datetime, int | None] | None:
+    """Return the part of a window not yet covered by completed exports.
+
+    Completed windows that cover the start of the window move the start
+    forward. A partial export that stopped at the new start contributes the
+    id to resume after. Returns ``None`` when the whole window is covered.
+    """
+    remaining_start = window_start
+    after_id = None
+    changed = True
+    while changed and remaining_start < window_end:
+        changed = False
+        for item in completed:
+            if item.window_start <= remaining_start < item.window_end:
+                remaining_start = item.window_end
+                after_id = item.last_id
+                changed = True
+            elif (
+                item.last_id is not None
+                and item.window_start <= remaining_start == item.window_end
+                and (after_id is None or item.last_id > after_id)
+            ):
+                after_id = item.last_id
+                changed = True
+    if remaining_start >= window_end:
+        return None
+    return remaining_start, window_end, after_id
@@ -0,0 +1,416 @@
+"""Partition-pruned reader for archived datasets.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from .catalog import find_catalog_entries
+from .exporters import dataset_zone
+from .models import CatalogEntry
+from .object_storage import (
+    ObjectStorageStateStore,
+    build_dataset_root_prefix,
+    read_json_members,
+)
+
+PART_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst", ".parquet")
+COMPACTION_DIRECTORY = "compaction_id="
+COMPACTION_MANIFEST_FILENAME = "_compaction.json"
+JSON_READ_BYTES = 64 * 1024
+
+
+class LocalArchiveSource:
+    """Read archive objects from a local directory mirroring the bucket."""
+
+    def __init__(self, root: str | Path):
+        """Store the directory that stands in for the bucket root."""
+        self.root = Path(root)
+
+    def list_objects(self, prefix: str) -> list[str]:
+        """Return the object names beneath ``prefix`` in lexical order."""
+        return [name for name, _size in self.list_object_sizes(prefix)]
+
+    def list_object_sizes(self, prefix: str) -> list[tuple[str, int]]:
+        """Return ``(name, size)`` for each object whose name starts with ``prefix``.
+
+        Like Object Storage, ``prefix`` need not end at a directory boundary.
+        """
+        directory = self.root / prefix
+        if not prefix.endswith("/"):
+            directory = directory.parent
+        if not directory.is_dir():
+            return []
+        objects = (
+            (path.relative_to(self.root).as_posix(), path)
+            for path in directory.rglob("*")
+            if path.is_file()
+        )
+        return sorted(
+            (name, path.stat().st_size)
+            for name, path in objects
+            if name.startswith(prefix)
+        )
+
+    def get_object(self, object_name: str) -> bytes:
+        """Return the bytes of one object."""
+        return (self.root / object_name).read_bytes()
+
+    def get_json_members(self, object_name: str, keys: tuple[str, ...]) -> dict:
+        """Return the named top-level members of one JSON object."""
+        with (self.root / object_name).open("rb") as file_obj:
+            return read_json_members(
+                iter(lambda: file_obj.read(JSON_READ_BYTES), b""), keys
+            )
+
+    def put_object(self, object_name: str, data: bytes) -> None:
+        """Write one object, creating its parent directories."""
+        path = self.root / object_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def delete_object(self, object_name: str) -> None:
+        """Delete one object if it still exists."""
+        (self.root / object_name).unlink(missing_ok=True)
+
+
+class ObjectStorageArchiveSource:
+    """Read archive objects from an Object Storage bucket."""
+
+    def __init__(self, client: Any, namespace: str, bucket_name: str):
+        """Store the Object Storage client and bucket coordinates."""
+        self.client = client
+        self.namespace = namespace
+        self.bucket_name = bucket_name
+
+    def list_objects(self, prefix: str) -> list[str]:
+        """Return the object names beneath ``prefix`` in lexical order."""
+        return [name for name, _size in self.list_object_sizes(prefix)]
+
+    def list_object_sizes(self, prefix: str) -> list[tuple[str, int]]:
+        """Return ``(name, size)`` for each object beneath ``prefix``."""
+        objects = []
+        start = None
+        while True:
+            response = self.client.list_objects(
+                namespace_name=self.namespace,
+                bucket_name=self.bucket_name,
+                prefix=prefix,
+                fields="name,size",
+                start=start,
+            )
+            objects.extend((item.name, item.size) for item in response.data.objects)
+            start = response.data.next_start_with
+            if not start:
+                return objects
+
+    def get_object(self, object_name: str) -> bytes:
+        """Return the bytes of one object."""
+        response = self.client.get_object(
+            namespace_name=self.namespace,
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+        )
+        return response.data.content
+
+    def get_json_members(self, object_name: str, keys: tuple[str, ...]) -> dict:
+        """Return the named top-level members of one JSON object via ranged GETs."""
+        store = ObjectStorageStateStore(self.client, self.namespace, self.bucket_name)
+        return store.get_json_members(object_name, keys) or {}
+
+    def put_object(self, object_name: str, data: bytes) -> None:
+        """Write one object."""
+        self.client.put_object(
+            namespace_name=self.namespace,
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+            put_object_body=data,
+        )
+
+    def delete_object(self, object_name: str) -> None:
+        """Delete one object if it still exists."""
+        try:
+            self.client.delete_object(
+                namespace_name=self.namespace,
+                bucket_name=self.bucket_name,
+                object_name=object_name,
+            )
+        except Exception as exc:
+            if getattr(exc, "status", None) != 404:
+                raise
+
+
+def partition_prefixes(
+    dataset_prefix: str, start_time: datetime, end_time: datetime
+) -> list[str]:
+    """Return the fewest partition prefixes covering ``[start_time, end_time)``.
+
+    Whole months inside the range become ``month=`` prefixes, whole days
+    ``day=`` prefixes, and the remaining edges individual ``hour=`` prefixes.
+    """
+    if end_time <= start_time:
+        return []
+    base = dataset_prefix.strip("/")
+    start = start_time.astimezone(timezone.utc)
+    end = end_time.astimezone(timezone.utc)
+    cursor = start.replace(minute=0, second=0, microsecond=0)
+    prefixes = []
+    while cursor < end:
+        month_end = _next_month(cursor)
+        day_end = cursor + timedelta(days=1)
+        if cursor == _month_start(cursor) and month_end <= end and cursor >= start:
+            prefixes.append(f"{base}/year={cursor:%Y}/month={cursor:%m}/")
+            cursor = month_end
+        elif cursor.hour == 0 and day_end <= end and cursor >= start:
+            prefixes.append(
+                f"{base}/year={cursor:%Y}/month={cursor:%m}/day={cursor:%d}/"
+            )
+            cursor = day_end
+        else:
+            prefixes.append(
+                f"{base}/year={cursor:%Y}/month={cursor:%m}/day={cursor:%d}/"
+                f"hour={cursor:%H}/"
+            )
+            cursor += timedelta(hours=1)
+    return prefixes
+
+
+def compacted_prefixes(prefixes: list[str]) -> list[str]:
+    """Return the compaction output prefixes of partially covered partitions.
+
+    Compacted files live directly beneath the day or month they merged, so a
+    range that covers only some hours of a day, or some days of a month, also
+    has to read that day's or month's compacted files. Which of the listed
+    compactions are readable is decided by :meth:`ArchiveReader.list_parts`.
+    """
+    compacted = []
+    for prefix in prefixes:
+        segments = prefix.rstrip("/").split("/")
+        if segments[-1].startswith("hour="):
+            parents = (segments[:-1], segments[:-2])
+        elif segments[-1].startswith("day="):
+            parents = (segments[:-1],)
+        else:
+            parents = ()
+        for parent in parents:
+            candidate = "/".join(parent) + f"/{COMPACTION_DIRECTORY}"
+            if candidate not in compacted:
+                compacted.append(candidate)
+    return compacted
+
+
+def _compaction_directory(object_name: str) -> str | None:
+    """Return the ``compaction_id=`` directory holding ``object_name``, if any."""
+    start = object_name.find(f"/{COMPACTION_DIRECTORY}")
+    if start < 0:
+        return None
+    return object_name[: object_name.index("/", start + 1) + 1]
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    month_start = _month_start(value)
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def decode_part(object_name: str, data: bytes) -> Iterator[dict[str, Any]]:
+    """Yield the records of one JSON Lines or Parquet part."""
+    if object_name.endswith(".parquet"):
+        for batch in _parquet_batches(data):
+            yield from batch.to_pylist()
+        return
+    for line in decompress_jsonl(object_name, data).splitlines():
+        if line:
+            yield json.loads(line)
+
+
+def decompress_jsonl(object_name: str, data: bytes) -> bytes:
+    """Return the uncompressed JSON Lines bytes of one part."""
+    if object_name.endswith(".gz"):
+        return gzip.decompress(data)
+    if object_name.endswith(".zst"):
+        try:
+            import zstandard
+        except ModuleNotFoundError as exc:
+            raise RuntimeError(
+                "The zstandard package is required to read zstd parts"
+            ) from exc
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def import_pyarrow():
+    """Import ``pyarrow`` and its Parquet module, which are optional."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ModuleNotFoundError as exc:
+        raise RuntimeError(
+            "The pyarrow package is required for Parquet parts and Arrow batches"
+        ) from exc
+    return pyarrow
+
+
+def _parquet_batches(data: bytes):
+    pyarrow = import_pyarrow()
+    return pyarrow.parquet.ParquetFile(io.BytesIO(data)).iter_batches()
+
+
+class ArchiveReader:
+    """Stream archived records for one dataset and archive time range.
+
+    Only the partition prefixes overlapping the range are listed, and up to
+    ``concurrency`` parts are downloaded ahead of the consumer while records
+    are yielded in object name order. Compacted files are read only once
+    their compaction manifest exists, and the parts that manifest replaced
+    are then skipped, so no record is read twice. Given the entries of the
+    catalog index, the same parts are taken from the objects the entries
+    record, without listing the bucket. Either way the range selects the
+    ``hour=`` partitions a run wrote to, which are keyed by the hour the run
+    started rather than by the times of the rows inside them.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        prefix: str,
+        domain_short_name: str,
+        concurrency: int = 4,
+        catalog: tuple[CatalogEntry, ...] | None = None,
+    ):
+        """Store the object source, archive root prefix, and read-ahead depth."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.source = source
+        self.prefix = prefix
+        self.domain_short_name = domain_short_name
+        self.concurrency = concurrency
+        self.catalog = catalog
+
+    def list_parts(
+        self, dataset: str, start_time: datetime, end_time: datetime
+    ) -> list[str]:
+        """Return the part objects archived for ``dataset`` in the range.
+
+        Parts are returned in partition order and by name within a partition.
+        """
+        dataset_prefix = build_dataset_root_prefix(
+            self.prefix, self.domain_short_name, dataset_zone(dataset), dataset
+        )
+        prefixes = partition_prefixes(dataset_prefix, start_time, end_time)
+        selected = prefixes + compacted_prefixes(prefixes)
+        if self.catalog is not None:
+            return self._catalog_parts(dataset, selected)
+        return self._readable_parts(
+            [
+                name
+                for partition in selected
+                for name in self.source.list_objects(partition)
+            ]
+        )
+
+    def _catalog_parts(self, dataset: str, selected: list[str]) -> list[str]:
+        """Return the catalog's parts beneath ``selected``, as a listing would."""
+        recorded = sorted(
+            {
+                name
+                for entry in find_catalog_entries(self.catalog, dataset)
+                for name in entry.object_names
+                if name.endswith(PART_SUFFIXES)
+            }
+        )
+        return [
+            name
+            for partition in selected
+            for name in recorded
+            if name.startswith(partition)
+        ]
+
+    def _readable_parts(self, names: list[str]) -> list[str]:
+        """Drop parts of unfinished compactions and parts a finished one replaced."""
+        manifests = [
+            name for name in names if name.endswith(f"/{COMPACTION_MANIFEST_FILENAME}")
+        ]
+        committed = {
+            name.removesuffix(COMPACTION_MANIFEST_FILENAME) for name in manifests
+        }
+        replaced = {
+            source
+            for name in manifests
+            for output in self.source.get_json_members(name, ("outputs",)).get(
+                "outputs", ()
+            )
+            for source in output.get("sources", ())
+        }
+        return [
+            name
+            for name in names
+            if name.endswith(PART_SUFFIXES)
+            and name not in replaced
+            and _compaction_directory(name) in (None, *committed)
+        ]
+
+    def iter_records(
+        self, dataset: str, start_time: datetime, end_time: datetime
+    ) -> Iterator[dict[str, Any]]:
+        """Yield every archived record as a dict."""
+        for object_name, data in self._fetch_parts(dataset, start_time, end_time):
+            yield from decode_part(object_name, data)
+
+    def iter_batches(
+        self, dataset: str, start_time: datetime, end_time: datetime
+    ) -> Iterator[Any]:
+        """Yield ``pyarrow.RecordBatch`` objects, one or more per part.
+
+        Parquet parts are read natively; JSON Lines parts are converted one
+        part at a time.
+        """
+        pyarrow = import_pyarrow()
+        for object_name, data in self._fetch_parts(dataset, start_time, end_time):
+            if object_name.endswith(".parquet"):
+                yield from _parquet_batches(data)
+                continue
+            records = list(decode_part(object_name, data))
+            if records:
+                yield pyarrow.RecordBatch.from_pylist(records)
+
+    def _fetch_parts(
+        self, dataset: str, start_time: datetime, end_time: datetime
+    ) -> Iterator[tuple[str, bytes]]:
+        names = self.list_parts(dataset, start_time, end_time)
+        yield from _read_ahead(names, self.source.get_object, self.concurrency)
+
+
+def _read_ahead(
+    names: list[str], fetch: Callable[[str], bytes], concurrency: int
+) -> Iterator[tuple[str, bytes]]:
+    """Fetch up to ``concurrency`` objects ahead and yield them in order."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending: deque = deque()
+        for name in names:
+            pending.append((name, pool.submit(fetch, name)))
+            if len(pending) >= concurrency:
+                ready_name, future = pending.popleft()
+                yield ready_name, future.result()
+        while pending:
+            ready_name, future = pending.popleft()
+            yield ready_name, future.result()
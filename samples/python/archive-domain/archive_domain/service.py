@@ -9,35 +9,87 @@ DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import functools
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from .config import load_config
-from .executor import LiveArchiveExecutor
+from .cache import MetadataCache
+from .catalog import add_catalog_entries
+from .compaction import PartitionCompactor
+from .config import ArchiveConfig, load_config
+from .db import add_queue_subscriber, connect, open_queue, raw_queue_name
+from .executor import LiveArchiveExecutor, PartialExportError
 from .exporters import dataset_zone
-from .iot_domain import IotDomainLookup, resolve_retention_days
-from .manifest import build_run_manifest
+from .iot_domain import (
+    CachedRetentionLookup,
+    IotDomainLookup,
+    OfflineRetentionLookup,
+    resolve_retention_days,
+)
+from .leases import (
+    LEASE_DONE,
+    LeaseManager,
+    archive_plan_payload,
+    parse_archive_plan,
+)
+from .manifest import (
+    build_run_manifest,
+    dataset_result_payload,
+    parse_dataset_result,
+    sum_known,
+)
 from .models import (
-    EXPORT_FORMAT_DATAPUMP,
     VALID_EXPORT_FORMATS,
+    VERIFICATION_FAILED,
+    VERIFICATION_UNAVAILABLE,
+    VERIFICATION_VERIFIED,
+    ArchivePlan,
+    CatalogEntry,
     CheckpointState,
+    CompletedWindow,
+    DatasetEstimate,
+    DatasetPlan,
+    DatasetProgress,
     DatasetResult,
     PlanResult,
     RunResult,
+    ShardPlan,
+    ShardResult,
+    ThroughputRecord,
 )
 from .object_storage import (
     ObjectStorageStateStore,
     build_dataset_object_prefix,
     build_manifest_object_name,
+    build_progress_object_name,
+    build_shard_object_prefix,
+    parse_catalog_payload,
     should_advance_checkpoint,
 )
 from .oci_utils import (
+    LazyClient,
     build_iot_client,
     build_object_storage_client,
     get_oci_config,
     resolve_region,
 )
-from .planner import build_archive_plan, parse_datasets
+from .pipeline import merge_stage_metrics
+from .planner import (
+    budget_window_end,
+    build_archive_plan,
+    build_dataset_estimate,
+    parse_datasets,
+    remaining_window,
+    shard_archive_plan,
+)
+from .reader import ArchiveReader, LocalArchiveSource, ObjectStorageArchiveSource
+from .streaming import RawQueueArchiver
 
 
 class NullRetentionLookup:
@@ -58,6 +110,7 @@ class ArchiveService:
         state_store: Any | None = None,
         executor: Any | None = None,
         clock: Any | None = None,
+        sleep: Any | None = None,
     ):
         """Store configuration and runtime collaborators for archive work."""
         self.config = config
@@ -67,6 +120,14 @@ class ArchiveService:
         self.clock = clock or (
             lambda: datetime.now(timezone.utc).replace(microsecond=0)
         )
+        self.sleep = sleep or time.sleep
+        self._progress_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Release runtime resources held by the executor."""
+        close = getattr(self.executor, "close", None)
+        if close is not None:
+            close()
 
     def _load_checkpoint(self) -> CheckpointState:
         if self.state_store is None:
@@ -75,18 +136,12 @@ class ArchiveService:
             self.config.object_storage.checkpoint_object
         )
 
-    def _validate_export_format(self, selected_datasets: tuple[str, ...]) -> None:
+    def _validate_export_format(self) -> None:
         export_format = (self.config.export_format or "parquet").lower()
 
         if export_format not in VALID_EXPORT_FORMATS:
             raise ValueError(f"unsupported export_format: {export_format}")
 
-        if export_format == EXPORT_FORMAT_DATAPUMP:
-            if len(selected_datasets) != 1:
-                raise ValueError(
-                    "datapump export format requires selecting exactly one dataset"
-                )
-
     def _resolved_export_format(self) -> str:
         return (self.config.export_format or "parquet").lower()
 
@@ -95,10 +150,47 @@ class ArchiveService:
         datasets: str | None = None,
         start_time: datetime | None = None,
         end_time: datetime | None = None,
+        shard_duration: timedelta | None = None,
+        target_rows_per_shard: int | None = None,
+        estimate: bool = False,
+        incremental: bool = False,
+        include_archived_through: bool = True,
     ) -> PlanResult:
-        """Compute the archive plan for the selected datasets."""
+        """Compute the archive plan for the selected datasets.
+
+        Dataset windows are split into sub-windows when either a fixed
+        ``shard_duration`` or a ``target_rows_per_shard`` is given. Row-based
+        splitting counts the rows of each window through the executor.
+
+        With ``estimate`` each window also gets a row and byte estimate, a
+        suggested shard count, and an expected export duration. Row-based
+        splitting then reuses those row estimates instead of counting again.
+
+        With a configured ``planning.run_budget_seconds`` and no explicit
+        time range, each window is cut to what the dataset's throughput
+        exports within the budget. The rest of the window is left for later
+        runs.
+
+        With ``incremental`` each dataset's export is an id range instead:
+        the ids above the checkpoint's high-water mark up to the highest id
+        the table holds now. A dataset without a high-water mark starts at
+        its planned window start. Incremental plans are not sharded or
+        budgeted and take no explicit time range.
+
+        ``include_archived_through`` reads how far each dataset has been
+        archived from the catalog summary; runs skip it.
+        """
+        if incremental and (start_time is not None or end_time is not None):
+            raise ValueError(
+                "Incremental runs start at the checkpoint high-water marks "
+                "and take no explicit time range"
+            )
+        if incremental and (
+            shard_duration is not None or target_rows_per_shard is not None
+        ):
+            raise ValueError("Incremental runs cannot be sharded")
         selected_datasets = parse_datasets(datasets)
-        self._validate_export_format(selected_datasets)
+        self._validate_export_format()
         export_format = self._resolved_export_format()
         checkpoint = self._load_checkpoint()
         retention_days = resolve_retention_days(
@@ -114,14 +206,717 @@ class ArchiveService:
             bootstrap_lookback_days=self.config.iot.bootstrap_lookback_days,
             explicit_start_time=start_time,
             explicit_end_time=end_time,
+            window_ends=checkpoint.window_ends,
+        )
+        if incremental:
+            plan = self._incremental_plan(plan, checkpoint)
+        elif (
+            self.config.planning.run_budget_seconds is not None
+            and start_time is None
+            and end_time is None
+        ):
+            plan = self._budget_plan(plan)
+        estimates = self._estimate_plan(plan) if estimate else {}
+        estimated_rows = None
+        if target_rows_per_shard is not None and estimates:
+            estimated_rows = {
+                dataset: dataset_estimate.rows
+                for dataset, dataset_estimate in estimates.items()
+            }
+        elif target_rows_per_shard is not None:
+            if self.executor is None:
+                raise RuntimeError(
+                    "Row-based sharding requires a runtime executor to estimate rows."
+                )
+            estimated_rows = {
+                dataset: self.executor.estimate_rows(dataset, dataset_plan)
+                for dataset, dataset_plan in plan.datasets.items()
+            }
+        plan = shard_archive_plan(
+            plan,
+            shard_duration=shard_duration,
+            estimated_rows=estimated_rows,
+            target_rows_per_shard=target_rows_per_shard,
         )
         return PlanResult(
             plan=plan,
             export_format=export_format,
             retention_days=retention_days,
             checkpoint=checkpoint,
+            estimates=estimates,
+            archived_through=(
+                {
+                    dataset: window_end
+                    for dataset, window_end in self._load_archived_through().items()
+                    if dataset in selected_datasets
+                }
+                if include_archived_through
+                else {}
+            ),
         )
 
+    def _incremental_plan(
+        self, plan: ArchivePlan, checkpoint: CheckpointState
+    ) -> ArchivePlan:
+        """Turn each dataset window into an id range above its high-water mark.
+
+        The range ends at the table's highest id when it is planned, so rows
+        inserted while the run exports are left for the next run. The window
+        end moves to the plan time, since rows of any age up to now are read.
+        """
+        if self.executor is None:
+            raise RuntimeError(
+                "Incremental planning requires a runtime executor to read the "
+                "highest ids."
+            )
+        datasets = {}
+        for dataset, dataset_plan in plan.datasets.items():
+            high_water_mark = checkpoint.high_water_marks.get(dataset)
+            max_id = self.executor.max_id(dataset)
+            datasets[dataset] = replace(
+                dataset_plan,
+                window_end=plan.now,
+                resume_after_id=high_water_mark,
+                through_id=max(max_id or 0, high_water_mark or 0),
+            )
+        return replace(plan, datasets=datasets)
+
+    def _load_archived_through(self) -> dict[str, datetime]:
+        if self.state_store is None:
+            return {}
+        return self.state_store.load_archived_through(
+            self.config.object_storage.catalog_object
+        )
+
+    def _update_catalog(
+        self,
+        run_id: str,
+        export_format: str,
+        work_units: list[_WorkUnit],
+        unit_results: list[DatasetResult],
+    ) -> None:
+        entries = []
+        for unit, result in zip(work_units, unit_results):
+            if (
+                unit.dataset_plan is None
+                or unit.dataset_plan.through_id is not None
+                or not (result.status == "succeeded" or result.resume_key is not None)
+            ):
+                continue
+            window_end = unit.dataset_plan.window_end
+            last_id = None
+            if result.resume_key is not None:
+                window_end, last_id = result.resume_key
+            entries.append(
+                CatalogEntry(
+                    dataset=unit.dataset,
+                    window_start=unit.dataset_plan.window_start,
+                    window_end=window_end,
+                    run_id=run_id,
+                    export_format=result.export_format or export_format,
+                    object_names=result.object_names,
+                    row_count=result.row_count,
+                    uncompressed_bytes=result.uncompressed_bytes,
+                    compressed_bytes=result.compressed_bytes,
+                    last_id=last_id,
+                    export_mode=result.export_mode,
+                )
+            )
+        if entries:
+            self.state_store.update_catalog(
+                self.config.object_storage.catalog_object,
+                lambda current: add_catalog_entries(current, entries),
+            )
+
+    def _load_throughput(self) -> dict[str, ThroughputRecord]:
+        if self.state_store is None:
+            return {}
+        return self.state_store.load_throughput(
+            self.config.object_storage.throughput_object
+        )
+
+    def _throughput(
+        self, dataset: str, recorded: dict[str, ThroughputRecord]
+    ) -> tuple[float | None, float | None, str | None]:
+        """Return the rows/s and bytes/s to plan with, and where they came from."""
+        record = recorded.get(dataset)
+        bytes_per_second = record.bytes_per_second if record is not None else None
+        if self.config.planning.throughput_rows_per_second is not None:
+            return (
+                self.config.planning.throughput_rows_per_second,
+                bytes_per_second,
+                "configured",
+            )
+        if record is not None:
+            return record.rows_per_second, bytes_per_second, "recorded"
+        return None, None, None
+
+    def _budget_plan(self, plan: ArchivePlan) -> ArchivePlan:
+        """Cut each dataset window to what fits in the run budget.
+
+        Datasets without a known throughput keep their whole window; the
+        run that exports it records the throughput for the next plan.
+        """
+        if self.executor is None:
+            return plan
+        planning = self.config.planning
+        recorded = self._load_throughput()
+        datasets = {}
+        for dataset, dataset_plan in plan.datasets.items():
+            rows_per_second, bytes_per_second, _source = self._throughput(
+                dataset, recorded
+            )
+            if dataset_plan.window_end <= dataset_plan.window_start or (
+                rows_per_second is None and bytes_per_second is None
+            ):
+                datasets[dataset] = dataset_plan
+                continue
+            rows, average_row_bytes, _method = self.executor.estimate_dataset(
+                dataset, dataset_plan, planning.estimate_method
+            )
+            datasets[dataset] = replace(
+                dataset_plan,
+                window_end=budget_window_end(
+                    dataset_plan,
+                    rows,
+                    average_row_bytes,
+                    planning.run_budget_seconds,
+                    rows_per_second=rows_per_second,
+                    bytes_per_second=bytes_per_second,
+                ),
+            )
+        return replace(plan, datasets=datasets)
+
+    def _estimate_plan(self, plan) -> dict[str, DatasetEstimate]:
+        if self.executor is None:
+            raise RuntimeError(
+                "Plan estimates require a runtime executor to query the database."
+            )
+        planning = self.config.planning
+        recorded = self._load_throughput()
+        estimates = {}
+        for dataset, dataset_plan in plan.datasets.items():
+            rows, average_row_bytes, method = self.executor.estimate_dataset(
+                dataset, dataset_plan, planning.estimate_method
+            )
+            rows_per_second, _bytes_per_second, throughput_source = self._throughput(
+                dataset, recorded
+            )
+            estimates[dataset] = build_dataset_estimate(
+                dataset,
+                method,
+                rows,
+                average_row_bytes,
+                planning.target_rows_per_shard,
+                rows_per_second=rows_per_second,
+                throughput_source=throughput_source,
+            )
+        return estimates
+
+    def _record_throughput(
+        self, run_id: str, mode: str, dataset_results: list[DatasetResult]
+    ) -> None:
+        observed = {
+            result.name: ThroughputRecord(
+                dataset=result.name,
+                mode=result.export_mode or mode,
+                rows_per_second=round(result.row_count / result.duration_seconds, 3),
+                run_id=run_id,
+                bytes_per_second=(
+                    round(result.uncompressed_bytes / result.duration_seconds, 3)
+                    if result.uncompressed_bytes
+                    else None
+                ),
+            )
+            for result in dataset_results
+            if result.status == "succeeded"
+            and result.row_count
+            and result.duration_seconds
+        }
+        if not observed or self.state_store is None:
+            return
+        records = self._load_throughput()
+        records.update(observed)
+        self.state_store.save_throughput(
+            self.config.object_storage.throughput_object, records
+        )
+
+    def _execute_dataset(
+        self,
+        dataset: str,
+        dataset_plan,
+        mode: str,
+        object_prefix: str,
+        export_format: str,
+    ) -> DatasetResult:
+        started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        try:
+            result = self.executor.execute_dataset(
+                dataset=dataset,
+                dataset_plan=dataset_plan,
+                mode=mode,
+                object_prefix=object_prefix,
+                export_format=export_format,
+            )
+        except PartialExportError as exc:
+            result = DatasetResult(
+                name=dataset,
+                status="failed",
+                export_mode=mode,
+                export_format=export_format,
+                object_prefix=object_prefix,
+                object_names=exc.object_names,
+                error_message=str(exc),
+                resume_key=exc.resume_key,
+            )
+        except Exception as exc:
+            result = DatasetResult(
+                name=dataset,
+                status="failed",
+                export_mode=mode,
+                export_format=export_format,
+                object_prefix=object_prefix,
+                error_message=str(exc),
+            )
+        return replace(
+            result,
+            started_at=started_at,
+            duration_seconds=round(time.monotonic() - started, 3),
+        )
+
+    def _progress_object_name(self, dataset: str) -> str:
+        return build_progress_object_name(
+            self.config.object_storage.progress_prefix, dataset
+        )
+
+    def _load_progress(
+        self, datasets: tuple[str, ...], checkpoint_before: datetime | None
+    ) -> dict[str, DatasetProgress]:
+        if self.state_store is None:
+            return {
+                dataset: DatasetProgress(
+                    dataset=dataset, checkpoint_before=checkpoint_before
+                )
+                for dataset in datasets
+            }
+        return {
+            dataset: self.state_store.load_progress(
+                self._progress_object_name(dataset), dataset, checkpoint_before
+            )
+            for dataset in datasets
+        }
+
+    def _record_progress(
+        self,
+        progress: dict[str, DatasetProgress],
+        unit: _WorkUnit,
+        run_id: str,
+        result: DatasetResult,
+    ) -> None:
+        window_end = unit.dataset_plan.window_end
+        last_id = None
+        if result.resume_key is not None:
+            window_end, last_id = result.resume_key
+        completed = CompletedWindow(
+            window_start=unit.dataset_plan.window_start,
+            window_end=window_end,
+            run_id=run_id,
+            object_prefix=result.object_prefix,
+            object_names=result.object_names,
+            last_id=last_id,
+        )
+        with self._progress_lock:
+            dataset_progress = progress[unit.dataset]
+            if self.state_store is None:
+                progress[unit.dataset] = replace(
+                    dataset_progress,
+                    completed=dataset_progress.completed + (completed,),
+                )
+                return
+            progress[unit.dataset] = self.state_store.update_progress(
+                self._progress_object_name(unit.dataset),
+                unit.dataset,
+                dataset_progress.checkpoint_before,
+                lambda current: replace(
+                    current, completed=current.completed + (completed,)
+                ),
+            )
+
+    def _execute_unit(
+        self,
+        unit: _WorkUnit,
+        mode: str,
+        export_format: str,
+        run_id: str,
+        progress: dict[str, DatasetProgress],
+        verification: threading.Event | None = None,
+    ) -> DatasetResult:
+        if unit.dataset_plan is None:
+            return _skipped_result(unit, mode, export_format)
+        if verification is not None and verification.is_set():
+            return DatasetResult(
+                name=unit.dataset,
+                status="failed",
+                export_mode=mode,
+                export_format=export_format,
+                object_prefix=unit.object_prefix,
+                error_message="not exported after a verification failure",
+            )
+
+        result = self._execute_dataset(
+            unit.dataset, unit.dataset_plan, mode, unit.object_prefix, export_format
+        )
+        return self._complete_unit(unit, run_id, progress, result, verification)
+
+    def _complete_unit(
+        self,
+        unit: _WorkUnit,
+        run_id: str,
+        progress: dict[str, DatasetProgress],
+        result: DatasetResult,
+        verification: threading.Event | None = None,
+    ) -> DatasetResult:
+        if verification is not None and result.status == "succeeded":
+            result = self._verify_unit(unit, result)
+            if result.verification == VERIFICATION_FAILED:
+                verification.set()
+        if unit.dataset_plan.through_id is None and (
+            result.status == "succeeded" or result.resume_key is not None
+        ):
+            self._record_progress(progress, unit, run_id, result)
+        if result.status != "succeeded":
+            return result
+        if not unit.resumed_from:
+            return result
+        return replace(
+            result,
+            object_names=tuple(
+                name for item in unit.resumed_from for name in item.object_names
+            )
+            + result.object_names,
+        )
+
+    def _verify_unit(self, unit: _WorkUnit, result: DatasetResult) -> DatasetResult:
+        """Compare the rows an export wrote with a count of its window.
+
+        Bulk exports do not report the rows they wrote, so their results are
+        marked unverified. A mismatch, or a count that fails, fails the unit
+        before its progress is recorded, so a rerun exports it again.
+        """
+        if result.row_count is None:
+            return replace(result, verification=VERIFICATION_UNAVAILABLE)
+        try:
+            counted = self.executor.count_rows(unit.dataset, unit.dataset_plan)
+        except Exception as exc:
+            error_message = f"verification failed: {exc}"
+        else:
+            if counted == result.row_count:
+                return replace(result, verification=VERIFICATION_VERIFIED)
+            error_message = (
+                f"verification failed: exported {result.row_count:,} rows "
+                f"but the window holds {counted:,}"
+            )
+        return replace(
+            result,
+            status="failed",
+            verification=VERIFICATION_FAILED,
+            error_message=error_message,
+        )
+
+    def _uses_scheduled_bulk(self, mode: str) -> bool:
+        uses_scheduled_bulk = getattr(self.executor, "uses_scheduled_bulk", None)
+        return uses_scheduled_bulk is not None and uses_scheduled_bulk(mode)
+
+    def _execute_units(
+        self,
+        work_units: list[_WorkUnit],
+        mode: str,
+        export_format: str,
+        run_id: str,
+        progress: dict[str, DatasetProgress],
+        parallelism: int,
+        verification: threading.Event | None = None,
+    ) -> list[DatasetResult]:
+        with ThreadPoolExecutor(max_workers=min(parallelism, len(work_units))) as pool:
+            futures = [
+                pool.submit(
+                    self._execute_unit,
+                    unit,
+                    mode,
+                    export_format,
+                    run_id,
+                    progress,
+                    verification,
+                )
+                for unit in work_units
+            ]
+            return [future.result() for future in futures]
+
+    def _execute_scheduled_units(
+        self,
+        work_units: list[_WorkUnit],
+        mode: str,
+        export_format: str,
+        run_id: str,
+        progress: dict[str, DatasetProgress],
+        parallelism: int,
+        verification: threading.Event | None = None,
+    ) -> list[DatasetResult]:
+        """Run bulk work units as database scheduler jobs from one thread.
+
+        Up to ``parallelism`` jobs run in the database at once. Finished jobs
+        are collected by polling, with the delay growing by ``poll_backoff``
+        while nothing finishes and resetting once a job completes.
+
+        A failed poll is retried on the same backoff. After ``poll_retries``
+        failures in a row the running jobs are stopped, and they fail along
+        with the units not submitted yet.
+        """
+        settings = self.config.bulk_export
+        results: dict[int, DatasetResult] = {}
+        pending = list(enumerate(work_units))
+        running: dict[str, tuple[int, _WorkUnit, Any, datetime, float]] = {}
+        delay = settings.poll_initial_seconds
+        poll_failures = 0
+        while pending or running:
+            while pending and len(running) < parallelism:
+                index, unit = pending.pop(0)
+                if unit.dataset_plan is None:
+                    results[index] = _skipped_result(unit, mode, export_format)
+                    continue
+                started_at = datetime.now(timezone.utc)
+                started = time.monotonic()
+                try:
+                    job = self.executor.submit_bulk(
+                        unit.dataset,
+                        unit.dataset_plan,
+                        unit.object_prefix,
+                        export_format,
+                    )
+                except Exception as exc:
+                    results[index] = DatasetResult(
+                        name=unit.dataset,
+                        status="failed",
+                        export_mode=mode,
+                        export_format=export_format,
+                        object_prefix=unit.object_prefix,
+                        error_message=str(exc),
+                        started_at=started_at,
+                        duration_seconds=round(time.monotonic() - started, 3),
+                    )
+                    continue
+                running[job.job_name] = (index, unit, job, started_at, started)
+            if not running:
+                continue
+
+            self.sleep(delay)
+            try:
+                finished = self.executor.poll_bulk(
+                    [item[2] for item in running.values()]
+                )
+            except Exception as exc:
+                poll_failures += 1
+                if poll_failures > settings.poll_retries:
+                    self._abandon_scheduled_units(
+                        running, pending, results, mode, export_format, exc
+                    )
+                    break
+                delay = min(delay * settings.poll_backoff, settings.poll_max_seconds)
+                continue
+            poll_failures = 0
+            if finished:
+                delay = settings.poll_initial_seconds
+            else:
+                delay = min(delay * settings.poll_backoff, settings.poll_max_seconds)
+            for job_name, result in finished.items():
+                index, unit, _job, started_at, started = running.pop(job_name)
+                result = replace(
+                    result,
+                    started_at=started_at,
+                    duration_seconds=round(time.monotonic() - started, 3),
+                )
+                results[index] = self._complete_unit(
+                    unit, run_id, progress, result, verification
+                )
+        return [results[index] for index in range(len(work_units))]
+
+    def _abandon_scheduled_units(
+        self,
+        running: dict[str, tuple[int, _WorkUnit, Any, datetime, float]],
+        pending: list[tuple[int, _WorkUnit]],
+        results: dict[int, DatasetResult],
+        mode: str,
+        export_format: str,
+        poll_error: Exception,
+    ) -> None:
+        """Stop the running jobs and fail every unit without a result."""
+        error_message = f"scheduler job polling failed: {poll_error}"
+        try:
+            self.executor.stop_bulk([item[2] for item in running.values()])
+        except Exception as exc:
+            error_message += f"; the running jobs could not be stopped: {exc}"
+        for index, unit, _job, started_at, started in running.values():
+            results[index] = DatasetResult(
+                name=unit.dataset,
+                status="failed",
+                export_mode=mode,
+                export_format=export_format,
+                object_prefix=unit.object_prefix,
+                error_message=error_message,
+                started_at=started_at,
+                duration_seconds=round(time.monotonic() - started, 3),
+            )
+        for index, unit in pending:
+            results[index] = (
+                _skipped_result(unit, mode, export_format)
+                if unit.dataset_plan is None
+                else DatasetResult(
+                    name=unit.dataset,
+                    status="failed",
+                    export_mode=mode,
+                    export_format=export_format,
+                    object_prefix=unit.object_prefix,
+                    error_message="not submitted after scheduler job polling failed",
+                )
+            )
+
+    def _join_shared_plan(
+        self, leases: LeaseManager, plan_result: PlanResult, mode: str
+    ) -> PlanResult:
+        """Adopt the plan other workers are running for the same checkpoint.
+
+        Workers plan at slightly different times, so the first one to write
+        the shared plan fixes the run ID and windows for all of them.
+        """
+        shared = leases.join_plan(
+            _format_checkpoint(plan_result.checkpoint.last_successful_run_at),
+            lambda: {
+                "run_id": _build_run_id(plan_result.plan.now),
+                "mode": mode,
+                "export_format": plan_result.export_format,
+                "plan": archive_plan_payload(plan_result.plan),
+            },
+        )
+        if (shared["mode"], shared["export_format"]) != (
+            mode,
+            plan_result.export_format,
+        ):
+            raise RuntimeError(
+                f"Shared run {shared['run_id']} exports in {shared['mode']} mode "
+                f"as {shared['export_format']}; start this worker with the same "
+                "mode and export format."
+            )
+        return replace(plan_result, plan=parse_archive_plan(shared["plan"]))
+
+    def _execute_leased_units(
+        self,
+        leases: LeaseManager,
+        plan: ArchivePlan,
+        object_prefixes: dict[str, str],
+        work_units: list[_WorkUnit],
+        mode: str,
+        export_format: str,
+        run_id: str,
+        progress: dict[str, DatasetProgress],
+        parallelism: int,
+        verification: threading.Event | None = None,
+    ) -> list[DatasetResult]:
+        """Export work units shared with other workers through leases.
+
+        Each pass claims the units nobody holds, or whose lease has expired,
+        and exports up to ``parallelism`` of them at once while renewing their
+        leases. Units held by other workers are rechecked every
+        ``leases.poll_seconds`` until their results are recorded, so the
+        returned results include the units other workers exported.
+        """
+        results = {
+            index: _skipped_result(unit, mode, export_format)
+            for index, unit in enumerate(work_units)
+            if unit.dataset_plan is None
+        }
+        while True:
+            for index, unit in enumerate(work_units):
+                if index in results:
+                    continue
+                record = leases.read(run_id, _unit_key(unit))
+                if record is not None and record["status"] == LEASE_DONE:
+                    results[index] = parse_dataset_result(record["result"])
+            pending = [
+                index for index in range(len(work_units)) if index not in results
+            ]
+            if not pending:
+                return [results[index] for index in range(len(work_units))]
+
+            with ThreadPoolExecutor(max_workers=min(parallelism, len(pending))) as pool:
+                futures = {
+                    index: pool.submit(
+                        self._execute_leased_unit,
+                        leases,
+                        plan,
+                        object_prefixes,
+                        work_units[index],
+                        mode,
+                        export_format,
+                        run_id,
+                        progress,
+                        verification,
+                    )
+                    for index in pending
+                }
+                exported = {
+                    index: result
+                    for index, future in futures.items()
+                    if (result := future.result()) is not None
+                }
+            results.update(exported)
+            if not exported:
+                self.sleep(leases.poll_seconds)
+
+    def _execute_leased_unit(
+        self,
+        leases: LeaseManager,
+        plan: ArchivePlan,
+        object_prefixes: dict[str, str],
+        unit: _WorkUnit,
+        mode: str,
+        export_format: str,
+        run_id: str,
+        progress: dict[str, DatasetProgress],
+        verification: threading.Event | None = None,
+    ) -> DatasetResult | None:
+        """Claim and export one unit; ``None`` if another worker owns it."""
+        lease = leases.claim(run_id, _unit_key(unit))
+        if lease is None:
+            return None
+
+        # A worker whose lease expired may have exported part of the unit.
+        dataset_progress = self._load_progress(
+            (unit.dataset,), progress[unit.dataset].checkpoint_before
+        )[unit.dataset]
+        with self._progress_lock:
+            progress[unit.dataset] = dataset_progress
+        unit = next(
+            candidate
+            for candidate in _dataset_work_units(
+                unit.dataset,
+                plan.datasets[unit.dataset],
+                object_prefixes[unit.dataset],
+                dataset_progress.completed,
+            )
+            if candidate.shard == unit.shard
+        )
+
+        with leases.hold(lease) as held:
+            result = self._execute_unit(
+                unit, mode, export_format, run_id, progress, verification
+            )
+        if held.lease is None or not leases.complete(
+            held.lease, dataset_result_payload(result)
+        ):
+            return None
+        return result
+
     def run(
         self,
         datasets: str | None = None,
@@ -129,17 +924,83 @@ class ArchiveService:
         dry_run: bool = False,
         start_time: datetime | None = None,
         end_time: datetime | None = None,
+        parallelism: int = 1,
+        shard_duration: timedelta | None = None,
+        target_rows_per_shard: int | None = None,
+        worker_id: str | None = None,
+        lease_seconds: float = 300,
+        verify: bool = False,
+        incremental: bool = False,
     ) -> RunResult:
-        """Run or simulate the archive flow."""
+        """Run or simulate the archive flow.
+
+        Datasets, or their sub-windows when the plan is sharded, are exported
+        on a bounded thread pool of ``parallelism`` workers. When bulk
+        exports are submitted as scheduler jobs, up to ``parallelism`` jobs
+        run in the database instead and one thread polls for their results.
+        Results are always reported in dataset selection and shard order.
+
+        Each exported window is recorded as progress for the current
+        checkpoint. A rerun before the checkpoint advances skips windows
+        that are already covered and exports only the remainder. SQL-mode
+        exports that fail part-way also record the last uploaded key, so the
+        rerun resumes after it instead of at the window start.
+
+        With a ``worker_id``, several workers can run the same archive run
+        together. They share one plan and claim its work units through
+        lease objects held for ``lease_seconds`` and renewed while the unit
+        exports; a unit whose worker stops renewing is taken over once the
+        lease expires. Only the worker that finalizes the shared plan after
+        every unit is done writes the manifest and advances the checkpoint;
+        the others return with ``manifest_object_name`` unset.
+
+        With ``verify`` each exported window's rows are counted in the
+        database once it is exported, on the same workers, and compared with
+        the rows the export wrote. Each dataset's manifest entry records
+        whether it was verified. The first mismatch fails its dataset and
+        stops the units that have not started yet, so the checkpoint does not
+        advance.
+
+        With ``incremental`` each dataset exports the ids above its
+        checkpoint high-water mark, as planned by :meth:`plan`, and the
+        checkpoint records the highest id planned as the new mark. Rows that
+        arrive late with an old time are exported by the next run. Id ranges
+        are not recorded as progress or in the catalog, so a failed
+        incremental run is exported again in full.
+        """
+        if parallelism < 1:
+            raise ValueError("parallelism must be >= 1")
+        if incremental and worker_id is not None:
+            raise ValueError("Incremental runs cannot be shared between workers")
+
+        started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
         plan_result = self.plan(
-            datasets=datasets, start_time=start_time, end_time=end_time
+            datasets=datasets,
+            start_time=start_time,
+            end_time=end_time,
+            shard_duration=shard_duration,
+            target_rows_per_shard=target_rows_per_shard,
+            incremental=incremental,
+            include_archived_through=False,
         )
+        leases = None
+        if worker_id is not None and not dry_run:
+            if self.state_store is None:
+                raise RuntimeError("Leased runs require an Object Storage state store.")
+            leases = LeaseManager(
+                self.state_store,
+                self.config.object_storage.work_prefix,
+                worker_id,
+                lease_seconds,
+                self.clock,
+            )
+            plan_result = self._join_shared_plan(leases, plan_result, mode)
         run_at = plan_result.plan.now
-        run_id = run_at.strftime("%Y%m%dT%H%M%SZ")
-        dataset_results = []
-
-        for dataset in plan_result.plan.selected_datasets:
-            object_prefix = build_dataset_object_prefix(
+        run_id = _build_run_id(run_at)
+        selected_datasets = plan_result.plan.selected_datasets
+        object_prefixes = {
+            dataset: build_dataset_object_prefix(
                 prefix=self.config.object_storage.prefix,
                 domain_short_name=self.config.database.iot_domain_short_name,
                 zone=dataset_zone(dataset),
@@ -147,45 +1008,97 @@ class ArchiveService:
                 run_id=run_id,
                 run_at=run_at,
             )
+            for dataset in selected_datasets
+        }
+        progress = self._load_progress(
+            selected_datasets, plan_result.checkpoint.last_successful_run_at
+        )
+        work_units = [
+            unit
+            for dataset in selected_datasets
+            for unit in _dataset_work_units(
+                dataset,
+                plan_result.plan.datasets[dataset],
+                object_prefixes[dataset],
+                () if incremental else progress[dataset].completed,
+            )
+        ]
 
-            if dry_run:
-                dataset_results.append(
-                    DatasetResult(
-                        name=dataset,
+        if dry_run:
+            unit_results = [
+                (
+                    _skipped_result(unit, mode, plan_result.export_format)
+                    if unit.dataset_plan is None
+                    else DatasetResult(
+                        name=unit.dataset,
                         status="planned",
                         export_mode=mode,
                         export_format=plan_result.export_format,
-                        object_prefix=object_prefix,
+                        object_prefix=unit.object_prefix,
                     )
                 )
-                continue
-
+                for unit in work_units
+            ]
+        else:
             if self.executor is None:
                 raise RuntimeError(
                     "No archive executor is configured. Use --dry-run or provide a runtime executor."
                 )
 
-            try:
-                dataset_results.append(
-                    self.executor.execute_dataset(
-                        dataset=dataset,
-                        dataset_plan=plan_result.plan.datasets[dataset],
-                        mode=mode,
-                        object_prefix=object_prefix,
-                        export_format=plan_result.export_format,
-                    )
+            verification = threading.Event() if verify else None
+            if leases is not None:
+                unit_results = self._execute_leased_units(
+                    leases,
+                    plan_result.plan,
+                    object_prefixes,
+                    work_units,
+                    mode,
+                    plan_result.export_format,
+                    run_id,
+                    progress,
+                    parallelism,
+                    verification,
                 )
-            except Exception as exc:
-                dataset_results.append(
-                    DatasetResult(
-                        name=dataset,
-                        status="failed",
-                        export_mode=mode,
-                        export_format=plan_result.export_format,
-                        object_prefix=object_prefix,
-                        error_message=str(exc),
-                    )
+            elif self._uses_scheduled_bulk(mode):
+                unit_results = self._execute_scheduled_units(
+                    work_units,
+                    mode,
+                    plan_result.export_format,
+                    run_id,
+                    progress,
+                    parallelism,
+                    verification,
+                )
+            else:
+                unit_results = self._execute_units(
+                    work_units,
+                    mode,
+                    plan_result.export_format,
+                    run_id,
+                    progress,
+                    parallelism,
+                    verification,
+                )
+
+        grouped_results: dict[str, list[tuple[ShardPlan | None, DatasetResult]]] = {
+            dataset: [] for dataset in selected_datasets
+        }
+        for unit, result in zip(work_units, unit_results):
+            grouped_results[unit.dataset].append((unit.shard, result))
+        dataset_results = [
+            (
+                shard_results[0][1]
+                if shard_results[0][0] is None
+                else _merge_shard_results(
+                    dataset,
+                    object_prefixes[dataset],
+                    mode,
+                    plan_result.export_format,
+                    shard_results,
                 )
+            )
+            for dataset, shard_results in grouped_results.items()
+        ]
 
         manifest_object_name = build_manifest_object_name(
             self.config.object_storage.manifest_prefix, run_id
@@ -194,26 +1107,40 @@ class ArchiveService:
             run_id=run_id,
             selected_datasets=plan_result.plan.selected_datasets,
             retention_days=plan_result.retention_days,
-            checkpoint_before=(
-                plan_result.checkpoint.last_successful_run_at.isoformat().replace(
-                    "+00:00", "Z"
-                )
-                if plan_result.checkpoint.last_successful_run_at is not None
-                else None
+            checkpoint_before=_format_checkpoint(
+                plan_result.checkpoint.last_successful_run_at
             ),
             dataset_results=list(dataset_results),
+            started_at=started_at,
+            wall_seconds=round(time.monotonic() - started, 3),
         )
 
         checkpoint_advanced = False
         if not dry_run:
             statuses = {result.name: result.status for result in dataset_results}
             checkpoint_advanced = should_advance_checkpoint(statuses)
-            if self.state_store is not None:
+            if leases is not None and not leases.finalize_plan(
+                run_id, checkpoint_advanced
+            ):
+                checkpoint_advanced = False
+                manifest_object_name = None
+            elif self.state_store is not None:
                 self.state_store.put_json_object(manifest_object_name, manifest)
+                self._update_catalog(
+                    run_id, plan_result.export_format, work_units, unit_results
+                )
+                self._record_throughput(run_id, mode, dataset_results)
                 if checkpoint_advanced:
                     self.state_store.save_checkpoint(
                         self.config.object_storage.checkpoint_object,
-                        CheckpointState(last_successful_run_at=run_at),
+                        CheckpointState(
+                            last_successful_run_at=run_at,
+                            window_ends=_carried_window_ends(
+                                plan_result,
+                                explicit=start_time is not None or end_time is not None,
+                            ),
+                            high_water_marks=_carried_high_water_marks(plan_result),
+                        ),
                     )
 
         return RunResult(
@@ -224,23 +1151,282 @@ class ArchiveService:
             dataset_results=tuple(dataset_results),
             checkpoint_advanced=checkpoint_advanced,
             manifest_object_name=manifest_object_name,
+            started_at=started_at,
+            wall_seconds=manifest["wall_seconds"],
+        )
+
+
+@dataclass(frozen=True)
+class _WorkUnit:
+    """One dataset window, or sub-window, scheduled for export.
+
+    ``dataset_plan`` is ``None`` when earlier runs already exported the whole
+    window; ``resumed_from`` lists the earlier exports this unit builds on.
+    """
+
+    dataset: str
+    shard: ShardPlan | None
+    dataset_plan: DatasetPlan | None
+    object_prefix: str
+    resumed_from: tuple[CompletedWindow, ...] = ()
+
+
+def _build_run_id(run_at: datetime) -> str:
+    return run_at.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _carried_window_ends(
+    plan_result: PlanResult, explicit: bool
+) -> dict[str, datetime]:
+    """Return the window ends the next checkpoint carries over.
+
+    Datasets outside the run keep theirs. A selected dataset whose budgeted
+    window stopped short of its purge boundary resumes from that window's
+    end; runs over an explicit time range reset the selected datasets.
+    """
+    plan = plan_result.plan
+    window_ends = {
+        dataset: window_end
+        for dataset, window_end in plan_result.checkpoint.window_ends.items()
+        if dataset not in plan.selected_datasets
+    }
+    if not explicit:
+        window_ends.update(
+            {
+                dataset: dataset_plan.window_end
+                for dataset, dataset_plan in plan.datasets.items()
+                if dataset_plan.window_end < dataset_plan.purge_boundary
+            }
+        )
+    return window_ends
+
+
+def _carried_high_water_marks(plan_result: PlanResult) -> dict[str, int]:
+    """Return the high-water marks the next checkpoint carries over.
+
+    Time-window runs keep the marks as they are; an incremental run moves
+    each selected dataset's mark to the highest id it planned.
+    """
+    high_water_marks = dict(plan_result.checkpoint.high_water_marks)
+    high_water_marks.update(
+        {
+            dataset: dataset_plan.through_id
+            for dataset, dataset_plan in plan_result.plan.datasets.items()
+            if dataset_plan.through_id is not None
+        }
+    )
+    return high_water_marks
+
+
+def _format_checkpoint(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _unit_key(unit: _WorkUnit) -> str:
+    if unit.shard is None:
+        return unit.dataset
+    return f"{unit.dataset}-{unit.shard.index:05d}"
+
+
+def _dataset_work_units(
+    dataset: str,
+    dataset_plan: DatasetPlan,
+    object_prefix: str,
+    completed: tuple[CompletedWindow, ...],
+) -> list[_WorkUnit]:
+    if dataset_plan.shards:
+        windows = [
+            (
+                shard,
+                replace(
+                    dataset_plan,
+                    window_start=shard.window_start,
+                    window_end=shard.window_end,
+                    shards=(),
+                ),
+                build_shard_object_prefix(object_prefix, shard.index),
+            )
+            for shard in dataset_plan.shards
+        ]
+    else:
+        windows = [(None, dataset_plan, object_prefix)]
+
+    units = []
+    for shard, unit_plan, unit_prefix in windows:
+        covering = tuple(
+            item
+            for item in completed
+            if item.window_start < unit_plan.window_end
+            and (
+                item.window_end > unit_plan.window_start
+                or (
+                    item.last_id is not None
+                    and item.window_end == unit_plan.window_start
+                )
+            )
         )
+        remaining = remaining_window(
+            unit_plan.window_start, unit_plan.window_end, covering
+        )
+        if remaining is None:
+            units.append(_WorkUnit(dataset, shard, None, unit_prefix, covering))
+            continue
+        remaining_start, _, after_id = remaining
+        if remaining_start != unit_plan.window_start or after_id is not None:
+            unit_plan = replace(
+                unit_plan, window_start=remaining_start, resume_after_id=after_id
+            )
+        else:
+            covering = ()
+        units.append(_WorkUnit(dataset, shard, unit_plan, unit_prefix, covering))
+    return units
+
+
+def _skipped_result(unit: _WorkUnit, mode: str, export_format: str) -> DatasetResult:
+    return DatasetResult(
+        name=unit.dataset,
+        status="skipped",
+        export_mode=mode,
+        export_format=export_format,
+        object_prefix=unit.resumed_from[-1].object_prefix,
+        object_names=tuple(
+            name for item in unit.resumed_from for name in item.object_names
+        ),
+    )
+
+
+def _merge_shard_results(
+    dataset: str,
+    object_prefix: str,
+    mode: str,
+    export_format: str,
+    shard_results: list[tuple[ShardPlan, DatasetResult]],
+) -> DatasetResult:
+    shards = tuple(
+        ShardResult(
+            index=shard.index,
+            window_start=shard.window_start,
+            window_end=shard.window_end,
+            status=result.status,
+            object_prefix=result.object_prefix,
+            object_names=result.object_names,
+            error_message=result.error_message,
+            started_at=result.started_at,
+            duration_seconds=result.duration_seconds,
+        )
+        for shard, result in shard_results
+    )
+    statuses = {shard.status for shard in shards}
+    if "failed" in statuses:
+        status = "failed"
+    elif len(statuses) == 1:
+        status = statuses.pop()
+    elif "planned" in statuses:
+        status = "planned"
+    else:
+        status = "succeeded"
+    errors = [
+        f"shard {shard.index}: {shard.error_message}"
+        for shard in shards
+        if shard.error_message
+    ]
+    first_result = shard_results[0][1]
+    results = [result for _shard, result in shard_results]
+    row_counts = [result.row_count for result in results]
+    started_at = None
+    duration_seconds = None
+    timed = [shard for shard in shards if shard.started_at is not None]
+    if timed:
+        started_at = min(shard.started_at for shard in timed)
+        finished_at = max(
+            shard.started_at + timedelta(seconds=shard.duration_seconds or 0)
+            for shard in timed
+        )
+        duration_seconds = round((finished_at - started_at).total_seconds(), 3)
+    return DatasetResult(
+        name=dataset,
+        status=status,
+        export_mode=first_result.export_mode or mode,
+        export_format=first_result.export_format or export_format,
+        object_prefix=object_prefix,
+        object_names=tuple(name for shard in shards for name in shard.object_names),
+        error_message="; ".join(errors) or None,
+        started_at=started_at,
+        duration_seconds=duration_seconds,
+        shards=shards,
+        row_count=(
+            sum(row_counts) if all(count is not None for count in row_counts) else None
+        ),
+        uncompressed_bytes=sum_known(result.uncompressed_bytes for result in results),
+        compressed_bytes=sum_known(result.compressed_bytes for result in results),
+        parts=tuple(part for result in results for part in result.parts),
+        stage_metrics=merge_stage_metrics(
+            [result.stage_metrics for result in results if result.stage_metrics]
+        ),
+        verification=_merged_verification(results),
+    )
+
+
+def _merged_verification(results: list[DatasetResult]) -> str | None:
+    """Return a dataset's verification from that of its sub-windows."""
+    verifications = {
+        result.verification for result in results if result.verification is not None
+    }
+    if not verifications:
+        return None
+    if VERIFICATION_FAILED in verifications:
+        return VERIFICATION_FAILED
+    if VERIFICATION_UNAVAILABLE in verifications:
+        return VERIFICATION_UNAVAILABLE
+    return VERIFICATION_VERIFIED
 
 
 def build_service(
-    config_path: str, profile: str | None = None, auth: str | None = None
+    config_path: str,
+    profile: str | None = None,
+    auth: str | None = None,
+    retention_ttl_seconds: float | None = None,
+    offline: bool = False,
 ):
-    """Build the archive service from configuration."""
+    """Build the archive service from configuration.
+
+    OCI clients are built on first use, and the namespace, region, and IoT
+    Domain retention are read from the metadata cache while they are younger
+    than its TTL. With ``retention_ttl_seconds`` the retention is refetched
+    at most once per that many seconds instead, for services that run many
+    times.
+
+    With ``offline`` the service makes no OCI calls at all: retention comes
+    from the metadata cache, whatever its age, or from the configured
+    overrides, and there is no state store or executor, so only plans and
+    dry runs are possible.
+    """
     config = load_config(config_path)
-    oci_config, signer = get_oci_config(
-        profile=profile or "DEFAULT", auth=auth or "api_key"
-    )
-    iot_client = build_iot_client(oci_config, signer)
-    object_storage_client = build_object_storage_client(oci_config, signer)
+    cache = _metadata_cache(config)
+    retention_key = f"retention/{config.iot.domain_id}"
+    if offline:
+        return ArchiveService(
+            config=config,
+            retention_lookup=CachedRetentionLookup(
+                OfflineRetentionLookup(),
+                math.inf,
+                cache=cache,
+                cache_key=retention_key,
+            ),
+        )
 
-    namespace = config.object_storage.namespace
-    if namespace is None:
-        namespace = object_storage_client.get_namespace().data
+    profile = profile or "DEFAULT"
+    auth = auth or "api_key"
+    oci_settings = functools.cache(lambda: get_oci_config(profile=profile, auth=auth))
+    iot_client = LazyClient(lambda: build_iot_client(*oci_settings()))
+    object_storage_client = LazyClient(
+        lambda: build_object_storage_client(*oci_settings())
+    )
+    namespace, region = _oci_metadata(
+        config, cache, f"oci/{auth}/{profile}", oci_settings, object_storage_client
+    )
 
     state_store = ObjectStorageStateStore(
         client=object_storage_client,
@@ -251,11 +1437,187 @@ def build_service(
         config=config,
         object_storage_client=object_storage_client,
         namespace=namespace,
-        region=resolve_region(oci_config),
+        region=region,
     )
+    retention_lookup = IotDomainLookup(iot_client, config.iot.domain_id)
+    if retention_ttl_seconds is not None or cache is not None:
+        retention_lookup = CachedRetentionLookup(
+            retention_lookup,
+            (
+                retention_ttl_seconds
+                if retention_ttl_seconds is not None
+                else config.metadata_cache.ttl_minutes * 60
+            ),
+            cache=cache,
+            cache_key=retention_key,
+        )
     return ArchiveService(
         config=config,
-        retention_lookup=IotDomainLookup(iot_client, config.iot.domain_id),
+        retention_lookup=retention_lookup,
         state_store=state_store,
         executor=executor,
     )
+
+
+def _metadata_cache(config: ArchiveConfig) -> MetadataCache | None:
+    if config.metadata_cache.path is None:
+        return None
+    return MetadataCache(config.metadata_cache.path)
+
+
+def _oci_metadata(
+    config: ArchiveConfig,
+    cache: MetadataCache | None,
+    cache_key: str,
+    oci_settings: Any,
+    object_storage_client: Any,
+) -> tuple[str, str | None]:
+    """Return the Object Storage namespace and the OCI region.
+
+    Both are read from the metadata cache while it is fresh; otherwise the
+    namespace is fetched, unless it is configured, and stored with the
+    region resolved from the OCI config.
+    """
+    configured = config.object_storage.namespace
+    cached = (
+        cache.get(cache_key, config.metadata_cache.ttl_minutes * 60)
+        if cache is not None
+        else None
+    )
+    if cached is not None and (configured or cached[0].get("namespace")):
+        metadata = cached[0]
+    else:
+        metadata = {
+            "namespace": configured or object_storage_client.get_namespace().data,
+            "region": resolve_region(oci_settings()[0]),
+        }
+        if cache is not None:
+            cache.put(cache_key, metadata)
+    return configured or metadata["namespace"], metadata.get("region")
+
+
+def _build_archive_source(
+    config: ArchiveConfig,
+    profile: str | None,
+    auth: str | None,
+    source_dir: str | None,
+) -> LocalArchiveSource | ObjectStorageArchiveSource:
+    if source_dir is not None:
+        return LocalArchiveSource(source_dir)
+    profile = profile or "DEFAULT"
+    auth = auth or "api_key"
+    oci_settings = functools.cache(lambda: get_oci_config(profile=profile, auth=auth))
+    object_storage_client = LazyClient(
+        lambda: build_object_storage_client(*oci_settings())
+    )
+    namespace, _region = _oci_metadata(
+        config,
+        _metadata_cache(config),
+        f"oci/{auth}/{profile}",
+        oci_settings,
+        object_storage_client,
+    )
+    return ObjectStorageArchiveSource(
+        client=object_storage_client,
+        namespace=namespace,
+        bucket_name=config.object_storage.bucket_name,
+    )
+
+
+def build_reader(
+    config_path: str,
+    profile: str | None = None,
+    auth: str | None = None,
+    source_dir: str | None = None,
+    concurrency: int = 4,
+    use_catalog: bool = False,
+) -> ArchiveReader:
+    """Build an archive reader over a local directory or the configured bucket.
+
+    With ``use_catalog`` parts are selected from the catalog index, fetched
+    with a single GET, instead of listing partition prefixes.
+    """
+    config = load_config(config_path)
+    source = _build_archive_source(config, profile, auth, source_dir)
+    catalog = None
+    if use_catalog:
+        catalog = parse_catalog_payload(
+            json.loads(source.get_object(config.object_storage.catalog_object))
+        )
+    return ArchiveReader(
+        source=source,
+        prefix=config.object_storage.prefix,
+        domain_short_name=config.database.iot_domain_short_name,
+        concurrency=concurrency,
+        catalog=catalog,
+    )
+
+
+def build_compactor(
+    config_path: str,
+    profile: str | None = None,
+    auth: str | None = None,
+    source_dir: str | None = None,
+    target_size_mb: int = 128,
+) -> PartitionCompactor:
+    """Build a partition compactor over a local directory or the configured bucket."""
+    config = load_config(config_path)
+    source = _build_archive_source(config, profile, auth, source_dir)
+    catalog_store = None
+    if isinstance(source, ObjectStorageArchiveSource):
+        catalog_store = ObjectStorageStateStore(
+            client=source.client,
+            namespace=source.namespace,
+            bucket_name=source.bucket_name,
+        )
+    return PartitionCompactor(
+        source=source,
+        prefix=config.object_storage.prefix,
+        domain_short_name=config.database.iot_domain_short_name,
+        manifest_prefix=config.object_storage.manifest_prefix,
+        target_size_mb=target_size_mb,
+        compression=config.sql_export.compression,
+        compression_level=config.sql_export.compression_level,
+        catalog_store=catalog_store,
+        catalog_object=config.object_storage.catalog_object,
+    )
+
+
+def build_stream_archiver(
+    config_path: str,
+    profile: str | None = None,
+    auth: str | None = None,
+) -> RawQueueArchiver:
+    """Build an archiver that subscribes to the domain's raw message queue.
+
+    The subscriber named in the ``streaming`` config section is added to the
+    queue if it is not subscribed already.
+    """
+    config = load_config(config_path)
+    source = _build_archive_source(config, profile, auth, None)
+    connection = connect(config.database)
+    queue_name = raw_queue_name(config.database.iot_domain_short_name)
+    add_queue_subscriber(connection, queue_name, config.streaming.subscriber_name)
+    queue = open_queue(
+        connection,
+        queue_name,
+        config.streaming.subscriber_name,
+        config.streaming.wait_seconds,
+    )
+    return RawQueueArchiver(
+        connection=connection,
+        queue=queue,
+        source=source,
+        prefix=config.object_storage.prefix,
+        domain_short_name=config.database.iot_domain_short_name,
+        manifest_prefix=config.object_storage.manifest_prefix,
+        settings=config.streaming,
+        compression=config.sql_export.compression,
+        compression_level=config.sql_export.compression_level,
+        catalog_store=ObjectStorageStateStore(
+            client=source.client,
+            namespace=source.namespace,
+            bucket_name=source.bucket_name,
+        ),
+        catalog_object=config.object_storage.catalog_object,
+    )
@@ -12,7 +12,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
-from .models import EXPORT_FORMAT_DATAPUMP, EXPORT_FORMAT_PARQUET, VALID_EXPORT_FORMATS
+from .models import (
+    EXPORT_FORMAT_DATAPUMP,
+    EXPORT_FORMAT_PARQUET,
+    VALID_DATASETS,
+    VALID_EXPORT_FORMATS,
+)
 
 
 @dataclass(frozen=True)
@@ -21,10 +26,17 @@ class DatasetQuery:
 
     dataset: str
     sql_text: str
-    binds: dict[str, datetime]
+    binds: dict[str, datetime | int]
     time_column: str
 
 
+def dataset_table_name(dataset: str) -> str:
+    """Return the IoT schema table backing a dataset."""
+    if dataset not in VALID_DATASETS:
+        raise ValueError(f"Unsupported dataset: {dataset}")
+    return f"{dataset}_data"
+
+
 def dataset_time_column(dataset: str) -> str:
     """Return the purge-relevant time column for a dataset."""
     if dataset == "historized":
@@ -33,157 +45,343 @@ def dataset_time_column(dataset: str) -> str:
 
 
 def _normalized_content_type_sql() -> str:
-    return "lower(trim(regexp_substr(content_type, '^[^;]+')))"
+    return "lower(trim(regexp_substr(src.content_type, '^[^;]+')))"
 
 
 def _json_candidate_sql() -> str:
-    return "to_clob(utl_raw.cast_to_varchar2(dbms_lob.substr(content, 32767, 1)))"
+    return "to_clob(utl_raw.cast_to_varchar2(dbms_lob.substr(src.content, 32767, 1)))"
 
 
-def _content_encoding_sql() -> str:
+def _content_classification_sql() -> str:
+    """Return a lateral inline view that classifies each row's content once.
+
+    Reading the BLOB prefix and running ``is json strict`` is the expensive
+    part of the projection. Doing it once per row here lets both
+    ``content_encoding`` and ``content_representation`` derive from the
+    same result; ``no_merge`` keeps the view from being merged back into
+    the select list, which would repeat the LOB read per reference.
+    """
     content_type_expr = _normalized_content_type_sql()
-    json_candidate_expr = _json_candidate_sql()
     return (
-        "case "
-        f"when {content_type_expr} like 'text/%' then 'text' "
-        f"when {content_type_expr} is null or instr({content_type_expr}, 'json') > 0 then "
-        f"  case when {json_candidate_expr} is json strict then 'json' else 'base64' end "
-        "else 'base64' "
-        "end"
+        "lateral (\n"
+        "                select /*+ no_merge */\n"
+        "                    case\n"
+        f"                        when {content_type_expr} like 'text/%' then 'text'\n"
+        f"                        when {content_type_expr} is null\n"
+        f"                          or instr({content_type_expr}, 'json') > 0 then\n"
+        f"                          case when {_json_candidate_sql()} is json strict\n"
+        "                               then 'json' else 'base64' end\n"
+        "                        else 'base64'\n"
+        "                    end as content_encoding\n"
+        "                from dual\n"
+        "            ) cls"
     )
 
 
 def _content_representation_sql() -> str:
-    content_type_expr = _normalized_content_type_sql()
-    json_candidate_expr = _json_candidate_sql()
     return (
-        "case "
-        f"when {content_type_expr} like 'text/%' then 'json-string' "
-        f"when {content_type_expr} is null or instr({content_type_expr}, 'json') > 0 then "
-        f"  case when {json_candidate_expr} is json strict then 'parsed-json' else 'base64-string' end "
+        "case cls.content_encoding "
+        "when 'text' then 'json-string' "
+        "when 'json' then 'parsed-json' "
         "else 'base64-string' "
         "end"
     )
 
 
+def _dataset_projection(dataset: str, export_format: str) -> tuple[str, str]:
+    """Return the rendered select list and from clause for a dataset/format pair."""
+    normalized_export_format = export_format.lower()
+    if normalized_export_format not in VALID_EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    if dataset in VALID_DATASETS and normalized_export_format == EXPORT_FORMAT_DATAPUMP:
+        return " *", dataset_table_name(dataset)
+
+    if dataset == "raw" and normalized_export_format == EXPORT_FORMAT_PARQUET:
+        columns = (
+            "id",
+            "digital_twin_instance_id",
+            "endpoint",
+            "time_received",
+            "content_type",
+            "cls.content_encoding",
+            f"{_content_representation_sql()} as content_representation",
+            f"{_blob_to_json_expr()} as content",
+        )
+    elif dataset == "historized" and normalized_export_format == EXPORT_FORMAT_PARQUET:
+        columns = (
+            "id",
+            "digital_twin_instance_id",
+            "content_path",
+            "time_observed",
+            "json_serialize(value returning varchar2(32767)) as value_json",
+            "json_value(value, '$' returning number null on error) as value_number",
+            "json_value(value, '$' returning varchar2(32767) null on error) as value_text",
+        )
+    elif dataset == "rejected" and normalized_export_format == EXPORT_FORMAT_PARQUET:
+        columns = (
+            "id",
+            "digital_twin_instance_id",
+            "endpoint",
+            "time_received",
+            "reason_code",
+            "reason_message",
+            "content_type",
+            "cls.content_encoding",
+            f"{_content_representation_sql()} as content_representation",
+            f"{_blob_to_json_expr()} as content",
+        )
+    else:
+        raise ValueError(
+            f"Unsupported dataset/export_format combination: {dataset}/{export_format}"
+        )
+    source = dataset_table_name(dataset)
+    if dataset in ("raw", "rejected"):
+        source = f"{source} src,\n            {_content_classification_sql()}"
+    separator = ",\n                "
+    return f"\n                {separator.join(columns)}", source
+
+
 def build_dataset_query(
     dataset: str,
     window_start: datetime,
     window_end: datetime,
     domain_short_name: str | None = None,
     export_format: str = EXPORT_FORMAT_PARQUET,
+    after_id: int | None = None,
+    through_id: int | None = None,
 ) -> DatasetQuery:
-    """Build the dataset-specific SQL query."""
-    normalized_export_format = export_format.lower()
-    if normalized_export_format not in VALID_EXPORT_FORMATS:
-        raise ValueError(f"Unsupported export format: {export_format}")
+    """Build the dataset-specific SQL query.
 
-    if dataset == "raw" and normalized_export_format == EXPORT_FORMAT_PARQUET:
-        content_encoding_expr = _content_encoding_sql()
-        content_representation_expr = _content_representation_sql()
-        blob_to_json_expr = _blob_to_json_expr()
-        sql_text = """
-            select
-                id,
-                digital_twin_instance_id,
-                endpoint,
-                time_received,
-                content_type,
-                {content_encoding_expr} as content_encoding,
-                {content_representation_expr} as content_representation,
-                {blob_to_json_expr} as content
-            from raw_data
-            where time_received >= :window_start
-              and time_received < :window_end
-            order by time_received, id
-        """.strip().format(
-            content_encoding_expr=content_encoding_expr,
-            content_representation_expr=content_representation_expr,
-            blob_to_json_expr=blob_to_json_expr,
+    ``after_id`` skips rows at exactly ``window_start`` whose id is not
+    greater than it, so an export can resume after the last exported key.
+
+    With a ``through_id`` the query reads an id range instead of a time
+    window: ids up to ``through_id`` and above ``after_id``, in primary key
+    order. Without an ``after_id`` the range starts at the rows from
+    ``window_start`` on; ``window_end`` is not used.
+    """
+    select_list, table_name = _dataset_projection(dataset, export_format)
+    time_column = dataset_time_column(dataset)
+    if through_id is not None:
+        predicate, binds = _id_range_predicate(
+            time_column, window_start, after_id, through_id
         )
-        time_column = "time_received"
-    elif dataset == "raw" and normalized_export_format == EXPORT_FORMAT_DATAPUMP:
-        sql_text = """
-            select *
-            from raw_data
-            where time_received >= :window_start
-              and time_received < :window_end
-            order by time_received, id
-        """.strip()
-        time_column = "time_received"
-    elif dataset == "historized" and normalized_export_format == EXPORT_FORMAT_PARQUET:
-        sql_text = """
-            select
-                id,
-                digital_twin_instance_id,
-                content_path,
-                time_observed,
-                json_serialize(value returning varchar2(32767)) as value_json,
-                json_value(value, '$' returning number null on error) as value_number,
-                json_value(value, '$' returning varchar2(32767) null on error) as value_text
-            from historized_data
-            where time_observed >= :window_start
-              and time_observed < :window_end
-            order by time_observed, id
+        return DatasetQuery(
+            dataset=dataset,
+            sql_text=f"""
+            select{select_list}
+            from {table_name}
+            where {predicate}
+            order by id
+        """.strip(),
+            binds=binds,
+            time_column=time_column,
+        )
+    binds: dict[str, datetime | int] = {
+        "window_start": window_start,
+        "window_end": window_end,
+    }
+    resume_predicate = ""
+    if after_id is not None:
+        resume_predicate = (
+            f"\n              and ({time_column} > :window_start or id > :after_id)"
+        )
+        binds["after_id"] = after_id
+
+    sql_text = f"""
+            select{select_list}
+            from {table_name}
+            where {time_column} >= :window_start
+              and {time_column} < :window_end{resume_predicate}
+            order by {time_column}, id
         """.strip()
-        time_column = "time_observed"
-    elif dataset == "historized" and normalized_export_format == EXPORT_FORMAT_DATAPUMP:
-        sql_text = """
-            select *
-            from historized_data
-            where time_observed >= :window_start
-              and time_observed < :window_end
-            order by time_observed, id
+    return DatasetQuery(
+        dataset=dataset,
+        sql_text=sql_text,
+        binds=binds,
+        time_column=time_column,
+    )
+
+
+def _id_range_predicate(
+    time_column: str,
+    window_start: datetime,
+    after_id: int | None,
+    through_id: int,
+) -> tuple[str, dict[str, datetime | int]]:
+    binds: dict[str, datetime | int] = {"through_id": through_id}
+    if after_id is None:
+        lower = f"{time_column} >= :window_start"
+        binds["window_start"] = window_start
+    else:
+        lower = "id > :after_id"
+        binds["after_id"] = after_id
+    return f"{lower}\n              and id <= :through_id", binds
+
+
+def build_keyset_page_query(
+    dataset: str,
+    export_format: str = EXPORT_FORMAT_PARQUET,
+    after_key: bool = False,
+) -> str:
+    """Build one bounded page of a keyset-paginated dataset export.
+
+    Pages are ordered by ``(time column, id)`` and limited with
+    ``fetch first :page_rows rows only`` so each page can be served from the
+    time index without sorting the whole window. When ``after_key`` is set
+    the page starts strictly after ``(:last_time, :last_id)``; Oracle has no
+    row-value comparison, so the tuple predicate is expanded.
+    """
+    select_list, table_name = _dataset_projection(dataset, export_format)
+    time_column = dataset_time_column(dataset)
+    key_predicate = ""
+    if after_key:
+        key_predicate = (
+            f"\n              and ({time_column} > :last_time"
+            f"\n                   or ({time_column} = :last_time and id > :last_id))"
+        )
+    return f"""
+            select{select_list}
+            from {table_name}
+            where {time_column} >= :window_start
+              and {time_column} < :window_end{key_predicate}
+            order by {time_column}, id
+            fetch first :page_rows rows only
         """.strip()
-        time_column = "time_observed"
-    elif dataset == "rejected" and normalized_export_format == EXPORT_FORMAT_PARQUET:
-        content_encoding_expr = _content_encoding_sql()
-        content_representation_expr = _content_representation_sql()
-        blob_to_json_expr = _blob_to_json_expr()
-        sql_text = """
-            select
-                id,
-                digital_twin_instance_id,
-                endpoint,
-                time_received,
-                reason_code,
-                reason_message,
-                content_type,
-                {content_encoding_expr} as content_encoding,
-                {content_representation_expr} as content_representation,
-                {blob_to_json_expr} as content
-            from rejected_data
-            where time_received >= :window_start
-              and time_received < :window_end
-            order by time_received, id
-        """.strip().format(
-            content_encoding_expr=content_encoding_expr,
-            content_representation_expr=content_representation_expr,
-            blob_to_json_expr=blob_to_json_expr,
+
+
+def build_id_page_query(
+    dataset: str,
+    export_format: str = EXPORT_FORMAT_PARQUET,
+    from_window_start: bool = False,
+) -> str:
+    """Build one bounded page of an incremental, id-ordered dataset export.
+
+    Pages walk the primary key index from ``:last_id`` up to
+    ``:through_id``. With ``from_window_start`` the rows before
+    ``:window_start`` are skipped as well, for a first incremental export
+    that has no high-water mark yet.
+    """
+    select_list, table_name = _dataset_projection(dataset, export_format)
+    time_predicate = ""
+    if from_window_start:
+        time_predicate = (
+            f"\n              and {dataset_time_column(dataset)} >= :window_start"
         )
-        time_column = "time_received"
-    elif dataset == "rejected" and normalized_export_format == EXPORT_FORMAT_DATAPUMP:
-        sql_text = """
-            select *
-            from rejected_data
-            where time_received >= :window_start
-              and time_received < :window_end
-            order by time_received, id
+    return f"""
+            select{select_list}
+            from {table_name}
+            where id > :last_id
+              and id <= :through_id{time_predicate}
+            order by id
+            fetch first :page_rows rows only
         """.strip()
-        time_column = "time_received"
-    else:
-        raise ValueError(
-            f"Unsupported dataset/export_format combination: {dataset}/{export_format}"
+
+
+def build_row_count_query(
+    dataset: str,
+    window_start: datetime,
+    window_end: datetime,
+    after_id: int | None = None,
+    through_id: int | None = None,
+) -> DatasetQuery:
+    """Build a row count query over one dataset window.
+
+    ``after_id`` and ``through_id`` select the same rows as in
+    :func:`build_dataset_query`, so the count matches what a resumed or
+    incremental export reads.
+    """
+    time_column = dataset_time_column(dataset)
+    if through_id is not None:
+        predicate, binds = _id_range_predicate(
+            time_column, window_start, after_id, through_id
+        )
+        return DatasetQuery(
+            dataset=dataset,
+            sql_text=f"""
+        select count(*)
+        from {dataset_table_name(dataset)}
+        where {predicate}
+    """.strip(),
+            binds=binds,
+            time_column=time_column,
+        )
+    binds: dict[str, datetime | int] = {
+        "window_start": window_start,
+        "window_end": window_end,
+    }
+    resume_predicate = ""
+    if after_id is not None:
+        resume_predicate = (
+            f"\n          and ({time_column} > :window_start or id > :after_id)"
         )
+        binds["after_id"] = after_id
+    sql_text = f"""
+        select count(*)
+        from {dataset_table_name(dataset)}
+        where {time_column} >= :window_start
+          and {time_column} < :window_end{resume_predicate}
+    """.strip()
+    return DatasetQuery(
+        dataset=dataset,
+        sql_text=sql_text,
+        binds=binds,
+        time_column=time_column,
+    )
+
 
+def build_table_stats_query(dataset: str) -> DatasetQuery:
+    """Build a lookup of optimizer statistics for a dataset table.
+
+    Returns ``num_rows`` and ``avg_row_len`` from ``user_tables``; both are
+    null when the table has never been analyzed.
+    """
+    sql_text = """
+        select num_rows, avg_row_len
+        from user_tables
+        where table_name = :table_name
+    """.strip()
+    return DatasetQuery(
+        dataset=dataset,
+        sql_text=sql_text,
+        binds={"table_name": dataset_table_name(dataset).upper()},
+        time_column=dataset_time_column(dataset),
+    )
+
+
+def build_time_bounds_query(dataset: str) -> DatasetQuery:
+    """Build a min/max lookup of a dataset's time column.
+
+    With an index on the time column both aggregates are answered by index
+    min/max scans rather than a table scan.
+    """
+    time_column = dataset_time_column(dataset)
+    sql_text = f"""
+        select min({time_column}), max({time_column})
+        from {dataset_table_name(dataset)}
+    """.strip()
     return DatasetQuery(
         dataset=dataset,
         sql_text=sql_text,
-        binds={"window_start": window_start, "window_end": window_end},
+        binds={},
         time_column=time_column,
     )
 
 
+def build_max_id_query(dataset: str) -> DatasetQuery:
+    """Build a lookup of a dataset's highest id.
+
+    The aggregate is answered by a min/max scan of the primary key index.
+    """
+    return DatasetQuery(
+        dataset=dataset,
+        sql_text=f"select max(id) from {dataset_table_name(dataset)}",
+        binds={},
+        time_column=dataset_time_column(dataset),
+    )
+
+
 def _blob_to_json_expr() -> str:
     return "blob_to_json(content, content_type)"
 
@@ -214,13 +412,95 @@ def build_dbms_cloud_export_statement(
     return statement, binds
 
 
+def _sql_string_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def render_dbms_cloud_export_block(
+    binds: dict[str, str | datetime], domain_short_name: str
+) -> str:
+    """Render a DBMS_CLOUD.EXPORT_DATA block with its binds inlined.
+
+    Scheduler job actions are stored as text and cannot carry bind values,
+    so the ``binds`` returned by :func:`build_dbms_cloud_export_statement`
+    are rendered as quoted literals. A job runs in a session of its own,
+    without the pool's schema switch, so the block switches to the
+    domain's IoT schema before the export query resolves its tables.
+    """
+    schema = _sql_string_literal(f"{domain_short_name}__iot".upper())
+    return f"""
+        begin
+          execute immediate 'alter session set current_schema = '
+            || dbms_assert.schema_name({schema});
+          dbms_cloud.export_data(
+            credential_name => {_sql_string_literal(str(binds["credential_name"]))},
+            file_uri_list   => {_sql_string_literal(str(binds["file_uri_list"]))},
+            format          => json_object('type' value {_sql_string_literal(str(binds["export_format"]))}),
+            query           => {_sql_string_literal(str(binds["query_text"]))}
+          );
+        end;
+    """.strip()
+
+
+def build_create_export_job_statement() -> str:
+    """Build the PL/SQL block that starts a one-off export scheduler job.
+
+    Binds ``:job_name`` and ``:job_action``. The job is kept after it runs
+    (``auto_drop => false``) so its outcome can be read before dropping it.
+    Pool sessions use the IoT schema as their current schema, so the job is
+    named under the login user explicitly rather than created there.
+    """
+    return """
+        begin
+          dbms_scheduler.create_job(
+            job_name   => sys_context('userenv', 'session_user') || '.' || :job_name,
+            job_type   => 'PLSQL_BLOCK',
+            job_action => :job_action,
+            enabled    => true,
+            auto_drop  => false
+          );
+        end;
+    """.strip()
+
+
+def build_job_run_details_query(job_count: int) -> str:
+    """Build a lookup of finished scheduler job runs.
+
+    Binds ``:job_0`` through ``:job_<job_count - 1>``. Jobs without a row
+    have not finished yet. Only jobs owned by the login user are read, as
+    created by :func:`build_create_export_job_statement`.
+    """
+    job_binds = ", ".join(f":job_{index}" for index in range(job_count))
+    return f"""
+        select job_name, status, additional_info
+        from all_scheduler_job_run_details
+        where owner = sys_context('userenv', 'session_user')
+          and job_name in ({job_binds})
+    """.strip()
+
+
+def build_drop_job_statement() -> str:
+    """Build the PL/SQL block that drops one login-user job by ``:job_name``."""
+    return """
+        begin
+          dbms_scheduler.drop_job(
+            job_name => sys_context('userenv', 'session_user') || '.' || :job_name,
+            force => true
+          );
+        end;
+    """.strip()
+
+
 def _render_dbms_cloud_query_text(dataset_query: DatasetQuery) -> str:
-    """Inline timestamp literals because DBMS_CLOUD receives the query as a string."""
+    """Inline bind literals because DBMS_CLOUD receives the query as a string."""
     query_text = dataset_query.sql_text
     for bind_name, bind_value in dataset_query.binds.items():
-        query_text = query_text.replace(
-            f":{bind_name}", _oracle_timestamp_tz_literal(bind_value)
+        literal = (
+            _oracle_timestamp_tz_literal(bind_value)
+            if isinstance(bind_value, datetime)
+            else str(int(bind_value))
         )
+        query_text = query_text.replace(f":{bind_name}", literal)
     return query_text
 
 
@@ -0,0 +1,314 @@
+"""Continuous archiving of raw messages from the IoT Domain queue.
+
+Copyright (c) 2026 Oracle and/or its affiliates.
+Licensed under the Universal Permissive License v 1.0 as shown at
+https://oss.oracle.com/licenses/upl
+
+DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from .catalog import add_catalog_entries
+from .config import StreamingConfig
+from .db import as_utc
+from .exporters import dataset_zone
+from .manifest import build_run_manifest
+from .models import STREAM_EXPORT_MODE, CatalogEntry, DatasetResult, PartMetrics
+from .object_storage import (
+    build_dataset_object_prefix,
+    build_manifest_object_name,
+    build_object_name,
+    encode_json,
+)
+from .pipeline import COMPRESSION_GZIP, build_compressor, part_filename
+
+_REPRESENTATIONS = {
+    "json": "parsed-json",
+    "text": "json-string",
+    "base64": "base64-string",
+}
+
+
+def classify_content(
+    content: bytes | None, content_type: str | None
+) -> tuple[str, Any]:
+    """Return the ``content_encoding`` and exported value of one payload.
+
+    This follows the classification the sql-mode queries do in the database:
+    ``text/*`` payloads are decoded text, payloads without a content type or
+    with a JSON one are parsed if they are strict JSON, and everything else
+    is base64.
+    """
+    normalized = (content_type or "").split(";", 1)[0].strip().lower()
+    if content is not None:
+        if normalized.startswith("text/"):
+            return "text", content.decode("utf-8", errors="replace")
+        if not normalized or "json" in normalized:
+            try:
+                return "json", json.loads(content, parse_constant=_reject_constant)
+            except ValueError:
+                pass
+        return "base64", base64.b64encode(content).decode("ascii")
+    return "base64", None
+
+
+def _reject_constant(value: str) -> Any:
+    raise ValueError(f"{value} is not strict JSON")
+
+
+def queue_record(payload: Any) -> dict[str, Any]:
+    """Build the archived record of one ``raw_data_in`` message payload.
+
+    Records carry the sql-mode ``raw`` columns except ``id``, which is only
+    assigned when the IoT Domain stores the message in ``raw_data``.
+    ``time_received`` stays a datetime until the record is written.
+    """
+    content = payload.CONTENT
+    if hasattr(content, "read"):
+        content = content.read()
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    content_type = getattr(payload, "CONTENT_TYPE", None)
+    encoding, value = classify_content(content, content_type)
+    return {
+        "digital_twin_instance_id": payload.DIGITAL_TWIN_INSTANCE_ID,
+        "endpoint": payload.ENDPOINT,
+        "time_received": as_utc(payload.TIME_RECEIVED),
+        "content_type": content_type,
+        "content_encoding": encoding,
+        "content_representation": _REPRESENTATIONS[encoding],
+        "content": value,
+    }
+
+
+class RawQueueArchiver:
+    """Archive raw messages from the IoT Domain queue as they arrive.
+
+    Dequeued messages are buffered into one compressed JSON Lines part until
+    it holds ``part_size_mb`` of uncompressed records or its first message
+    has waited ``max_part_seconds``. Each part is written as a run of its
+    own: the part, then its run manifest, then its catalog entry. Only then
+    are the dequeues committed, so a crash before the commit leaves the
+    messages on the queue to be archived again rather than lost.
+    """
+
+    def __init__(
+        self,
+        connection: Any,
+        queue: Any,
+        source: Any,
+        prefix: str,
+        domain_short_name: str,
+        manifest_prefix: str,
+        settings: StreamingConfig | None = None,
+        compression: str = COMPRESSION_GZIP,
+        compression_level: int = 6,
+        catalog_store: Any = None,
+        catalog_object: str | None = None,
+        clock: Callable[[], datetime] | None = None,
+        monotonic: Callable[[], float] = time.monotonic,
+    ):
+        """Store the queue, the archive layout, and how parts are bounded."""
+        self.settings = settings or StreamingConfig()
+        if self.settings.part_size_mb < 1:
+            raise ValueError("part size must be >= 1 MB")
+        if self.settings.max_part_seconds <= 0:
+            raise ValueError("max_part_seconds must be > 0")
+        self.connection = connection
+        self.queue = queue
+        self.source = source
+        self.prefix = prefix
+        self.domain_short_name = domain_short_name
+        self.manifest_prefix = manifest_prefix
+        self.part_size_bytes = self.settings.part_size_mb * 1024 * 1024
+        self.compression = compression
+        self.compression_level = compression_level
+        self.catalog_store = catalog_store
+        self.catalog_object = catalog_object
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.monotonic = monotonic
+        self._stopped = threading.Event()
+        self._reset()
+
+    def stop(self) -> None:
+        """Flush the buffered messages and stop after the current dequeue."""
+        self._stopped.set()
+
+    def close(self) -> None:
+        """Close the queue connection; uncommitted dequeues are returned."""
+        self.connection.close()
+
+    def run(
+        self,
+        max_parts: int | None = None,
+        on_flush: Callable[[DatasetResult], None] | None = None,
+    ) -> int:
+        """Archive messages until stopped, or until ``max_parts`` are written.
+
+        Returns the number of parts written.
+        """
+        written = 0
+        while not self._stopped.is_set():
+            for message in self.queue.deqmany(self.settings.dequeue_batch):
+                self._add(message.payload)
+            if self._due():
+                self._flushed(on_flush)
+                written += 1
+                if max_parts is not None and written >= max_parts:
+                    return written
+        if self._rows:
+            self._flushed(on_flush)
+            written += 1
+        return written
+
+    def flush(self) -> DatasetResult | None:
+        """Write the buffered messages, then commit their dequeues.
+
+        If any write fails the dequeues are rolled back, which returns the
+        messages to the queue, and the error is raised.
+        """
+        if not self._rows:
+            return None
+        try:
+            result = self._write_part()
+        except Exception:
+            self.connection.rollback()
+            self._reset()
+            raise
+        self.connection.commit()
+        self._reset()
+        return result
+
+    def _flushed(self, on_flush: Callable[[DatasetResult], None] | None) -> None:
+        result = self.flush()
+        if on_flush is not None:
+            on_flush(result)
+
+    def _reset(self) -> None:
+        self._compressor = build_compressor(self.compression, self.compression_level)
+        self._chunks: list[bytes] = []
+        self._rows = 0
+        self._raw_bytes = 0
+        self._serialize_seconds = 0.0
+        self._first_at: float | None = None
+        self._started_at: datetime | None = None
+        self._window: tuple[datetime, datetime] | None = None
+
+    def _add(self, payload: Any) -> None:
+        started = time.perf_counter()
+        record = queue_record(payload)
+        received = record["time_received"]
+        data = (
+            json.dumps(
+                {**record, "time_received": _format_timestamp(received)},
+                sort_keys=True,
+            ).encode("utf-8")
+            + b"\n"
+        )
+        self._chunks.append(self._compressor.compress(data))
+        self._serialize_seconds += time.perf_counter() - started
+        if self._first_at is None:
+            self._first_at = self.monotonic()
+            self._started_at = self.clock()
+        if received is not None:
+            self._window = (
+                (received, received)
+                if self._window is None
+                else (min(self._window[0], received), max(self._window[1], received))
+            )
+        self._rows += 1
+        self._raw_bytes += len(data)
+
+    def _due(self) -> bool:
+        return bool(self._rows) and (
+            self._raw_bytes >= self.part_size_bytes
+            or self.monotonic() - self._first_at >= self.settings.max_part_seconds
+        )
+
+    def _write_part(self) -> DatasetResult:
+        flushed_at = self.clock()
+        run_id = f"{flushed_at:%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:8]}"
+        object_prefix = build_dataset_object_prefix(
+            self.prefix,
+            self.domain_short_name,
+            dataset_zone("raw"),
+            "raw",
+            run_id=run_id,
+            run_at=flushed_at,
+        )
+        object_name = build_object_name(
+            object_prefix, part_filename(0, self.compression)
+        )
+        data = b"".join([*self._chunks, self._compressor.flush()])
+        upload_started = time.perf_counter()
+        self.source.put_object(object_name, data)
+        part = PartMetrics(
+            object_name=object_name,
+            rows=self._rows,
+            uncompressed_bytes=self._raw_bytes,
+            compressed_bytes=len(data),
+            sha256=hashlib.sha256(data).hexdigest(),
+            serialize_seconds=round(self._serialize_seconds, 6),
+            upload_seconds=round(time.perf_counter() - upload_started, 6),
+        )
+        result = DatasetResult(
+            name="raw",
+            status="succeeded",
+            export_mode=STREAM_EXPORT_MODE,
+            object_prefix=object_prefix,
+            object_names=(object_name,),
+            started_at=self._started_at,
+            duration_seconds=round(self.monotonic() - self._first_at, 3),
+            row_count=self._rows,
+            uncompressed_bytes=self._raw_bytes,
+            compressed_bytes=len(data),
+            parts=(part,),
+        )
+        manifest = build_run_manifest(
+            run_id=run_id,
+            selected_datasets=("raw",),
+            retention_days={},
+            checkpoint_before=None,
+            dataset_results=[result],
+            started_at=self._started_at,
+            wall_seconds=result.duration_seconds,
+        )
+        self.source.put_object(
+            build_manifest_object_name(self.manifest_prefix, run_id),
+            encode_json(manifest),
+        )
+        if self.catalog_store is not None and self._window is not None:
+            # Catalog windows are end-exclusive.
+            entry = CatalogEntry(
+                dataset="raw",
+                window_start=self._window[0],
+                window_end=self._window[1] + timedelta(microseconds=1),
+                run_id=run_id,
+                object_names=(object_name,),
+                row_count=self._rows,
+                uncompressed_bytes=self._raw_bytes,
+                compressed_bytes=len(data),
+                export_mode=STREAM_EXPORT_MODE,
+            )
+            self.catalog_store.update_catalog(
+                self.catalog_object,
+                lambda entries: add_catalog_entries(entries, [entry]),
+            )
+        return result
+
+
+def _format_timestamp(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
@@ -0,0 +1,83 @@
+import json
+
+from click.testing import CliRunner
+
+from archive_domain.benchmark import (
+    BenchmarkCase,
+    SyntheticCursor,
+    run_benchmark,
+)
+from archive_domain.cli import cli
+
+
+def test_synthetic_cursor_serves_keyset_pages_from_the_binds():
+    cursor = SyntheticCursor("raw", rows=250, templates=8)
+    cursor.arraysize = 40
+
+    cursor.execute("page", {"page_rows": 100})
+    first_page = []
+    while rows := cursor.fetchmany():
+        first_page.extend(rows)
+    cursor.execute("page", {"page_rows": 100, "last_id": first_page[-1][0]})
+    second_page = cursor.fetchmany(500)
+
+    assert [row[0] for row in first_page] == list(range(1, 101))
+    assert second_page[0][0] == 101
+    assert len(second_page) == 100
+    assert second_page[0][3] > first_page[-1][3]
+    assert hasattr(first_page[0][-1], "read")
+
+
+def test_run_benchmark_measures_each_path_in_process():
+    cases = [
+        BenchmarkCase("raw", paging="cursor"),
+        BenchmarkCase("historized", paging="keyset"),
+    ]
+
+    results = run_benchmark(cases, 2000, isolate=False, page_rows=500)
+
+    assert [result.case for result in results] == cases
+    assert all(result.rows == 2000 for result in results)
+    assert all(result.rows_per_second > 0 for result in results)
+    assert all(result.compressed_mb > 0 for result in results)
+    assert all(result.objects == 1 for result in results)
+
+
+def test_synthetic_rows_encode_like_exported_records():
+    cursor = SyntheticCursor("rejected", rows=3, templates=2)
+    cursor.execute("query", {})
+    columns = [column[0].lower() for column in cursor.description]
+    row = dict(zip(columns, cursor.fetchmany()[0]))
+
+    assert row["reason_code"] == "SCHEMA_MISMATCH"
+    assert row["content_encoding"] in ("json", "base64")
+    if row["content_encoding"] == "json":
+        json.loads(row["content"].read())
+
+
+def test_benchmark_command_prints_one_line_per_case(monkeypatch):
+    captured = {}
+
+    def _run_benchmark(cases, rows, isolate, **options):
+        captured.update(cases=cases, rows=rows, isolate=isolate, options=options)
+        return run_benchmark(cases[:1], 100, isolate=False)
+
+    monkeypatch.setattr("archive_domain.cli.run_benchmark", _run_benchmark)
+
+    result = CliRunner().invoke(
+        cli,
+        ["benchmark", "--rows", "100", "--datasets", "raw", "--compression", "gzip"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert [case.paging for case in captured["cases"]] == ["cursor", "keyset"]
+    assert captured["isolate"] is True
+    assert len(result.output.splitlines()) == 2
+    assert result.output.splitlines()[1].startswith("raw")
+
+
+def test_benchmark_command_rejects_unknown_compression():
+    result = CliRunner().invoke(cli, ["benchmark", "--compression", "lz4"])
+
+    assert result.exit_code != 0
+    assert "gzip, zstd" in result.output
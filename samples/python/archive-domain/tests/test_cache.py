@@ -0,0 +1,29 @@
+from archive_domain.cache import MetadataCache
+
+
+def test_metadata_cache_round_trips_values_and_reports_their_age(tmp_path):
+    now = [1000.0]
+    path = tmp_path / "cache" / "metadata.json"
+    cache = MetadataCache(path, clock=lambda: now[0])
+
+    assert cache.get("oci/api_key/DEFAULT") is None
+    cache.put("oci/api_key/DEFAULT", {"namespace": "sample-ns", "region": None})
+    now[0] = 1030.0
+
+    reopened = MetadataCache(path, clock=lambda: now[0])
+    assert reopened.get("oci/api_key/DEFAULT") == (
+        {"namespace": "sample-ns", "region": None},
+        30.0,
+    )
+    assert reopened.get("oci/api_key/DEFAULT", max_age_seconds=30) is None
+    assert reopened.get("oci/api_key/DEFAULT", max_age_seconds=31) is not None
+
+
+def test_metadata_cache_treats_an_unreadable_file_as_empty(tmp_path):
+    path = tmp_path / "metadata.json"
+    path.write_text("{not json", encoding="utf-8")
+    cache = MetadataCache(path)
+
+    assert cache.get("retention/domain") is None
+    cache.put("retention/domain", {"raw": 16})
+    assert cache.get("retention/domain")[0] == {"raw": 16}
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from datetime import datetime, timezone
 
 from click.testing import CliRunner
@@ -6,6 +7,7 @@ from archive_domain.cli import cli
 from archive_domain.models import (
     ArchivePlan,
     CheckpointState,
+    DatasetEstimate,
     DatasetPlan,
     DatasetResult,
     PlanResult,
@@ -71,6 +73,9 @@ class _FakeService:
             checkpoint_advanced=False,
         )
 
+    def close(self):
+        pass
+
     def plan(self, **_kwargs):
         return self.plan_result
 
@@ -93,6 +98,45 @@ def test_plan_command_prints_selected_dataset_windows(monkeypatch):
     assert "2026-03-22T12:00:00Z" in result.output
 
 
+def test_plan_command_prints_estimates(monkeypatch):
+    runner = CliRunner()
+    service = _FakeService()
+    service.plan_result = replace(
+        service.plan_result,
+        estimates={
+            "raw": DatasetEstimate(
+                dataset="raw",
+                method="stats",
+                rows=1_200_000,
+                bytes=3 * 1024 * 1024 * 1024,
+                suggested_shards=3,
+                rows_per_second=2000.0,
+                throughput_source="recorded",
+                expected_seconds=600.0,
+            ),
+            "historized": DatasetEstimate(
+                dataset="historized",
+                method="count",
+                rows=10,
+                bytes=None,
+                suggested_shards=1,
+            ),
+        },
+    )
+    monkeypatch.setattr(
+        "archive_domain.cli.build_service", lambda *_args, **_kwargs: service
+    )
+
+    result = runner.invoke(cli, ["plan", "--datasets", "raw,historized", "--estimate"])
+
+    assert result.exit_code == 0
+    assert (
+        "  estimate: ~1,200,000 rows (stats), ~3.0 GB, suggested shards=3, "
+        "expected 10m00s at 2,000 rows/s (recorded)"
+    ) in result.output
+    assert "expected duration unknown" in result.output
+
+
 def test_run_dry_run_does_not_advance_checkpoint(monkeypatch):
     runner = CliRunner()
 
@@ -122,3 +166,47 @@ def test_run_command_exits_nonzero_when_any_dataset_fails(monkeypatch):
     assert result.exit_code != 0
     assert "raw: failed" in result.output
     assert "simulated export failure" in result.output
+
+
+def test_run_command_passes_worker_lease_and_reports_other_committer(monkeypatch):
+    runner = CliRunner()
+    service = _FakeService(dataset_statuses=("succeeded", "succeeded"))
+    calls = []
+
+    def run(**kwargs):
+        calls.append(kwargs)
+        return service.run_result
+
+    service.run = run
+    monkeypatch.setattr(
+        "archive_domain.cli.build_service", lambda *_args, **_kwargs: service
+    )
+
+    result = runner.invoke(
+        cli, ["run", "--worker-id", "host-a", "--lease-seconds", "120"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert calls[0]["worker_id"] == "host-a"
+    assert calls[0]["lease_seconds"] == 120
+    assert "Another worker commits this run." in result.output
+
+
+def test_run_offline_requires_dry_run_and_notes_the_skipped_checkpoint(monkeypatch):
+    runner = CliRunner()
+    calls = []
+
+    def build_service(*_args, **kwargs):
+        calls.append(kwargs)
+        return _FakeService()
+
+    monkeypatch.setattr("archive_domain.cli.build_service", build_service)
+
+    rejected = runner.invoke(cli, ["run", "--offline"])
+    result = runner.invoke(cli, ["run", "--dry-run", "--offline"])
+
+    assert rejected.exit_code != 0
+    assert "--offline requires --dry-run" in rejected.output
+    assert result.exit_code == 0, result.output
+    assert [call["offline"] for call in calls] == [True]
+    assert "Offline; the checkpoint was not read" in result.output
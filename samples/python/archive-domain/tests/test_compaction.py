@@ -0,0 +1,258 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+from click.testing import CliRunner
+
+from archive_domain.cli import cli
+from archive_domain.compaction import (
+    PartitionCompactor,
+    build_partition_prefix,
+    group_by_size,
+)
+from archive_domain.models import CatalogEntry
+from archive_domain.reader import ArchiveReader, LocalArchiveSource
+
+_DATASET_PREFIX = "iot-archive/domain=demo/zone=bronze/dataset=raw"
+_DAY_PREFIX = f"{_DATASET_PREFIX}/year=2026/month=04/day=08"
+
+
+def _write_part(root, object_name, records):
+    path = root / object_name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(json.dumps(record) + "\n" for record in records)
+    path.write_bytes(gzip.compress(payload.encode("utf-8")))
+
+
+def _write_run(root, hour, run_id, records, committed=True):
+    _write_part(
+        root,
+        f"{_DAY_PREFIX}/hour={hour:02d}/run_id={run_id}/part-00000.jsonl.gz",
+        records,
+    )
+    if committed:
+        manifest = root / "_manifests" / f"run_id={run_id}.json"
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        manifest.write_text("{}")
+
+
+def _compactor(root, clock_hour=0, **kwargs):
+    return PartitionCompactor(
+        LocalArchiveSource(root),
+        prefix="iot-archive",
+        domain_short_name="demo",
+        manifest_prefix="_manifests",
+        clock=lambda: datetime(2026, 4, 10, clock_hour, tzinfo=timezone.utc),
+        **kwargs,
+    )
+
+
+def _read_all(root):
+    reader = ArchiveReader(LocalArchiveSource(root), "iot-archive", "demo")
+    return sorted(
+        record["id"]
+        for record in reader.iter_records(
+            "raw",
+            datetime(2026, 4, 1, tzinfo=timezone.utc),
+            datetime(2026, 5, 1, tzinfo=timezone.utc),
+        )
+    )
+
+
+def test_build_partition_prefix_accepts_days_and_months():
+    assert build_partition_prefix(_DATASET_PREFIX, "2026-04") == (
+        f"{_DATASET_PREFIX}/year=2026/month=04/"
+    )
+    assert build_partition_prefix(_DATASET_PREFIX, "2026-04-08") == f"{_DAY_PREFIX}/"
+    with pytest.raises(ValueError, match="YYYY-MM-DD"):
+        build_partition_prefix(_DATASET_PREFIX, "2026/04/08")
+
+
+def test_group_by_size_starts_a_new_group_past_the_target():
+    groups = group_by_size([("a", 40), ("b", 40), ("c", 40), ("d", 200)], 100)
+
+    assert [[name for name, _ in group] for group in groups] == [
+        ["a", "b"],
+        ["c"],
+        ["d"],
+    ]
+
+
+def test_compact_day_merges_committed_runs_and_leaves_running_exports(tmp_path):
+    _write_run(tmp_path, 1, "r1", [{"id": 1}, {"id": 2}])
+    _write_run(tmp_path, 2, "r2", [{"id": 3}])
+    _write_run(tmp_path, 3, "r3", [{"id": 4}], committed=False)
+
+    result = _compactor(tmp_path).compact("raw", "2026-04-08")
+
+    assert result.status == "compacted"
+    assert len(result.source_objects) == 2
+    assert [output.rows for output in result.outputs] == [3]
+    assert result.outputs[0].object_name == (
+        f"{_DAY_PREFIX}/compaction_id=20260410T000000Z/part-00000.jsonl.gz"
+    )
+    assert result.uncommitted_objects == (
+        f"{_DAY_PREFIX}/hour=03/run_id=r3/part-00000.jsonl.gz",
+    )
+    assert all(not (tmp_path / name).exists() for name in result.source_objects)
+    manifest = json.loads((tmp_path / result.manifest_object_name).read_text())
+    assert manifest["sources"] == list(result.source_objects)
+    assert manifest["outputs"][0]["rows"] == 3
+    assert _read_all(tmp_path) == [1, 2, 3, 4]
+
+
+def test_compact_keeps_sources_when_the_written_object_does_not_verify(tmp_path):
+    _write_run(tmp_path, 1, "r1", [{"id": 1}])
+    _write_run(tmp_path, 2, "r2", [{"id": 2}])
+
+    class _CorruptingSource(LocalArchiveSource):
+        def put_object(self, object_name, data):
+            super().put_object(object_name, gzip.compress(b'{"id": 1}\n'))
+
+    compactor = _compactor(tmp_path)
+    compactor.source = _CorruptingSource(tmp_path)
+
+    with pytest.raises(RuntimeError, match="failed verification"):
+        compactor.compact("raw", "2026-04-08")
+
+    assert (tmp_path / f"{_DAY_PREFIX}/hour=01/run_id=r1/part-00000.jsonl.gz").exists()
+    assert not list(tmp_path.rglob("_compaction.json"))
+
+
+def test_compact_finishes_deleting_sources_of_an_interrupted_compaction(tmp_path):
+    _write_run(tmp_path, 1, "r1", [{"id": 1}])
+    _write_run(tmp_path, 2, "r2", [{"id": 2}])
+
+    class _FailingDeleteSource(LocalArchiveSource):
+        def delete_object(self, object_name):
+            raise OSError("simulated crash")
+
+    interrupted = _compactor(tmp_path)
+    interrupted.source = _FailingDeleteSource(tmp_path)
+    with pytest.raises(OSError):
+        interrupted.compact("raw", "2026-04-08")
+
+    result = _compactor(tmp_path, clock_hour=1).compact("raw", "2026-04-08")
+
+    assert result.status == "skipped"
+    assert len(result.deleted_objects) == 2
+    assert _read_all(tmp_path) == [1, 2]
+
+
+def test_compaction_manifest_is_compact_and_read_back_by_its_outputs(tmp_path):
+    _write_run(tmp_path, 1, "r1", [{"id": 1}])
+    _write_run(tmp_path, 2, "r2", [{"id": 2}])
+
+    result = _compactor(tmp_path).compact("raw", "2026-04-08")
+
+    manifest = (tmp_path / result.manifest_object_name).read_bytes()
+    assert manifest.startswith(b'{"compaction_id":')
+    assert b"\n" not in manifest
+    members = LocalArchiveSource(tmp_path).get_json_members(
+        result.manifest_object_name, ("outputs",)
+    )
+    assert [item["sources"] for item in members["outputs"]] == [
+        list(result.source_objects)
+    ]
+
+
+def test_compact_month_rolls_up_day_outputs(tmp_path):
+    _write_run(tmp_path, 1, "r1", [{"id": 1}])
+    _write_run(tmp_path, 2, "r2", [{"id": 2}])
+    _compactor(tmp_path).compact("raw", "2026-04-08")
+    other_day = f"{_DATASET_PREFIX}/year=2026/month=04/day=09"
+    _write_part(
+        tmp_path, f"{other_day}/hour=05/run_id=r4/part-00000.jsonl.gz", [{"id": 5}]
+    )
+    (tmp_path / "_manifests" / "run_id=r4.json").write_text("{}")
+
+    result = _compactor(tmp_path, clock_hour=1).compact("raw", "2026-04")
+
+    assert [output.rows for output in result.outputs] == [3]
+    assert len(list(tmp_path.rglob("_compaction.json"))) == 1
+    reader = ArchiveReader(LocalArchiveSource(tmp_path), "iot-archive", "demo")
+    partial_day = reader.list_parts(
+        "raw",
+        datetime(2026, 4, 8, 1, tzinfo=timezone.utc),
+        datetime(2026, 4, 8, 2, tzinfo=timezone.utc),
+    )
+    assert partial_day == [output.object_name for output in result.outputs]
+
+
+def test_compact_command_dry_run_writes_nothing(monkeypatch, tmp_path):
+    _write_run(tmp_path, 1, "r1", [{"id": 1}])
+    _write_run(tmp_path, 2, "r2", [{"id": 2}])
+    monkeypatch.setattr(
+        "archive_domain.cli.build_compactor",
+        lambda *_args, **kwargs: _compactor(kwargs["source_dir"]),
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "compact",
+            "--dataset",
+            "raw",
+            "--partition",
+            "2026-04-08",
+            "--source-dir",
+            str(tmp_path),
+            "--dry-run",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Merged 2 objects into 1" in result.output
+    assert "Dry run only" in result.output
+    assert not list(tmp_path.rglob("compaction_id=*"))
+
+
+class _MemoryCatalogStore:
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+
+    def update_catalog(self, _object_name, update):
+        self.entries = update(self.entries)
+        return self.entries
+
+
+def test_compact_points_catalog_entries_at_merged_files(tmp_path):
+    _write_run(tmp_path, 1, "r1", [{"id": 1}])
+    _write_run(tmp_path, 2, "r2", [{"id": 2}])
+    _write_run(tmp_path, 3, "r3", [{"id": 3}], committed=False)
+    entries = [
+        CatalogEntry(
+            dataset="raw",
+            window_start=datetime(2026, 3, 20, hour, tzinfo=timezone.utc),
+            window_end=datetime(2026, 3, 20, hour + 1, tzinfo=timezone.utc),
+            run_id=run_id,
+            object_names=(
+                f"{_DAY_PREFIX}/hour={hour:02d}/run_id={run_id}/part-00000.jsonl.gz",
+            ),
+        )
+        for hour, run_id in ((1, "r1"), (2, "r2"), (3, "r3"))
+    ]
+    catalog_store = _MemoryCatalogStore(entries)
+
+    result = _compactor(
+        tmp_path, catalog_store=catalog_store, catalog_object="_state/catalog.json"
+    ).compact("raw", "2026-04-08")
+
+    merged = result.outputs[0].object_name
+    assert [entry.object_names for entry in catalog_store.entries] == [
+        (merged,),
+        (merged,),
+        entries[2].object_names,
+    ]
+    reader = ArchiveReader(
+        LocalArchiveSource(tmp_path),
+        "iot-archive",
+        "demo",
+        catalog=catalog_store.entries,
+    )
+    assert reader.list_parts(
+        "raw",
+        datetime(2026, 4, 8, 1, tzinfo=timezone.utc),
+        datetime(2026, 4, 8, 3, tzinfo=timezone.utc),
+    ) == [merged]
@@ -0,0 +1,211 @@
+import threading
+import urllib.request
+from datetime import datetime, timedelta, timezone
+
+from click.testing import CliRunner
+
+from archive_domain.cli import cli
+from archive_domain.daemon import ArchiveDaemon, serve_metrics
+from archive_domain.models import (
+    ArchivePlan,
+    CheckpointState,
+    DatasetPlan,
+    DatasetResult,
+    PlanResult,
+    RunResult,
+)
+
+_START = datetime(2026, 4, 8, 12, tzinfo=timezone.utc)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = _START
+        self.waits = []
+
+    def __call__(self):
+        return self.now
+
+    def wait(self, seconds):
+        self.waits.append(seconds)
+        self.now += timedelta(seconds=seconds)
+
+
+class _FakeService:
+    def __init__(self, clock, durations=(), statuses=("succeeded",), finalizing=True):
+        self.clock = clock
+        self.finalizing = finalizing
+        self.durations = list(durations)
+        self.statuses = list(statuses)
+        self.started = []
+        self.closed = False
+
+    def run(self, **kwargs):
+        now = self.clock()
+        self.started.append((now, kwargs))
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if self.durations:
+            self.clock.now += timedelta(seconds=self.durations.pop(0))
+        if status == "error":
+            raise RuntimeError("database unavailable")
+        purge_boundary = now - timedelta(days=16)
+        dataset_plan = DatasetPlan(
+            name="raw",
+            retention_days=16,
+            purge_boundary=purge_boundary,
+            window_start=purge_boundary - timedelta(minutes=5),
+            window_end=purge_boundary,
+        )
+        run_id = now.strftime("%Y%m%dT%H%M%SZ")
+        return RunResult(
+            run_id=run_id,
+            mode="sql",
+            export_format="parquet",
+            plan_result=PlanResult(
+                plan=ArchivePlan(
+                    now=now,
+                    selected_datasets=("raw",),
+                    datasets={"raw": dataset_plan},
+                ),
+                export_format="parquet",
+                retention_days={"raw": 16},
+                checkpoint=CheckpointState(),
+            ),
+            dataset_results=(DatasetResult(name="raw", status=status),),
+            checkpoint_advanced=self.finalizing and status == "succeeded",
+            manifest_object_name=(
+                f"_manifests/run_id={run_id}.json" if self.finalizing else None
+            ),
+            wall_seconds=1.0,
+        )
+
+    def close(self):
+        self.closed = True
+
+
+def test_serve_keeps_a_fixed_cadence_and_skips_runs_that_overlap():
+    clock = _Clock()
+    service = _FakeService(clock, durations=[10, 250, 10])
+    daemon = ArchiveDaemon(
+        service, 100, {"datasets": "raw"}, clock=clock, wait=clock.wait
+    )
+
+    daemon.serve(max_runs=3)
+
+    assert [started for started, _kwargs in service.started] == [
+        _START,
+        _START + timedelta(seconds=100),
+        _START + timedelta(seconds=400),
+    ]
+    assert service.started[0][1] == {"datasets": "raw"}
+    assert daemon.skipped_runs == 2
+    assert daemon.runs == {"succeeded": 3, "failed": 0}
+
+
+def test_run_once_skips_while_another_run_is_in_progress():
+    clock = _Clock()
+    release = threading.Event()
+    entered = threading.Event()
+
+    class _BlockingService(_FakeService):
+        def run(self, **kwargs):
+            entered.set()
+            release.wait(5)
+            return super().run(**kwargs)
+
+    daemon = ArchiveDaemon(_BlockingService(clock), 60, clock=clock)
+    worker = threading.Thread(target=daemon.run_once)
+    worker.start()
+    entered.wait(5)
+
+    assert daemon.run_once() is None
+    release.set()
+    worker.join()
+    assert daemon.skipped_runs == 1
+    assert daemon.runs["succeeded"] == 1
+
+
+def test_lag_behind_boundary_grows_until_a_run_advances_the_checkpoint():
+    clock = _Clock()
+    errors = []
+    service = _FakeService(clock, statuses=["succeeded", "failed", "error"])
+    daemon = ArchiveDaemon(
+        service, 60, clock=clock, wait=clock.wait, on_error=errors.append
+    )
+
+    daemon.run_once()
+    assert daemon.lag_seconds() == {"raw": 0.0}
+
+    clock.now += timedelta(minutes=10)
+    daemon.run_once()
+    assert daemon.lag_seconds() == {"raw": 300.0}
+
+    clock.now += timedelta(minutes=10)
+    daemon.run_once()
+    assert daemon.lag_seconds() == {"raw": 900.0}
+    assert [str(error) for error in errors] == ["database unavailable"]
+    metrics = daemon.render_metrics()
+    assert 'archive_domain_lag_behind_boundary_seconds{dataset="raw"} 900' in metrics
+    assert 'archive_domain_runs_total{status="failed"} 2' in metrics
+
+
+def test_lag_is_kept_when_another_worker_finalizes_the_run():
+    clock = _Clock()
+    service = _FakeService(clock)
+    daemon = ArchiveDaemon(service, 60, clock=clock, wait=clock.wait)
+
+    daemon.run_once()
+    assert daemon.lag_seconds() == {"raw": 0.0}
+
+    clock.now += timedelta(minutes=10)
+    service.finalizing = False
+    result = daemon.run_once()
+
+    assert result.manifest_object_name is None
+    assert daemon.runs == {"succeeded": 2, "failed": 0}
+    assert daemon.lag_seconds() == {"raw": 600.0}
+
+
+def test_serve_metrics_exposes_the_rendered_text():
+    server = serve_metrics(lambda: "archive_domain_skipped_runs_total 3\n", 0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+
+    assert body == "archive_domain_skipped_runs_total 3\n"
+
+
+def test_serve_command_reuses_one_service_for_every_run(monkeypatch):
+    clock = _Clock()
+    service = _FakeService(clock)
+    built = []
+
+    def build_service(*_args, **kwargs):
+        built.append(kwargs)
+        return service
+
+    monkeypatch.setattr("archive_domain.cli.build_service", build_service)
+    monkeypatch.setattr(
+        "archive_domain.cli.ArchiveDaemon",
+        lambda *args, **kwargs: ArchiveDaemon(
+            *args, clock=clock, wait=clock.wait, **kwargs
+        ),
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        ["serve", "--datasets", "raw", "--interval-seconds", "30", "--max-runs", "2"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert len(built) == 1
+    assert built[0]["retention_ttl_seconds"] == 3600
+    assert len(service.started) == 2
+    assert service.started[0][1]["mode"] == "sql"
+    assert "Run 20260408T120000Z: raw=succeeded; checkpoint advanced: yes" in (
+        result.output
+    )
+    assert service.closed
@@ -1,17 +1,31 @@
-from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
 
+from archive_domain import db
 from archive_domain.config import (
     ArchiveConfig,
+    BulkExportConfig,
     DatabaseConfig,
     IotConfig,
     ObjectStorageConfig,
+    SqlExportConfig,
 )
 from archive_domain.db import choose_execution_mode
-from archive_domain.executor import LiveArchiveExecutor
-from archive_domain.models import DatasetPlan
+from archive_domain.executor import (
+    LiveArchiveExecutor,
+    PartialExportError,
+    _encode_record,
+    _encode_record_chunks,
+)
+from archive_domain.models import DatasetPlan, ScheduledExport
+from archive_domain.object_storage import ObjectStorageStateStore
+from archive_domain.service import ArchiveService
 
 
 def test_choose_execution_mode_uses_sql_when_bulk_mode_is_unavailable():
@@ -94,6 +108,34 @@ class _FakeConnection:
         return _FakeCursor()
 
 
+class _ListingObjectStorageClient:
+    def __init__(self, objects=()):
+        self.objects = list(objects)
+        self.prefixes = []
+
+    def list_objects(self, namespace_name, bucket_name, prefix, fields, start=None):
+        self.prefixes.append(prefix)
+        return SimpleNamespace(
+            data=SimpleNamespace(
+                objects=[item for item in self.objects if item.name.startswith(prefix)],
+                next_start_with=None,
+            )
+        )
+
+
+class _FakePool:
+    def __init__(self):
+        self.acquired = 0
+        self.closed = False
+
+    def acquire(self):
+        self.acquired += 1
+        return _FakeConnection()
+
+    def close(self):
+        self.closed = True
+
+
 def test_execute_dataset_bulk_uses_parquet_for_bronze_datasets(monkeypatch):
     captured = []
 
@@ -114,19 +156,14 @@ def test_execute_dataset_bulk_uses_parquet_for_bronze_datasets(monkeypatch):
         "archive_domain.executor.build_bulk_export_request",
         fake_build_bulk_export_request,
     )
-    monkeypatch.setattr(
-        "archive_domain.executor.connect", lambda _cfg: _FakeConnection()
-    )
-    monkeypatch.setattr(
-        "archive_domain.executor.set_current_schema", lambda *_args, **_kwargs: None
-    )
+    monkeypatch.setattr("archive_domain.executor.create_pool", lambda _cfg: _FakePool())
     monkeypatch.setattr(
         "archive_domain.executor.execute_statement", lambda *_args, **_kwargs: None
     )
 
     executor = LiveArchiveExecutor(
         config=_build_config(export_format="parquet"),
-        object_storage_client=SimpleNamespace(),
+        object_storage_client=_ListingObjectStorageClient(),
         namespace="sample-ns",
         region="us-phoenix-1",
     )
@@ -209,3 +246,580 @@ def test_execute_dataset_sql_mode_rejects_datapump():
             object_prefix="archive-root/raw",
             export_format="datapump",
         )
+
+
+def test_executor_creates_one_pool_for_all_datasets(monkeypatch):
+    pools = []
+
+    def fake_create_pool(_cfg):
+        pools.append(_FakePool())
+        return pools[-1]
+
+    monkeypatch.setattr("archive_domain.executor.create_pool", fake_create_pool)
+    monkeypatch.setattr(
+        "archive_domain.executor.execute_statement", lambda *_args, **_kwargs: None
+    )
+    executor = LiveArchiveExecutor(
+        config=_build_config(export_format="parquet"),
+        object_storage_client=_ListingObjectStorageClient(),
+        namespace="sample-ns",
+        region="us-phoenix-1",
+    )
+
+    for dataset in ("raw", "historized", "rejected"):
+        executor.execute_dataset(
+            dataset=dataset,
+            dataset_plan=_build_dataset_plan(dataset, 16, "time_received"),
+            mode="bulk",
+            object_prefix=f"archive-root/{dataset}",
+            export_format="parquet",
+        )
+    executor.close()
+
+    assert len(pools) == 1
+    assert pools[0].acquired == 3
+    assert pools[0].closed is True
+
+
+def test_create_pool_sets_iot_schema_in_session_callback(monkeypatch):
+    captured = {}
+    fake_oracledb = SimpleNamespace(
+        POOL_GETMODE_WAIT="wait",
+        create_pool=lambda **kwargs: captured.update(kwargs) or "pool",
+    )
+    monkeypatch.setattr(db, "_import_oracledb", lambda: fake_oracledb)
+    statements = []
+
+    class _SchemaCursor(_FakeCursor):
+        def execute(self, statement):
+            statements.append(statement)
+
+    class _SchemaConnection(_FakeConnection):
+        def cursor(self):
+            return _SchemaCursor()
+
+    pool = db.create_pool(_build_config().database)
+    captured["session_callback"](_SchemaConnection(), None)
+
+    assert pool == "pool"
+    assert captured["max"] == 8
+    assert captured["extra_auth_params"]["profile"] == "DEFAULT"
+    assert statements == ["alter session set current_schema = sample__iot"]
+
+
+def test_thick_mode_initializes_oracle_client_once(monkeypatch):
+    calls = []
+    fake_oracledb = SimpleNamespace(
+        init_oracle_client=lambda **kwargs: calls.append(kwargs),
+        connect=lambda **kwargs: kwargs,
+    )
+    monkeypatch.setattr(db, "_import_oracledb", lambda: fake_oracledb)
+    monkeypatch.setattr(db, "_oracle_client_initialized", False)
+    database_config = replace(_build_config().database, thick_mode=True)
+
+    db.connect(database_config)
+    connect_kwargs = db.connect(database_config)
+
+    assert len(calls) == 1
+    assert connect_kwargs["externalauth"] is True
+
+
+class _RowCursor(_FakeCursor):
+    description = (("ID",), ("PAYLOAD",))
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.arraysize = 100
+
+    def execute(self, _statement, _binds):
+        pass
+
+    def fetchmany(self):
+        batch, self.rows = self.rows[: self.arraysize], self.rows[self.arraysize :]
+        return batch
+
+
+class _RowConnection(_FakeConnection):
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return _RowCursor(self.rows)
+
+
+class _RecordingObjectStorageClient:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, namespace_name, bucket_name, object_name, put_object_body):
+        self.objects[object_name] = put_object_body
+
+
+def test_execute_sql_streams_rows_into_compressed_parts(monkeypatch):
+    rows = [(index, b"\x00\x01") for index in range(25)]
+    pool = SimpleNamespace(acquire=lambda: _RowConnection(rows), close=lambda: None)
+    monkeypatch.setattr("archive_domain.executor.create_pool", lambda _cfg: pool)
+    client = _RecordingObjectStorageClient()
+    config = replace(
+        _build_config(),
+        sql_export=SqlExportConfig(fetch_rows=10, part_size_mb=1),
+    )
+    executor = LiveArchiveExecutor(
+        config=config,
+        object_storage_client=client,
+        namespace="sample-ns",
+        region="us-phoenix-1",
+    )
+
+    result = executor.execute_dataset(
+        dataset="raw",
+        dataset_plan=_build_dataset_plan("raw", 16, "time_received"),
+        mode="sql",
+        object_prefix="archive-root/raw",
+        export_format="parquet",
+    )
+
+    assert result.object_names == ("archive-root/raw/part-00000.jsonl.gz",)
+    lines = gzip.decompress(client.objects[result.object_names[0]]).splitlines()
+    assert len(lines) == 25
+    assert json.loads(lines[0]) == {
+        "id": 0,
+        "payload": {"data": "AAE=", "encoding": "base64"},
+    }
+    assert result.stage_metrics[0].items == 25
+    assert result.row_count == 25
+    (part,) = result.parts
+    assert part.object_name == "archive-root/raw/part-00000.jsonl.gz"
+    assert part.rows == 25
+    assert part.compressed_bytes == result.compressed_bytes
+    assert part.uncompressed_bytes == result.uncompressed_bytes
+    assert part.sha256 == hashlib.sha256(client.objects[part.object_name]).hexdigest()
+
+
+class _FakeLob:
+    def __init__(self, value, type_name):
+        self.value = value
+        self.type = SimpleNamespace(name=type_name)
+        self.reads = []
+
+    def size(self):
+        return len(self.value)
+
+    def read(self, offset=1, amount=None):
+        self.reads.append(amount)
+        if amount is None:
+            return self.value
+        return self.value[offset - 1 : offset - 1 + amount]
+
+
+def test_encode_record_chunks_streams_large_lobs_in_bounded_reads():
+    blob = _FakeLob(bytes(range(256)) * 40 + b"\x07", "DB_TYPE_BLOB")
+    clob = _FakeLob('{"note": "caf\u00e9"}\n' * 300, "DB_TYPE_CLOB")
+    small = _FakeLob(b"\x00\x01", "DB_TYPE_BLOB")
+    columns = ["id", "content", "payload", "small"]
+
+    chunks = list(
+        _encode_record_chunks(columns, (7, clob, blob, small), chunk_size=1000)
+    )
+
+    assert len(chunks) > 10
+    assert max(len(chunk) for chunk in chunks) < 2000
+    assert set(blob.reads[:-1]) == set(clob.reads[:-1]) == {1000}
+    assert small.reads == [None]
+    whole = (7, clob.value, blob.value, small.value)
+    assert b"".join(chunks) == _encode_record(columns, whole)
+    assert _encode_record_chunks(columns, whole) == _encode_record(columns, whole)
+
+
+class _KeysetCursor(_FakeCursor):
+    description = (("ID",), ("TIME_RECEIVED",))
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.arraysize = 100
+        self.executions = []
+        self.page = []
+
+    def execute(self, statement, binds):
+        self.executions.append((statement, dict(binds)))
+        remaining = [
+            row
+            for row in self.rows
+            if "last_id" not in binds
+            or (row[1], row[0]) > (binds["last_time"], binds["last_id"])
+        ]
+        self.page = remaining[: binds["page_rows"]]
+
+    def fetchmany(self):
+        batch, self.page = self.page[: self.arraysize], self.page[self.arraysize :]
+        return batch
+
+
+def _keyset_executor(monkeypatch, cursor, client, **sql_export):
+    connection = _FakeConnection()
+    connection.cursor = lambda: cursor
+    pool = SimpleNamespace(acquire=lambda: connection, close=lambda: None)
+    monkeypatch.setattr("archive_domain.executor.create_pool", lambda _cfg: pool)
+    config = replace(
+        _build_config(),
+        sql_export=SqlExportConfig(paging="keyset", **sql_export),
+    )
+    return LiveArchiveExecutor(
+        config=config,
+        object_storage_client=client,
+        namespace="sample-ns",
+        region="us-phoenix-1",
+    )
+
+
+def test_execute_sql_keyset_paging_restarts_after_last_key(monkeypatch):
+    start = datetime(2026, 4, 1, tzinfo=timezone.utc)
+    rows = [(index, start + timedelta(seconds=index // 2)) for index in range(25)]
+    cursor = _KeysetCursor(rows)
+    client = _RecordingObjectStorageClient()
+    executor = _keyset_executor(monkeypatch, cursor, client, fetch_rows=4, page_rows=10)
+
+    result = executor.execute_dataset(
+        dataset="raw",
+        dataset_plan=_build_dataset_plan("raw", 16, "time_received"),
+        mode="sql",
+        object_prefix="archive-root/raw",
+        export_format="parquet",
+    )
+
+    lines = gzip.decompress(client.objects[result.object_names[0]]).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(25))
+    assert len(cursor.executions) == 3
+    assert "last_id" not in cursor.executions[0][1]
+    assert cursor.executions[1][1]["last_id"] == 9
+    assert cursor.executions[1][1]["last_time"] == start + timedelta(seconds=4)
+    assert "fetch first :page_rows rows only" in cursor.executions[2][0]
+
+
+def test_execute_sql_keyset_resumes_after_plan_id(monkeypatch):
+    plan = _build_dataset_plan("raw", 16, "time_received")
+    rows = [(index, plan.window_start) for index in range(5)]
+    cursor = _KeysetCursor(rows)
+    client = _RecordingObjectStorageClient()
+    executor = _keyset_executor(monkeypatch, cursor, client)
+
+    result = executor.execute_dataset(
+        dataset="raw",
+        dataset_plan=replace(plan, resume_after_id=2),
+        mode="sql",
+        object_prefix="archive-root/raw",
+        export_format="parquet",
+    )
+
+    lines = gzip.decompress(client.objects[result.object_names[0]]).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [3, 4]
+    assert cursor.executions[0][1]["last_time"] == plan.window_start
+
+
+def test_execute_sql_reports_uploaded_parts_on_partial_failure(monkeypatch):
+    start = datetime(2026, 4, 1, tzinfo=timezone.utc)
+    rows = [(index, start + timedelta(seconds=index)) for index in range(50)]
+    cursor = _KeysetCursor(rows)
+
+    class _FailingClient(_RecordingObjectStorageClient):
+        def put_object(self, namespace_name, bucket_name, object_name, put_object_body):
+            if len(self.objects) == 2:
+                raise RuntimeError("simulated upload failure")
+            super().put_object(
+                namespace_name, bucket_name, object_name, put_object_body
+            )
+
+    client = _FailingClient()
+    executor = _keyset_executor(monkeypatch, cursor, client, fetch_rows=5)
+    executor.config = replace(
+        executor.config,
+        sql_export=replace(executor.config.sql_export, part_size_mb=0),
+    )
+
+    with pytest.raises(PartialExportError) as excinfo:
+        executor.execute_dataset(
+            dataset="raw",
+            dataset_plan=_build_dataset_plan("raw", 16, "time_received"),
+            mode="sql",
+            object_prefix="archive-root/raw",
+            export_format="parquet",
+        )
+
+    assert excinfo.value.object_names == (
+        "archive-root/raw/part-00000.jsonl.gz",
+        "archive-root/raw/part-00001.jsonl.gz",
+    )
+    assert excinfo.value.resume_key == (start + timedelta(seconds=1), 1)
+
+
+class _NaiveTimeKeysetCursor(_KeysetCursor):
+    """Return naive time values, as python-oracledb does for TIMESTAMP columns."""
+
+    def execute(self, statement, binds):
+        self.executions.append((statement, dict(binds)))
+
+        def key(row):
+            return row[1].replace(tzinfo=timezone.utc), row[0]
+
+        remaining = [
+            row
+            for row in self.rows
+            if binds["window_start"] <= key(row)[0] < binds["window_end"]
+            and (
+                "last_id" not in binds
+                or key(row) > (binds["last_time"], binds["last_id"])
+            )
+        ]
+        self.page = remaining[: binds["page_rows"]]
+
+
+class _ObjectNotFoundError(Exception):
+    status = 404
+
+
+class _StateObjectStorageClient(_RecordingObjectStorageClient):
+    def __init__(self):
+        super().__init__()
+        self.failing_suffix = None
+
+    def put_object(
+        self, namespace_name, bucket_name, object_name, put_object_body, **_condition
+    ):
+        if self.failing_suffix and object_name.endswith(self.failing_suffix):
+            raise RuntimeError("simulated upload failure")
+        self.objects[object_name] = put_object_body
+        return SimpleNamespace(headers={"etag": str(len(self.objects))})
+
+    def get_object(self, namespace_name, bucket_name, object_name):
+        if object_name not in self.objects:
+            raise _ObjectNotFoundError(object_name)
+        return SimpleNamespace(
+            data=SimpleNamespace(content=self.objects[object_name]), headers={}
+        )
+
+
+def test_sql_rerun_resumes_after_a_partial_export_of_naive_db_times(monkeypatch):
+    start = datetime(2026, 3, 22, 13, 0)
+    cursor = _NaiveTimeKeysetCursor(
+        [(index, start + timedelta(seconds=index)) for index in range(10)]
+    )
+    client = _StateObjectStorageClient()
+    executor = _keyset_executor(
+        monkeypatch, cursor, client, fetch_rows=5, part_size_mb=0
+    )
+    now = [datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)]
+    service = ArchiveService(
+        config=executor.config,
+        retention_lookup=SimpleNamespace(
+            get_retention_days=lambda: {"raw": 16, "historized": 30, "rejected": 16}
+        ),
+        state_store=ObjectStorageStateStore(client, "sample-ns", "archive-bucket"),
+        executor=executor,
+        clock=lambda: now[0],
+    )
+
+    client.failing_suffix = "/part-00002.jsonl.gz"
+    failed = service.run(datasets="raw", mode="sql")
+    client.failing_suffix = None
+    now[0] += timedelta(seconds=1)
+    resumed = service.run(datasets="raw", mode="sql")
+
+    assert failed.dataset_results[0].status == "failed"
+    assert resumed.dataset_results[0].status == "succeeded"
+    assert cursor.executions[-1][1]["last_id"] == 1
+    assert cursor.executions[-1][1]["last_time"] == datetime(
+        2026, 3, 22, 13, 0, 1, tzinfo=timezone.utc
+    )
+    exported = [
+        json.loads(line)["id"]
+        for name in resumed.dataset_results[0].object_names
+        for line in gzip.decompress(client.objects[name]).splitlines()
+    ]
+    assert exported == list(range(10))
+
+
+class _ScriptedCursor(_FakeCursor):
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    def execute(self, statement, _binds):
+        self.statements.append(statement)
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+
+def _estimating_executor(monkeypatch, cursor):
+    connection = _FakeConnection()
+    connection.cursor = lambda: cursor
+    pool = SimpleNamespace(acquire=lambda: connection, close=lambda: None)
+    monkeypatch.setattr("archive_domain.executor.create_pool", lambda _cfg: pool)
+    return LiveArchiveExecutor(
+        config=_build_config(),
+        object_storage_client=_ListingObjectStorageClient(),
+        namespace="sample-ns",
+        region="us-phoenix-1",
+    )
+
+
+def test_estimate_dataset_scales_optimizer_stats_to_the_window(monkeypatch):
+    table_start = datetime(2026, 3, 1)
+    cursor = _ScriptedCursor(
+        [(1000, 250), (table_start, datetime(2026, 3, 11))],
+    )
+    executor = _estimating_executor(monkeypatch, cursor)
+    plan = replace(
+        _build_dataset_plan("raw", 16, "time_received"),
+        window_start=datetime(2026, 3, 1, tzinfo=timezone.utc),
+        window_end=datetime(2026, 3, 2, tzinfo=timezone.utc),
+    )
+
+    assert executor.estimate_dataset("raw", plan, "stats") == (100, 250, "stats")
+    assert "user_tables" in cursor.statements[0]
+    assert "min(time_received)" in cursor.statements[1]
+
+
+def test_estimate_dataset_counts_rows_when_the_table_has_no_stats(monkeypatch):
+    cursor = _ScriptedCursor([(None, None), (42,)])
+    executor = _estimating_executor(monkeypatch, cursor)
+
+    assert executor.estimate_dataset(
+        "raw", _build_dataset_plan("raw", 16, "time_received"), "stats"
+    ) == (42, None, "count")
+    assert "count(*)" in cursor.statements[1]
+
+
+class _SchedulerCursor(_FakeCursor):
+    def __init__(self, run_details=()):
+        self.run_details = list(run_details)
+        self.executions = []
+
+    def execute(self, statement, binds):
+        self.executions.append((statement, dict(binds)))
+
+    def fetchall(self):
+        return self.run_details
+
+
+def test_submit_bulk_creates_a_scheduler_job_with_an_inlined_export_block(
+    monkeypatch,
+):
+    cursor = _SchedulerCursor()
+    executor = _estimating_executor(monkeypatch, cursor)
+    executor.config = replace(
+        executor.config, bulk_export=BulkExportConfig(submission="scheduler")
+    )
+
+    job = executor.submit_bulk(
+        "raw",
+        _build_dataset_plan("raw", 16, "time_received"),
+        "archive-root/raw",
+        "parquet",
+    )
+
+    assert executor.uses_scheduled_bulk("bulk") is True
+    assert executor.uses_scheduled_bulk("sql") is False
+    statement, binds = cursor.executions[0]
+    assert "dbms_scheduler.create_job" in statement
+    assert binds["job_name"] == job.job_name
+    assert job.job_name.startswith("ARCHIVE_DOMAIN_")
+    assert "credential_name => 'ARCHIVE_CRED'" in binds["job_action"]
+    assert "json_object('type' value 'parquet')" in binds["job_action"]
+    assert "like ''text/%''" in binds["job_action"]
+    assert ":window_start" not in binds["job_action"]
+    assert "sys_context('userenv', 'session_user') || '.' || :job_name" in statement
+
+
+def test_scheduler_job_action_sets_the_iot_schema_before_exporting(monkeypatch):
+    cursor = _SchedulerCursor()
+    executor = _estimating_executor(monkeypatch, cursor)
+    executor.config = replace(
+        executor.config, bulk_export=BulkExportConfig(submission="scheduler")
+    )
+
+    executor.submit_bulk(
+        "raw",
+        _build_dataset_plan("raw", 16, "time_received"),
+        "archive-root/raw",
+        "parquet",
+    )
+
+    action = cursor.executions[0][1]["job_action"]
+    schema_switch = action.index(
+        "execute immediate 'alter session set current_schema = '\n"
+        "            || dbms_assert.schema_name('SAMPLE__IOT');"
+    )
+    assert schema_switch < action.index("dbms_cloud.export_data(")
+
+
+def test_poll_bulk_collects_finished_jobs_and_drops_them(monkeypatch):
+    cursor = _SchedulerCursor(
+        [("JOB_A", "SUCCEEDED", None), ("JOB_B", "FAILED", "ORA-20401: denied")]
+    )
+    executor = _estimating_executor(monkeypatch, cursor)
+    jobs = [
+        ScheduledExport("JOB_A", "raw", "archive-root/raw", "parquet"),
+        ScheduledExport("JOB_B", "rejected", "archive-root/rejected", "parquet"),
+        ScheduledExport("JOB_C", "historized", "archive-root/historized", "parquet"),
+    ]
+
+    results = executor.poll_bulk(jobs)
+
+    assert set(results) == {"JOB_A", "JOB_B"}
+    assert results["JOB_A"].status == "succeeded"
+    assert results["JOB_B"].status == "failed"
+    assert results["JOB_B"].error_message == "ORA-20401: denied"
+    assert "from all_scheduler_job_run_details" in cursor.executions[0][0]
+    assert "owner = sys_context('userenv', 'session_user')" in cursor.executions[0][0]
+    assert cursor.executions[0][1] == {
+        "job_0": "JOB_A",
+        "job_1": "JOB_B",
+        "job_2": "JOB_C",
+    }
+    assert [binds for _statement, binds in cursor.executions[1:]] == [
+        {"job_name": "JOB_A"},
+        {"job_name": "JOB_B"},
+    ]
+
+    executor.stop_bulk(jobs[2:])
+
+    assert "force => true" in cursor.executions[-1][0]
+    assert cursor.executions[-1][1] == {"job_name": "JOB_C"}
+
+
+def test_bulk_export_lists_written_objects_with_sizes_and_md5(monkeypatch):
+    monkeypatch.setattr("archive_domain.executor.create_pool", lambda _cfg: _FakePool())
+    monkeypatch.setattr(
+        "archive_domain.executor.execute_statement", lambda *_args, **_kwargs: None
+    )
+    client = _ListingObjectStorageClient(
+        [
+            SimpleNamespace(name="archive-root/raw/raw_1.parquet", size=100, md5="a=="),
+            SimpleNamespace(name="archive-root/raw/raw_2.parquet", size=50, md5="b=="),
+            SimpleNamespace(name="archive-root/rawer/x.parquet", size=7, md5="c=="),
+        ]
+    )
+    executor = LiveArchiveExecutor(
+        config=_build_config(),
+        object_storage_client=client,
+        namespace="sample-ns",
+        region="us-phoenix-1",
+    )
+
+    result = executor.execute_dataset(
+        dataset="raw",
+        dataset_plan=_build_dataset_plan("raw", 16, "time_received"),
+        mode="bulk",
+        object_prefix="archive-root/raw",
+        export_format="parquet",
+    )
+
+    assert client.prefixes == ["archive-root/raw/"]
+    assert result.object_names == (
+        "archive-root/raw/raw_1.parquet",
+        "archive-root/raw/raw_2.parquet",
+    )
+    assert result.compressed_bytes == 150
+    assert [part.md5 for part in result.parts] == ["a==", "b=="]
+    assert result.row_count is None
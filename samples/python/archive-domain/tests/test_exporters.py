@@ -5,7 +5,12 @@ from archive_domain.exporters import (
     build_bulk_export_request,
     export_format_for_dataset,
 )
-from archive_domain.sql import build_dataset_query
+from archive_domain.sql import (
+    build_dataset_query,
+    build_id_page_query,
+    build_keyset_page_query,
+    build_row_count_query,
+)
 
 
 def test_export_format_for_dataset_uses_configured_run_format():
@@ -59,6 +64,20 @@ def test_parquet_raw_and_rejected_queries_project_blob_content_as_json():
     assert "blobToJson" not in rejected_query.sql_text
 
 
+def test_parquet_blob_content_is_classified_once_per_row():
+    window_start = datetime(2026, 4, 1, 0, 0, tzinfo=timezone.utc)
+    window_end = datetime(2026, 4, 2, 0, 0, tzinfo=timezone.utc)
+
+    for dataset in ("raw", "rejected"):
+        sql_text = build_dataset_query(dataset, window_start, window_end).sql_text
+
+        assert sql_text.count("dbms_lob.substr(") == 1
+        assert sql_text.count(" is json strict") == 1
+        assert f"from {dataset}_data src,\n            lateral (" in sql_text
+        assert "cls.content_encoding,\n" in sql_text
+        assert "case cls.content_encoding when 'text' then 'json-string'" in sql_text
+
+
 def test_parquet_blob_content_conversion_does_not_require_domain_short_name():
     window_start = datetime(2026, 4, 1, 0, 0, tzinfo=timezone.utc)
     window_end = datetime(2026, 4, 2, 0, 0, tzinfo=timezone.utc)
@@ -142,6 +161,62 @@ def test_bulk_export_request_inlines_window_literals_for_dbms_cloud():
     assert "blobToJson" not in binds["query_text"]
 
 
+def test_keyset_page_query_expands_the_time_and_id_key_predicate():
+    first_page = build_keyset_page_query("historized")
+    next_page = build_keyset_page_query("historized", after_key=True)
+
+    assert "last_id" not in first_page
+    assert first_page.endswith(
+        "order by time_observed, id\n            fetch first :page_rows rows only"
+    )
+    assert (
+        "and (time_observed > :last_time\n"
+        "                   or (time_observed = :last_time and id > :last_id))"
+    ) in next_page
+
+
+def test_dataset_query_resume_skips_exported_ids_at_window_start():
+    window_start = datetime(2026, 4, 1, 0, 0, tzinfo=timezone.utc)
+    window_end = datetime(2026, 4, 2, 0, 0, tzinfo=timezone.utc)
+
+    query = build_dataset_query("raw", window_start, window_end, after_id=42)
+
+    assert "and (time_received > :window_start or id > :after_id)" in query.sql_text
+    assert query.binds["after_id"] == 42
+
+    count_query = build_row_count_query("raw", window_start, window_end, after_id=42)
+    assert "and (time_received > :window_start or id > :after_id)" in (
+        count_query.sql_text
+    )
+    assert count_query.binds["after_id"] == 42
+
+
+def test_incremental_queries_read_an_id_range_in_primary_key_order():
+    window_start = datetime(2026, 4, 1, 0, 0, tzinfo=timezone.utc)
+    window_end = datetime(2026, 4, 2, 0, 0, tzinfo=timezone.utc)
+
+    query = build_dataset_query(
+        "raw", window_start, window_end, after_id=42, through_id=90
+    )
+    first_query = build_dataset_query("raw", window_start, window_end, through_id=90)
+
+    assert query.sql_text.endswith(
+        "where id > :after_id\n              and id <= :through_id\n"
+        "            order by id"
+    )
+    assert query.binds == {"after_id": 42, "through_id": 90}
+    assert "where time_received >= :window_start\n" in first_query.sql_text
+    assert first_query.binds == {"through_id": 90, "window_start": window_start}
+    count_query = build_row_count_query(
+        "raw", window_start, window_end, after_id=42, through_id=90
+    )
+    assert count_query.binds == query.binds
+    assert "and id > :last_id" not in build_id_page_query("raw")
+    assert "and time_received >= :window_start" in build_id_page_query(
+        "raw", from_window_start=True
+    )
+
+
 def test_sql_sample_uses_public_blob_to_json_api():
     sample_root = Path(__file__).resolve().parents[3]
     sql_package = (
@@ -167,6 +242,19 @@ def test_sql_sample_does_not_gate_datapump_availability():
     assert "datapump export format requires exactly one dataset per run" in sql_package
 
 
+def test_sql_sample_exports_parallel_run_chunks_through_dbms_parallel_execute():
+    sample_root = Path(__file__).resolve().parents[3] / "sql" / "archive-domain"
+    sql_package = (sample_root / "archive_domain_pkg.sql").read_text()
+    sql_tables = (sample_root / "archive_domain_tables.sql").read_text()
+    sql_teardown = (sample_root / "teardown.sql").read_text()
+
+    assert "procedure run_parallel(" in sql_package
+    assert "dbms_parallel_execute.run_task(" in sql_package
+    assert "archive_domain_pkg.export_chunk(" in sql_package
+    assert "create table archive_domain_run_chunks" in sql_tables
+    assert "drop table archive_domain_run_chunks" in sql_teardown
+
+
 def test_sql_sample_documents_datapump_one_dataset_rule_and_sql_loader_dependency():
     sample_root = Path(__file__).resolve().parents[3]
     sql_readme = (sample_root / "sql" / "archive-domain" / "README.md").read_text()
@@ -0,0 +1,360 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from archive_domain.config import (
+    ArchiveConfig,
+    DatabaseConfig,
+    IotConfig,
+    ObjectStorageConfig,
+)
+from archive_domain.leases import LeaseManager, archive_plan_payload
+from archive_domain.models import DatasetResult
+from archive_domain.object_storage import ObjectStorageStateStore
+from archive_domain.service import ArchiveService
+
+
+class _FakeObjectStorageError(Exception):
+    def __init__(self, status):
+        super().__init__("simulated object storage error")
+        self.status = status
+
+
+class _FakeResponse:
+    def __init__(self, content=None, etag=None):
+        self.data = type("Data", (), {"content": content})()
+        self.headers = {"etag": etag}
+
+
+class _ConditionalBucket:
+    def __init__(self):
+        self.objects = {}
+        self.writes = 0
+
+    def get_object(self, namespace_name, bucket_name, object_name, range=None, **_):
+        if object_name not in self.objects:
+            raise _FakeObjectStorageError(404)
+        body, etag = self.objects[object_name]
+        if range is not None:
+            first, last = (int(item) for item in range[6:].split("-"))
+            body = body[first : last + 1]
+        return _FakeResponse(body, etag)
+
+    def put_object(
+        self,
+        namespace_name,
+        bucket_name,
+        object_name,
+        put_object_body,
+        if_match=None,
+        if_none_match=None,
+    ):
+        current = self.objects.get(object_name)
+        if if_none_match == "*" and current is not None:
+            raise _FakeObjectStorageError(412)
+        if if_match is not None and (current is None or current[1] != if_match):
+            raise _FakeObjectStorageError(412)
+        self.writes += 1
+        etag = f"etag-{self.writes}"
+        self.objects[object_name] = (put_object_body, etag)
+        return _FakeResponse(etag=etag)
+
+    def json(self, object_name):
+        return json.loads(self.objects[object_name][0])
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class _StaticRetentionLookup:
+    def get_retention_days(self):
+        return {"raw": 16, "historized": 30, "rejected": 16}
+
+
+class _RecordingExecutor:
+    def __init__(self):
+        self.windows = []
+
+    def execute_dataset(
+        self, dataset, dataset_plan, mode, object_prefix, export_format
+    ):
+        self.windows.append((dataset_plan.window_start, dataset_plan.window_end))
+        return DatasetResult(
+            name=dataset,
+            status="succeeded",
+            export_mode=mode,
+            export_format=export_format,
+            object_prefix=object_prefix,
+            object_names=(f"{object_prefix}/part-00000.jsonl.gz",),
+            row_count=10,
+        )
+
+
+def _config():
+    return ArchiveConfig(
+        iot=IotConfig(
+            domain_id="ocid1.iotdomain.oc1..exampleuniqueID",
+            retention_days={"raw": 16, "historized": 30, "rejected": 16},
+            bootstrap_lookback_days=1,
+        ),
+        database=DatabaseConfig(
+            connect_string="tcps:adb.example.com:1522/archive_high",
+            token_scope="urn:oracle:db::id::*",
+            iot_domain_short_name="sample",
+            auth_type="SecurityToken",
+            profile="DEFAULT",
+            thick_mode=False,
+            lib_dir=None,
+            dbms_cloud_credential_name=None,
+        ),
+        object_storage=ObjectStorageConfig(
+            namespace="sample-ns",
+            bucket_name="archive-bucket",
+            prefix="archive-root",
+            manifest_prefix="_manifests",
+            checkpoint_object="_state/checkpoint.json",
+        ),
+    )
+
+
+def _worker(bucket, clock, executor):
+    return ArchiveService(
+        config=_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=ObjectStorageStateStore(bucket, "sample-ns", "archive-bucket"),
+        executor=executor,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+def _leases(bucket, clock, worker_id):
+    return LeaseManager(
+        ObjectStorageStateStore(bucket, "sample-ns", "archive-bucket"),
+        "_state/work",
+        worker_id,
+        lease_seconds=60,
+        clock=clock,
+    )
+
+
+def test_live_leases_block_other_workers_until_they_expire():
+    bucket = _ConditionalBucket()
+    clock = _Clock(datetime(2026, 4, 8, 12, tzinfo=timezone.utc))
+    first = _leases(bucket, clock, "host-a")
+    second = _leases(bucket, clock, "host-b")
+
+    lease = first.claim("r1", "raw")
+    assert lease is not None
+    assert second.claim("r1", "raw") is None
+
+    clock.sleep(30)
+    lease = first.renew(lease)
+    clock.sleep(45)
+    assert second.claim("r1", "raw") is None
+
+    clock.sleep(30)
+    taken_over = second.claim("r1", "raw")
+
+    assert taken_over is not None
+    assert first.renew(lease) is None
+    assert first.complete(lease, {"status": "succeeded"}) is False
+    assert second.complete(taken_over, {"status": "succeeded"}) is True
+    assert first.claim("r1", "raw") is None
+    assert first.read("r1", "raw")["owner"] == "host-b"
+
+
+class _FlakyBucket(_ConditionalBucket):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.renewed = threading.Event()
+
+    def put_object(self, **kwargs):
+        if self.objects and self.failures:
+            self.failures -= 1
+            raise _FakeObjectStorageError(503)
+        response = super().put_object(**kwargs)
+        if self.writes > 1:
+            self.renewed.set()
+        return response
+
+
+def _wall_clock():
+    return datetime.now(timezone.utc)
+
+
+def test_hold_retries_failed_renewals_while_the_lease_lasts():
+    bucket = _FlakyBucket(failures=3)
+    leases = _leases(bucket, _wall_clock, "host-a")
+    leases.lease_seconds = 0.6
+    lease = leases.claim("r1", "raw")
+
+    with leases.hold(lease) as held:
+        assert bucket.renewed.wait(timeout=5)
+
+    assert bucket.failures == 0
+    assert not held.lost.is_set()
+    assert held.lease.etag != lease.etag
+
+
+def test_hold_signals_a_lost_lease_when_renewals_fail_until_it_expires():
+    bucket = _FlakyBucket(failures=1_000_000)
+    leases = _leases(bucket, _wall_clock, "host-a")
+    leases.lease_seconds = 0.3
+    lease = leases.claim("r1", "raw")
+
+    with leases.hold(lease) as held:
+        assert held.lost.wait(timeout=5)
+
+    assert held.lease is None
+
+
+def test_conditional_write_without_an_etag_raises():
+    class _NoEtagBucket(_ConditionalBucket):
+        def put_object(self, **kwargs):
+            super().put_object(**kwargs)
+            return _FakeResponse()
+
+    leases = _leases(_NoEtagBucket(), _wall_clock, "host-a")
+
+    with pytest.raises(RuntimeError, match="no ETag"):
+        leases.claim("r1", "raw")
+
+
+def test_later_workers_join_the_open_plan_and_only_one_finalizes():
+    bucket = _ConditionalBucket()
+    clock = _Clock(datetime(2026, 4, 8, 12, tzinfo=timezone.utc))
+    first = _leases(bucket, clock, "host-a")
+    second = _leases(bucket, clock, "host-b")
+
+    def build(run_id):
+        return lambda: {"run_id": run_id, "plan": {}}
+
+    shared = first.join_plan(None, build("r1"))
+    joined = second.join_plan(None, build("r2"))
+
+    assert shared["run_id"] == joined["run_id"] == "r1"
+    assert first.finalize_plan("r1", advances_checkpoint=False) is True
+    assert second.finalize_plan("r1", advances_checkpoint=False) is False
+    assert second.join_plan(None, build("r2"))["run_id"] == "r2"
+    assert (
+        second.join_plan("2026-04-08T12:00:00Z", build("r3"))["checkpoint_before"]
+        == "2026-04-08T12:00:00Z"
+    )
+
+
+def test_workers_joining_before_the_checkpoint_is_saved_join_the_finalized_run():
+    bucket = _ConditionalBucket()
+    clock = _Clock(datetime(2026, 4, 8, 12, tzinfo=timezone.utc))
+    first = _leases(bucket, clock, "host-a")
+    late = _leases(bucket, clock, "host-b")
+
+    def build(run_id):
+        return lambda: {"run_id": run_id, "plan": {}}
+
+    first.join_plan(None, build("r1"))
+    assert first.finalize_plan("r1", advances_checkpoint=True) is True
+
+    joined = late.join_plan(None, build("r2"))
+    assert (joined["run_id"], joined["status"]) == ("r1", "finalized")
+    assert late.finalize_plan("r1", advances_checkpoint=True) is False
+
+    # The finalizer never saved its checkpoint, so the run is planned again.
+    clock.sleep(60)
+    assert late.join_plan(None, build("r2"))["run_id"] == "r2"
+
+
+def test_leased_run_takes_over_an_expired_shard_and_advances_checkpoint_once():
+    bucket = _ConditionalBucket()
+    clock = _Clock(datetime(2026, 4, 8, 12, tzinfo=timezone.utc))
+    crashed = _worker(bucket, clock, _RecordingExecutor())
+    plan_result = crashed.plan(datasets="raw", shard_duration=timedelta(hours=12))
+    run_id = plan_result.plan.now.strftime("%Y%m%dT%H%M%SZ")
+    first_lease = _leases(bucket, clock, "host-a")
+    first_lease.join_plan(
+        None,
+        lambda: {
+            "run_id": run_id,
+            "mode": "bulk",
+            "export_format": "parquet",
+            "plan": archive_plan_payload(plan_result.plan),
+        },
+    )
+    assert first_lease.claim(run_id, "raw-00000") is not None
+
+    clock.sleep(30)
+    executor = _RecordingExecutor()
+    result = _worker(bucket, clock, executor).run(
+        datasets="raw",
+        shard_duration=timedelta(hours=12),
+        worker_id="host-b",
+        lease_seconds=300,
+    )
+
+    shards = plan_result.plan.datasets["raw"].shards
+    assert result.run_id == run_id
+    assert sorted(executor.windows) == [
+        (shard.window_start, shard.window_end) for shard in shards
+    ]
+    assert result.checkpoint_advanced is True
+    assert bucket.json("_state/checkpoint.json") == {
+        "last_successful_run_at": "2026-04-08T12:00:00Z"
+    }
+    manifest = bucket.json(result.manifest_object_name)
+    assert manifest["totals"]["row_count"] == 20
+    assert bucket.json("_state/work/plan.json")["finalized_by"] == "host-b"
+    assert all(
+        bucket.json(f"_state/work/run_id={run_id}/unit=raw-0000{index}.json")["owner"]
+        == "host-b"
+        for index in range(2)
+    )
+
+
+def test_leased_run_merges_units_exported_by_other_workers():
+    bucket = _ConditionalBucket()
+    clock = _Clock(datetime(2026, 4, 8, 12, tzinfo=timezone.utc))
+    executor = _RecordingExecutor()
+    worker = _worker(bucket, clock, executor)
+    options = {"datasets": "raw", "shard_duration": timedelta(hours=12)}
+    plan_result = worker.plan(**options)
+    run_id = plan_result.plan.now.strftime("%Y%m%dT%H%M%SZ")
+    other = _leases(bucket, clock, "host-b")
+    other.join_plan(
+        None,
+        lambda: {
+            "run_id": run_id,
+            "mode": "bulk",
+            "export_format": "parquet",
+            "plan": archive_plan_payload(plan_result.plan),
+        },
+    )
+    other.complete(
+        other.claim(run_id, "raw-00001"),
+        {
+            "name": "raw",
+            "status": "succeeded",
+            "object_names": ["other/part-00000.jsonl.gz"],
+            "row_count": 7,
+        },
+    )
+
+    result = worker.run(worker_id="host-a", **options)
+
+    assert len(executor.windows) == 1
+    assert result.dataset_results[0].shards[1].object_names == (
+        "other/part-00000.jsonl.gz",
+    )
+    assert result.dataset_results[0].row_count == 17
+    assert result.checkpoint_advanced is True
+    assert other.finalize_plan(run_id, advances_checkpoint=True) is False
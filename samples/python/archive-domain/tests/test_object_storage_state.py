@@ -1,11 +1,22 @@
 import json
+from dataclasses import replace
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 import pytest
 
+from archive_domain.catalog import add_catalog_entries
+from archive_domain.models import (
+    CatalogEntry,
+    CheckpointState,
+    CompletedWindow,
+    DatasetProgress,
+)
 from archive_domain.object_storage import (
     ObjectStorageStateStore,
     build_dataset_object_prefix,
+    iter_json_members,
+    read_json_members,
     should_advance_checkpoint,
 )
 
@@ -33,6 +44,87 @@ class _FakeObjectStorageClient:
         return self.response
 
 
+class _MemoryObjectStorageClient:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, namespace_name, bucket_name, object_name, put_object_body):
+        self.objects[object_name] = put_object_body
+
+    def get_object(self, namespace_name, bucket_name, object_name):
+        if object_name not in self.objects:
+            raise _FakeObjectStorageError(status=404)
+        return _FakeGetObjectResponse(self.objects[object_name].decode("utf-8"))
+
+
+class _RangedObjectStorageClient(_MemoryObjectStorageClient):
+    def __init__(self):
+        super().__init__()
+        self.ranges = []
+
+    def get_object(self, namespace_name, bucket_name, object_name, range, **_kwargs):
+        if object_name not in self.objects:
+            raise _FakeObjectStorageError(status=404)
+        self.ranges.append(range)
+        first, last = (int(item) for item in range.removeprefix("bytes=").split("-"))
+        return _FakeGetObjectResponse(
+            self.objects[object_name][first : last + 1].decode("utf-8")
+        )
+
+
+def test_iter_json_members_decodes_members_split_across_chunks():
+    document = '{"count": 12345, "name": "caf\u00e9", "items": [1, {"a": null}]}'
+    encoded = document.encode("utf-8")
+    read = []
+
+    def chunks():
+        for index in range(len(encoded)):
+            read.append(index)
+            yield encoded[index : index + 1]
+
+    members = iter_json_members(chunks())
+
+    assert next(members) == ("count", 12345)
+    assert next(members) == ("name", "caf\u00e9")
+    assert len(read) < len(encoded)
+    assert list(members) == [("items", [1, {"a": None}])]
+    assert list(iter_json_members([b" { } "])) == []
+
+
+def test_read_json_members_handles_every_chunk_split_of_a_float_document():
+    document = b'{"a":1.5,"b":-2.25e+3,"c":[0.125,7],"d":true,"e":10}'
+
+    for split in range(1, len(document)):
+        assert read_json_members(
+            [document[:split], document[split:]], ["a", "b", "c", "d", "e"]
+        ) == json.loads(document), split
+
+
+def test_get_json_members_stops_ranged_reads_once_the_keys_are_found():
+    client = _RangedObjectStorageClient()
+    store = ObjectStorageStateStore(client, "sample-ns", "archive-bucket")
+    manifest = {
+        "run_id": "20260408T120000Z",
+        "wall_seconds": 12.5,
+        "dataset_results": [{"name": f"part-{index:05d}"} for index in range(500)],
+    }
+    store.put_json_object("_manifests/run.json", manifest)
+
+    members = store.get_json_members(
+        "_manifests/run.json", ("run_id", "wall_seconds"), first_bytes=32
+    )
+
+    assert client.objects["_manifests/run.json"].startswith(
+        b'{"run_id":"20260408T120000Z","wall_seconds":12.5,'
+    )
+    assert members == {"run_id": "20260408T120000Z", "wall_seconds": 12.5}
+    assert client.ranges == ["bytes=0-31", "bytes=32-95"]
+    assert store.get_json_members(
+        "_manifests/run.json", ("dataset_results",), first_bytes=32
+    ) == {"dataset_results": manifest["dataset_results"]}
+    assert store.get_json_members("_manifests/missing.json", ("run_id",)) is None
+
+
 def test_checkpoint_advances_only_when_all_selected_datasets_succeed():
     statuses = {"raw": "succeeded", "historized": "failed"}
 
@@ -71,6 +163,42 @@ def test_load_checkpoint_returns_empty_state_only_for_not_found():
     assert checkpoint.last_successful_run_at is None
 
 
+def test_checkpoint_round_trips_carried_window_ends():
+    client = _MemoryObjectStorageClient()
+    store = ObjectStorageStateStore(client, "sample-ns", "archive-bucket")
+    run_at = datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)
+    carried = datetime(2026, 3, 22, 18, 0, tzinfo=timezone.utc)
+
+    store.save_checkpoint("_state/plain.json", CheckpointState(run_at))
+    store.save_checkpoint(
+        "_state/checkpoint.json", CheckpointState(run_at, {"raw": carried})
+    )
+
+    assert json.loads(client.objects["_state/plain.json"]) == {
+        "last_successful_run_at": "2026-04-08T12:00:00Z"
+    }
+    assert store.load_checkpoint("_state/checkpoint.json") == CheckpointState(
+        run_at, {"raw": carried}
+    )
+
+
+def test_checkpoint_round_trips_high_water_marks():
+    client = _MemoryObjectStorageClient()
+    store = ObjectStorageStateStore(client, "sample-ns", "archive-bucket")
+    checkpoint = CheckpointState(
+        datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+        high_water_marks={"raw": 1200, "historized": 75},
+    )
+
+    store.save_checkpoint("_state/checkpoint.json", checkpoint)
+
+    assert json.loads(client.objects["_state/checkpoint.json"])["high_water_marks"] == {
+        "historized": 75,
+        "raw": 1200,
+    }
+    assert store.load_checkpoint("_state/checkpoint.json") == checkpoint
+
+
 def test_load_checkpoint_raises_for_non_not_found_errors():
     store = ObjectStorageStateStore(
         client=_FakeObjectStorageClient(exc=_FakeObjectStorageError(status=500)),
@@ -91,3 +219,217 @@ def test_load_checkpoint_raises_for_malformed_json():
 
     with pytest.raises(json.JSONDecodeError):
         store.load_checkpoint("_state/checkpoint.json")
+
+
+def test_progress_round_trips_and_is_ignored_after_checkpoint_moves():
+    store = ObjectStorageStateStore(
+        client=_MemoryObjectStorageClient(),
+        namespace="sample-ns",
+        bucket_name="archive-bucket",
+    )
+    checkpoint = datetime(2026, 4, 7, 12, 0, tzinfo=timezone.utc)
+    progress = DatasetProgress(
+        dataset="raw",
+        checkpoint_before=checkpoint,
+        completed=(
+            CompletedWindow(
+                window_start=datetime(2026, 3, 22, 12, 0, tzinfo=timezone.utc),
+                window_end=datetime(2026, 3, 22, 18, 0, tzinfo=timezone.utc),
+                run_id="run-1",
+                object_prefix="archive-root/raw/shard=00000",
+                object_names=("archive-root/raw/shard=00000/raw_1_1.parquet",),
+            ),
+        ),
+    )
+
+    store.save_progress("_state/progress/dataset=raw.json", progress)
+
+    assert store.load_progress(
+        "_state/progress/dataset=raw.json", "raw", checkpoint
+    ) == (progress)
+    assert (
+        store.load_progress(
+            "_state/progress/dataset=raw.json",
+            "raw",
+            datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+        ).completed
+        == ()
+    )
+    assert should_advance_checkpoint({"raw": "skipped", "historized": "succeeded"})
+
+
+class _ConditionalObjectStorageClient:
+    def __init__(self, conflicts=0):
+        self.objects = {}
+        self.conflicts = conflicts
+        self.conditions = []
+        self.ranges = []
+
+    def get_object(self, namespace_name, bucket_name, object_name, range=None, **_):
+        if object_name not in self.objects:
+            raise _FakeObjectStorageError(status=404)
+        body, etag = self.objects[object_name]
+        if range is not None:
+            self.ranges.append(range)
+            first, last = (int(item) for item in range[6:].split("-"))
+            body = body[first : last + 1]
+        response = _FakeGetObjectResponse(body.decode("utf-8"))
+        response.headers = {"etag": etag}
+        return response
+
+    def put_object(
+        self,
+        namespace_name,
+        bucket_name,
+        object_name,
+        put_object_body,
+        if_match=None,
+        if_none_match=None,
+    ):
+        self.conditions.append((if_match, if_none_match))
+        current = self.objects.get(object_name)
+        if self.conflicts:
+            self.conflicts -= 1
+            self.objects[object_name] = (
+                current[0] if current else b'{"entries": []}',
+                f"etag-{len(self.conditions)}-concurrent",
+            )
+            raise _FakeObjectStorageError(status=412)
+        if if_none_match == "*" and current is not None:
+            raise _FakeObjectStorageError(status=412)
+        if if_match is not None and (current is None or current[1] != if_match):
+            raise _FakeObjectStorageError(status=412)
+        self.objects[object_name] = (put_object_body, f"etag-{len(self.conditions)}")
+        return SimpleNamespace(headers={"etag": f"etag-{len(self.conditions)}"})
+
+
+def _catalog_entry(run_id, hour):
+    return CatalogEntry(
+        dataset="raw",
+        window_start=datetime(2026, 4, 8, hour, tzinfo=timezone.utc),
+        window_end=datetime(2026, 4, 8, hour + 1, tzinfo=timezone.utc),
+        run_id=run_id,
+        object_names=(f"{run_id}/part-00000.jsonl.gz",),
+        row_count=10,
+    )
+
+
+def test_update_catalog_creates_then_conditionally_replaces_the_index():
+    client = _ConditionalObjectStorageClient()
+    store = ObjectStorageStateStore(client, "ns", "bucket")
+
+    store.update_catalog(
+        "_state/catalog.json",
+        lambda entries: add_catalog_entries(entries, [_catalog_entry("r1", 1)]),
+    )
+    store.update_catalog(
+        "_state/catalog.json",
+        lambda entries: add_catalog_entries(entries, [_catalog_entry("r2", 2)]),
+    )
+
+    assert client.conditions == [(None, "*"), ("etag-1", None)]
+    entries = store.load_catalog("_state/catalog.json")
+    assert [entry.run_id for entry in entries] == ["r1", "r2"]
+    assert entries[0] == _catalog_entry("r1", 1)
+
+
+def test_archived_through_is_read_from_the_catalog_summary_with_one_ranged_get():
+    client = _ConditionalObjectStorageClient()
+    store = ObjectStorageStateStore(client, "ns", "bucket")
+    store.update_catalog(
+        "_state/catalog.json",
+        lambda entries: add_catalog_entries(
+            entries, [_catalog_entry(f"r{hour}", hour) for hour in range(1, 20)]
+        ),
+    )
+
+    through = store.load_archived_through("_state/catalog.json")
+
+    assert through == {"raw": _catalog_entry("r19", 19).window_end}
+    assert client.ranges == ["bytes=0-16383"]
+    client.objects["_state/legacy.json"] = (
+        json.dumps(
+            {
+                "entries": [
+                    {
+                        "dataset": "raw",
+                        "window_start": "2026-04-08T01:00:00Z",
+                        "window_end": "2026-04-08T02:00:00Z",
+                        "run_id": "r1",
+                    }
+                ]
+            }
+        ).encode("utf-8"),
+        "etag-legacy",
+    )
+    assert store.load_archived_through("_state/legacy.json") == {
+        "raw": _catalog_entry("r1", 1).window_end
+    }
+    assert store.load_archived_through("_state/missing.json") == {}
+
+
+def test_archived_through_summary_leaves_out_stream_entries():
+    client = _ConditionalObjectStorageClient()
+    store = ObjectStorageStateStore(client, "ns", "bucket")
+    streamed = replace(_catalog_entry("s1", 22), export_mode="stream")
+    store.update_catalog(
+        "_state/catalog.json",
+        lambda entries: add_catalog_entries(
+            entries, [replace(_catalog_entry("r1", 1), export_mode="bulk"), streamed]
+        ),
+    )
+
+    assert store.load_archived_through("_state/catalog.json") == {
+        "raw": _catalog_entry("r1", 1).window_end
+    }
+    assert store.load_catalog("_state/catalog.json")[-1] == streamed
+
+
+def test_update_catalog_rereads_and_retries_after_a_concurrent_write():
+    client = _ConditionalObjectStorageClient(conflicts=1)
+    store = ObjectStorageStateStore(client, "ns", "bucket")
+    calls = []
+
+    def _update(entries):
+        calls.append(entries)
+        return add_catalog_entries(entries, [_catalog_entry("r1", 1)])
+
+    store.update_catalog("_state/catalog.json", _update)
+
+    assert len(calls) == 2
+    assert client.conditions[1] == ("etag-1-concurrent", None)
+    assert len(store.load_catalog("_state/catalog.json")) == 1
+
+
+def test_update_catalog_gives_up_after_repeated_conflicts():
+    store = ObjectStorageStateStore(
+        _ConditionalObjectStorageClient(conflicts=10), "ns", "bucket"
+    )
+
+    with pytest.raises(RuntimeError, match="3 update attempts"):
+        store.update_catalog("_state/catalog.json", lambda entries: entries, attempts=3)
+
+
+def test_update_progress_reapplies_the_update_after_a_concurrent_write():
+    client = _ConditionalObjectStorageClient(conflicts=1)
+    store = ObjectStorageStateStore(client, "ns", "bucket")
+    window = CompletedWindow(
+        window_start=datetime(2026, 4, 8, 0, tzinfo=timezone.utc),
+        window_end=datetime(2026, 4, 8, 6, tzinfo=timezone.utc),
+        run_id="r1",
+    )
+
+    progress = store.update_progress(
+        "_state/progress/dataset=raw.json",
+        "raw",
+        None,
+        lambda current: DatasetProgress(
+            dataset="raw", completed=current.completed + (window,)
+        ),
+    )
+
+    assert progress.completed == (window,)
+    assert len(client.conditions) == 2
+    assert store.load_progress(
+        "_state/progress/dataset=raw.json", "raw", None
+    ).completed == (window,)
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+
+import pytest
+
+from archive_domain.models import StageMetrics
+from archive_domain.pipeline import (
+    ExportPipeline,
+    PipelineSettings,
+    build_compressor,
+    merge_stage_metrics,
+    part_filename,
+)
+
+
+def _batches(rows, size):
+    batches = [rows[index : index + size] for index in range(0, len(rows), size)]
+    iterator = iter(batches)
+    return lambda: next(iterator, [])
+
+
+def _encode(row):
+    return json.dumps({"id": row[0]}).encode("utf-8") + b"\n"
+
+
+def test_pipeline_splits_rows_into_size_bounded_gzip_parts():
+    uploaded = {}
+    rows = [(index,) for index in range(100)]
+    pipeline = ExportPipeline(
+        PipelineSettings(part_size_bytes=400, queue_depth=1),
+        encode_row=_encode,
+        upload_part=lambda filename, data: uploaded.__setitem__(filename, data),
+    )
+
+    result = pipeline.run(_batches(rows, 7))
+
+    assert result.row_count == 100
+    assert len(result.filenames) > 1
+    assert result.filenames[0] == "part-00000.jsonl.gz"
+    assert set(uploaded) == set(result.filenames)
+    decoded = [
+        json.loads(line)["id"]
+        for filename in result.filenames
+        for line in gzip.decompress(uploaded[filename]).splitlines()
+    ]
+    assert decoded == list(range(100))
+    assert [metrics.stage for metrics in result.stage_metrics] == [
+        "fetch",
+        "serialize",
+        "upload",
+    ]
+    assert result.stage_metrics[1].items == 100
+    assert result.stage_metrics[2].items == len(result.filenames)
+    assert [part.object_name for part in result.parts] == list(result.filenames)
+    assert sum(part.rows for part in result.parts) == 100
+    for part in result.parts:
+        assert part.compressed_bytes == len(uploaded[part.object_name])
+        assert part.sha256 == hashlib.sha256(uploaded[part.object_name]).hexdigest()
+        assert part.uncompressed_bytes == len(
+            gzip.decompress(uploaded[part.object_name])
+        )
+        assert part.upload_seconds is not None
+
+
+def test_pipeline_compresses_chunked_rows_as_they_are_encoded():
+    uploaded = {}
+    rows = [(index,) for index in range(10)]
+    pipeline = ExportPipeline(
+        PipelineSettings(queue_depth=1),
+        encode_row=lambda row: iter((b'{"id": ', str(row[0]).encode(), b"}\n")),
+        upload_part=lambda filename, data: uploaded.__setitem__(filename, data),
+    )
+
+    result = pipeline.run(_batches(rows, 4))
+
+    assert gzip.decompress(uploaded["part-00000.jsonl.gz"]) == b"".join(
+        _encode(row) for row in rows
+    )
+    assert result.stage_metrics[1].bytes == result.parts[0].uncompressed_bytes
+
+
+def test_pipeline_writes_one_empty_part_for_empty_windows():
+    uploaded = {}
+    pipeline = ExportPipeline(
+        PipelineSettings(),
+        encode_row=_encode,
+        upload_part=lambda filename, data: uploaded.__setitem__(filename, data),
+    )
+
+    result = pipeline.run(lambda: [])
+
+    assert result.filenames == ("part-00000.jsonl.gz",)
+    assert gzip.decompress(uploaded["part-00000.jsonl.gz"]) == b""
+
+
+def test_pipeline_surfaces_upload_failures_without_hanging():
+    def failing_upload(_filename, _data):
+        raise RuntimeError("simulated upload failure")
+
+    pipeline = ExportPipeline(
+        PipelineSettings(part_size_bytes=10, queue_depth=1),
+        encode_row=_encode,
+        upload_part=failing_upload,
+    )
+    rows = [(index,) for index in range(10_000)]
+
+    with pytest.raises(RuntimeError, match="simulated upload failure"):
+        pipeline.run(_batches(rows, 10))
+
+
+def test_zstd_parts_use_zst_extension_and_round_trip():
+    zstandard = pytest.importorskip("zstandard")
+    compressor = build_compressor("zstd", level=3, threads=2)
+    data = compressor.compress(b'{"id":1}\n') + compressor.flush()
+
+    assert part_filename(3, "zstd") == "part-00003.jsonl.zst"
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(data) == (
+        b'{"id":1}\n'
+    )
+
+
+def test_merge_stage_metrics_sums_counters_per_stage():
+    first = (StageMetrics("fetch", 10, 0, 1.0), StageMetrics("upload", 1, 500, 0.5))
+    second = (StageMetrics("fetch", 30, 0, 1.0), StageMetrics("upload", 2, 1500, 1.5))
+
+    merged = merge_stage_metrics([first, second])
+
+    assert merged[0] == StageMetrics("fetch", 40, 0, 2.0, items_per_second=20.0)
+    assert merged[1].bytes == 2000
+    assert merged[1].mb_per_second == 0.001
@@ -2,7 +2,17 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from archive_domain.planner import build_archive_plan, parse_datasets
+from archive_domain.models import CompletedWindow
+from archive_domain.planner import (
+    budget_window_end,
+    build_archive_plan,
+    build_dataset_estimate,
+    parse_datasets,
+    remaining_window,
+    scale_table_rows,
+    shard_archive_plan,
+    split_window,
+)
 
 
 def test_build_archive_plan_computes_newly_at_risk_window_per_dataset():
@@ -36,6 +46,50 @@ def test_build_archive_plan_uses_bootstrap_lookback_for_first_run():
     assert plan.datasets["raw"].window_start == now - timedelta(days=18)
 
 
+def test_build_archive_plan_resumes_datasets_from_their_carried_window_end():
+    now = datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)
+    last_success = now - timedelta(days=1)
+    carried = datetime(2026, 3, 20, 6, 0, tzinfo=timezone.utc)
+
+    plan = build_archive_plan(
+        selected_datasets=["raw", "historized"],
+        retention_days={"raw": 16, "historized": 30},
+        now=now,
+        last_successful_run_at=last_success,
+        window_ends={"raw": carried},
+    )
+
+    assert plan.datasets["raw"].window_start == carried
+    assert plan.datasets["historized"].window_start == last_success - timedelta(days=30)
+
+
+def test_budget_window_end_cuts_the_window_to_the_slower_throughput():
+    now = datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)
+    dataset_plan = build_archive_plan(
+        ["raw"], {"raw": 16}, now, bootstrap_lookback_days=1
+    ).datasets["raw"]
+    start = dataset_plan.window_start
+
+    assert budget_window_end(
+        dataset_plan, 86_400_000, 200, 3600, rows_per_second=6000.0
+    ) == start + timedelta(hours=6)
+    assert budget_window_end(
+        dataset_plan,
+        86_400_000,
+        200,
+        3600,
+        rows_per_second=6000.0,
+        bytes_per_second=600_000.0,
+    ) == start + timedelta(hours=3)
+    assert budget_window_end(dataset_plan, 1000, 200, 3600, 6000.0) == (
+        dataset_plan.window_end
+    )
+    assert budget_window_end(dataset_plan, 10**12, 200, 1, 1.0) == start + timedelta(
+        seconds=1
+    )
+    assert budget_window_end(dataset_plan, 1000, 200, 3600) == dataset_plan.window_end
+
+
 def test_parse_datasets_normalizes_and_validates_values():
     assert parse_datasets("rejected, raw ,historized") == (
         "raw",
@@ -45,3 +99,112 @@ def test_parse_datasets_normalizes_and_validates_values():
 
     with pytest.raises(ValueError, match="Unknown datasets"):
         parse_datasets("raw,unknown")
+
+
+def test_split_window_by_duration_keeps_contiguous_bounds():
+    window_start = datetime(2026, 4, 1, 0, 0, tzinfo=timezone.utc)
+    window_end = datetime(2026, 4, 1, 10, 0, tzinfo=timezone.utc)
+
+    shards = split_window(window_start, window_end, shard_duration=timedelta(hours=4))
+
+    assert [(shard.window_start.hour, shard.window_end.hour) for shard in shards] == [
+        (0, 4),
+        (4, 8),
+        (8, 10),
+    ]
+    assert split_window(window_start, window_end, timedelta(days=1)) == ()
+
+
+def test_shard_archive_plan_uses_estimated_rows_per_dataset():
+    now = datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)
+    plan = build_archive_plan(
+        selected_datasets=["raw", "historized"],
+        retention_days={"raw": 16, "historized": 30},
+        now=now,
+        bootstrap_lookback_days=1,
+    )
+
+    sharded = shard_archive_plan(
+        plan,
+        estimated_rows={"raw": 2_500_000, "historized": 10},
+        target_rows_per_shard=1_000_000,
+    )
+
+    raw_shards = sharded.datasets["raw"].shards
+    assert len(raw_shards) == 3
+    assert raw_shards[0].window_start == plan.datasets["raw"].window_start
+    assert raw_shards[-1].window_end == plan.datasets["raw"].window_end
+    assert sharded.datasets["historized"].shards == ()
+
+
+def test_remaining_window_resumes_after_the_last_id_of_a_partial_export():
+    start = datetime(2026, 4, 1, tzinfo=timezone.utc)
+    end = start + timedelta(hours=6)
+    partial = CompletedWindow(
+        window_start=start,
+        window_end=start + timedelta(hours=2),
+        run_id="r1",
+        last_id=17,
+    )
+    stalled = CompletedWindow(
+        window_start=start + timedelta(hours=2),
+        window_end=start + timedelta(hours=2),
+        run_id="r2",
+        last_id=30,
+    )
+
+    assert remaining_window(start, end, (partial,)) == (
+        start + timedelta(hours=2),
+        end,
+        17,
+    )
+    assert remaining_window(start, end, (partial, stalled)) == (
+        start + timedelta(hours=2),
+        end,
+        30,
+    )
+    assert remaining_window(start, end, ()) == (start, end, None)
+
+
+def test_scale_table_rows_uses_the_window_share_of_the_table_time_range():
+    table_start = datetime(2026, 4, 1, tzinfo=timezone.utc)
+    table_end = table_start + timedelta(days=10)
+
+    assert (
+        scale_table_rows(
+            1000,
+            table_start,
+            table_end,
+            table_start + timedelta(days=9),
+            table_end + timedelta(days=5),
+        )
+        == 100
+    )
+    assert scale_table_rows(1000, None, None, table_start, table_end) == 0
+    assert (
+        scale_table_rows(
+            1000, table_start, table_end, table_end + timedelta(days=1), table_end
+        )
+        == 0
+    )
+
+
+def test_build_dataset_estimate_derives_bytes_shards_and_duration():
+    estimate = build_dataset_estimate(
+        "raw",
+        "count",
+        rows=1_000_001,
+        average_row_bytes=100,
+        target_rows_per_shard=500_000,
+        rows_per_second=2000.0,
+        throughput_source="configured",
+    )
+
+    assert estimate.bytes == 100_000_100
+    assert estimate.suggested_shards == 3
+    assert estimate.expected_seconds == 500.0
+
+    unknown = build_dataset_estimate("raw", "stats", 10, None, 500_000)
+    assert unknown.bytes is None
+    assert unknown.expected_seconds is None
+    assert unknown.throughput_source is None
@@ -0,0 +1,258 @@
+import gzip
+import json
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from archive_domain.cli import cli
+from archive_domain.models import CatalogEntry
+from archive_domain.reader import (
+    ArchiveReader,
+    LocalArchiveSource,
+    ObjectStorageArchiveSource,
+    partition_prefixes,
+)
+
+_DATASET_PREFIX = "iot-archive/domain=demo/zone=bronze/dataset=raw"
+
+
+def _write_part(root, object_name, records):
+    path = root / object_name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(json.dumps(record) + "\n" for record in records)
+    path.write_bytes(gzip.compress(payload.encode("utf-8")))
+
+
+def test_partition_prefixes_coalesce_whole_months_and_days():
+    prefixes = partition_prefixes(
+        _DATASET_PREFIX,
+        datetime(2026, 2, 27, 22, 0, tzinfo=timezone.utc),
+        datetime(2026, 4, 2, 1, 30, tzinfo=timezone.utc),
+    )
+
+    assert [prefix.removeprefix(_DATASET_PREFIX + "/") for prefix in prefixes] == [
+        "year=2026/month=02/day=27/hour=22/",
+        "year=2026/month=02/day=27/hour=23/",
+        "year=2026/month=02/day=28/",
+        "year=2026/month=03/",
+        "year=2026/month=04/day=01/",
+        "year=2026/month=04/day=02/hour=00/",
+        "year=2026/month=04/day=02/hour=01/",
+    ]
+
+
+def test_partition_prefixes_keep_partial_first_hour():
+    prefixes = partition_prefixes(
+        _DATASET_PREFIX,
+        datetime(2026, 4, 8, 0, 15, tzinfo=timezone.utc),
+        datetime(2026, 4, 9, 0, 0, tzinfo=timezone.utc),
+    )
+
+    assert prefixes[0].endswith("day=08/hour=00/")
+    assert prefixes[1].endswith("day=08/hour=01/")
+    assert len(prefixes) == 24
+
+
+def test_reader_streams_only_parts_in_the_range_from_a_local_dir(tmp_path):
+    inside = f"{_DATASET_PREFIX}/year=2026/month=04/day=08/hour=12/run_id=a"
+    outside = f"{_DATASET_PREFIX}/year=2026/month=04/day=08/hour=13/run_id=b"
+    _write_part(tmp_path, f"{inside}/part-00000.jsonl.gz", [{"id": 1}, {"id": 2}])
+    _write_part(tmp_path, f"{inside}/part-00001.jsonl.gz", [{"id": 3}])
+    _write_part(tmp_path, f"{outside}/part-00000.jsonl.gz", [{"id": 4}])
+    (tmp_path / inside / "export.log").write_text("not a part")
+
+    reader = ArchiveReader(
+        LocalArchiveSource(tmp_path), "iot-archive", "demo", concurrency=2
+    )
+    records = list(
+        reader.iter_records(
+            "raw",
+            datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+            datetime(2026, 4, 8, 13, 0, tzinfo=timezone.utc),
+        )
+    )
+
+    assert records == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def test_reader_prefetches_parts_concurrently_and_yields_in_order():
+    names = [f"{_DATASET_PREFIX}/year=2026/month=04/part-{i}.jsonl" for i in range(4)]
+    release = threading.Event()
+    started = []
+
+    class _SlowSource:
+        def list_objects(self, prefix):
+            return names if prefix.endswith("month=04/") else []
+
+        def get_object(self, object_name):
+            started.append(object_name)
+            if len(started) == 3:
+                release.set()
+            assert release.wait(timeout=5)
+            return json.dumps({"name": object_name}).encode("utf-8") + b"\n"
+
+    reader = ArchiveReader(_SlowSource(), "iot-archive", "demo", concurrency=3)
+    records = list(
+        reader.iter_records(
+            "raw",
+            datetime(2026, 4, 1, tzinfo=timezone.utc),
+            datetime(2026, 5, 1, tzinfo=timezone.utc),
+        )
+    )
+
+    assert [record["name"] for record in records] == names
+
+
+def test_object_storage_source_follows_list_pagination():
+    pages = {
+        None: (["a/part-0.jsonl"], "a/part-1.jsonl"),
+        "a/part-1.jsonl": (["a/part-1.jsonl"], None),
+    }
+    calls = []
+
+    class _Client:
+        def list_objects(self, **kwargs):
+            calls.append(kwargs)
+            names, next_start = pages[kwargs["start"]]
+            return SimpleNamespace(
+                data=SimpleNamespace(
+                    objects=[SimpleNamespace(name=name, size=1) for name in names],
+                    next_start_with=next_start,
+                )
+            )
+
+    source = ObjectStorageArchiveSource(_Client(), "ns", "bucket")
+
+    assert source.list_objects("a/") == ["a/part-0.jsonl", "a/part-1.jsonl"]
+    assert calls[0]["prefix"] == "a/"
+    assert calls[0]["bucket_name"] == "bucket"
+
+
+def test_reader_rejects_non_positive_concurrency():
+    with pytest.raises(ValueError, match="concurrency"):
+        ArchiveReader(LocalArchiveSource("."), "iot-archive", "demo", concurrency=0)
+
+
+def test_reader_skips_unfinished_compactions_and_replaced_sources(tmp_path):
+    day_prefix = f"{_DATASET_PREFIX}/year=2026/month=04/day=08"
+    replaced = f"{day_prefix}/hour=12/run_id=a/part-00000.jsonl.gz"
+    kept = f"{day_prefix}/hour=12/run_id=b/part-00000.jsonl.gz"
+    committed = f"{day_prefix}/compaction_id=20260409T000000Z"
+    unfinished = f"{day_prefix}/compaction_id=20260410T000000Z"
+    _write_part(tmp_path, replaced, [{"id": 1}])
+    _write_part(tmp_path, kept, [{"id": 2}])
+    _write_part(tmp_path, f"{committed}/part-00000.jsonl.gz", [{"id": 1}])
+    _write_part(tmp_path, f"{unfinished}/part-00000.jsonl.gz", [{"id": 1}, {"id": 2}])
+    (tmp_path / committed / "_compaction.json").write_text(
+        json.dumps(
+            {
+                "outputs": [
+                    {
+                        "object_name": f"{committed}/part-00000.jsonl.gz",
+                        "sources": [replaced],
+                    }
+                ],
+                "sources": [replaced],
+            }
+        )
+    )
+
+    reader = ArchiveReader(LocalArchiveSource(tmp_path), "iot-archive", "demo")
+    start = datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)
+    end = datetime(2026, 4, 8, 13, 0, tzinfo=timezone.utc)
+
+    assert reader.list_parts("raw", start, end) == [
+        kept,
+        f"{committed}/part-00000.jsonl.gz",
+    ]
+    assert sorted(
+        record["id"] for record in reader.iter_records("raw", start, end)
+    ) == [1, 2]
+
+
+def test_catalog_and_listing_select_the_same_parts_for_a_range(tmp_path):
+    day_prefix = f"{_DATASET_PREFIX}/year=2026/month=04/day=08"
+    entries = []
+    for hour, run_id in ((11, "a"), (12, "b"), (13, "c")):
+        name = f"{day_prefix}/hour={hour}/run_id={run_id}/part-00000.jsonl.gz"
+        _write_part(tmp_path, name, [{"id": hour}])
+        # A late run exports an older window than the hour it started in.
+        entries.append(
+            CatalogEntry(
+                dataset="raw",
+                window_start=datetime(2026, 4, 1, hour, tzinfo=timezone.utc),
+                window_end=datetime(2026, 4, 1, hour + 1, tzinfo=timezone.utc),
+                run_id=run_id,
+                object_names=(name,),
+            )
+        )
+    listing = ArchiveReader(LocalArchiveSource(tmp_path), "iot-archive", "demo")
+    catalog = ArchiveReader(
+        LocalArchiveSource(tmp_path), "iot-archive", "demo", catalog=tuple(entries)
+    )
+
+    utc = timezone.utc
+    ranges = {
+        (datetime(2026, 4, 8, 12, tzinfo=utc), datetime(2026, 4, 8, 14, tzinfo=utc)): 2,
+        (datetime(2026, 4, 8, tzinfo=utc), datetime(2026, 4, 9, tzinfo=utc)): 3,
+        (datetime(2026, 4, 1, 11, tzinfo=utc), datetime(2026, 4, 1, 14, tzinfo=utc)): 0,
+    }
+    for (start, end), expected in ranges.items():
+        parts = catalog.list_parts("raw", start, end)
+        assert parts == listing.list_parts("raw", start, end)
+        assert len(parts) == expected
+
+
+def test_iter_batches_converts_json_lines_parts(tmp_path):
+    pytest.importorskip("pyarrow")
+    run_prefix = f"{_DATASET_PREFIX}/year=2026/month=04/day=08/hour=12/run_id=a"
+    _write_part(tmp_path, f"{run_prefix}/part-00000.jsonl.gz", [{"id": 1}, {"id": 2}])
+
+    reader = ArchiveReader(LocalArchiveSource(tmp_path), "iot-archive", "demo")
+    batches = list(
+        reader.iter_batches(
+            "raw",
+            datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+            datetime(2026, 4, 8, 13, 0, tzinfo=timezone.utc),
+        )
+    )
+
+    assert sum(batch.num_rows for batch in batches) == 2
+
+
+def test_read_command_prints_json_lines_up_to_the_limit(monkeypatch, tmp_path):
+    run_prefix = f"{_DATASET_PREFIX}/year=2026/month=04/day=08/hour=12/run_id=a"
+    _write_part(tmp_path, f"{run_prefix}/part-00000.jsonl.gz", [{"id": 1}, {"id": 2}])
+    captured = {}
+
+    def _build_reader(*_args, **kwargs):
+        captured.update(kwargs)
+        return ArchiveReader(
+            LocalArchiveSource(kwargs["source_dir"]), "iot-archive", "demo"
+        )
+
+    monkeypatch.setattr("archive_domain.cli.build_reader", _build_reader)
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "read",
+            "--dataset",
+            "raw",
+            "--start-time",
+            "2026-04-08T00:00:00Z",
+            "--end-time",
+            "2026-04-09T00:00:00Z",
+            "--source-dir",
+            str(tmp_path),
+            "--limit",
+            "1",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == ['{"id": 1}']
+    assert captured["concurrency"] == 4
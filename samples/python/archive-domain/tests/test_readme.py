@@ -15,5 +15,5 @@ def test_readme_mentions_supported_datasets_and_modes():
     assert "DBMS_CLOUD.EXPORT_DATA" in readme
     assert "--dry-run" in readme
     assert "samples/python/archive-domain/data/archive_config.yaml" in readme
-    assert "Data Pump runs require selecting exactly one dataset" in readme
+    assert "Data Pump runs can select several datasets" in readme
     assert "DOMAIN_ARCHIVE_TEST" in readme
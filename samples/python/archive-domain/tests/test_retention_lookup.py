@@ -1,4 +1,5 @@
-from archive_domain.iot_domain import resolve_retention_days
+from archive_domain.cache import MetadataCache
+from archive_domain.iot_domain import CachedRetentionLookup, resolve_retention_days
 
 
 class _FailingLookup:
@@ -27,3 +28,57 @@ def test_resolve_retention_days_merges_live_lookup_and_overrides():
     )
 
     assert retention == {"raw": 16, "historized": 30, "rejected": 12}
+
+
+class _CountingLookup:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def get_retention_days(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("lookup failed")
+        return {"raw": 16 + self.calls}
+
+
+def test_cached_retention_lookup_refreshes_after_ttl_and_survives_failures():
+    lookup = _CountingLookup()
+    now = [0.0]
+    cached = CachedRetentionLookup(lookup, ttl_seconds=60, monotonic=lambda: now[0])
+
+    assert cached.get_retention_days() == {"raw": 17}
+    now[0] = 59
+    assert cached.get_retention_days() == {"raw": 17}
+    now[0] = 60
+    assert cached.get_retention_days() == {"raw": 18}
+    lookup.fail = True
+    now[0] = 120
+    assert cached.get_retention_days() == {"raw": 18}
+    assert lookup.calls == 3
+
+
+def test_cached_retention_lookup_shares_values_through_the_disk_cache(tmp_path):
+    wall = [0.0]
+    cache = MetadataCache(tmp_path / "metadata.json", clock=lambda: wall[0])
+    lookup = _CountingLookup()
+
+    first = CachedRetentionLookup(
+        lookup, ttl_seconds=60, monotonic=lambda: 0.0, cache=cache
+    )
+    assert first.get_retention_days() == {"raw": 17}
+
+    wall[0] = 30.0
+    second = CachedRetentionLookup(
+        lookup, ttl_seconds=60, monotonic=lambda: 500.0, cache=cache
+    )
+    assert second.get_retention_days() == {"raw": 17}
+    assert lookup.calls == 1
+
+    wall[0] = 90.0
+    lookup.fail = True
+    stale = CachedRetentionLookup(
+        lookup, ttl_seconds=60, monotonic=lambda: 500.0, cache=cache
+    )
+    assert stale.get_retention_days() == {"raw": 17}
+    assert lookup.calls == 2
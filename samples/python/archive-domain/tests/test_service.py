@@ -1,17 +1,32 @@
-from datetime import datetime, timezone
+import json
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
 
+from archive_domain.catalog import archived_through
 from archive_domain.config import (
     ArchiveConfig,
     DatabaseConfig,
     IotConfig,
     ObjectStorageConfig,
+    PlanningConfig,
     load_config,
 )
-from archive_domain.models import CheckpointState
-from archive_domain.service import ArchiveService
+from archive_domain.executor import PartialExportError
+from archive_domain.models import (
+    CheckpointState,
+    DatasetProgress,
+    DatasetResult,
+    PartMetrics,
+    ScheduledExport,
+    StageMetrics,
+    ThroughputRecord,
+)
+from archive_domain.service import ArchiveService, build_service
 
 
 class _StaticRetentionLookup:
@@ -23,9 +38,45 @@ class _MemoryStateStore:
     def __init__(self):
         self.objects = {}
         self.saved_checkpoints = []
+        self.progress = {}
+        self.throughput = {}
+        self.catalog = ()
+        self.archived_through_reads = 0
+        self.checkpoint = CheckpointState()
 
     def load_checkpoint(self, _object_name):
-        return CheckpointState()
+        return self.checkpoint
+
+    def load_progress(self, object_name, dataset, checkpoint_before):
+        return self.progress.get(
+            object_name,
+            DatasetProgress(dataset=dataset, checkpoint_before=checkpoint_before),
+        )
+
+    def save_progress(self, object_name, progress):
+        self.progress[object_name] = progress
+
+    def update_progress(self, object_name, dataset, checkpoint_before, update):
+        progress = update(self.load_progress(object_name, dataset, checkpoint_before))
+        self.save_progress(object_name, progress)
+        return progress
+
+    def load_throughput(self, _object_name):
+        return dict(self.throughput)
+
+    def save_throughput(self, _object_name, records):
+        self.throughput = dict(records)
+
+    def load_catalog(self, _object_name):
+        return self.catalog
+
+    def load_archived_through(self, _object_name):
+        self.archived_through_reads += 1
+        return archived_through(self.catalog)
+
+    def update_catalog(self, _object_name, update):
+        self.catalog = update(self.catalog)
+        return self.catalog
 
     def put_json_object(self, object_name, payload):
         self.objects[object_name] = payload
@@ -128,6 +179,55 @@ object_storage:
     assert config.export_format == "parquet"
 
 
+def test_offline_service_plans_from_cached_retention_without_oci(tmp_path, monkeypatch):
+    cache_path = tmp_path / "metadata.json"
+    config_path = tmp_path / "archive_config.yaml"
+    config_path.write_text(
+        f"""
+iot:
+  domain_id: ocid1.iotdomain.oc1..exampleuniqueID
+  retention_days:
+    rejected: 12
+database:
+  connect_string: "tcps:adb.example.com:1522/archive_high"
+  token_scope: "urn:oracle:db::id::*"
+  iot_domain_short_name: sample
+object_storage:
+  bucket_name: archive-bucket
+metadata_cache:
+  path: {cache_path}
+  ttl_minutes: 1
+""".strip(),
+        encoding="utf-8",
+    )
+    cache_path.write_text(
+        json.dumps(
+            {
+                "retention/ocid1.iotdomain.oc1..exampleuniqueID": {
+                    "stored_at": 0,
+                    "value": {"raw": 16, "historized": 30},
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    def unavailable(**_kwargs):
+        raise AssertionError("offline services must not load the OCI config")
+
+    monkeypatch.setattr("archive_domain.service.get_oci_config", unavailable)
+    service = build_service(str(config_path), offline=True)
+
+    result = service.run(dry_run=True)
+
+    assert result.plan_result.retention_days == {
+        "raw": 16,
+        "historized": 30,
+        "rejected": 12,
+    }
+    assert [item.status for item in result.dataset_results] == ["planned"] * 3
+
+
 def test_distributed_config_template_defaults_to_parquet():
     template = (
         Path(__file__).resolve().parents[1] / "data" / "archive_config.distr.yaml"
@@ -146,14 +246,26 @@ def test_run_allows_datapump():
     assert result.dataset_results[0].export_format == "datapump"
 
 
-def test_plan_rejects_multiple_datasets_for_datapump():
-    service = _build_plan_service(_build_config(export_format="datapump"))
+def test_run_exports_datapump_datasets_concurrently_to_their_own_prefixes():
+    state_store = _MemoryStateStore()
+    service = ArchiveService(
+        config=_build_config(export_format="datapump"),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_BarrierExecutor(parties=3),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
 
-    with pytest.raises(
-        ValueError,
-        match="datapump export format requires selecting exactly one dataset",
-    ):
-        service.plan(datasets="raw,historized")
+    result = service.run(datasets="raw,historized,rejected", parallelism=3)
+
+    assert [item.export_format for item in result.dataset_results] == ["datapump"] * 3
+    prefixes = [item.object_prefix for item in result.dataset_results]
+    assert len(set(prefixes)) == 3
+    assert all(
+        f"/dataset={item.name}/" in item.object_prefix
+        for item in result.dataset_results
+    )
+    assert result.checkpoint_advanced is True
 
 
 def test_plan_rejects_empty_normalized_dataset_selection():
@@ -190,3 +302,701 @@ def test_run_does_not_advance_checkpoint_for_empty_status_map():
         service.run(datasets=" , , ")
 
     assert state_store.saved_checkpoints == []
+
+
+class _BarrierExecutor:
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def execute_dataset(
+        self, dataset, dataset_plan, mode, object_prefix, export_format
+    ):
+        self.barrier.wait()
+        return DatasetResult(
+            name=dataset,
+            status="succeeded",
+            export_mode=mode,
+            export_format=export_format,
+            object_prefix=object_prefix,
+        )
+
+
+def test_run_exports_datasets_concurrently_and_keeps_selection_order():
+    state_store = _MemoryStateStore()
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_BarrierExecutor(parties=3),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(datasets="rejected,raw,historized", parallelism=3)
+
+    assert [item.name for item in result.dataset_results] == [
+        "raw",
+        "historized",
+        "rejected",
+    ]
+    assert result.checkpoint_advanced is True
+    manifest = state_store.objects[result.manifest_object_name]
+    json.dumps(manifest)
+    assert all(
+        entry["duration_seconds"] is not None and entry["started_at"].endswith("Z")
+        for entry in manifest["dataset_results"]
+    )
+
+
+def test_run_rejects_non_positive_parallelism():
+    service = _build_plan_service(_build_config())
+
+    with pytest.raises(ValueError, match="parallelism must be >= 1"):
+        service.run(datasets="raw", dry_run=True, parallelism=0)
+
+
+class _RecordingExecutor:
+    def __init__(self, failing_windows=()):
+        self.calls = []
+        self.failing_windows = failing_windows
+        self.lock = threading.Lock()
+
+    def execute_dataset(
+        self, dataset, dataset_plan, mode, object_prefix, export_format
+    ):
+        with self.lock:
+            self.calls.append((dataset, dataset_plan, object_prefix))
+        if dataset_plan.window_start in self.failing_windows:
+            raise RuntimeError("simulated shard failure")
+        return DatasetResult(
+            name=dataset,
+            status="succeeded",
+            export_mode=mode,
+            export_format=export_format,
+            object_prefix=object_prefix,
+            object_names=(f"{object_prefix}/part-00000.jsonl.gz",),
+        )
+
+
+def test_run_exports_sub_windows_to_their_own_part_prefixes():
+    state_store = _MemoryStateStore()
+    executor = _RecordingExecutor()
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(
+        datasets="raw", parallelism=4, shard_duration=timedelta(hours=6)
+    )
+
+    raw_result = result.dataset_results[0]
+    assert raw_result.status == "succeeded"
+    assert [shard.index for shard in raw_result.shards] == [0, 1, 2, 3]
+    assert raw_result.shards[1].object_prefix.endswith("/shard=00001")
+    assert len(raw_result.object_names) == 4
+    assert len(executor.calls) == 4
+    manifest = state_store.objects[result.manifest_object_name]
+    assert len(manifest["dataset_results"][0]["shards"]) == 4
+    assert result.checkpoint_advanced is True
+
+
+def test_run_fails_dataset_when_any_sub_window_fails():
+    state_store = _MemoryStateStore()
+    executor = _RecordingExecutor(
+        failing_windows=(datetime(2026, 3, 22, 18, 0, tzinfo=timezone.utc),)
+    )
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(datasets="raw", shard_duration=timedelta(hours=6))
+
+    raw_result = result.dataset_results[0]
+    assert raw_result.status == "failed"
+    assert raw_result.error_message == "shard 1: simulated shard failure"
+    assert result.checkpoint_advanced is False
+
+
+class _CountedExecutor(_RecordingExecutor):
+    def __init__(self, exported_rows, counted_rows):
+        super().__init__()
+        self.exported_rows = exported_rows
+        self.counted_rows = counted_rows
+
+    def execute_dataset(self, dataset, dataset_plan, mode, **kwargs):
+        result = super().execute_dataset(dataset, dataset_plan, mode, **kwargs)
+        return replace(result, row_count=self.exported_rows.get(dataset))
+
+    def count_rows(self, dataset, _dataset_plan):
+        return self.counted_rows[dataset]
+
+
+def test_run_verify_records_verified_and_unverified_datasets():
+    state_store = _MemoryStateStore()
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_CountedExecutor(exported_rows={"raw": 10}, counted_rows={"raw": 10}),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(datasets="raw,historized", mode="sql", verify=True)
+
+    assert [item.verification for item in result.dataset_results] == [
+        "verified",
+        "unverified",
+    ]
+    manifest = state_store.objects[result.manifest_object_name]
+    assert manifest["dataset_results"][0]["verification"] == "verified"
+    assert result.checkpoint_advanced is True
+
+
+def test_run_verify_fails_fast_on_a_row_count_mismatch():
+    state_store = _MemoryStateStore()
+    executor = _CountedExecutor(
+        exported_rows={"raw": 10, "historized": 5},
+        counted_rows={"raw": 12, "historized": 5},
+    )
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(datasets="raw,historized", mode="sql", verify=True)
+
+    raw_result, historized_result = result.dataset_results
+    assert raw_result.status == "failed"
+    assert raw_result.verification == "failed"
+    assert raw_result.error_message == (
+        "verification failed: exported 10 rows but the window holds 12"
+    )
+    assert historized_result.status == "failed"
+    assert historized_result.error_message == (
+        "not exported after a verification failure"
+    )
+    assert [call[0] for call in executor.calls] == ["raw"]
+    assert state_store.progress == {}
+    assert result.checkpoint_advanced is False
+
+
+class _IncrementalExecutor(_RecordingExecutor):
+    def __init__(self, max_ids):
+        super().__init__()
+        self.max_ids = max_ids
+
+    def max_id(self, dataset):
+        return self.max_ids.get(dataset)
+
+
+def test_incremental_runs_export_ids_above_the_checkpoint_high_water_mark():
+    now = datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)
+    state_store = _MemoryStateStore()
+    state_store.checkpoint = CheckpointState(
+        last_successful_run_at=datetime(2026, 4, 7, 12, 0, tzinfo=timezone.utc),
+        high_water_marks={"raw": 500, "rejected": 9},
+    )
+    executor = _IncrementalExecutor({"raw": 800})
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=executor,
+        clock=lambda: now,
+    )
+
+    result = service.run(datasets="raw,historized", mode="sql", incremental=True)
+
+    raw_plan = executor.calls[0][1]
+    historized_plan = executor.calls[1][1]
+    assert (raw_plan.resume_after_id, raw_plan.through_id) == (500, 800)
+    assert (historized_plan.resume_after_id, historized_plan.through_id) == (None, 0)
+    assert historized_plan.window_end == now
+    assert result.checkpoint_advanced is True
+    assert state_store.saved_checkpoints[-1][1].high_water_marks == {
+        "raw": 800,
+        "historized": 0,
+        "rejected": 9,
+    }
+    assert state_store.progress == {}
+    assert state_store.catalog == ()
+    with pytest.raises(ValueError, match="cannot be sharded"):
+        service.run(datasets="raw", incremental=True, target_rows_per_shard=10)
+
+
+def test_run_adds_exported_windows_to_the_catalog_and_plan_reads_it():
+    state_store = _MemoryStateStore()
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_RecordingExecutor(
+            failing_windows=(datetime(2026, 3, 22, 18, 0, tzinfo=timezone.utc),)
+        ),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(datasets="raw", shard_duration=timedelta(hours=6))
+
+    assert [entry.window_start.hour for entry in state_store.catalog] == [12, 0, 6]
+    assert {entry.run_id for entry in state_store.catalog} == {result.run_id}
+    assert state_store.catalog[0].object_names == (
+        f"{result.dataset_results[0].shards[0].object_prefix}/part-00000.jsonl.gz",
+    )
+    assert state_store.archived_through_reads == 0
+    plan_result = service.plan(datasets="raw")
+    assert plan_result.archived_through == {
+        "raw": datetime(2026, 3, 23, 12, 0, tzinfo=timezone.utc)
+    }
+
+
+def test_rerun_skips_completed_sub_windows_and_exports_only_the_rest():
+    state_store = _MemoryStateStore()
+    backfill_start = datetime(2026, 3, 22, 12, 0, tzinfo=timezone.utc)
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_RecordingExecutor(
+            failing_windows=(datetime(2026, 3, 22, 18, 0, tzinfo=timezone.utc),)
+        ),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+    first = service.run(
+        datasets="raw", start_time=backfill_start, shard_duration=timedelta(hours=6)
+    )
+    assert first.checkpoint_advanced is False
+
+    second_executor = _RecordingExecutor()
+    service.executor = second_executor
+    service.clock = lambda: datetime(2026, 4, 8, 13, 0, tzinfo=timezone.utc)
+    second = service.run(
+        datasets="raw", start_time=backfill_start, shard_duration=timedelta(hours=6)
+    )
+
+    raw_result = second.dataset_results[0]
+    assert [shard.status for shard in raw_result.shards] == [
+        "skipped",
+        "succeeded",
+        "skipped",
+        "skipped",
+        "succeeded",
+    ]
+    assert raw_result.status == "succeeded"
+    assert (
+        raw_result.shards[0].object_prefix
+        == first.dataset_results[0].shards[0].object_prefix
+    )
+    assert [call[1].window_start.hour for call in second_executor.calls] == [18, 12]
+    assert second.checkpoint_advanced is True
+
+
+def test_rerun_exports_only_the_uncovered_tail_of_a_grown_window():
+    state_store = _MemoryStateStore()
+    window_start = datetime(2026, 3, 22, 12, 0, tzinfo=timezone.utc)
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_RecordingExecutor(),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+    service.run(datasets="raw", start_time=window_start)
+
+    executor = _RecordingExecutor()
+    service.executor = executor
+    service.clock = lambda: datetime(2026, 4, 8, 14, 0, tzinfo=timezone.utc)
+    result = service.run(datasets="raw", start_time=window_start)
+
+    _dataset, dataset_plan, _prefix = executor.calls[0]
+    assert dataset_plan.window_start == datetime(
+        2026, 3, 23, 12, 0, tzinfo=timezone.utc
+    )
+    assert dataset_plan.window_end == datetime(2026, 3, 23, 14, 0, tzinfo=timezone.utc)
+    assert len(result.dataset_results[0].object_names) == 2
+
+
+def test_rerun_resumes_a_partial_sql_export_after_its_last_key():
+    state_store = _MemoryStateStore()
+    window_start = datetime(2026, 3, 22, 12, 0, tzinfo=timezone.utc)
+    last_time = datetime(2026, 3, 23, 1, 0, tzinfo=timezone.utc)
+
+    class _PartialExecutor(_RecordingExecutor):
+        def execute_dataset(
+            self, dataset, dataset_plan, mode, object_prefix, export_format
+        ):
+            self.calls.append((dataset, dataset_plan, object_prefix))
+            raise PartialExportError(
+                "simulated fetch failure",
+                object_names=(f"{object_prefix}/part-00000.jsonl.gz",),
+                resume_key=(last_time, 41),
+            )
+
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_PartialExecutor(),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+    first = service.run(datasets="raw", mode="sql", start_time=window_start)
+    assert first.dataset_results[0].status == "failed"
+    assert first.dataset_results[0].resume_key == (last_time, 41)
+
+    executor = _RecordingExecutor()
+    service.executor = executor
+    service.clock = lambda: datetime(2026, 4, 8, 13, 0, tzinfo=timezone.utc)
+    second = service.run(datasets="raw", mode="sql", start_time=window_start)
+
+    _dataset, dataset_plan, _prefix = executor.calls[0]
+    assert dataset_plan.window_start == last_time
+    assert dataset_plan.resume_after_id == 41
+    assert second.dataset_results[0].status == "succeeded"
+    assert len(second.dataset_results[0].object_names) == 2
+
+
+class _EstimatingExecutor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.methods = []
+
+    def estimate_dataset(self, dataset, dataset_plan, method):
+        self.methods.append(method)
+        return self.rows[dataset], 200, method
+
+    def estimate_rows(self, _dataset, _dataset_plan):
+        raise AssertionError("estimates should be reused for row-based sharding")
+
+    def execute_dataset(
+        self, dataset, dataset_plan, mode, object_prefix, export_format
+    ):
+        time.sleep(0.01)
+        return DatasetResult(
+            name=dataset,
+            status="succeeded",
+            export_mode=mode,
+            export_format=export_format,
+            object_prefix=object_prefix,
+            row_count=self.rows[dataset],
+        )
+
+
+def test_plan_estimates_size_shards_and_duration_from_recorded_throughput():
+    state_store = _MemoryStateStore()
+    state_store.throughput = {
+        "raw": ThroughputRecord(
+            dataset="raw", mode="sql", rows_per_second=1000.0, run_id="r1"
+        )
+    }
+    executor = _EstimatingExecutor({"raw": 12_000_000, "historized": 10})
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.plan(
+        datasets="raw,historized", estimate=True, target_rows_per_shard=5_000_000
+    )
+
+    raw_estimate = result.estimates["raw"]
+    assert executor.methods == ["stats", "stats"]
+    assert raw_estimate.bytes == 2_400_000_000
+    assert raw_estimate.suggested_shards == 3
+    assert raw_estimate.expected_seconds == 12_000.0
+    assert raw_estimate.throughput_source == "recorded"
+    assert len(result.plan.datasets["raw"].shards) == 3
+    assert result.estimates["historized"].expected_seconds is None
+
+
+def test_plan_estimate_prefers_configured_throughput():
+    state_store = _MemoryStateStore()
+    state_store.throughput = {
+        "raw": ThroughputRecord(
+            dataset="raw", mode="sql", rows_per_second=1000.0, run_id="r1"
+        )
+    }
+    service = ArchiveService(
+        config=replace(
+            _build_config(),
+            planning=PlanningConfig(throughput_rows_per_second=4000.0),
+        ),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_EstimatingExecutor({"raw": 8000}),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    estimate = service.plan(datasets="raw", estimate=True).estimates["raw"]
+
+    assert estimate.expected_seconds == 2.0
+    assert estimate.throughput_source == "configured"
+
+
+def test_run_records_observed_throughput_per_dataset():
+    state_store = _MemoryStateStore()
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_EstimatingExecutor({"raw": 5000}),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(datasets="raw", mode="sql")
+
+    record = state_store.throughput["raw"]
+    assert record.run_id == result.run_id
+    assert record.mode == "sql"
+    assert record.rows_per_second > 0
+
+
+def test_budgeted_run_exports_part_of_the_window_and_carries_the_rest_over():
+    state_store = _MemoryStateStore()
+    state_store.throughput = {
+        "raw": ThroughputRecord(
+            dataset="raw", mode="sql", rows_per_second=1000.0, run_id="r1"
+        )
+    }
+    executor = _EstimatingExecutor({"raw": 86_400_000})
+    now = datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc)
+    service = ArchiveService(
+        config=replace(
+            _build_config(), planning=PlanningConfig(run_budget_seconds=21_600)
+        ),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=executor,
+        clock=lambda: now,
+    )
+
+    result = service.run(datasets="raw", mode="sql")
+
+    raw_plan = result.plan_result.plan.datasets["raw"]
+    assert raw_plan.window_start == datetime(2026, 3, 22, 12, tzinfo=timezone.utc)
+    assert raw_plan.window_end == datetime(2026, 3, 22, 18, tzinfo=timezone.utc)
+    assert result.checkpoint_advanced is True
+    _name, checkpoint = state_store.saved_checkpoints[-1]
+    assert checkpoint.window_ends == {"raw": raw_plan.window_end}
+
+    state_store.checkpoint = checkpoint
+    now += timedelta(minutes=5)
+    next_plan = service.plan(datasets="raw").plan.datasets["raw"]
+    assert next_plan.window_start == raw_plan.window_end
+
+    caught_up = service.run(datasets="raw", mode="sql", start_time=raw_plan.window_end)
+    assert caught_up.plan_result.plan.datasets["raw"].window_end == (
+        next_plan.purge_boundary
+    )
+    assert state_store.saved_checkpoints[-1][1].window_ends == {}
+
+
+class _SchedulerExecutor:
+    def __init__(self, polls_until_done=2, failing_datasets=()):
+        self.polls_until_done = polls_until_done
+        self.failing_datasets = failing_datasets
+        self.submitted = []
+        self.polls = {}
+        self.max_running = 0
+
+    def uses_scheduled_bulk(self, mode):
+        return mode == "bulk"
+
+    def submit_bulk(self, dataset, dataset_plan, object_prefix, export_format):
+        job = ScheduledExport(
+            job_name=f"JOB_{len(self.submitted)}",
+            dataset=dataset,
+            object_prefix=object_prefix,
+            export_format=export_format,
+        )
+        self.submitted.append(job)
+        self.polls[job.job_name] = 0
+        return job
+
+    def poll_bulk(self, jobs):
+        self.max_running = max(self.max_running, len(jobs))
+        finished = {}
+        for job in jobs:
+            self.polls[job.job_name] += 1
+            if self.polls[job.job_name] >= self.polls_until_done:
+                failed = job.dataset in self.failing_datasets
+                finished[job.job_name] = DatasetResult(
+                    name=job.dataset,
+                    status="failed" if failed else "succeeded",
+                    export_mode="bulk",
+                    export_format=job.export_format,
+                    object_prefix=job.object_prefix,
+                    error_message="ORA-20000: export failed" if failed else None,
+                )
+        return finished
+
+
+class _UnreachableSchedulerExecutor(_SchedulerExecutor):
+    def __init__(self, failed_polls):
+        super().__init__(polls_until_done=1)
+        self.failed_polls = failed_polls
+        self.stopped = []
+
+    def poll_bulk(self, jobs):
+        if self.failed_polls:
+            self.failed_polls -= 1
+            raise RuntimeError("ORA-03113: end-of-file on communication channel")
+        return super().poll_bulk(jobs)
+
+    def stop_bulk(self, jobs):
+        self.stopped.extend(job.job_name for job in jobs)
+
+
+def test_run_retries_failed_scheduler_polls_on_the_backoff():
+    executor = _UnreachableSchedulerExecutor(failed_polls=2)
+    delays = []
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=_MemoryStateStore(),
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+        sleep=delays.append,
+    )
+
+    result = service.run(datasets="raw")
+
+    assert result.dataset_results[0].status == "succeeded"
+    assert delays == [2.0, 4.0, 8.0]
+    assert executor.stopped == []
+
+
+def test_run_stops_scheduler_jobs_and_fails_units_when_polling_gives_up():
+    executor = _UnreachableSchedulerExecutor(failed_polls=100)
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=_MemoryStateStore(),
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+        sleep=lambda _seconds: None,
+    )
+
+    result = service.run(datasets="raw,historized", parallelism=1)
+
+    assert executor.stopped == ["JOB_0"]
+    assert len(executor.submitted) == 1
+    raw_result, historized_result = result.dataset_results
+    assert raw_result.status == "failed"
+    assert raw_result.error_message == (
+        "scheduler job polling failed: "
+        "ORA-03113: end-of-file on communication channel"
+    )
+    assert historized_result.error_message == (
+        "not submitted after scheduler job polling failed"
+    )
+    assert result.checkpoint_advanced is False
+
+
+def test_run_submits_bulk_exports_as_scheduler_jobs_and_polls_with_backoff():
+    state_store = _MemoryStateStore()
+    executor = _SchedulerExecutor(polls_until_done=3)
+    delays = []
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+        sleep=delays.append,
+    )
+
+    result = service.run(datasets="raw,historized,rejected", parallelism=2)
+
+    assert [item.name for item in result.dataset_results] == [
+        "raw",
+        "historized",
+        "rejected",
+    ]
+    assert {item.status for item in result.dataset_results} == {"succeeded"}
+    assert executor.max_running == 2
+    assert delays == [2.0, 4.0, 8.0, 2.0, 4.0, 8.0]
+    assert result.checkpoint_advanced is True
+
+
+def test_run_reports_failed_scheduler_jobs():
+    executor = _SchedulerExecutor(polls_until_done=1, failing_datasets=("raw",))
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=_MemoryStateStore(),
+        executor=executor,
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+        sleep=lambda _seconds: None,
+    )
+
+    result = service.run(datasets="raw,historized", parallelism=4)
+
+    assert [item.status for item in result.dataset_results] == ["failed", "succeeded"]
+    assert result.dataset_results[0].error_message == "ORA-20000: export failed"
+    assert result.checkpoint_advanced is False
+
+
+def test_run_manifest_records_part_metrics_totals_and_wall_time():
+    state_store = _MemoryStateStore()
+
+    class _MeteredExecutor(_RecordingExecutor):
+        def execute_dataset(
+            self, dataset, dataset_plan, mode, object_prefix, export_format
+        ):
+            result = super().execute_dataset(
+                dataset, dataset_plan, mode, object_prefix, export_format
+            )
+            part = PartMetrics(
+                object_name=result.object_names[0],
+                rows=10,
+                uncompressed_bytes=1000,
+                compressed_bytes=100,
+                sha256="0" * 64,
+            )
+            return replace(
+                result,
+                row_count=10,
+                uncompressed_bytes=1000,
+                compressed_bytes=100,
+                parts=(part,),
+                stage_metrics=(StageMetrics("fetch", 10, 0, 0.5),),
+            )
+
+    service = ArchiveService(
+        config=_build_config(),
+        retention_lookup=_StaticRetentionLookup(),
+        state_store=state_store,
+        executor=_MeteredExecutor(),
+        clock=lambda: datetime(2026, 4, 8, 12, 0, tzinfo=timezone.utc),
+    )
+
+    result = service.run(
+        datasets="raw,historized", parallelism=2, shard_duration=timedelta(hours=12)
+    )
+
+    manifest = state_store.objects[result.manifest_object_name]
+    assert manifest["wall_seconds"] == result.wall_seconds
+    assert manifest["started_at"].endswith("Z")
+    assert manifest["totals"] == {
+        "row_count": 40,
+        "uncompressed_bytes": 4000,
+        "compressed_bytes": 400,
+    }
+    raw_entry = manifest["dataset_results"][0]
+    assert raw_entry["row_count"] == 20
+    assert len(raw_entry["parts"]) == 2
+    assert raw_entry["parts"][0]["sha256"] == "0" * 64
+    assert raw_entry["stage_metrics"][0]["items"] == 20
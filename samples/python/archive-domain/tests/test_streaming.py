@@ -0,0 +1,203 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from archive_domain.config import StreamingConfig
+from archive_domain.streaming import RawQueueArchiver, classify_content
+
+_RECEIVED = datetime(2026, 4, 8, 11, 59)
+
+
+class _FakeQueue:
+    def __init__(self, batches, archiver=None):
+        self.batches = list(batches)
+        self.archiver = archiver
+
+    def deqmany(self, max_messages):
+        if not self.batches:
+            self.archiver.stop()
+            return []
+        return self.batches.pop(0)
+
+
+class _FakeConnection:
+    def __init__(self, events):
+        self.events = events
+
+    def commit(self):
+        self.events.append("commit")
+
+    def rollback(self):
+        self.events.append("rollback")
+
+    def close(self):
+        self.events.append("close")
+
+
+class _MemorySource:
+    def __init__(self, events, fail=False):
+        self.events = events
+        self.fail = fail
+        self.objects = {}
+
+    def put_object(self, object_name, data):
+        if self.fail:
+            raise RuntimeError("upload failed")
+        self.events.append(f"put {object_name.rsplit('/', 1)[-1]}")
+        self.objects[object_name] = data
+
+
+class _MemoryCatalogStore:
+    def __init__(self, events):
+        self.events = events
+        self.entries = ()
+
+    def update_catalog(self, object_name, update):
+        self.events.append("catalog")
+        self.entries = update(self.entries)
+
+
+class _Monotonic:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _message(index, content=b'{"temperature": 21.5}', content_type=None):
+    return SimpleNamespace(
+        payload=SimpleNamespace(
+            DIGITAL_TWIN_INSTANCE_ID=f"twin-{index}",
+            ENDPOINT="telemetry",
+            TIME_RECEIVED=_RECEIVED + timedelta(seconds=index),
+            CONTENT=content,
+            CONTENT_TYPE=content_type,
+        )
+    )
+
+
+def _archiver(batches, source, events, monotonic=None, **settings):
+    archiver = RawQueueArchiver(
+        connection=_FakeConnection(events),
+        queue=_FakeQueue(batches),
+        source=source,
+        prefix="archive-root",
+        domain_short_name="sample",
+        manifest_prefix="_manifests",
+        settings=StreamingConfig(**settings),
+        catalog_store=_MemoryCatalogStore(events),
+        catalog_object="_state/catalog.json",
+        clock=lambda: datetime(2026, 4, 8, 12, tzinfo=timezone.utc),
+        monotonic=monotonic or _Monotonic(),
+    )
+    archiver.queue.archiver = archiver
+    return archiver
+
+
+def test_classify_content_follows_the_sql_mode_rules():
+    assert classify_content(b'{"a": 1}', "application/json; charset=utf-8") == (
+        "json",
+        {"a": 1},
+    )
+    assert classify_content(b"[1, 2]", None) == ("json", [1, 2])
+    assert classify_content(b"hello", "text/plain") == ("text", "hello")
+    assert classify_content(b"{bad", "application/json") == ("base64", "e2JhZA==")
+    assert classify_content(b"NaN", None) == ("base64", "TmFO")
+    assert classify_content(b"{}", "application/octet-stream") == ("base64", "e30=")
+
+
+def test_stream_flushes_a_part_and_commits_only_after_it_is_recorded():
+    events = []
+    source = _MemorySource(events)
+    archiver = _archiver(
+        [[_message(0), _message(1, b"\x00\x01", "image/png")]], source, events
+    )
+
+    assert archiver.run() == 1
+
+    part_name = next(name for name in source.objects if name.endswith(".jsonl.gz"))
+    run_id = part_name.split("run_id=")[1].split("/")[0]
+    assert events == [
+        "put part-00000.jsonl.gz",
+        f"put run_id={run_id}.json",
+        "catalog",
+        "commit",
+    ]
+    assert part_name.startswith(
+        "archive-root/domain=sample/zone=bronze/dataset=raw/"
+        "year=2026/month=04/day=08/hour=12/run_id=20260408T120000Z-"
+    )
+    records = [
+        json.loads(line)
+        for line in gzip.decompress(source.objects[part_name]).splitlines()
+    ]
+    assert records[0] == {
+        "content": {"temperature": 21.5},
+        "content_encoding": "json",
+        "content_representation": "parsed-json",
+        "content_type": None,
+        "digital_twin_instance_id": "twin-0",
+        "endpoint": "telemetry",
+        "time_received": "2026-04-08T11:59:00Z",
+    }
+    assert records[1]["content_encoding"] == "base64"
+    manifest = json.loads(source.objects[f"_manifests/run_id={run_id}.json"])
+    assert manifest["totals"]["row_count"] == 2
+    assert manifest["dataset_results"][0]["export_mode"] == "stream"
+    entry = archiver.catalog_store.entries[0]
+    assert entry.export_mode == "stream"
+    assert entry.window_start == _RECEIVED.replace(tzinfo=timezone.utc)
+    assert entry.window_end == entry.window_start + timedelta(seconds=1, microseconds=1)
+
+
+def test_stream_bounds_parts_by_size():
+    events = []
+    archiver = _archiver(
+        [[_message(0), _message(1)], [_message(2)]], _MemorySource(events), events
+    )
+    archiver.part_size_bytes = 1
+    written = []
+
+    assert archiver.run(on_flush=written.append) == 2
+
+    assert [result.row_count for result in written] == [2, 1]
+    assert events.count("commit") == 2
+
+
+def test_stream_bounds_parts_by_age_and_flushes_the_rest_when_stopped():
+    events = []
+    monotonic = _Monotonic()
+    archiver = _archiver(
+        [[_message(0)], [_message(1)], [], [_message(2)]],
+        _MemorySource(events),
+        events,
+        monotonic=monotonic,
+        max_part_seconds=60,
+    )
+    dequeue = archiver.queue.deqmany
+
+    def slow_dequeue(max_messages):
+        monotonic.now += 40
+        return dequeue(max_messages)
+
+    archiver.queue.deqmany = slow_dequeue
+    written = []
+
+    assert archiver.run(on_flush=written.append) == 2
+
+    assert [result.row_count for result in written] == [2, 1]
+    assert events.count("commit") == 2
+
+
+def test_stream_rolls_back_dequeues_when_the_upload_fails():
+    events = []
+    archiver = _archiver([[_message(0)]], _MemorySource(events, fail=True), events)
+
+    with pytest.raises(RuntimeError, match="upload failed"):
+        archiver.run()
+
+    assert events == ["rollback"]
@@ -24,6 +24,23 @@ create or replace package archive_domain_pkg as
     p_end_time     in timestamp with time zone default null,
     p_result       out clob
   );
+
+  procedure run_parallel(
+    p_config_name    in varchar2 default 'default',
+    p_dataset_list   in varchar2 default 'raw,historized,rejected',
+    p_start_time     in timestamp with time zone default null,
+    p_end_time       in timestamp with time zone default null,
+    p_chunk_minutes  in pls_integer default 60,
+    p_parallel_level in pls_integer default 4,
+    p_result         out clob
+  );
+
+  -- Called by DBMS_PARALLEL_EXECUTE for the chunks of run_parallel.
+  procedure export_chunk(
+    p_task_name in varchar2,
+    p_start_id  in number,
+    p_end_id    in number
+  );
 end archive_domain_pkg;
 /
 
@@ -501,41 +518,36 @@ create or replace package body archive_domain_pkg as
   function normalized_content_type_sql return varchar2
   is
   begin
-    return 'lower(trim(regexp_substr(content_type, ''^[^;]+'')))';
+    return 'lower(trim(regexp_substr(src.content_type, ''^[^;]+'')))';
   end normalized_content_type_sql;
 
   function json_candidate_sql return varchar2
   is
   begin
-    return 'to_clob(utl_raw.cast_to_varchar2(dbms_lob.substr(content, 32767, 1)))';
+    return 'to_clob(utl_raw.cast_to_varchar2(dbms_lob.substr(src.content, 32767, 1)))';
   end json_candidate_sql;
 
-  function content_encoding_sql return varchar2
+  function content_classification_sql return varchar2
   is
     l_content_type_expr varchar2(4000);
     l_json_candidate_expr varchar2(4000);
   begin
     l_content_type_expr := normalized_content_type_sql();
     l_json_candidate_expr := json_candidate_sql();
-    return 'case '
+    return 'lateral (select /*+ no_merge */ case '
            || 'when ' || l_content_type_expr || ' like ''text/%'' then ''text'' '
            || 'when ' || l_content_type_expr || ' is null or instr(' || l_content_type_expr || ', ''json'') > 0 then '
            || 'case when ' || l_json_candidate_expr || ' is json strict then ''json'' else ''base64'' end '
            || 'else ''base64'' '
-           || 'end';
-  end content_encoding_sql;
+           || 'end as content_encoding from dual) cls';
+  end content_classification_sql;
 
   function content_representation_sql return varchar2
   is
-    l_content_type_expr varchar2(4000);
-    l_json_candidate_expr varchar2(4000);
   begin
-    l_content_type_expr := normalized_content_type_sql();
-    l_json_candidate_expr := json_candidate_sql();
-    return 'case '
-           || 'when ' || l_content_type_expr || ' like ''text/%'' then ''json-string'' '
-           || 'when ' || l_content_type_expr || ' is null or instr(' || l_content_type_expr || ', ''json'') > 0 then '
-           || 'case when ' || l_json_candidate_expr || ' is json strict then ''parsed-json'' else ''base64-string'' end '
+    return 'case cls.content_encoding '
+           || 'when ''text'' then ''json-string'' '
+           || 'when ''json'' then ''parsed-json'' '
            || 'else ''base64-string'' '
            || 'end';
   end content_representation_sql;
@@ -563,10 +575,11 @@ create or replace package body archive_domain_pkg as
 
     return 'select '
            || 'id, digital_twin_instance_id, endpoint, time_received, content_type, '
-           || content_encoding_sql() || ' as content_encoding, '
+           || 'cls.content_encoding, '
            || content_representation_sql() || ' as content_representation, '
            || 'blob_to_json(content, content_type) as content '
-           || 'from ' || l_iot_schema || '.raw_data '
+           || 'from ' || l_iot_schema || '.raw_data src, '
+           || content_classification_sql() || ' '
            || 'where time_received >= ' || to_sql_timestamp_tz_literal(p_window_start) || ' '
            || 'and time_received < ' || to_sql_timestamp_tz_literal(p_window_end) || ' '
            || 'order by time_received, id';
@@ -628,10 +641,11 @@ create or replace package body archive_domain_pkg as
     return 'select '
            || 'id, digital_twin_instance_id, endpoint, time_received, '
            || 'reason_code, reason_message, content_type, '
-           || content_encoding_sql() || ' as content_encoding, '
+           || 'cls.content_encoding, '
            || content_representation_sql() || ' as content_representation, '
            || 'blob_to_json(content, content_type) as content '
-           || 'from ' || l_iot_schema || '.rejected_data '
+           || 'from ' || l_iot_schema || '.rejected_data src, '
+           || content_classification_sql() || ' '
            || 'where time_received >= ' || to_sql_timestamp_tz_literal(p_window_start) || ' '
            || 'and time_received < ' || to_sql_timestamp_tz_literal(p_window_end) || ' '
            || 'order by time_received, id';
@@ -654,6 +668,159 @@ create or replace package body archive_domain_pkg as
     );
   end put_json_object;
 
+  function build_dataset_query(
+    p_dataset           in varchar2,
+    p_domain_short_name in varchar2,
+    p_export_format     in varchar2,
+    p_window_start      in timestamp with time zone,
+    p_window_end        in timestamp with time zone
+  ) return clob
+  is
+  begin
+    case p_dataset
+      when 'raw' then
+        return build_raw_query(
+          p_domain_short_name => p_domain_short_name,
+          p_export_format     => p_export_format,
+          p_window_start      => p_window_start,
+          p_window_end        => p_window_end
+        );
+      when 'historized' then
+        return build_historized_query(
+          p_domain_short_name => p_domain_short_name,
+          p_export_format     => p_export_format,
+          p_window_start      => p_window_start,
+          p_window_end        => p_window_end
+        );
+      when 'rejected' then
+        return build_rejected_query(
+          p_domain_short_name => p_domain_short_name,
+          p_export_format     => p_export_format,
+          p_window_start      => p_window_start,
+          p_window_end        => p_window_end
+        );
+      else
+        raise_application_error(-20012, 'unsupported dataset: ' || p_dataset);
+    end case;
+  end build_dataset_query;
+
+  function build_dataset_file_uri_list(
+    p_region        in varchar2,
+    p_namespace     in varchar2,
+    p_bucket_name   in varchar2,
+    p_object_prefix in varchar2,
+    p_dataset       in varchar2,
+    p_export_format in varchar2
+  ) return varchar2
+  is
+  begin
+    if p_export_format = 'datapump' then
+      return build_object_uri(
+        p_region      => p_region,
+        p_namespace   => p_namespace,
+        p_bucket_name => p_bucket_name,
+        p_object_name => p_object_prefix || '/' || p_dataset || '_01.dmp'
+      );
+    end if;
+
+    return build_object_uri(
+      p_region      => p_region,
+      p_namespace   => p_namespace,
+      p_bucket_name => p_bucket_name,
+      p_object_name => p_object_prefix || '/' || p_dataset
+    );
+  end build_dataset_file_uri_list;
+
+  procedure export_window(
+    p_credential_name in varchar2,
+    p_file_uri_list   in varchar2,
+    p_export_format   in varchar2,
+    p_query           in clob
+  )
+  is
+  begin
+    if p_export_format = 'datapump' then
+      dbms_cloud.export_data(
+        credential_name => p_credential_name,
+        file_uri_list   => p_file_uri_list,
+        format          => json_object(
+                             'type' value 'datapump',
+                             'compression' value 'HIGH',
+                             'version' value 'LATEST'
+                           ),
+        query           => p_query
+      );
+    else
+      dbms_cloud.export_data(
+        credential_name => p_credential_name,
+        file_uri_list   => p_file_uri_list,
+        format          => '{"type":"' || p_export_format || '"}',
+        query           => p_query
+      );
+    end if;
+  end export_window;
+
+  function finish_run(
+    p_credential_name   in varchar2,
+    p_region            in varchar2,
+    p_namespace         in varchar2,
+    p_bucket_name       in varchar2,
+    p_manifest_prefix   in varchar2,
+    p_checkpoint_object in varchar2,
+    p_run_id            in varchar2,
+    p_run_at            in timestamp with time zone,
+    p_checkpoint_before in varchar2,
+    p_selected_datasets in json_array_t,
+    p_dataset_results   in json_array_t,
+    p_all_succeeded     in boolean
+  ) return varchar2
+  is
+    l_manifest_object_name varchar2(2048);
+    l_manifest_obj json_object_t := json_object_t();
+    l_checkpoint_obj json_object_t := json_object_t();
+  begin
+    l_manifest_object_name := build_manifest_object_name(
+      p_manifest_prefix => p_manifest_prefix,
+      p_run_id          => p_run_id
+    );
+
+    l_manifest_obj.put('run_id', p_run_id);
+    l_manifest_obj.put('selected_datasets', p_selected_datasets);
+    if p_checkpoint_before is null then
+      l_manifest_obj.put_null('checkpoint_before');
+    else
+      l_manifest_obj.put('checkpoint_before', p_checkpoint_before);
+    end if;
+    l_manifest_obj.put('dataset_results', p_dataset_results);
+
+    put_json_object(
+      p_credential_name => p_credential_name,
+      p_object_uri      => build_object_uri(
+                             p_region      => p_region,
+                             p_namespace   => p_namespace,
+                             p_bucket_name => p_bucket_name,
+                             p_object_name => l_manifest_object_name
+                           ),
+      p_payload         => l_manifest_obj.to_clob()
+    );
+
+    if p_all_succeeded then
+      l_checkpoint_obj.put('last_successful_run_at', format_timestamp(p_run_at));
+      put_json_object(
+        p_credential_name => p_credential_name,
+        p_object_uri      => build_object_uri(
+                               p_region      => p_region,
+                               p_namespace   => p_namespace,
+                               p_bucket_name => p_bucket_name,
+                               p_object_name => p_checkpoint_object
+                             ),
+        p_payload         => l_checkpoint_obj.to_clob()
+      );
+    end if;
+
+    return l_manifest_object_name;
+  end finish_run;
+
   procedure plan(
     p_config_name  in varchar2 default 'default',
     p_dataset_list in varchar2 default 'raw,historized,rejected',
@@ -782,13 +949,8 @@ create or replace package body archive_domain_pkg as
     l_result_datasets_obj json_object_t := json_object_t();
     l_manifest_dataset_obj json_object_t;
     l_result_dataset_obj json_object_t;
-    l_manifest_obj json_object_t := json_object_t();
     l_result_obj json_object_t := json_object_t();
     l_manifest_object_name varchar2(2048);
-    l_manifest_uri varchar2(4000);
-    l_manifest_json clob;
-    l_checkpoint_uri varchar2(4000);
-    l_checkpoint_json clob;
     l_export_format varchar2(30);
   begin
     l_config := load_config(p_config_name => p_config_name);
@@ -844,101 +1006,33 @@ create or replace package body archive_domain_pkg as
         p_run_at            => l_run_at
       );
 
-      case l_dataset
-        when 'raw' then
-          l_dataset_query := build_raw_query(
-            p_domain_short_name => l_domain_short_name,
-            p_export_format     => l_export_format,
-            p_window_start      => l_window_start,
-            p_window_end        => l_window_end
-          );
-          l_dataset_export_format := l_export_format;
-          if l_export_format = 'datapump' then
-            l_dataset_file_uri_list := build_object_uri(
-              p_region      => l_region,
-              p_namespace   => l_namespace,
-              p_bucket_name => l_bucket_name,
-              p_object_name => l_dataset_object_prefix || '/raw_01.dmp'
-            );
-          else
-            l_dataset_file_uri_list := build_object_uri(
-              p_region      => l_region,
-              p_namespace   => l_namespace,
-              p_bucket_name => l_bucket_name,
-              p_object_name => l_dataset_object_prefix || '/' || l_dataset
-            );
-          end if;
-        when 'historized' then
-          l_dataset_query := build_historized_query(
-            p_domain_short_name => l_domain_short_name,
-            p_export_format     => l_export_format,
-            p_window_start      => l_window_start,
-            p_window_end        => l_window_end
-          );
-          l_dataset_export_format := l_export_format;
-          if l_export_format = 'datapump' then
-            l_dataset_file_uri_list := build_object_uri(
-              p_region      => l_region,
-              p_namespace   => l_namespace,
-              p_bucket_name => l_bucket_name,
-              p_object_name => l_dataset_object_prefix || '/historized_01.dmp'
-            );
-          else
-            l_dataset_file_uri_list := build_object_uri(
-              p_region      => l_region,
-              p_namespace   => l_namespace,
-              p_bucket_name => l_bucket_name,
-              p_object_name => l_dataset_object_prefix || '/' || l_dataset
-            );
-          end if;
-        when 'rejected' then
-          l_dataset_query := build_rejected_query(
-            p_domain_short_name => l_domain_short_name,
-            p_export_format     => l_export_format,
-            p_window_start      => l_window_start,
-            p_window_end        => l_window_end
-          );
-          l_dataset_export_format := l_export_format;
-          if l_export_format = 'datapump' then
-            l_dataset_file_uri_list := build_object_uri(
-              p_region      => l_region,
-              p_namespace   => l_namespace,
-              p_bucket_name => l_bucket_name,
-              p_object_name => l_dataset_object_prefix || '/rejected_01.dmp'
-            );
-          else
-            l_dataset_file_uri_list := build_object_uri(
-              p_region      => l_region,
-              p_namespace   => l_namespace,
-              p_bucket_name => l_bucket_name,
-              p_object_name => l_dataset_object_prefix || '/' || l_dataset
-            );
-          end if;
-      end case;
+      l_dataset_query := build_dataset_query(
+        p_dataset           => l_dataset,
+        p_domain_short_name => l_domain_short_name,
+        p_export_format     => l_export_format,
+        p_window_start      => l_window_start,
+        p_window_end        => l_window_end
+      );
+      l_dataset_export_format := l_export_format;
+      l_dataset_file_uri_list := build_dataset_file_uri_list(
+        p_region        => l_region,
+        p_namespace     => l_namespace,
+        p_bucket_name   => l_bucket_name,
+        p_object_prefix => l_dataset_object_prefix,
+        p_dataset       => l_dataset,
+        p_export_format => l_dataset_export_format
+      );
 
       l_dataset_status := 'planned';
       l_dataset_error_message := null;
 
       begin
-        if l_dataset_export_format = 'datapump' then
-          dbms_cloud.export_data(
-            credential_name => l_credential_name,
-            file_uri_list   => l_dataset_file_uri_list,
-            format          => json_object(
-                                 'type' value 'datapump',
-                                 'compression' value 'HIGH',
-                                 'version' value 'LATEST'
-                               ),
-            query           => l_dataset_query
-          );
-        else
-          dbms_cloud.export_data(
-            credential_name => l_credential_name,
-            file_uri_list   => l_dataset_file_uri_list,
-            format          => '{"type":"' || l_dataset_export_format || '"}',
-            query           => l_dataset_query
-          );
-        end if;
+        export_window(
+          p_credential_name => l_credential_name,
+          p_file_uri_list   => l_dataset_file_uri_list,
+          p_export_format   => l_dataset_export_format,
+          p_query           => l_dataset_query
+        );
         l_dataset_status := 'succeeded';
       exception
         when others then
@@ -976,59 +1070,376 @@ create or replace package body archive_domain_pkg as
       l_result_datasets_obj.put(l_dataset, l_result_dataset_obj);
     end loop;
 
-    l_manifest_object_name := build_manifest_object_name(
-      p_manifest_prefix => l_manifest_prefix,
-      p_run_id          => l_run_id
-    );
-    l_manifest_uri := build_object_uri(
-      p_region      => l_region,
-      p_namespace   => l_namespace,
-      p_bucket_name => l_bucket_name,
-      p_object_name => l_manifest_object_name
+    l_manifest_object_name := finish_run(
+      p_credential_name   => l_credential_name,
+      p_region            => l_region,
+      p_namespace         => l_namespace,
+      p_bucket_name       => l_bucket_name,
+      p_manifest_prefix   => l_manifest_prefix,
+      p_checkpoint_object => l_checkpoint_object,
+      p_run_id            => l_run_id,
+      p_run_at            => l_run_at,
+      p_checkpoint_before => l_checkpoint_before,
+      p_selected_datasets => l_selected_datasets,
+      p_dataset_results   => l_manifest_dataset_results,
+      p_all_succeeded     => l_all_succeeded
     );
 
-    l_manifest_obj.put('run_id', l_run_id);
-    l_manifest_obj.put('selected_datasets', l_selected_datasets);
-    if l_checkpoint_before is null then
-      l_manifest_obj.put_null('checkpoint_before');
-    else
-      l_manifest_obj.put('checkpoint_before', l_checkpoint_before);
+    l_result_obj.put('run_id', l_run_id);
+    l_result_obj.put('export_format', l_export_format);
+    l_result_obj.put('datasets', l_result_datasets_obj);
+    l_result_obj.put('manifest_object_name', l_manifest_object_name);
+    l_result_obj.put('checkpoint_advanced', l_all_succeeded);
+    p_result := l_result_obj.to_clob();
+  end run;
+
+  procedure run_parallel(
+    p_config_name    in varchar2 default 'default',
+    p_dataset_list   in varchar2 default 'raw,historized,rejected',
+    p_start_time     in timestamp with time zone default null,
+    p_end_time       in timestamp with time zone default null,
+    p_chunk_minutes  in pls_integer default 60,
+    p_parallel_level in pls_integer default 4,
+    p_result         out clob
+  )
+  is
+    l_config clob;
+    l_datasets t_dataset_list;
+    l_plan_result clob;
+    l_plan_obj json_object_t;
+    l_plan_datasets_obj json_object_t;
+    l_plan_dataset_obj json_object_t;
+    l_checkpoint_before_element json_element_t;
+    l_run_at timestamp with time zone;
+    l_window_start timestamp with time zone;
+    l_window_end timestamp with time zone;
+    l_chunk_start timestamp with time zone;
+    l_chunk_end timestamp with time zone;
+    l_region varchar2(128);
+    l_domain_short_name varchar2(128);
+    l_namespace varchar2(256);
+    l_bucket_name varchar2(256);
+    l_prefix varchar2(1024);
+    l_manifest_prefix varchar2(1024);
+    l_checkpoint_object varchar2(1024);
+    l_credential_name varchar2(128);
+    l_checkpoint_before varchar2(128);
+    l_dataset varchar2(30);
+    l_run_id varchar2(64);
+    l_task_name varchar2(128);
+    l_chunk_no pls_integer := 0;
+    l_shard_index pls_integer;
+    l_dataset_object_prefix varchar2(2048);
+    l_chunk_object_prefix varchar2(2048);
+    l_chunk_file_uri_list varchar2(4000);
+    l_chunk_query clob;
+    l_dataset_status varchar2(32);
+    l_dataset_error_message varchar2(4000);
+    l_all_succeeded boolean := true;
+    l_selected_datasets json_array_t := json_array_t();
+    l_manifest_dataset_results json_array_t := json_array_t();
+    l_result_datasets_obj json_object_t := json_object_t();
+    l_manifest_dataset_obj json_object_t;
+    l_result_dataset_obj json_object_t;
+    l_shards json_array_t;
+    l_shard_obj json_object_t;
+    l_result_obj json_object_t := json_object_t();
+    l_manifest_object_name varchar2(2048);
+    l_export_format varchar2(30);
+    l_current_schema varchar2(128);
+  begin
+    if p_chunk_minutes is null or p_chunk_minutes < 1 then
+      raise_application_error(-20027, 'p_chunk_minutes must be >= 1');
     end if;
-    l_manifest_obj.put('dataset_results', l_manifest_dataset_results);
-    l_manifest_json := l_manifest_obj.to_clob();
 
-    put_json_object(
-      p_credential_name => l_credential_name,
-      p_object_uri      => l_manifest_uri,
-      p_payload         => l_manifest_json
+    if p_parallel_level is null or p_parallel_level < 1 then
+      raise_application_error(-20028, 'p_parallel_level must be >= 1');
+    end if;
+
+    l_config := load_config(p_config_name => p_config_name);
+    l_datasets := parse_datasets(p_dataset_list => p_dataset_list);
+
+    plan(
+      p_config_name  => p_config_name,
+      p_dataset_list => p_dataset_list,
+      p_start_time   => p_start_time,
+      p_end_time     => p_end_time,
+      p_result       => l_plan_result
     );
 
-    if l_all_succeeded then
-      l_checkpoint_uri := build_object_uri(
-        p_region      => l_region,
-        p_namespace   => l_namespace,
-        p_bucket_name => l_bucket_name,
-        p_object_name => l_checkpoint_object
-      );
+    l_plan_obj := json_object_t.parse(l_plan_result);
+    l_run_at := parse_timestamp(l_plan_obj.get_string('now'));
+    l_export_format := l_plan_obj.get_string('export_format');
+    l_plan_datasets_obj := l_plan_obj.get_object('datasets');
+    l_checkpoint_before_element := l_plan_obj.get('checkpoint_before');
+    if l_checkpoint_before_element is not null and not l_checkpoint_before_element.is_null then
+      l_checkpoint_before := l_plan_obj.get_string('checkpoint_before');
+    end if;
 
-      l_result_dataset_obj := json_object_t();
-      l_result_dataset_obj.put('last_successful_run_at', format_timestamp(l_run_at));
-      l_checkpoint_json := l_result_dataset_obj.to_clob();
+    select json_value(l_config, '$.domain_short_name' returning varchar2(128) error on error),
+           json_value(l_config, '$.namespace' returning varchar2(256) error on error),
+           json_value(l_config, '$.bucket_name' returning varchar2(256) error on error),
+           json_value(l_config, '$.prefix' returning varchar2(1024) error on error),
+           json_value(l_config, '$.manifest_prefix' returning varchar2(1024) error on error),
+           json_value(l_config, '$.checkpoint_object' returning varchar2(1024) error on error),
+           json_value(l_config, '$.dbms_cloud_credential_name' returning varchar2(128) error on error)
+      into l_domain_short_name, l_namespace, l_bucket_name, l_prefix, l_manifest_prefix,
+           l_checkpoint_object, l_credential_name
+      from dual;
 
-      put_json_object(
-        p_credential_name => l_credential_name,
-        p_object_uri      => l_checkpoint_uri,
-        p_payload         => l_checkpoint_json
+    l_region := resolve_region(l_config);
+    if l_region is null then
+      raise_application_error(-20020, 'missing region and CLOUD_REGION context');
+    end if;
+
+    l_run_id := build_run_id(l_run_at);
+    l_task_name := dbms_parallel_execute.generate_task_name('ARCHIVE_DOMAIN_');
+    l_current_schema := sys_context('userenv', 'current_schema');
+
+    -- Each chunk is one sub-window of one dataset, exported to its own
+    -- shard=<index> prefix under the dataset's run prefix.
+    for l_index in 1 .. l_datasets.count loop
+      l_dataset := l_datasets(l_index);
+      l_plan_dataset_obj := l_plan_datasets_obj.get_object(l_dataset);
+      l_window_start := parse_timestamp(l_plan_dataset_obj.get_string('window_start'));
+      l_window_end := parse_timestamp(l_plan_dataset_obj.get_string('window_end'));
+      l_dataset_object_prefix := build_dataset_object_prefix(
+        p_prefix            => l_prefix,
+        p_domain_short_name => l_domain_short_name,
+        p_dataset           => l_dataset,
+        p_run_id            => l_run_id,
+        p_run_at            => l_run_at
       );
+
+      l_shard_index := 0;
+      l_chunk_start := l_window_start;
+      while l_chunk_start < l_window_end loop
+        l_chunk_end := least(
+          l_chunk_start + numtodsinterval(p_chunk_minutes, 'MINUTE'),
+          l_window_end
+        );
+        l_chunk_no := l_chunk_no + 1;
+        l_chunk_object_prefix := l_dataset_object_prefix
+                                 || '/shard=' || to_char(l_shard_index, 'FM00000');
+        l_chunk_file_uri_list := build_dataset_file_uri_list(
+          p_region        => l_region,
+          p_namespace     => l_namespace,
+          p_bucket_name   => l_bucket_name,
+          p_object_prefix => l_chunk_object_prefix,
+          p_dataset       => l_dataset,
+          p_export_format => l_export_format
+        );
+        l_chunk_query := build_dataset_query(
+          p_dataset           => l_dataset,
+          p_domain_short_name => l_domain_short_name,
+          p_export_format     => l_export_format,
+          p_window_start      => l_chunk_start,
+          p_window_end        => l_chunk_end
+        );
+
+        insert into archive_domain_run_chunks (
+          task_name, chunk_no, dataset, shard_index, window_start, window_end,
+          object_prefix, file_uri_list, export_format, credential_name, query_text,
+          current_schema
+        ) values (
+          l_task_name, l_chunk_no, l_dataset, l_shard_index, l_chunk_start, l_chunk_end,
+          l_chunk_object_prefix, l_chunk_file_uri_list, l_export_format, l_credential_name,
+          l_chunk_query, l_current_schema
+        );
+
+        l_shard_index := l_shard_index + 1;
+        l_chunk_start := l_chunk_end;
+      end loop;
+    end loop;
+
+    -- The chunk jobs run in their own sessions and only see committed rows.
+    commit;
+
+    if l_chunk_no > 0 then
+      begin
+        dbms_parallel_execute.create_task(task_name => l_task_name);
+        dbms_parallel_execute.create_chunks_by_sql(
+          task_name => l_task_name,
+          sql_stmt  => 'select chunk_no, chunk_no from archive_domain_run_chunks '
+                       || 'where task_name = ' || dbms_assert.enquote_literal(l_task_name),
+          by_rowid  => false
+        );
+        dbms_parallel_execute.run_task(
+          task_name      => l_task_name,
+          sql_stmt       => 'begin archive_domain_pkg.export_chunk('
+                            || dbms_assert.enquote_literal(l_task_name)
+                            || ', :start_id, :end_id); end;',
+          language_flag  => dbms_sql.native,
+          parallel_level => p_parallel_level
+        );
+        dbms_parallel_execute.drop_task(task_name => l_task_name);
+      exception
+        when others then
+          begin
+            dbms_parallel_execute.drop_task(task_name => l_task_name);
+          exception
+            when others then
+              null;
+          end;
+          delete from archive_domain_run_chunks where task_name = l_task_name;
+          commit;
+          raise;
+      end;
     end if;
 
+    for l_index in 1 .. l_datasets.count loop
+      l_dataset := l_datasets(l_index);
+      l_selected_datasets.append(l_dataset);
+      l_dataset_object_prefix := build_dataset_object_prefix(
+        p_prefix            => l_prefix,
+        p_domain_short_name => l_domain_short_name,
+        p_dataset           => l_dataset,
+        p_run_id            => l_run_id,
+        p_run_at            => l_run_at
+      );
+
+      l_dataset_status := 'succeeded';
+      l_dataset_error_message := null;
+      l_shards := json_array_t();
+      for l_chunk in (
+        select shard_index, window_start, window_end, object_prefix, status, error_message
+          from archive_domain_run_chunks
+         where task_name = l_task_name
+           and dataset = l_dataset
+         order by shard_index
+      ) loop
+        l_shard_obj := json_object_t();
+        l_shard_obj.put('index', l_chunk.shard_index);
+        l_shard_obj.put('window_start', format_timestamp(l_chunk.window_start));
+        l_shard_obj.put('window_end', format_timestamp(l_chunk.window_end));
+        l_shard_obj.put('status', l_chunk.status);
+        l_shard_obj.put('object_prefix', l_chunk.object_prefix);
+        if l_chunk.error_message is null then
+          l_shard_obj.put_null('error_message');
+        else
+          l_shard_obj.put('error_message', l_chunk.error_message);
+        end if;
+        l_shards.append(l_shard_obj);
+
+        if l_chunk.status <> 'succeeded' then
+          l_dataset_status := 'failed';
+          if l_dataset_error_message is null then
+            l_dataset_error_message := substr(
+              'shard ' || l_chunk.shard_index || ': '
+              || coalesce(l_chunk.error_message, 'chunk was not exported'),
+              1,
+              4000
+            );
+          end if;
+        end if;
+      end loop;
+
+      if l_dataset_status <> 'succeeded' then
+        l_all_succeeded := false;
+      end if;
+
+      l_manifest_dataset_obj := json_object_t();
+      l_manifest_dataset_obj.put('name', l_dataset);
+      l_manifest_dataset_obj.put('status', l_dataset_status);
+      l_manifest_dataset_obj.put('export_mode', 'bulk');
+      l_manifest_dataset_obj.put('export_format', l_export_format);
+      l_manifest_dataset_obj.put('object_prefix', l_dataset_object_prefix);
+      if l_dataset_error_message is null then
+        l_manifest_dataset_obj.put_null('error_message');
+      else
+        l_manifest_dataset_obj.put('error_message', l_dataset_error_message);
+      end if;
+      l_manifest_dataset_obj.put('shards', l_shards);
+      l_manifest_dataset_results.append(l_manifest_dataset_obj);
+
+      l_result_dataset_obj := json_object_t();
+      l_result_dataset_obj.put('status', l_dataset_status);
+      l_result_dataset_obj.put('export_format', l_export_format);
+      l_result_dataset_obj.put('object_prefix', l_dataset_object_prefix);
+      l_result_dataset_obj.put('chunk_count', l_shards.get_size());
+      if l_dataset_error_message is null then
+        l_result_dataset_obj.put_null('error_message');
+      else
+        l_result_dataset_obj.put('error_message', l_dataset_error_message);
+      end if;
+      l_result_datasets_obj.put(l_dataset, l_result_dataset_obj);
+    end loop;
+
+    delete from archive_domain_run_chunks where task_name = l_task_name;
+    commit;
+
+    l_manifest_object_name := finish_run(
+      p_credential_name   => l_credential_name,
+      p_region            => l_region,
+      p_namespace         => l_namespace,
+      p_bucket_name       => l_bucket_name,
+      p_manifest_prefix   => l_manifest_prefix,
+      p_checkpoint_object => l_checkpoint_object,
+      p_run_id            => l_run_id,
+      p_run_at            => l_run_at,
+      p_checkpoint_before => l_checkpoint_before,
+      p_selected_datasets => l_selected_datasets,
+      p_dataset_results   => l_manifest_dataset_results,
+      p_all_succeeded     => l_all_succeeded
+    );
+
     l_result_obj.put('run_id', l_run_id);
     l_result_obj.put('export_format', l_export_format);
     l_result_obj.put('datasets', l_result_datasets_obj);
     l_result_obj.put('manifest_object_name', l_manifest_object_name);
     l_result_obj.put('checkpoint_advanced', l_all_succeeded);
     p_result := l_result_obj.to_clob();
-  end run;
+  end run_parallel;
+
+  procedure export_chunk(
+    p_task_name in varchar2,
+    p_start_id  in number,
+    p_end_id    in number
+  )
+  is
+    l_error_message varchar2(4000);
+  begin
+    for l_chunk in (
+      select chunk_no, file_uri_list, export_format, credential_name, query_text,
+             current_schema
+        from archive_domain_run_chunks
+       where task_name = p_task_name
+         and chunk_no between p_start_id and p_end_id
+       order by chunk_no
+    ) loop
+      begin
+        -- Chunk jobs run in new sessions; resolve unqualified names in the
+        -- export query, such as blob_to_json, as the run_parallel caller did.
+        execute immediate 'alter session set current_schema = '
+                          || dbms_assert.enquote_name(
+                               dbms_assert.schema_name(l_chunk.current_schema),
+                               false
+                             );
+        export_window(
+          p_credential_name => l_chunk.credential_name,
+          p_file_uri_list   => l_chunk.file_uri_list,
+          p_export_format   => l_chunk.export_format,
+          p_query           => l_chunk.query_text
+        );
+        update archive_domain_run_chunks
+           set status = 'succeeded',
+               finished_at = systimestamp
+         where task_name = p_task_name
+           and chunk_no = l_chunk.chunk_no;
+      exception
+        when others then
+          -- Failures are recorded on the chunk row so run_parallel can put them
+          -- in the manifest; DBMS_PARALLEL_EXECUTE commits after each chunk.
+          l_error_message := substr(sqlerrm, 1, 4000);
+          update archive_domain_run_chunks
+             set status = 'failed',
+                 error_message = l_error_message,
+                 finished_at = systimestamp
+           where task_name = p_task_name
+             and chunk_no = l_chunk.chunk_no;
+      end;
+    end loop;
+  end export_chunk;
 end archive_domain_pkg;
 /
 
@@ -32,6 +32,26 @@ end;
 
 show errors;
 
+create table archive_domain_run_chunks
+(
+  task_name       varchar2(128) not null,
+  chunk_no        number not null,
+  dataset         varchar2(30) not null,
+  shard_index     number not null,
+  window_start    timestamp with time zone not null,
+  window_end      timestamp with time zone not null,
+  object_prefix   varchar2(2048) not null,
+  file_uri_list   varchar2(4000) not null,
+  export_format   varchar2(30) not null,
+  credential_name varchar2(128) not null,
+  query_text      clob not null,
+  current_schema  varchar2(128) not null,
+  status          varchar2(32) default 'planned' not null,
+  error_message   varchar2(4000),
+  finished_at     timestamp with time zone,
+  constraint archive_domain_run_chunks_pk primary key (task_name, chunk_no)
+);
+
 declare
   l_error_count number;
 begin
@@ -10,7 +10,7 @@
 
 whenever sqlerror exit sql.sqlcode
 
-prompt Creating archive_domain_config table
+prompt Creating archive_domain_config and archive_domain_run_chunks tables
 @@archive_domain_tables.sql
 
 prompt Creating archive_domain_pkg
@@ -0,0 +1,116 @@
+--
+-- Smoke test for archive_domain_pkg.run_parallel.
+--
+-- Copyright (c) 2026 Oracle and/or its affiliates.
+-- Licensed under the Universal Permissive License v 1.0 as shown at
+-- https://oss.oracle.com/licenses/upl.
+--
+-- DO NOT ALTER OR REMOVE COPYRIGHT NOTICES OR THIS HEADER.
+--
+-- Checks that archive_domain_pkg compiled, then exports one dataset over a
+-- short explicit window that ends at the last full hour and checks that every
+-- chunk succeeded and that no chunk rows or DBMS_PARALLEL_EXECUTE tasks are
+-- left behind. Run install.sql first. A successful run writes a manifest and
+-- advances the checkpoint of the config it uses, so point it at a config row
+-- whose prefix, manifest_prefix, and checkpoint_object are scratch locations:
+--
+--   sql "<connect string>" @smoke_test_run_parallel.sql smoke rejected 120 60
+--
+-- Arguments: config name, dataset, window length in minutes, chunk length in
+-- minutes.
+--
+
+whenever sqlerror exit sql.sqlcode
+set serveroutput on
+set verify off
+
+define config_name = &1
+define dataset = &2
+define window_minutes = &3
+define chunk_minutes = &4
+
+declare
+  l_count number;
+  l_end_time timestamp with time zone;
+  l_result clob;
+  l_result_obj json_object_t;
+  l_dataset_obj json_object_t;
+  l_expected_chunks pls_integer;
+begin
+  select count(*)
+    into l_count
+    from user_errors
+   where name = 'ARCHIVE_DOMAIN_PKG';
+
+  if l_count > 0 then
+    raise_application_error(-20100, 'archive_domain_pkg has compilation errors');
+  end if;
+
+  select count(*)
+    into l_count
+    from session_privs
+   where privilege = 'CREATE JOB';
+
+  if l_count = 0 then
+    raise_application_error(-20101, 'run_parallel needs the CREATE JOB privilege');
+  end if;
+
+  l_end_time := from_tz(
+    cast(trunc(sys_extract_utc(systimestamp), 'HH24') as timestamp),
+    'UTC'
+  );
+  l_expected_chunks := ceil(&window_minutes / &chunk_minutes);
+
+  archive_domain_pkg.run_parallel(
+    p_config_name    => '&config_name',
+    p_dataset_list   => '&dataset',
+    p_start_time     => l_end_time - numtodsinterval(&window_minutes, 'MINUTE'),
+    p_end_time       => l_end_time,
+    p_chunk_minutes  => &chunk_minutes,
+    p_parallel_level => 2,
+    p_result         => l_result
+  );
+  dbms_output.put_line(l_result);
+
+  l_result_obj := json_object_t.parse(l_result);
+  l_dataset_obj := l_result_obj.get_object('datasets').get_object('&dataset');
+
+  if l_dataset_obj.get_string('status') <> 'succeeded' then
+    raise_application_error(
+      -20102,
+      'dataset failed: ' || l_dataset_obj.get_string('error_message')
+    );
+  end if;
+
+  if l_dataset_obj.get_number('chunk_count') <> l_expected_chunks then
+    raise_application_error(
+      -20103,
+      'expected ' || l_expected_chunks || ' chunks, got '
+      || l_dataset_obj.get_number('chunk_count')
+    );
+  end if;
+
+  if not l_result_obj.get_boolean('checkpoint_advanced') then
+    raise_application_error(-20104, 'checkpoint did not advance');
+  end if;
+
+  select count(*)
+    into l_count
+    from archive_domain_run_chunks;
+
+  if l_count > 0 then
+    raise_application_error(-20105, l_count || ' chunk rows were left behind');
+  end if;
+
+  select count(*)
+    into l_count
+    from user_parallel_execute_tasks
+   where task_name like 'ARCHIVE_DOMAIN_%';
+
+  if l_count > 0 then
+    raise_application_error(-20106, l_count || ' parallel execute tasks were left behind');
+  end if;
+
+  dbms_output.put_line('run_parallel smoke test passed');
+end;
+/
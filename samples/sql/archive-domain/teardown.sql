@@ -54,3 +54,18 @@ begin
   end if;
 end;
 /
+
+declare
+  l_table_exists number;
+begin
+  select count(*)
+    into l_table_exists
+    from user_objects
+   where object_name = 'ARCHIVE_DOMAIN_RUN_CHUNKS'
+     and object_type = 'TABLE';
+
+  if l_table_exists > 0 then
+    execute immediate 'drop table archive_domain_run_chunks';
+  end if;
+end;
+/